@@ -4,7 +4,11 @@
 添加 GPT5 对 25121 期的历史预测并计算命中结果
 """
 
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fetch_history"))
+from json_io import update_json
 
 # GPT5 对 25121 期的预测数据
 gpt5_prediction = {
@@ -76,50 +80,45 @@ best_pred = max(gpt5_prediction["predictions"], key=lambda p: p["hit_result"]["t
 gpt5_prediction["best_group"] = best_pred["group_id"]
 gpt5_prediction["best_hit_count"] = best_pred["hit_result"]["total_hits"]
 
-# 读取现有历史预测数据
-with open('data/predictions_history.json', 'r', encoding='utf-8') as f:
-    history_data = json.load(f)
+HISTORY_FILE = 'data/predictions_history.json'
 
-# 检查 25121 期是否已存在
-existing_record = next((r for r in history_data['predictions_history'] if r['target_period'] == '25121'), None)
 
-if existing_record:
-    # 添加 GPT5 模型到现有记录
-    existing_models = [m['model_id'] for m in existing_record['models']]
-    if 'GPT5' not in existing_models:
-        model_entry = {
-            "model_id": gpt5_prediction["model_id"],
-            "model_name": gpt5_prediction["model_name"],
-            "predictions": gpt5_prediction["predictions"],
-            "best_group": gpt5_prediction["best_group"],
-            "best_hit_count": gpt5_prediction["best_hit_count"]
-        }
+def add_gpt5_record(history_data):
+    """把 GPT5 的预测加入 25121 期的历史记录（不存在时按期号降序插入新记录），返回是否有修改"""
+    records = history_data['predictions_history']
+    existing_record = next((r for r in records if r['target_period'] == '25121'), None)
+    model_entry = {
+        "model_id": gpt5_prediction["model_id"],
+        "model_name": gpt5_prediction["model_name"],
+        "predictions": gpt5_prediction["predictions"],
+        "best_group": gpt5_prediction["best_group"],
+        "best_hit_count": gpt5_prediction["best_hit_count"]
+    }
+
+    if existing_record:
+        # 添加 GPT5 模型到现有记录
+        if 'GPT5' in [m['model_id'] for m in existing_record['models']]:
+            print(f"⚠️  GPT5 模型已存在于 25121 期历史记录中，跳过")
+            return False
         existing_record['models'].append(model_entry)
         print(f"✓ 已将 GPT5 模型添加到 25121 期的历史记录")
-    else:
-        print(f"⚠️  GPT5 模型已存在于 25121 期历史记录中，跳过")
-else:
-    # 创建新的历史记录
+        return True
+
+    # 创建新的历史记录，保持归档按期号降序
     new_record = {
         "prediction_date": gpt5_prediction["prediction_date"],
         "target_period": gpt5_prediction["target_period"],
         "actual_result": actual_result,
-        "models": [
-            {
-                "model_id": gpt5_prediction["model_id"],
-                "model_name": gpt5_prediction["model_name"],
-                "predictions": gpt5_prediction["predictions"],
-                "best_group": gpt5_prediction["best_group"],
-                "best_hit_count": gpt5_prediction["best_hit_count"]
-            }
-        ]
+        "models": [model_entry]
     }
-    history_data['predictions_history'].insert(0, new_record)
+    position = next((i for i, r in enumerate(records) if int(r['target_period']) < 25121), len(records))
+    records.insert(position, new_record)
     print(f"✓ 已创建 25121 期的新历史记录并添加 GPT5 模型")
+    return True
+
 
-# 保存更新后的数据
-with open('data/predictions_history.json', 'w', encoding='utf-8') as f:
-    json.dump(history_data, f, ensure_ascii=False, indent=2)
+# 持锁完成读取、修改与写入，同时运行的归档不会被覆盖
+update_json(HISTORY_FILE, add_gpt5_record, {"predictions_history": []})
 
 print(f"\n命中结果:")
 print(f"最佳组: 第 {gpt5_prediction['best_group']} 组")
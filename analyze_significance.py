@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+AI 预测显著性分析脚本
+将历史命中记录与随机选号的精确零假设分布对比，给出 p 值与效应量
+
+- 双色球：红球命中服从超几何分布 H(33, 6, 6)，蓝球命中概率 1/16
+- 福彩3D：每位独立均匀，定位命中数服从二项分布 B(3, 1/10)
+- 模型级统计使用「5 组取最佳」的命中数，零分布按组数取最大值校正
+- 策略级统计使用每组的命中数（不存在挑选偏差）
+- 归档逐条流式读取，预测组转换为 lottery_records 的紧凑记录；开奖号码取自号码矩阵
+  （draw_matrix.py，即主数据），矩阵中没有的期号才解析归档中的 actual_result；
+  归档中与主数据不一致的开奖结果计入 draw_mismatches
+
+使用方法：
+    python3 analyze_significance.py
+    python3 analyze_significance.py --json report.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from draw_matrix import DrawMatrix, draw_numbers
+from lottery_records import GROUP_TYPES
+
+# 文件路径
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "predictions_history.json")
+FC3D_PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "fc3d_predictions_history.json")
+
+# 归档流式读取按同目录方式导入
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+from archive_stream import iter_records
+
+# ==================== 零假设分布 ====================
+
+def ssq_group_pmf() -> List[float]:
+    """双色球单组总命中数（红球命中 + 蓝球命中）的精确分布，长度 8"""
+    total = math.comb(33, 6)
+    red = [math.comb(6, h) * math.comb(27, 6 - h) / total for h in range(7)]
+    blue = [15 / 16, 1 / 16]
+    return convolve(red, blue)
+
+def fc3d_group_pmf() -> List[float]:
+    """福彩3D 单组定位命中数的精确分布，长度 4"""
+    return [math.comb(3, k) * 0.1 ** k * 0.9 ** (3 - k) for k in range(4)]
+
+def max_pmf(pmf: List[float], groups: int) -> List[float]:
+    """
+    groups 组独立同分布命中数取最大值后的分布
+
+    同一期内各组号码往往有重叠，真实最大值分布比独立假设更集中，
+    因此该校正得到的 p 值偏保守。
+    """
+    if groups <= 1:
+        return list(pmf)
+    cdf = []
+    acc = 0.0
+    for p in pmf:
+        acc += p
+        cdf.append(min(acc, 1.0))
+    powered = [c ** groups for c in cdf]
+    return [powered[0]] + [powered[k] - powered[k - 1] for k in range(1, len(powered))]
+
+def convolve(a: List[float], b: List[float]) -> List[float]:
+    """两个离散分布的卷积（独立随机变量之和）"""
+    out = [0.0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x == 0.0:
+            continue
+        for j, y in enumerate(b):
+            out[i + j] += x * y
+    return out
+
+def pmf_moments(pmf: List[float]) -> Tuple[float, float]:
+    """返回分布的均值与方差"""
+    mean = sum(k * p for k, p in enumerate(pmf))
+    var = sum((k - mean) ** 2 * p for k, p in enumerate(pmf))
+    return mean, var
+
+# ==================== 检验 ====================
+
+def sum_test(observed: List[int], pmfs: List[List[float]]) -> Dict[str, Any]:
+    """
+    对一组观测值之和做精确单侧检验
+
+    Args:
+        observed: 每次观测的命中数
+        pmfs: 每次观测在零假设下的分布（与 observed 一一对应）
+
+    Returns:
+        包含样本数、观测/期望均值、p 值和效应量的字典
+    """
+    n = len(observed)
+    total = sum(observed)
+
+    # 相同分布的观测先做快速幂卷积，再与其余分布卷积
+    groups: Dict[Tuple[float, ...], int] = {}
+    for pmf in pmfs:
+        key = tuple(pmf)
+        groups[key] = groups.get(key, 0) + 1
+
+    dist = [1.0]
+    expected = 0.0
+    variance = 0.0
+    for key, count in groups.items():
+        dist = convolve(dist, _pmf_power(list(key), count))
+        mean, var = pmf_moments(list(key))
+        expected += mean * count
+        variance += var * count
+
+    p_value = min(1.0, sum(dist[total:]))
+    sd = math.sqrt(variance) if variance > 0 else 0.0
+
+    return {
+        "n": n,
+        "observed_total": total,
+        "expected_total": round(expected, 4),
+        "observed_mean": round(total / n, 4) if n else 0.0,
+        "expected_mean": round(expected / n, 4) if n else 0.0,
+        "z_score": round((total - expected) / sd, 4) if sd else 0.0,
+        # 标准化均值差：(观测均值 - 期望均值) / 单次观测标准差
+        "effect_size": round((total - expected) / math.sqrt(n * variance), 4) if n and variance else 0.0,
+        "p_value": p_value,
+    }
+
+def _pmf_power(pmf: List[float], count: int) -> List[float]:
+    """同一分布自卷积 count 次（平方-乘法）"""
+    result = [1.0]
+    base = pmf
+    while count:
+        if count & 1:
+            result = convolve(result, base)
+        count >>= 1
+        if count:
+            base = convolve(base, base)
+    return result
+
+def holm_adjust(rows: List[Dict[str, Any]]):
+    """对同一张表内的 p 值做 Holm-Bonferroni 多重比较校正（原地写入 p_holm）"""
+    order = sorted(range(len(rows)), key=lambda i: rows[i]["p_value"])
+    m = len(rows)
+    running = 0.0
+    for rank, idx in enumerate(order):
+        adjusted = min(1.0, (m - rank) * rows[idx]["p_value"])
+        running = max(running, adjusted)
+        rows[idx]["p_holm"] = running
+
+# ==================== 命中数提取 ====================
+
+def ssq_group_hits(group, draw: Sequence[int]) -> int:
+    """双色球单组总命中数（红 + 蓝），group 为 SSQGroup，draw 为 6 红 + 1 蓝"""
+    return len(set(group.reds).intersection(draw[:6])) + (group.blue == draw[6])
+
+def fc3d_group_hits(group, draw: Sequence[int]) -> int:
+    """福彩3D 单组定位命中数，group 为 FC3DGroup，draw 为百十个三位"""
+    return sum(p == a for p, a in zip(group.digits, draw))
+
+def analyze_history(records: Iterable[Dict[str, Any]], group_pmf: List[float], hit_func,
+                    game: str, matrix: Optional[DrawMatrix] = None) -> Dict[str, Any]:
+    """
+    按模型（5 组取最佳）和策略（逐组）汇总检验结果
+
+    只统计已开奖（带 actual_result）的记录；开奖号码优先取自 matrix 中的同期号行，
+    归档 actual_result 与之不一致的期数记为 draw_mismatches
+    """
+    by_model: Dict[str, Dict[str, list]] = {}
+    by_strategy: Dict[str, Dict[str, list]] = {}
+    max_cache: Dict[int, List[float]] = {}
+    group_type = GROUP_TYPES[game]
+
+    periods = 0
+    mismatches = 0
+    for record in records:
+        periods += 1
+        actual = record.get("actual_result")
+        if not actual:
+            continue
+        row = matrix.find(actual["period"]) if matrix is not None else None
+        actual = draw_numbers(game, actual)
+        if row is not None:
+            canonical = matrix.row(row)
+            mismatches += canonical != actual
+            actual = canonical
+        # 多模型共识与普通模型一样参与检验
+        models = record.get("models", []) + ([record["consensus"]] if record.get("consensus") else [])
+        for model in models:
+            groups = list(map(group_type.from_dict, model.get("predictions", [])))
+            if not groups:
+                continue
+            hits = [hit_func(g, actual) for g in groups]
+
+            name = model.get("model_name") or model.get("model_id") or "未知"
+            if len(groups) not in max_cache:
+                max_cache[len(groups)] = max_pmf(group_pmf, len(groups))
+            entry = by_model.setdefault(name, {"observed": [], "pmfs": []})
+            entry["observed"].append(max(hits))
+            entry["pmfs"].append(max_cache[len(groups)])
+
+            for group, hit in zip(groups, hits):
+                strategy = group.strategy or "未知"
+                entry = by_strategy.setdefault(strategy, {"observed": [], "pmfs": []})
+                entry["observed"].append(hit)
+                entry["pmfs"].append(group_pmf)
+
+    models = [dict(name=name, **sum_test(v["observed"], v["pmfs"])) for name, v in by_model.items()]
+    strategies = [dict(name=name, **sum_test(v["observed"], v["pmfs"])) for name, v in by_strategy.items()]
+    holm_adjust(models)
+    holm_adjust(strategies)
+    models.sort(key=lambda r: r["p_value"])
+    strategies.sort(key=lambda r: r["p_value"])
+
+    return {"periods": periods, "draw_mismatches": mismatches, "models": models, "strategies": strategies}
+
+def load_history(path: str) -> Iterator[Dict[str, Any]]:
+    """逐条读取历史命中记录（不整体载入归档）"""
+    if not os.path.exists(path):
+        return iter(())
+    return iter_records(path)
+
+def load_matrix(game: str) -> Optional[DrawMatrix]:
+    """加载号码矩阵；开奖数据文件不存在时返回 None（只用归档中的开奖结果）"""
+    try:
+        return DrawMatrix.load(game)
+    except OSError:
+        return None
+
+def analyze_game(game: str, history_file: str, group_pmf: List[float], hit_func) -> Dict[str, Any]:
+    matrix = load_matrix(game)
+    try:
+        return analyze_history(load_history(history_file), group_pmf, hit_func, game, matrix)
+    finally:
+        if matrix is not None:
+            matrix.close()
+
+def build_report() -> Dict[str, Any]:
+    """生成双色球与福彩3D 的完整显著性报告"""
+    return {
+        "ssq": {
+            "metric": "total_hits (红球命中 + 蓝球命中)",
+            **analyze_game("ssq", PREDICTIONS_HISTORY_FILE, ssq_group_pmf(), ssq_group_hits),
+        },
+        "fc3d": {
+            "metric": "position_hit_count (定位命中数)",
+            **analyze_game("fc3d", FC3D_PREDICTIONS_HISTORY_FILE, fc3d_group_pmf(), fc3d_group_hits),
+        },
+    }
+
+def print_table(title: str, rows: List[Dict[str, Any]]):
+    """打印检验结果表"""
+    print(f"\n{title}")
+    print("-" * 86)
+    print(f"{'名称':<20}{'样本':>6}{'观测均值':>10}{'期望均值':>10}{'效应量':>9}{'z':>8}{'p值':>11}{'Holm p':>11}")
+    for r in rows:
+        print(f"{r['name'][:18]:<20}{r['n']:>6}{r['observed_mean']:>10.3f}{r['expected_mean']:>10.3f}"
+              f"{r['effect_size']:>9.3f}{r['z_score']:>8.2f}{r['p_value']:>11.4g}{r['p_holm']:>11.4g}")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="AI 预测历史命中的显著性分析")
+    parser.add_argument("--json", dest="json_path", help="将完整报告写入指定 JSON 文件")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = build_report()
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "=" * 50)
+    print("📈 AI 预测显著性分析")
+    print("=" * 50)
+    for game, label in (("ssq", "双色球"), ("fc3d", "福彩3D")):
+        section = report[game]
+        print(f"\n🎯 {label}：{section['periods']} 期，指标 {section['metric']}")
+        if section["draw_mismatches"]:
+            print(f"⚠️  {section['draw_mismatches']} 期归档中的开奖结果与主数据不一致，已按主数据计算命中")
+        print_table("按模型（5 组取最佳，已做挑选偏差校正）", section["models"])
+        print_table("按策略（逐组）", section["strategies"])
+
+    print(f"\n⏱  分析耗时 {elapsed * 1000:.1f} ms")
+    print("ℹ️  p 值为单侧检验（命中多于随机选号）；p_holm 为表内多重比较校正结果\n")
+
+    if args.json_path:
+        report["elapsed_ms"] = round(elapsed * 1000, 2)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 报告已保存到: {args.json_path}\n")
+
+if __name__ == "__main__":
+    main()
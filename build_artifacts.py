@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+由各彩种的主数据重新生成全部派生文件
+
+主数据（唯一数据源，只有抓取脚本写入）：
+- 双色球: fetch_history/lottery_data.json（开奖记录列表，期号降序）
+- 福彩3D: data/fc3d_history.json（开奖记录与网页数据在同一个文件中）
+- 历史预测归档: data/predictions_history.json、data/fc3d_predictions_history.json（预测脚本写入）
+
+派生文件：
+- data/lottery_history.json: 双色球网页与预测脚本使用的开奖数据（附下一期信息）
+- cache/draw_matrix_<game>.bin: 号码矩阵缓存（见 draw_matrix.py）
+- data/dashboard_<game>.json: 图表分析页的预计算数据（见 dashboard.py）
+- data/history/<game>/: 历史预测归档的分页（热文件 + 按年份分片 + 索引，见 fetch_history/history_pages.py）
+
+依赖清单记录每个派生文件生成时各输入文件与输出文件的内容哈希，只有输入变化、输出缺失
+或输出被改动过的文件才会重新生成。清单放在输出文件所在目录（build_manifest.json），随输出一起
+提交：CI 每次从干净的检出开始，输入未变时不会重新生成任何提交过的文件。号码矩阵缓存在不提交的
+cache/ 下，干净的检出中会重新生成（也可以省略，生成图表数据时 DrawMatrix.load 会按需构建）。
+
+使用方法：
+    python3 build_artifacts.py
+    python3 build_artifacts.py --game ssq --force
+    python3 build_artifacts.py --dry-run            # 只列出需要重新生成的文件
+    python3 build_artifacts.py --only history       # 只导出历史预测分页（预测工作流使用）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from contextlib import ExitStack
+from typing import Dict, Any, List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_NAME = "build_manifest.json"
+MANIFEST_VERSION = 1
+
+# 抓取脚本按同目录方式导入
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+from json_io import atomic_write_json, file_lock
+
+GAMES = ("ssq", "fc3d")
+# 派生文件的种类（ARTIFACTS 键中 "." 之后的部分）
+KINDS = ("web", "matrix", "dashboard", "history")
+
+
+def build_ssq_web(root: str, artifact: Dict[str, Any]):
+    """与抓取脚本保存时相同的转换（LotteryDataFetcher.export_web_file）"""
+    from fetch_lottery_history import LotteryDataFetcher
+
+    source = os.path.join(root, artifact["inputs"][0])
+    with open(source, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    LotteryDataFetcher().export_web_file(rows, source)
+
+
+def build_draw_matrix(root: str, artifact: Dict[str, Any]):
+    from draw_matrix import DrawMatrix
+
+    source = os.path.join(root, artifact["inputs"][0])
+    DrawMatrix.load(artifact["game"], source, os.path.join(root, artifact["output"])).close()
+
+
+def build_dashboard(root: str, artifact: Dict[str, Any]):
+    from dashboard import write_dashboard
+
+    game = artifact["game"]
+    write_dashboard(game, os.path.join(root, artifact["inputs"][0]), os.path.join(root, artifact["output"]),
+                    os.path.join(root, "cache", f"draw_matrix_{game}.bin"))
+
+
+def build_history_pages(root: str, artifact: Dict[str, Any]):
+    from history_pages import export_pages
+
+    output = os.path.join(root, artifact["output"])
+    export_pages(artifact["game"], os.path.join(root, artifact["inputs"][0]), os.path.dirname(output))
+
+
+# 派生文件（按依赖顺序排列，路径相对仓库根目录）；转换逻辑变化时提高 version 强制重新生成
+ARTIFACTS: Dict[str, Dict[str, Any]] = {
+    "ssq.web": {
+        "game": "ssq", "version": 1, "recipe": build_ssq_web,
+        "output": os.path.join("data", "lottery_history.json"),
+        "inputs": [os.path.join("fetch_history", "lottery_data.json")],
+    },
+    "ssq.matrix": {
+        "game": "ssq", "version": 1, "recipe": build_draw_matrix,
+        "output": os.path.join("cache", "draw_matrix_ssq.bin"),
+        "inputs": [os.path.join("data", "lottery_history.json")],
+    },
+    "fc3d.matrix": {
+        "game": "fc3d", "version": 1, "recipe": build_draw_matrix,
+        "output": os.path.join("cache", "draw_matrix_fc3d.bin"),
+        "inputs": [os.path.join("data", "fc3d_history.json")],
+    },
+    "ssq.dashboard": {
+        "game": "ssq", "version": 2, "recipe": build_dashboard,
+        "output": os.path.join("data", "dashboard_ssq.json"),
+        "inputs": [os.path.join("data", "lottery_history.json")],
+    },
+    "fc3d.dashboard": {
+        "game": "fc3d", "version": 2, "recipe": build_dashboard,
+        "output": os.path.join("data", "dashboard_fc3d.json"),
+        "inputs": [os.path.join("data", "fc3d_history.json")],
+    },
+    # 输出记为分页索引；索引中带有每个分页的内容摘要
+    "ssq.history": {
+        "game": "ssq", "version": 1, "recipe": build_history_pages,
+        "output": os.path.join("data", "history", "ssq", "index.json"),
+        "inputs": [os.path.join("data", "predictions_history.json")],
+    },
+    "fc3d.history": {
+        "game": "fc3d", "version": 1, "recipe": build_history_pages,
+        "output": os.path.join("data", "history", "fc3d", "index.json"),
+        "inputs": [os.path.join("data", "fc3d_predictions_history.json")],
+    },
+}
+
+
+def file_hash(path: str) -> Optional[str]:
+    """文件内容的 sha256，文件不存在时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def manifest_path(name: str) -> str:
+    """派生文件所属依赖清单的路径（相对仓库根目录）：与输出文件在同一目录"""
+    return os.path.join(os.path.dirname(ARTIFACTS[name]["output"]), MANIFEST_NAME)
+
+
+def manifest_key(path: str) -> str:
+    """清单中的输入路径统一使用 /，在不同系统上生成的清单一致"""
+    return path.replace(os.sep, "/")
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "artifacts": {}}
+
+
+def save_manifest(path: str, manifest: Dict[str, Any]):
+    atomic_write_json(path, manifest)
+
+
+def stale_reason(root: str, name: str, record: Optional[Dict[str, Any]]) -> Optional[str]:
+    """派生文件需要重新生成的原因，已是最新时返回 None"""
+    artifact = ARTIFACTS[name]
+    output_hash = file_hash(os.path.join(root, artifact["output"]))
+    if output_hash is None:
+        return "输出文件不存在"
+    if record is None:
+        return "清单中没有记录"
+    if record.get("version") != artifact["version"]:
+        return "转换逻辑已更新"
+    if record.get("output") != output_hash:
+        return "输出文件被改动"
+    for path in artifact["inputs"]:
+        if record.get("inputs", {}).get(manifest_key(path)) != file_hash(os.path.join(root, path)):
+            return f"{path} 已变化"
+    return None
+
+
+def build(games: List[str] = GAMES, force: bool = False, dry_run: bool = False,
+          root: str = SCRIPT_DIR, kinds: Optional[List[str]] = None) -> List[str]:
+    """
+    重新生成过期的派生文件
+
+    Args:
+        games: 要处理的彩种
+        force: 忽略清单，全部重新生成
+        dry_run: 只检查不生成
+        root: 仓库根目录（测试时指向临时目录）
+        kinds: 只处理这些种类的派生文件（见 KINDS），为空时全部处理
+
+    Returns:
+        重新生成（dry_run 时为需要重新生成）的派生文件名列表
+    """
+    names = [name for name, artifact in ARTIFACTS.items()
+             if artifact["game"] in games and (not kinds or name.split(".", 1)[1] in kinds)]
+    paths = sorted({os.path.join(root, manifest_path(name)) for name in names})
+    # 两个彩种的流水线可能同时构建，持有清单的锁避免互相覆盖记录（按路径顺序加锁，避免死锁）
+    with ExitStack() as stack:
+        for path in paths:
+            stack.enter_context(file_lock(path))
+        return _build_locked(names, force, dry_run, root)
+
+
+def _build_locked(names: List[str], force: bool, dry_run: bool, root: str) -> List[str]:
+    manifests: Dict[str, Dict[str, Any]] = {}
+    changed = set()
+    rebuilt = []
+
+    for name in names:
+        artifact = ARTIFACTS[name]
+        path = os.path.join(root, manifest_path(name))
+        if path not in manifests:
+            manifests[path] = load_manifest(path)
+        records = manifests[path]["artifacts"]
+        missing = [p for p in artifact["inputs"] if not os.path.exists(os.path.join(root, p))]
+        if missing:
+            print(f"⚠️  {name}: 缺少输入文件 {', '.join(missing)}，跳过")
+            continue
+
+        reason = "强制重新生成" if force else stale_reason(root, name, records.get(name))
+        if reason is None:
+            continue
+        print(f"🔧 {name}: {reason} → {artifact['output']}")
+        rebuilt.append(name)
+        if dry_run:
+            continue
+
+        artifact["recipe"](root, artifact)
+        records[name] = {
+            "version": artifact["version"],
+            "inputs": {manifest_key(p): file_hash(os.path.join(root, p)) for p in artifact["inputs"]},
+            "output": file_hash(os.path.join(root, artifact["output"])),
+        }
+        changed.add(path)
+
+    for path in sorted(changed):
+        save_manifest(path, manifests[path])
+    return rebuilt
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="由主数据重新生成派生文件（只处理输入有变化的文件）")
+    parser.add_argument("--game", choices=GAMES, action="append", dest="games", help="只处理指定彩种，可重复指定")
+    parser.add_argument("--only", choices=KINDS, action="append", dest="kinds",
+                        help="只处理指定种类的派生文件，可重复指定")
+    parser.add_argument("--force", action="store_true", help="忽略依赖清单，全部重新生成")
+    parser.add_argument("--dry-run", action="store_true", help="只列出需要重新生成的文件")
+    args = parser.parse_args()
+
+    rebuilt = build(args.games or list(GAMES), force=args.force, dry_run=args.dry_run, kinds=args.kinds)
+    if not rebuilt:
+        print("✓ 所有派生文件都是最新的")
+    elif args.dry_run:
+        print(f"共 {len(rebuilt)} 个派生文件需要重新生成")
+    else:
+        print(f"✓ 已重新生成 {len(rebuilt)} 个派生文件")
+
+
+if __name__ == "__main__":
+    main()
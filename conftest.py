@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""测试公共设施：本地 HTTP 替身服务器与录制网页目录"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(SCRIPT_DIR, "fetch_history", "fixtures")
+
+# 抓取脚本位于 fetch_history/，按脚本方式（同目录导入）组织
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+# test_single_model.py 是需要真实 API Key 的手动调试脚本，不参与自动测试
+collect_ignore = ["test_single_model.py"]
+
+
+def read_fixture(name):
+    """读取录制网页的原始字节"""
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@contextmanager
+def run_stand_in_server(route, latency=0.0):
+    """
+    启动本地 HTTP 替身服务器
+
+    Args:
+        route: route(path, query) -> (status, body_bytes[, headers])，query 为 parse_qs 结果
+        latency: 每个请求的固定延迟（秒）
+
+    Yields:
+        (base_url, stats)，stats 记录请求数、最大并发数、到达时间与请求路径
+    """
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "arrivals": [], "paths": [], "headers": []}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats["requests"] += 1
+                stats["in_flight"] += 1
+                stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+                stats["arrivals"].append(time.monotonic())
+                stats["paths"].append(self.path)
+                stats["headers"].append(dict(self.headers))
+            try:
+                time.sleep(latency)
+                parsed = urlparse(self.path)
+                result = route(parsed.path, parse_qs(parsed.query))
+                status, body = result[0], result[1]
+                headers = result[2] if len(result) > 2 else {}
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=gb2312")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                with lock:
+                    stats["in_flight"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", stats
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def stand_in_server():
+    """返回 run_stand_in_server，供测试以 with 语句启动替身服务器"""
+    return run_stand_in_server
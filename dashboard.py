@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+图表分析页的预计算数据（data/dashboard_<game>.json）
+
+网页「图表分析」中的统计卡片与 5 个图表原本在浏览器中逐期遍历开奖数据计算，切换彩种时全部重算。
+这里由号码矩阵（见 draw_matrix.py）一次算好多个统计窗口的全部序列，网页只负责绑定数据：
+
+    {
+      "game": "ssq",
+      "latest_period": "26031",
+      "draw_count": 92,
+      "default_window": "all",
+      "windows": {
+        "30":  {窗口数据},
+        "all": {窗口数据}
+      }
+    }
+
+窗口数据：
+- draws: 窗口内期数
+- stats: 最热号码（双色球红球 / 福彩3D 数字）、次热项（蓝球 / 百位）与平均和值
+- frequency / secondary_frequency: 号码频率（双色球红球、蓝球；福彩3D 全部位、百位）
+- odd_even: 奇偶比分布（只列出出现过的比例）
+- sum_trend: 和值走势（最早在前）与平均值；指定期数的窗口画出窗口内全部期数，
+  「全部」窗口（网页默认）只画最近 SUM_TREND_POINTS 期，与原网页一致
+- zones: 区间分布（双色球红球三个区间；福彩3D 豹子 / 组三 / 组六）
+
+使用方法：
+    python3 dashboard.py                    # 生成两个彩种的预计算数据
+    python3 dashboard.py --game fc3d
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, Any, List, Optional, Sequence
+
+from draw_matrix import SOURCE_FILES, DrawMatrix
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 抓取脚本按同目录方式导入
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+from json_io import write_json_if_changed
+
+# 统计窗口（最近多少期），None 表示全部
+WINDOWS = (30, 50, 100, None)
+# 「全部」窗口的和值走势期数；更长的走势通过窗口选择查看
+SUM_TREND_POINTS = 30
+
+ODD_EVEN_RATIOS = {
+    "ssq": ["0:6", "1:5", "2:4", "3:3", "4:2", "5:1", "6:0"],
+    "fc3d": ["0:3", "1:2", "2:1", "3:0"],
+}
+SSQ_ZONES = (("01-11", 1, 11), ("12-22", 12, 22), ("23-33", 23, 33))
+FC3D_TYPES = ("豹子", "组三", "组六")
+
+
+def dashboard_path(game: str) -> str:
+    return os.path.join(SCRIPT_DIR, "data", f"dashboard_{game}.json")
+
+
+def window_key(window: Optional[int]) -> str:
+    return "all" if window is None else str(window)
+
+
+def series(counts: Dict[int, int], label) -> Dict[str, List]:
+    """{号码: 次数} → 图表使用的 {"labels", "data"}（按号码升序）"""
+    keys = sorted(counts)
+    return {"labels": [label(k) for k in keys], "data": [counts[k] for k in keys]}
+
+
+def hottest(chart: Dict[str, List]) -> Dict[str, Any]:
+    """次数最多的号码（次数相同时取号码较小的）"""
+    data = chart["data"]
+    index = data.index(max(data))
+    return {"label": chart["labels"][index], "count": data[index]}
+
+
+def fc3d_type(digits: Sequence[int]) -> str:
+    return FC3D_TYPES[len(set(digits)) - 1]
+
+
+def window_data(matrix: DrawMatrix, window: Optional[int]) -> Dict[str, Any]:
+    """一个统计窗口的全部图表序列与统计值"""
+    game = matrix.game
+    draws = min(window or matrix.count, matrix.count)
+    freq = matrix.frequency(draws)
+    sums = matrix.sums(draws)
+    rows = [matrix.row(i) for i in range(draws)]
+
+    if game == "ssq":
+        numbers = [row[:6] for row in rows]
+        frequency = series(freq["red"], lambda n: f"{n:02d}")
+        secondary = series(freq["blue"], lambda n: f"{n:02d}")
+        zones = {"labels": [name for name, _, _ in SSQ_ZONES],
+                 "data": [sum(1 for reds in numbers for n in reds if low <= n <= high)
+                          for _, low, high in SSQ_ZONES]}
+    else:
+        numbers = rows
+        frequency = series(freq["digits"], str)
+        secondary = series(freq["positions"][0], str)
+        types = [fc3d_type(row) for row in rows]
+        zones = {"labels": list(FC3D_TYPES), "data": [types.count(t) for t in FC3D_TYPES]}
+
+    ratios = {}
+    for values in numbers:
+        odd = sum(n % 2 for n in values)
+        ratio = f"{odd}:{len(values) - odd}"
+        ratios[ratio] = ratios.get(ratio, 0) + 1
+    odd_even_labels = [r for r in ODD_EVEN_RATIOS[game] if ratios.get(r)]
+
+    trend = sums[:draws if window else SUM_TREND_POINTS][::-1]
+    return {
+        "draws": draws,
+        "stats": {
+            "hottest": hottest(frequency),
+            "hottest_secondary": hottest(secondary),
+            # 与网页原先的 Math.round 一致（.5 向上取整）
+            "avg_sum": int(sum(sums) / draws + 0.5) if draws else 0,
+        },
+        "frequency": frequency,
+        "secondary_frequency": secondary,
+        "odd_even": {"labels": odd_even_labels, "data": [ratios[r] for r in odd_even_labels]},
+        "sum_trend": {
+            "labels": [matrix.period(i) for i in range(len(trend) - 1, -1, -1)],
+            "data": trend,
+            "average": round(sum(trend) / len(trend), 2) if trend else 0,
+        },
+        "zones": zones,
+    }
+
+
+def build_dashboard(matrix: DrawMatrix, windows: Sequence[Optional[int]] = WINDOWS) -> Dict[str, Any]:
+    """
+    所有统计窗口的预计算数据；期数不足的窗口与「全部」相同，不重复输出
+    """
+    keys = [w for w in windows if w is not None and w < matrix.count]
+    keys.append(None)
+    return {
+        "game": matrix.game,
+        "latest_period": matrix.period(0) if matrix.count else None,
+        "draw_count": matrix.count,
+        "default_window": "all",
+        "windows": {window_key(w): window_data(matrix, w) for w in keys},
+    }
+
+
+def write_dashboard(game: str, source_file: Optional[str] = None, output: Optional[str] = None,
+                    cache_file: Optional[str] = None) -> bool:
+    """
+    由开奖数据生成 dashboard_<game>.json（内容不变时不改写）
+
+    Returns:
+        是否写入了文件
+    """
+    matrix = DrawMatrix.load(game, source_file, cache_file)
+    try:
+        dashboard = build_dashboard(matrix)
+    finally:
+        matrix.close()
+    return write_json_if_changed(output or dashboard_path(game), dashboard)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="生成图表分析页的预计算数据")
+    parser.add_argument("--game", choices=list(SOURCE_FILES), help="只处理一个彩种")
+    args = parser.parse_args()
+
+    for game in [args.game] if args.game else list(SOURCE_FILES):
+        written = write_dashboard(game)
+        print(f"{'✓' if written else 'ℹ️ '} {dashboard_path(game)}{'' if written else '（无变化）'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+开奖号码矩阵缓存（按列存储、内存映射）
+
+把历史开奖 JSON 转成每个彩种一个二进制文件，按列存放 uint8 号码：
+- 双色球: 6 列红球 + 1 列蓝球，外加 33 列红球 one-hot（第 k 列第 i 行为 1 表示第 i 期开出 k）
+- 福彩3D: 3 列（百位、十位、个位）
+行顺序与 JSON 相同（最新一期在前），因此「最近 W 期」就是每列的前 W 个字节。
+
+加载时只 mmap 文件并切出 memoryview，不做任何解析；文件头记录源 JSON 的大小与修改时间，
+JSON 变化后下次加载自动重建。频率、遗漏、和值等统计直接在列上用 bytes.count / find 完成。
+图表数据（dashboard.py）与显著性分析（analyze_significance.py）的开奖号码都取自这里。
+
+使用方法：
+    python3 draw_matrix.py                 # 重建（如需要）并打印两个彩种的统计
+    python3 draw_matrix.py --game ssq --window 30
+    python3 draw_matrix.py --bench         # 对比 JSON 解析与矩阵加载的耗时
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, Any, List, Optional, Sequence
+
+# 文件路径
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 抓取脚本按同目录方式导入
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+from json_io import atomic_open, file_lock
+
+CACHE_DIR = os.path.join(SCRIPT_DIR, "cache")
+SOURCE_FILES = {
+    "ssq": os.path.join(SCRIPT_DIR, "data", "lottery_history.json"),
+    "fc3d": os.path.join(SCRIPT_DIR, "data", "fc3d_history.json"),
+}
+
+RED_MAX = 33
+BLUE_MAX = 16
+PERIOD_WIDTH = {"ssq": 5, "fc3d": 7}
+NUMBER_COLUMNS = {"ssq": 7, "fc3d": 3}
+ONEHOT_COLUMNS = {"ssq": RED_MAX, "fc3d": 0}
+
+_CACHE_MAGIC = b"DRWM"
+_CACHE_VERSION = 1
+# magic, version, 行数, 源文件大小, 源文件修改时间(ns)；32 字节，使后面的 uint32 期号列对齐
+_HEADER = struct.Struct("<4sIIxxxxqq")
+
+
+def cache_path(game: str) -> str:
+    return os.path.join(CACHE_DIR, f"draw_matrix_{game}.bin")
+
+
+def source_stamp(path: str) -> tuple:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def draw_numbers(game: str, row: Dict[str, Any]) -> List[int]:
+    """一期开奖的号码（双色球 6 红 + 1 蓝，福彩3D 3 位）"""
+    if game == "ssq":
+        return [int(b) for b in row["red_balls"]] + [int(row["blue_ball"])]
+    return [int(d) for d in row["digits"]]
+
+
+class DrawMatrix:
+    """一个彩种的开奖号码矩阵（各列为长度 count 的 uint8 序列）"""
+
+    def __init__(self, game: str, periods: Sequence[int], columns: List[Sequence[int]],
+                 onehot: List[Sequence[int]], mapped: Optional[mmap.mmap] = None):
+        self.game = game
+        self.count = len(periods)
+        self.periods = periods
+        self.columns = columns
+        self.onehot = onehot
+        self._mapped = mapped
+        self._index: Optional[Dict[int, int]] = None
+
+    # ==================== 构建与缓存 ====================
+
+    @classmethod
+    def build(cls, game: str, rows: List[Dict[str, Any]]) -> "DrawMatrix":
+        """从 JSON 记录构建（内存中）"""
+        count = len(rows)
+        periods = array("I", (int(r["period"]) for r in rows))
+        columns = [bytearray(count) for _ in range(NUMBER_COLUMNS[game])]
+        onehot = [bytearray(count) for _ in range(ONEHOT_COLUMNS[game])]
+        for i, row in enumerate(rows):
+            numbers = draw_numbers(game, row)
+            for col, value in zip(columns, numbers):
+                col[i] = value
+            if onehot:
+                for red in numbers[:6]:
+                    onehot[red - 1][i] = 1
+        return cls(game, periods, [bytes(c) for c in columns], [bytes(c) for c in onehot])
+
+    def save(self, cache_file: str, stamp: tuple):
+        """
+        写入缓存文件：持有文件锁写入唯一的临时文件再改名，同时重建的进程不会互相覆盖半成品，
+        正在 mmap 的读者也不受影响
+        """
+        with file_lock(cache_file), atomic_open(cache_file, 'wb') as f:
+            f.write(_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, self.count, stamp[0], stamp[1]))
+            f.write(array("I", self.periods).tobytes())
+            for col in self.columns + self.onehot:
+                f.write(bytes(col))
+
+    @classmethod
+    def open(cls, game: str, cache_file: str, stamp: Optional[tuple] = None) -> Optional["DrawMatrix"]:
+        """
+        mmap 缓存文件；文件缺失、格式不符或与 stamp（源文件大小与修改时间）不一致时返回 None
+        """
+        try:
+            with open(cache_file, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, version, count, size, mtime_ns = _HEADER.unpack_from(mapped, 0)
+        except struct.error:
+            mapped.close()
+            return None
+        ncols = NUMBER_COLUMNS[game] + ONEHOT_COLUMNS[game]
+        expected = _HEADER.size + count * 4 + count * ncols
+        if (magic != _CACHE_MAGIC or version != _CACHE_VERSION or len(mapped) != expected
+                or (stamp is not None and (size, mtime_ns) != tuple(stamp))):
+            mapped.close()
+            return None
+
+        view = memoryview(mapped)
+        offset = _HEADER.size
+        periods = view[offset:offset + count * 4].cast("I")
+        offset += count * 4
+        cols = [view[offset + k * count:offset + (k + 1) * count] for k in range(ncols)]
+        split = NUMBER_COLUMNS[game]
+        return cls(game, periods, cols[:split], cols[split:], mapped)
+
+    @classmethod
+    def load(cls, game: str, source_file: Optional[str] = None,
+             cache_file: Optional[str] = None) -> "DrawMatrix":
+        """加载矩阵；缓存缺失或源 JSON 已变化时重新构建并写入缓存"""
+        source_file = source_file or SOURCE_FILES[game]
+        cache_file = cache_file or cache_path(game)
+        stamp = source_stamp(source_file)
+
+        matrix = cls.open(game, cache_file, stamp)
+        if matrix is not None:
+            return matrix
+
+        with open(source_file, 'r', encoding='utf-8') as f:
+            rows = json.load(f).get("data", [])
+        matrix = cls.build(game, rows)
+        try:
+            matrix.save(cache_file, stamp)
+        except OSError as e:
+            print(f"  ⚠️  写入号码矩阵缓存失败: {e}")
+            return matrix
+        return cls.open(game, cache_file, stamp) or matrix
+
+    def close(self):
+        """释放内存映射（之后不能再访问各列）"""
+        if self._mapped is not None:
+            for col in self.columns + self.onehot:
+                if isinstance(col, memoryview):
+                    col.release()
+            if isinstance(self.periods, memoryview):
+                self.periods.release()
+            self._mapped.close()
+            self._mapped = None
+
+    # ==================== 访问与统计 ====================
+
+    def period(self, i: int) -> str:
+        return str(self.periods[i]).zfill(PERIOD_WIDTH[self.game])
+
+    def row(self, i: int) -> List[int]:
+        return [col[i] for col in self.columns]
+
+    def find(self, period: str) -> Optional[int]:
+        """期号所在行（最新一期为 0），不存在时返回 None"""
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(self.periods)}
+        return self._index.get(int(period))
+
+    def _window(self, column, window: Optional[int]) -> bytes:
+        """列的前 window 行（最近 window 期）"""
+        return bytes(column[:window] if window else column)
+
+    def value_counts(self, column, values: range, window: Optional[int] = None) -> Dict[int, int]:
+        data = self._window(column, window)
+        return {v: data.count(v) for v in values}
+
+    def frequency(self, window: Optional[int] = None) -> Dict[str, Any]:
+        """
+        最近 window 期（为空时全部）各号码出现次数
+
+        Returns:
+            双色球 {"red": {1..33: 次数}, "blue": {1..16: 次数}}
+            福彩3D {"positions": [{0..9: 次数} × 3], "digits": {0..9: 次数}}
+        """
+        if self.game == "ssq":
+            return {
+                "red": {n: self._window(self.onehot[n - 1], window).count(1) for n in range(1, RED_MAX + 1)},
+                "blue": self.value_counts(self.columns[6], range(1, BLUE_MAX + 1), window),
+            }
+        positions = [self.value_counts(col, range(10), window) for col in self.columns]
+        return {"positions": positions, "digits": {d: sum(p[d] for p in positions) for d in range(10)}}
+
+    def omission(self) -> Dict[str, Any]:
+        """各号码当前遗漏期数（距最近一次开出的期数；从未开出时为总期数）"""
+        def gap(data: bytes, value: int) -> int:
+            index = data.find(value)
+            return self.count if index < 0 else index
+
+        if self.game == "ssq":
+            return {
+                "red": {n: gap(bytes(self.onehot[n - 1]), 1) for n in range(1, RED_MAX + 1)},
+                "blue": {n: gap(bytes(self.columns[6]), n) for n in range(1, BLUE_MAX + 1)},
+            }
+        return {"positions": [{d: gap(bytes(col), d) for d in range(10)} for col in self.columns]}
+
+    def sums(self, window: Optional[int] = None) -> List[int]:
+        """最近 window 期的和值（双色球为红球和值），最新在前"""
+        cols = self.columns[:6] if self.game == "ssq" else self.columns
+        return [sum(values) for values in zip(*(self._window(c, window) for c in cols))]
+
+
+# ==================== 基准测试 ====================
+
+def json_frequency(game: str, source_file: str, window: Optional[int] = None) -> Dict[str, Any]:
+    """对照组：解析 JSON 后逐期统计（与 DrawMatrix.frequency 结果相同）"""
+    with open(source_file, 'r', encoding='utf-8') as f:
+        rows = json.load(f)["data"][:window]
+    if game == "ssq":
+        red = {n: 0 for n in range(1, RED_MAX + 1)}
+        blue = {n: 0 for n in range(1, BLUE_MAX + 1)}
+        for row in rows:
+            for b in row["red_balls"]:
+                red[int(b)] += 1
+            blue[int(row["blue_ball"])] += 1
+        return {"red": red, "blue": blue}
+    positions = [{d: 0 for d in range(10)} for _ in range(3)]
+    for row in rows:
+        for pos, d in enumerate(row["digits"]):
+            positions[pos][int(d)] += 1
+    return {"positions": positions, "digits": {d: sum(p[d] for p in positions) for d in range(10)}}
+
+
+def run_benchmark(repeat: int = 20, source_files: Optional[Dict[str, str]] = None,
+                  cache_dir: str = CACHE_DIR) -> List[Dict[str, Any]]:
+    """
+    对比「解析 JSON + 统计频率」与「mmap 加载矩阵 + 统计频率」的单次耗时（微秒）
+
+    Returns:
+        [{"game", "rows", "json_us", "matrix_load_us", "matrix_us"}, ...]
+    """
+    source_files = source_files or SOURCE_FILES
+    results = []
+    for game, source_file in source_files.items():
+        cache_file = os.path.join(cache_dir, f"draw_matrix_{game}.bin")
+        matrix = DrawMatrix.load(game, source_file, cache_file)
+        if matrix.frequency() != json_frequency(game, source_file):
+            raise AssertionError(f"{game}: 矩阵统计与 JSON 统计不一致")
+        rows = matrix.count
+        matrix.close()
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            json_frequency(game, source_file)
+        json_us = (time.perf_counter() - start) / repeat * 1e6
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            DrawMatrix.load(game, source_file, cache_file).close()
+        load_us = (time.perf_counter() - start) / repeat * 1e6
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            matrix = DrawMatrix.load(game, source_file, cache_file)
+            matrix.frequency()
+            matrix.close()
+        matrix_us = (time.perf_counter() - start) / repeat * 1e6
+
+        results.append({"game": game, "rows": rows, "json_us": round(json_us, 1),
+                        "matrix_load_us": round(load_us, 1), "matrix_us": round(matrix_us, 1)})
+    return results
+
+
+def print_stats(game: str, window: Optional[int]):
+    matrix = DrawMatrix.load(game)
+    label = f"最近 {window} 期" if window else f"全部 {matrix.count} 期"
+    print(f"\n📊 {game}（{label}，最新 {matrix.period(0)} 期: {matrix.row(0)}）")
+    freq = matrix.frequency(window)
+    omission = matrix.omission()
+    if game == "ssq":
+        red, gaps = freq["red"], omission["red"]
+        hot = sorted(red, key=lambda n: (-red[n], n))[:6]
+        cold = sorted(gaps, key=lambda n: (-gaps[n], n))[:6]
+        print("  红球热号: " + " ".join(f"{n:02d}({red[n]})" for n in hot))
+        print("  红球遗漏: " + " ".join(f"{n:02d}({gaps[n]})" for n in cold))
+        top_blue = max(freq["blue"], key=lambda n: (freq["blue"][n], -n))
+        print(f"  蓝球最热: {top_blue:02d}({freq['blue'][top_blue]})")
+    else:
+        for pos, name in enumerate(("百位", "十位", "个位")):
+            counts = freq["positions"][pos]
+            print(f"  {name}: {' '.join(f'{d}:{counts[d]}' for d in range(10))}")
+    sums = matrix.sums(window or 10)
+    print(f"  和值走势: {sums[:10]}")
+    matrix.close()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="开奖号码矩阵缓存")
+    parser.add_argument("--game", choices=list(SOURCE_FILES), help="只处理一个彩种")
+    parser.add_argument("--window", type=int, help="统计最近多少期（默认全部）")
+    parser.add_argument("--bench", action="store_true", help="对比 JSON 解析与矩阵加载的耗时")
+    args = parser.parse_args()
+
+    games = [args.game] if args.game else list(SOURCE_FILES)
+    if args.bench:
+        print(f"{'彩种':<8}{'期数':>8}{'JSON(μs)':>12}{'mmap 加载(μs)':>16}{'加载+统计(μs)':>16}")
+        for r in run_benchmark(source_files={g: SOURCE_FILES[g] for g in games}):
+            print(f"{r['game']:<8}{r['rows']:>8}{r['json_us']:>12,.1f}{r['matrix_load_us']:>16,.1f}"
+                  f"{r['matrix_us']:>16,.1f}")
+        return
+
+    for game in games:
+        print_stats(game, args.window)
+
+
+if __name__ == "__main__":
+    main()
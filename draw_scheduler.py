@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+开奖时间感知的调度器
+
+双色球（周二、四、日）与福彩3D（每天）都在北京时间 21:15 开奖。调度器常驻运行：
+1. 根据本地最新一期，用抓取器的 predict_next_draw 计算下一期的期号与开奖时刻
+2. 在开奖后 poll_delay 秒开始增量同步，未出结果时按指数退避继续轮询
+3. 新一期出现后立即执行归档与预测（run_pipeline 的 load → archive → predict → save）
+
+两个彩种各自一个线程，互不等待。相比固定的定时任务，开奖到发布的延迟从数小时缩短到数分钟。
+
+使用方法：
+    python3 draw_scheduler.py                 # 常驻运行，两个彩种
+    python3 draw_scheduler.py --games fc3d --once
+"""
+
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+# run_pipeline 会把 fetch_history/ 加入 sys.path
+from run_pipeline import GAMES, SSQ_FETCH_FILE, build_pipeline, print_report
+from generate_ai_prediction import BEIJING_TZ
+
+from http_utils import backoff_delay
+
+DRAW_HOUR, DRAW_MINUTE = 21, 15
+POLL_DELAY = 10 * 60          # 开奖后多久开始第一次轮询（秒）
+FIRST_INTERVAL = 60           # 首次重试间隔（秒）
+MAX_INTERVAL = 10 * 60        # 重试间隔上限（秒）
+GIVE_UP_AFTER = 6 * 3600      # 开始轮询后多久放弃本期（秒）
+
+
+def beijing_now() -> datetime:
+    """当前北京时间"""
+    return datetime.now(BEIJING_TZ)
+
+
+class DrawScheduler:
+    """按开奖时刻轮询数据源并触发归档与预测"""
+
+    def __init__(self, games: List[str] = GAMES, poll_delay: float = POLL_DELAY,
+                 first_interval: float = FIRST_INTERVAL, max_interval: float = MAX_INTERVAL,
+                 give_up_after: float = GIVE_UP_AFTER, sources: Optional[List[str]] = None,
+                 cache_dir: Optional[str] = None, skip_predict: bool = False,
+                 now: Callable[[], datetime] = beijing_now, sleep: Callable[[float], None] = time.sleep,
+                 sync: Optional[Callable[[str], Optional[int]]] = None,
+                 publish: Optional[Callable[[str], bool]] = None):
+        """
+        Args:
+            games: 要调度的彩种
+            poll_delay / first_interval / max_interval / give_up_after: 轮询节奏（秒）
+            sources / cache_dir: 传给抓取器的增量同步数据源与响应缓存目录
+            skip_predict: 新开奖后只归档，不生成预测
+            now / sleep: 时钟与等待函数（北京时间）
+            sync: sync(game) -> 新增期数或 None，默认使用抓取器的 delta_sync
+            publish: publish(game) -> 是否成功，默认执行 run_pipeline 的后续阶段
+        """
+        self.games = list(games)
+        self.poll_delay = poll_delay
+        self.first_interval = first_interval
+        self.max_interval = max_interval
+        self.give_up_after = give_up_after
+        self.sources = sources
+        self.cache_dir = cache_dir
+        self.skip_predict = skip_predict
+        self.now = now
+        self.sleep = sleep
+        self.sync = sync or self.delta_sync
+        self.publish = publish or self.run_pipeline
+        self.fetchers: Dict[str, Any] = {}
+
+    # ==================== 抓取器与本地数据 ====================
+
+    def fetcher(self, game: str):
+        """每个彩种复用一个抓取器（及其连接池与响应缓存）"""
+        if game not in self.fetchers:
+            if game == "ssq":
+                from fetch_lottery_history import LotteryDataFetcher as Fetcher
+            else:
+                from fetch_fc3d_history import FC3DDataFetcher as Fetcher
+            self.fetchers[game] = Fetcher(cache_dir=self.cache_dir, sources=self.sources,
+                                          store=self.generator(game).STORE)
+        return self.fetchers[game]
+
+    @staticmethod
+    def generator(game: str):
+        if game == "ssq":
+            import generate_ai_prediction as generator
+        else:
+            import generate_fc3d_prediction as generator
+        return generator
+
+    def latest_draw(self, game: str) -> Dict[str, Any]:
+        """本地历史文件中最新的一期"""
+        return self.generator(game).load_lottery_history()["data"][0]
+
+    def next_draw(self, game: str) -> Tuple[str, datetime]:
+        """
+        下一期的期号与开奖时刻（北京时间）
+
+        以本地最新一期为起点；本地数据落后时返回的时刻可能已经过去，调度器会立即开始轮询。
+        """
+        latest = self.latest_draw(game)
+        info = self.fetcher(game).predict_next_draw(latest["period"], latest["date"])
+        if not info:
+            raise ValueError(f"无法推算 {game} 下一期开奖信息")
+        draw_date = datetime.strptime(info["next_date"], "%Y-%m-%d")
+        draw_at = draw_date.replace(hour=DRAW_HOUR, minute=DRAW_MINUTE, tzinfo=BEIJING_TZ)
+        return info["next_period"], draw_at
+
+    def delta_sync(self, game: str) -> Optional[int]:
+        """默认的同步方式：抓取器增量同步"""
+        if game == "ssq":
+            return self.fetcher(game).delta_sync(SSQ_FETCH_FILE)
+        from fetch_fc3d_history import DEFAULT_OUTPUT_FILE
+        return self.fetcher(game).delta_sync(DEFAULT_OUTPUT_FILE)
+
+    def run_pipeline(self, game: str) -> bool:
+        """默认的发布方式：读取一次历史 → 归档 → 预测 → 保存"""
+        report = build_pipeline([game], skip_fetch=True, skip_predict=self.skip_predict).run()
+        print_report(report)
+        return all(r["status"] == "ok" for r in report.values())
+
+    # ==================== 调度 ====================
+
+    def wait_until(self, when: datetime):
+        """等待到指定时刻（分段等待，便于时钟调整后及时醒来）"""
+        while True:
+            remaining = (when - self.now()).total_seconds()
+            if remaining <= 0:
+                return
+            self.sleep(min(remaining, 3600))
+
+    def poll(self, game: str, period: str, draw_at: datetime) -> bool:
+        """
+        从开奖后 poll_delay 秒开始轮询，直到本地出现 period 期
+
+        Returns:
+            是否在放弃前等到了这一期
+        """
+        start_at = max(draw_at + timedelta(seconds=self.poll_delay), self.now())
+        deadline = start_at + timedelta(seconds=self.give_up_after)
+        self.wait_until(start_at)
+
+        attempt = 0
+        while True:
+            new_count = self.sync(game)
+            # 同步成功即检查本地最新期号：这一期可能已由其他进程或上一次运行写入，本次新增 0 期
+            if new_count is not None and self.latest_draw(game)["period"] >= period:
+                print(f"✅ [{game}] 第 {period} 期开奖数据已获取（开奖后 "
+                      f"{(self.now() - draw_at).total_seconds() / 60:.1f} 分钟）")
+                return True
+
+            delay = backoff_delay(attempt, base=self.first_interval, cap=self.max_interval)
+            if self.now() + timedelta(seconds=delay) > deadline:
+                print(f"⚠️  [{game}] 轮询 {attempt + 1} 次仍未获取第 {period} 期，放弃本期")
+                return False
+            status = "同步失败" if new_count is None else "尚未开奖"
+            print(f"⏳ [{game}] 第 {period} 期{status}，{delay:.0f} 秒后重试")
+            self.sleep(delay)
+            attempt += 1
+
+    def run_cycle(self, game: str) -> Tuple[str, bool]:
+        """
+        等待并处理下一期
+
+        Returns:
+            (期号, 是否已发布)
+        """
+        period, draw_at = self.next_draw(game)
+        print(f"📅 [{game}] 下一期 {period}，开奖时间 {draw_at.strftime('%Y-%m-%d %H:%M')}（北京时间）")
+        if not self.poll(game, period, draw_at):
+            return period, False
+        return period, self.publish(game)
+
+    def run_game(self, game: str, cycles: Optional[int] = None):
+        """循环处理某个彩种，cycles 为空时一直运行"""
+        done = 0
+        while cycles is None or done < cycles:
+            try:
+                self.run_cycle(game)
+            except Exception as e:
+                # 单期出错不退出调度，稍后重新计算下一期
+                print(f"❌ [{game}] 调度出错: {type(e).__name__}: {e}")
+                self.sleep(self.max_interval)
+            done += 1
+
+    def run(self, cycles: Optional[int] = None):
+        """每个彩种一个线程并行调度"""
+        threads = [threading.Thread(target=self.run_game, args=(game, cycles),
+                                    name=f"scheduler-{game}", daemon=True)
+                   for game in self.games]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="开奖时间感知的调度器（北京时间 21:15 开奖后轮询）")
+    parser.add_argument("--games", nargs="+", choices=GAMES, default=list(GAMES), help="要调度的彩种")
+    parser.add_argument("--once", action="store_true", help="只处理下一期后退出")
+    parser.add_argument("--poll-delay", type=float, default=POLL_DELAY, help="开奖后多少秒开始轮询")
+    parser.add_argument("--max-interval", type=float, default=MAX_INTERVAL, help="轮询间隔上限（秒）")
+    parser.add_argument("--give-up-after", type=float, default=GIVE_UP_AFTER, help="轮询多少秒后放弃本期")
+    parser.add_argument("--source", action="append", dest="sources", help="增量同步的数据源，可重复指定")
+    parser.add_argument("--no-cache", action="store_true", help="不使用原始响应缓存")
+    parser.add_argument("--skip-predict", action="store_true", help="新开奖后只归档，不生成预测")
+    args = parser.parse_args()
+
+    from draw_sources import BUILTIN_SOURCES
+    from fetch_lottery_history import HTTP_CACHE_DIR
+
+    scheduler = DrawScheduler(args.games, poll_delay=args.poll_delay, max_interval=args.max_interval,
+                              give_up_after=args.give_up_after,
+                              sources=args.sources or list(BUILTIN_SOURCES),
+                              cache_dir=None if args.no_cache else HTTP_CACHE_DIR,
+                              skip_predict=args.skip_predict)
+    try:
+        scheduler.run(cycles=1 if args.once else None)
+    except KeyboardInterrupt:
+        print("\n已停止调度")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史预测归档（predictions_history.json / fc3d_predictions_history.json）的流式读写
+
+归档文件格式：
+    {
+      "历史预测记录": "...",
+      "predictions_history": [ {一期记录}, ... ]     # 期号降序，必须是最后一个键
+    }
+
+- iter_records: 增量解析，每次只在内存中保留一条记录（按块读取，用 JSONDecoder.raw_decode 逐条解码）
+- ArchiveWriter: 逐条写入，输出与 json.dump(..., ensure_ascii=False, indent=2) 逐字节相同
+- find_record / prepend_record / filter_records: 查找、在顶部插入、筛选，内存占用与归档大小无关
+
+使用方法：
+    python3 archive_stream.py count ../data/predictions_history.json
+    python3 archive_stream.py find ../data/predictions_history.json 26031
+    python3 archive_stream.py filter ../data/predictions_history.json --since 26001 --output recent.json
+"""
+
+import argparse
+import json
+import os
+import re
+
+from json_io import atomic_open, file_lock
+
+ARCHIVE_KEY = "predictions_history"
+CHUNK_SIZE = 1 << 18
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class _StreamReader:
+    """按块读取文本，逐个解码 JSON 值"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        """丢弃已解析的部分并读入下一块；返回是否读到了新内容"""
+        chunk = self.f.read(size or self.chunk_size)
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self):
+        """跳过空白，返回下一个字符（文件结束时返回空字符串）"""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self.fill():
+                return self.text[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"归档格式错误：期望 {char!r}，实际为 {found!r}")
+        self.pos += 1
+
+    def decode(self):
+        """解码下一个完整的 JSON 值"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # 当前缓冲区里的值不完整：按剩余长度成倍扩大读取量，避免大记录反复重试
+                self.fill(max(self.chunk_size, len(self.text) - self.pos))
+                continue
+            if end == len(self.text) and not self.eof:
+                # 数字等值可能恰好在缓冲区末尾被截断
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_records(path, key=ARCHIVE_KEY, header=None, chunk_size=CHUNK_SIZE):
+    """
+    逐条读取归档记录
+
+    Args:
+        path: 归档文件
+        key: 记录数组的键
+        header: 传入字典时，填入记录数组之前的其他键（如 "历史预测记录"）
+        chunk_size: 每次读取的字符数
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _StreamReader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            name = reader.decode()
+            reader.expect(':')
+            if name == key:
+                reader.expect('[')
+                if reader.peek() == ']':
+                    return
+                while True:
+                    yield reader.decode()
+                    separator = reader.peek()
+                    reader.pos += 1
+                    if separator == ']':
+                        return
+                    if separator != ',':
+                        raise ValueError(f"归档格式错误：记录之间应为 ',' 实际为 {separator!r}")
+            value = reader.decode()
+            if header is not None:
+                header[name] = value
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"归档格式错误：键之间应为 ',' 实际为 {separator!r}")
+
+
+def read_header(path, key=ARCHIVE_KEY):
+    """记录数组之前的其他键，不解析任何记录"""
+    header = {}
+    records = iter_records(path, key, header)
+    next(records, None)
+    records.close()
+    return header
+
+
+class ArchiveWriter:
+    """
+    逐条写入归档（持有文件锁，写入临时文件，正常结束时改名覆盖）
+
+        with ArchiveWriter(path, header) as writer:
+            for record in records:
+                writer.write(record)
+    """
+
+    def __init__(self, path, header=None, key=ARCHIVE_KEY):
+        self.path = path
+        self.header = header or {}
+        self.key = key
+        self.count = 0
+        self._trailer_written = False
+        self._lock = None
+        self._file = None
+
+    @staticmethod
+    def prefix(header, key=ARCHIVE_KEY):
+        """记录数组第一个元素之前的全部文本"""
+        parts = ["{\n"]
+        for name, value in header.items():
+            text = json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            parts.append(f"  {json.dumps(name, ensure_ascii=False)}: {text},\n")
+        parts.append(f"  {json.dumps(key, ensure_ascii=False)}: [")
+        return "".join(parts)
+
+    def __enter__(self):
+        self._lock = file_lock(self.path)
+        self._lock.__enter__()
+        try:
+            self._file = atomic_open(self.path, 'w', encoding='utf-8')
+            self._out = self._file.__enter__()
+        except BaseException:
+            self._lock.__exit__(None, None, None)
+            raise
+        self._out.write(self.prefix(self.header, self.key))
+        return self
+
+    def write(self, record):
+        self._out.write(("\n    " if self.count == 0 else ",\n    ") + format_record(record))
+        self.count += 1
+
+    def write_raw(self, text):
+        """直接写入已按归档格式排版的文本，包括结尾（prepend_record 复制原有记录时使用）"""
+        self._out.write(text)
+        self._trailer_written = True
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None and not self._trailer_written:
+                self._out.write("\n  ]\n}" if self.count else "]\n}")
+            return self._file.__exit__(exc_type, exc, tb)
+        finally:
+            self._lock.__exit__(exc_type, exc, tb)
+
+
+def format_record(record):
+    """一条记录在归档中的文本（数组内缩进 4 个空格，首行不含缩进）"""
+    return json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+
+
+def find_record(path, period, field="target_period"):
+    """查找某期记录（从最新一期开始，找到即停止），不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    for record in iter_records(path):
+        if record.get(field) == period:
+            return record
+    return None
+
+
+def prepend_record(path, record, header=None, field="target_period"):
+    """
+    在归档顶部插入一条记录（持有文件锁重写；按 json.dump(indent=2) 排版的文件直接复制原有记录）
+
+    Args:
+        header: 文件不存在时使用的其他键
+        field: 判重字段，已存在同一期时不写入
+
+    Returns:
+        是否写入
+    """
+    with file_lock(path):
+        if not os.path.exists(path):
+            with ArchiveWriter(path, header) as writer:
+                writer.write(record)
+            return True
+
+        if find_record(path, record.get(field), field) is not None:
+            return False
+
+        header = read_header(path)
+        prefix = ArchiveWriter.prefix(header)
+        with ArchiveWriter(path, header) as writer, open(path, 'r', encoding='utf-8') as f:
+            writer.write(record)
+            if f.read(len(prefix)) != prefix or f.read(1) != "\n":
+                # 不是 json.dump(indent=2) 排版的非空归档：逐条解析后重新写出
+                for existing in iter_records(path):
+                    writer.write(existing)
+                return True
+
+            # 排版一致时原有记录（连同文件结尾）按原文复制，不再解析与序列化
+            writer.write_raw(",\n")
+            while True:
+                block = f.read(CHUNK_SIZE)
+                if not block:
+                    break
+                writer.write_raw(block)
+        return True
+
+
+def filter_records(path, predicate, output=None):
+    """
+    只保留 predicate(record) 为真的记录，写入 output（默认覆盖 path）
+
+    Returns:
+        保留的记录数
+    """
+    output = output or path
+    with file_lock(path):
+        with ArchiveWriter(output, read_header(path)) as writer:
+            for record in iter_records(path):
+                if predicate(record):
+                    writer.write(record)
+    return writer.count
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="历史预测归档的流式读写")
+    parser.add_argument("command", choices=["count", "find", "filter"], help="统计记录数 / 查找某期 / 按期号筛选")
+    parser.add_argument("path", help="归档文件")
+    parser.add_argument("period", nargs="?", help="find 使用的期号")
+    parser.add_argument("--since", help="filter: 只保留不早于该期号的记录")
+    parser.add_argument("--output", help="filter: 输出文件（默认覆盖原文件）")
+    args = parser.parse_args()
+
+    if args.command == "count":
+        print(f"📦 {args.path}: {sum(1 for _ in iter_records(args.path))} 期记录")
+    elif args.command == "find":
+        record = find_record(args.path, args.period)
+        if record is None:
+            print(f"❌ 没有找到期号 {args.period}")
+            raise SystemExit(1)
+        print(json.dumps(record, ensure_ascii=False, indent=2))
+    else:
+        since = int(args.since or 0)
+        kept = filter_records(args.path, lambda r: int(r.get("target_period", 0)) >= since, args.output)
+        print(f"✓ 保留 {kept} 期记录 → {args.output or args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史预测归档流式读写基准测试
+
+生成指定大小的合成归档（双色球格式，每期 4 个模型 × 5 组预测），
+在独立子进程中分别执行以下操作，统计耗时、吞吐量（MB/s）与峰值内存（RSS）：
+- load-find / stream-find: json.load 整个文件后查找最早一期 / iter_records 流式查找
+- load-prepend / stream-prepend: 整体读入、插入、写回 / prepend_record 在顶部插入（原有记录按原文复制）
+
+使用方法：
+    cd fetch_history
+    python3 bench_archive.py                      # 默认 300 MB
+    python3 bench_archive.py --size-mb 50 --dir /tmp
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from archive_stream import ArchiveWriter, find_record, prepend_record
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ("load-find", "stream-find", "load-prepend", "stream-prepend")
+
+
+def synthetic_record(index):
+    """一期合成记录（期号随 index 递减）"""
+    period = f"{90000 - index:05d}"
+    reds = [f"{(index + k * 5) % 33 + 1:02d}" for k in range(6)]
+    actual = {"period": period, "red_balls": sorted(reds), "blue_ball": f"{index % 16 + 1:02d}", "date": "2026-01-01"}
+    models = []
+    for m in range(4):
+        predictions = []
+        for g in range(5):
+            group_reds = sorted(f"{(index + m * 7 + g * 3 + k * 4) % 33 + 1:02d}" for k in range(6))
+            hits = [b for b in group_reds if b in actual["red_balls"]]
+            predictions.append({
+                "group_id": g + 1, "strategy": f"策略{g + 1}", "red_balls": group_reds,
+                "blue_ball": f"{(m + g) % 16 + 1:02d}", "description": "合成数据，用于归档读写基准测试。" * 3,
+                "hit_result": {"red_hits": hits, "red_hit_count": len(hits), "blue_hit": False,
+                               "total_hits": len(hits)},
+            })
+        models.append({"model_id": f"MODEL-{m}", "model_name": f"模型 {m}", "predictions": predictions,
+                       "best_group": 1, "best_hit_count": predictions[0]["hit_result"]["total_hits"]})
+    return {"prediction_date": "2026-01-01", "target_period": period, "actual_result": actual, "models": models}
+
+
+def write_synthetic_archive(path, size_mb):
+    """写入约 size_mb 的合成归档，返回记录数"""
+    target = size_mb * 1024 * 1024
+    with ArchiveWriter(path, {"历史预测记录": "合成归档"}) as writer:
+        while True:
+            writer.write(synthetic_record(writer.count))
+            if writer.count % 100 == 0 and writer._out.tell() >= target:
+                break
+    return writer.count
+
+
+def peak_rss_mb():
+    """当前进程的峰值 RSS（MB），不支持时返回 None"""
+    # Linux 的 ru_maxrss 会沿用 exec 之前父进程的峰值，优先读取只属于本进程的 VmHWM
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_mode(mode, path, oldest_period):
+    """在当前进程中执行一种操作，返回耗时（秒）"""
+    new_record = dict(synthetic_record(0), target_period="99999")
+    start = time.perf_counter()
+    if mode == "load-find":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        found = next(r for r in data["predictions_history"] if r["target_period"] == oldest_period)
+    elif mode == "stream-find":
+        found = find_record(path, oldest_period)
+    elif mode == "load-prepend":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data["predictions_history"].insert(0, new_record)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        found = True
+    else:
+        found = prepend_record(path, new_record)
+    if not found:
+        raise AssertionError(f"{mode}: 操作结果不正确")
+    return time.perf_counter() - start
+
+
+def run_benchmark(size_mb=300, work_dir=None):
+    """
+    Returns:
+        [{"mode", "records", "size_mb", "seconds", "mb_per_s", "peak_rss_mb"}, ...]
+    """
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        source = os.path.join(tmp, "archive.json")
+        count = write_synthetic_archive(source, size_mb)
+        oldest_period = synthetic_record(count - 1)["target_period"]
+        actual_mb = os.path.getsize(source) / (1024 * 1024)
+
+        results = []
+        for mode in MODES:
+            # prepend 会修改文件，每种操作使用一份副本；每种操作在独立子进程中执行，峰值内存互不影响
+            path = os.path.join(tmp, f"{mode}.json")
+            with open(source, 'rb') as src, open(path, 'wb') as dst:
+                while True:
+                    block = src.read(1 << 20)
+                    if not block:
+                        break
+                    dst.write(block)
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", mode, path, oldest_period],
+                check=True, capture_output=True, text=True, cwd=SCRIPT_DIR).stdout
+            measured = json.loads(output.strip().splitlines()[-1])
+            results.append({
+                "mode": mode, "records": count, "size_mb": round(actual_mb, 1),
+                "seconds": round(measured["seconds"], 3),
+                "mb_per_s": round(actual_mb / measured["seconds"], 1) if measured["seconds"] else None,
+                "peak_rss_mb": measured["peak_rss_mb"],
+            })
+            os.remove(path)
+        return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="历史预测归档流式读写基准测试")
+    parser.add_argument("--size-mb", type=int, default=300, help="合成归档大小（MB）")
+    parser.add_argument("--dir", help="存放合成归档的目录（默认系统临时目录）")
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "PATH", "PERIOD"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, path, period = args.worker
+        seconds = run_mode(mode, path, period)
+        print(json.dumps({"seconds": seconds, "peak_rss_mb": peak_rss_mb()}))
+        return
+
+    print("=" * 60)
+    print(f"历史预测归档读写基准测试（合成归档约 {args.size_mb} MB）")
+    print("=" * 60)
+    results = run_benchmark(args.size_mb, args.dir)
+    print(f"记录数 {results[0]['records']:,}，文件 {results[0]['size_mb']} MB\n")
+    print(f"{'操作':<16}{'耗时(s)':>10}{'吞吐(MB/s)':>12}{'峰值RSS(MB)':>14}")
+    for r in results:
+        rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:,.1f}"
+        print(f"{r['mode']:<16}{r['seconds']:>10.2f}{r['mb_per_s'] or 0:>12.1f}{rss:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+开奖记录合并基准测试
+
+在不同规模的合成历史数据上，对比原先的「字典重建 + 全量排序」合并与有序插入合并
+（draw_merge.merge_sorted）每次合并一期新数据的耗时。有序插入的耗时应基本不随历史规模增长。
+
+使用方法：
+    cd fetch_history
+    python3 bench_merge.py
+    python3 bench_merge.py --sizes 1000 10000 100000 --repeat 200
+"""
+
+import argparse
+import time
+
+from draw_merge import merge_sorted
+
+
+def synthetic_history(size):
+    """按期号降序的合成福彩3D记录（7 位期号，每年 1000 期以内）"""
+    rows = []
+    for i in range(size):
+        year, seq = 2000 + i // 900, i % 900 + 1
+        digits = [str((i * 7 + k * 3) % 10) for k in range(3)]
+        rows.append({"period": f"{year}{seq:03d}", "digits": digits, "number": "".join(digits),
+                     "date": f"{year}-01-01"})
+    rows.reverse()
+    return rows
+
+
+def next_row(period):
+    return {"period": str(int(period) + 1), "digits": ["1", "2", "3"], "number": "123", "date": "2099-01-01"}
+
+
+def legacy_merge(existing, new_rows):
+    """原先的合并方式：以期号为键重建字典后全量排序"""
+    data_dict = {item['period']: item for item in existing}
+    for item in new_rows:
+        data_dict[item['period']] = item
+    merged = list(data_dict.values())
+    merged.sort(key=lambda x: x['period'], reverse=True)
+    return merged
+
+
+def time_merge(merge, rows, repeat):
+    """每次合并比当前最新一期更新的一期，返回单次平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = merge(rows, [next_row(rows[0]['period'])])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run_benchmark(sizes=(1000, 10000, 50000), repeat=50):
+    """
+    Returns:
+        [{"size", "legacy_us", "sorted_us"}, ...]
+    """
+    results = []
+    for size in sizes:
+        base = synthetic_history(size)
+        legacy_us = time_merge(legacy_merge, list(base), repeat)
+        sorted_us = time_merge(lambda rows, new: merge_sorted(rows, new)[0], list(base), repeat)
+
+        # 两种方式的结果必须一致（含中间插入与冲突覆盖）
+        middle = dict(base[size // 2], digits=["9", "9", "9"], number="999")
+        extra = [next_row(base[0]['period']), middle]
+        if merge_sorted(list(base), extra)[0] != legacy_merge(base, extra):
+            raise AssertionError(f"{size}: 有序插入与全量排序的合并结果不一致")
+
+        results.append({"size": size, "legacy_us": round(legacy_us, 1), "sorted_us": round(sorted_us, 1)})
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="开奖记录合并基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="历史数据期数")
+    parser.add_argument("--repeat", type=int, default=50, help="每种规模合并次数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("开奖记录合并基准测试（每次合并 1 期新数据）")
+    print("=" * 50)
+    print(f"{'历史期数':>10}{'全量排序(μs)':>16}{'有序插入(μs)':>16}{'加速':>8}")
+    for r in run_benchmark(args.sizes, args.repeat):
+        speedup = r["legacy_us"] / r["sorted_us"] if r["sorted_us"] else 0
+        print(f"{r['size']:>10}{r['legacy_us']:>16,.1f}{r['sorted_us']:>16,.1f}{speedup:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史开奖表格解析基准测试
+
+用 fixtures/ 下录制的网页对比 BeautifulSoup 路径与快速路径（parse_html，
+结构不符时回退 BeautifulSoup）的吞吐量（行/秒），并校验两条路径的解析结果完全一致。
+
+使用方法：
+    cd fetch_history
+    python3 bench_parsers.py
+    python3 bench_parsers.py --repeat 50
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from fetch_fc3d_history import FC3DDataFetcher
+from fetch_lottery_history import LotteryDataFetcher
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(SCRIPT_DIR, 'fixtures')
+
+
+def load_pages(prefix):
+    """读取 fixtures/<prefix>*.html（gb2312 解码），忽略空表页面"""
+    pages = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.startswith(prefix) and name.endswith('.html') and 'empty' not in name:
+            with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+                pages.append(f.read().decode('gb2312'))
+    return pages
+
+
+def time_parser(parse, pages, repeat):
+    """返回 (总行数, 耗时秒)；解析函数的进度输出被屏蔽"""
+    rows = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for page in pages:
+                rows += len(parse(page))
+        elapsed = time.perf_counter() - start
+    return rows, elapsed
+
+
+def run_benchmark(repeat=20):
+    """
+    对两种彩票分别测量两条解析路径
+
+    Returns:
+        [{"game", "parser", "rows", "seconds", "rows_per_sec"}, ...]
+    """
+    fc3d_fetcher = FC3DDataFetcher()
+    cases = [
+        ("ssq", load_pages('ssq_history_'), {
+            "beautifulsoup": lambda html: LotteryDataFetcher.parse_lottery_data(BeautifulSoup(html, 'html.parser')),
+            "fast": LotteryDataFetcher.parse_html,
+        }),
+        ("fc3d", load_pages('fc3d_history_'), {
+            "beautifulsoup": lambda html: fc3d_fetcher.parse_fc3d_data(BeautifulSoup(html, 'html.parser')),
+            "fast": fc3d_fetcher.parse_html,
+        }),
+    ]
+
+    results = []
+    for game, pages, parsers in cases:
+        with contextlib.redirect_stdout(io.StringIO()):
+            outputs = {name: [parse(page) for page in pages] for name, parse in parsers.items()}
+        if outputs["fast"] != outputs["beautifulsoup"]:
+            raise AssertionError(f"{game}: 快速路径与 BeautifulSoup 解析结果不一致")
+
+        for name, parse in parsers.items():
+            rows, elapsed = time_parser(parse, pages, repeat)
+            results.append({
+                "game": game,
+                "parser": name,
+                "rows": rows,
+                "seconds": round(elapsed, 4),
+                "rows_per_sec": round(rows / elapsed) if elapsed > 0 else 0,
+            })
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="历史开奖表格解析基准测试")
+    parser.add_argument("--repeat", type=int, default=20, help="每个录制页面重复解析次数")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat)
+
+    print("=" * 50)
+    print("历史开奖表格解析基准测试")
+    print("=" * 50)
+    print(f"{'彩种':<8}{'解析器':<16}{'行数':>10}{'耗时(s)':>10}{'行/秒':>12}")
+    for r in results:
+        print(f"{r['game']:<8}{r['parser']:<16}{r['rows']:>10}{r['seconds']:>10.3f}{r['rows_per_sec']:>12,}")
+
+    for game in ("ssq", "fc3d"):
+        speed = {r["parser"]: r["rows_per_sec"] for r in results if r["game"] == game}
+        print(f"⚡ {game} 快速路径加速 {speed['fast'] / speed['beautifulsoup']:.1f}x（结果已校验一致）")
+
+
+if __name__ == "__main__":
+    main()
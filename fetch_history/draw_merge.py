@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+按期号有序合并开奖记录
+
+本地数据始终按期号降序保存（两个抓取脚本的写入路径都经过这里），因此合并时不必
+重建整个字典再全量排序：
+- 比本地最新一期更新的记录（最常见的情况）整体插到列表头部
+- 其余记录用二分查找定位，已有期号原地比较，缺失期号原地插入
+
+Python 层面的工作量与新记录数成正比（每条 O(log n) 次比较）；列表插入只是一次内存移动。
+"""
+
+
+def find_position(rows, period):
+    """
+    在按期号降序排列的 rows 中二分查找 period
+
+    Returns:
+        第一个期号 <= period 的下标（period 已存在时即为其下标）
+    """
+    lo, hi = 0, len(rows)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if rows[mid]['period'] > period:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def draw_numbers(row):
+    """一期开奖的号码（双色球红球 + 蓝球，福彩3D 各位数字），用于判断新旧数据是否冲突"""
+    return tuple(row.get('red_balls') or row.get('digits') or ()), row.get('blue_ball')
+
+
+def merge_sorted(existing, new_rows):
+    """
+    把 new_rows 合并进按期号降序排列的 existing（原地修改）
+
+    同一期号以新数据为准；new_rows 内部的重复期号以最后出现的为准（与原先的字典合并一致）。
+    新旧数据号码不同的期号记为冲突并被覆盖，由调用方决定如何报告；号码相同、只有日期等其他字段
+    不同的期号同样以新数据为准，但不算冲突。
+
+    Args:
+        existing: 已有记录列表（降序，会被原地修改）
+        new_rows: 新记录列表（顺序不限）
+
+    Returns:
+        (existing, 新增期数, 冲突列表 [{"period", "old", "new"}])
+    """
+    incoming = {}
+    for row in new_rows:
+        incoming[row['period']] = row
+
+    added = 0
+    conflicts = []
+    newer = []
+    head = existing[0]['period'] if existing else None
+
+    for period in sorted(incoming, reverse=True):
+        row = incoming[period]
+        if head is None or period > head:
+            newer.append(row)
+            continue
+
+        pos = find_position(existing, period)
+        if pos < len(existing) and existing[pos]['period'] == period:
+            if draw_numbers(existing[pos]) != draw_numbers(row):
+                conflicts.append({"period": period, "old": existing[pos], "new": row})
+            existing[pos] = row
+        else:
+            existing.insert(pos, row)
+            added += 1
+
+    if newer:
+        existing[0:0] = newer
+        added += len(newer)
+
+    return existing, added, conflicts
+
+
+def report_conflicts(conflicts, limit=5):
+    """打印被新数据覆盖的冲突期号"""
+    if not conflicts:
+        return
+    periods = ", ".join(c["period"] for c in conflicts[:limit])
+    more = f" 等 {len(conflicts)} 期" if len(conflicts) > limit else ""
+    print(f"⚠️  以下期号与本地数据不一致，已用新数据覆盖: {periods}{more}")
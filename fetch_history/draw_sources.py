@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+开奖数据源适配器
+
+- DrawSource: 数据源接口，fetch_range(start, end) 返回该期号范围内的开奖记录列表（失败返回 None）
+- Five00Source: 500 彩票网（及使用相同页面结构的镜像站）
+- CwlSource: 中国福利彩票官网开奖公告 JSON 接口
+- race_sources: 并发请求全部数据源，采用最先返回且校验通过的完整结果
+
+期号统一使用抓取脚本的本地格式：双色球 5 位（26031），福彩3D 7 位（2026071）。
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+
+from history_parser import fc3d_record
+
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+SSQ_PERIOD_DIGITS = 5
+FC3D_PERIOD_DIGITS = 7
+
+
+class DrawSource:
+    """开奖数据源接口"""
+
+    name = "base"
+
+    def __init__(self, game):
+        # game: "ssq" 或 "fc3d"
+        self.game = game
+
+    def fetch_range(self, start, end):
+        """
+        获取 [start, end] 期号范围内的开奖记录
+
+        Returns:
+            记录列表（可以为空），请求或解析失败返回 None
+        """
+        raise NotImplementedError
+
+
+class Five00Source(DrawSource):
+    """500 彩票网历史开奖页面（镜像站只需换一个 range_url）"""
+
+    def __init__(self, game, range_url, fetch_text, parse_html, name="500.com"):
+        """
+        Args:
+            range_url: 带 {start} / {end} 占位符的期号范围查询地址
+            fetch_text: fetch_text(url, defer=True) -> 网页文本或 None（沿用抓取脚本的会话、缓存与重试；
+                新页面只暂存到响应缓存，由抓取器保存数据后 commit_cache）
+            parse_html: parse_html(text) -> 记录列表（快速路径 + BeautifulSoup 回退）
+        """
+        super().__init__(game)
+        self.name = name
+        self.range_url = range_url
+        self.fetch_text = fetch_text
+        self.parse_html = parse_html
+
+    def fetch_range(self, start, end):
+        text = self.fetch_text(self.range_url.format(start=start, end=end), defer=True)
+        if text is None:
+            return None
+        return [row for row in self.parse_html(text) if start <= row["period"] <= end]
+
+
+class CwlSource(DrawSource):
+    """中国福利彩票官网开奖公告接口（期号为 7 位，如 2026031）"""
+
+    API_URL = ("https://www.cwl.gov.cn/cwl_admin/front/cwlkj/search/kjxx/findDrawNotice"
+               "?name={name}&issueStart={start}&issueEnd={end}")
+    GAME_NAMES = {"ssq": "ssq", "fc3d": "3d"}
+
+    def __init__(self, game, session, api_url=None, timeout=10, name="cwl.gov.cn"):
+        super().__init__(game)
+        self.name = name
+        self.session = session
+        self.api_url = api_url or self.API_URL
+        self.timeout = timeout
+
+    def to_issue(self, period):
+        """本地期号 -> 官网 7 位期号"""
+        return "20" + period if self.game == "ssq" else period
+
+    def from_issue(self, issue):
+        """官网 7 位期号 -> 本地期号"""
+        return issue[2:] if self.game == "ssq" else issue
+
+    def fetch_range(self, start, end):
+        url = self.api_url.format(name=self.GAME_NAMES[self.game], start=self.to_issue(start),
+                                  end=self.to_issue(end))
+        try:
+            response = self.session.get(url, timeout=self.timeout,
+                                        headers={'Referer': 'https://www.cwl.gov.cn/ygkj/wqkjgg/'})
+            if response.status_code != 200:
+                print(f"[{self.name}] HTTP 状态码: {response.status_code}")
+                return None
+            items = response.json().get("result") or []
+        except Exception as e:
+            print(f"[{self.name}] 请求失败: {e}")
+            return None
+
+        rows = []
+        for item in items:
+            period = self.from_issue(str(item.get("code", "")))
+            # 日期形如 "2026-03-22(日)"
+            date = str(item.get("date", ""))[:10]
+            numbers = [n.strip() for n in str(item.get("red", "")).split(",") if n.strip()]
+            if self.game == "ssq":
+                rows.append({"period": period, "red_balls": numbers,
+                             "blue_ball": str(item.get("blue", "")).strip(), "date": date})
+            elif len(numbers) == 3 and all(n.isdigit() for n in numbers):
+                rows.append(fc3d_record(period, numbers, date))
+            else:
+                return None
+        return rows
+
+
+# 内置数据源名称；其他值视为 500 彩票网页面结构的镜像地址（含 {start} / {end} 占位符）
+BUILTIN_SOURCES = ("500", "cwl")
+
+
+def build_sources(game, specs, fetcher):
+    """
+    按名称或镜像地址构造数据源列表
+
+    Args:
+        game: "ssq" 或 "fc3d"
+        specs: 如 ["500", "cwl", "https://mirror.example/history.php?start={start}&end={end}"]
+        fetcher: 抓取器实例，提供 range_url / fetch_text / parse_html / session
+    """
+    sources = []
+    for spec in specs:
+        if spec == "500":
+            sources.append(Five00Source(game, fetcher.range_url, fetcher.fetch_text, fetcher.parse_html))
+        elif spec == "cwl":
+            sources.append(CwlSource(game, fetcher.session))
+        elif "{start}" in spec and "{end}" in spec:
+            sources.append(Five00Source(game, spec, fetcher.fetch_text, fetcher.parse_html, name=spec))
+        else:
+            raise ValueError(f"未知的数据源: {spec}")
+    return sources
+
+
+# ==================== 校验 ====================
+
+def is_valid_row(game, row):
+    """检查单条记录的格式与号码范围"""
+    period = row.get("period", "")
+    if not DATE_RE.match(row.get("date", "")):
+        return False
+    if game == "ssq":
+        reds = row.get("red_balls", [])
+        blue = row.get("blue_ball", "")
+        return (len(period) == SSQ_PERIOD_DIGITS and period.isdigit()
+                and len(reds) == 6 and len(set(reds)) == 6
+                and all(len(b) == 2 and b.isdigit() and 1 <= int(b) <= 33 for b in reds)
+                and len(blue) == 2 and blue.isdigit() and 1 <= int(blue) <= 16)
+    digits = row.get("digits", [])
+    return (len(period) == FC3D_PERIOD_DIGITS and period.isdigit()
+            and len(digits) == 3 and all(len(d) == 1 and d.isdigit() for d in digits))
+
+
+def draw_key(game, row):
+    """用于比较两个数据源是否一致的开奖号码（红球不计顺序）"""
+    if game == "ssq":
+        return tuple(sorted(row["red_balls"])), row["blue_ball"]
+    return tuple(row["digits"])
+
+
+def is_complete(rows, start, end):
+    """
+    结果是否完整：期号落在范围内且同一年内连续，并从 start 开始
+
+    跨年时新一年从 001 期开始，不要求与上一年末期相接。
+    """
+    periods = sorted(row["period"] for row in rows)
+    if not periods:
+        return True
+    if periods[0] != start or periods[-1] > end:
+        return False
+    year_len = len(start) - 3
+    for prev, cur in zip(periods, periods[1:]):
+        if cur[:year_len] == prev[:year_len]:
+            if int(cur) != int(prev) + 1:
+                return False
+        elif not cur.endswith("001"):
+            return False
+    return True
+
+
+def find_conflicts(game, rows, reference):
+    """返回 rows 中与 reference（期号 -> 记录）同期号但开奖号码不同的期号列表"""
+    return [row["period"] for row in rows
+            if row["period"] in reference and draw_key(game, row) != draw_key(game, reference[row["period"]])]
+
+
+def check_result(game, rows, start, end, reference=None):
+    """校验一个数据源的结果，返回问题描述（通过时返回 None）"""
+    reference = reference or {}
+    if rows is None:
+        return "请求失败"
+    if not rows and start in reference:
+        return "缺少已知的起始期"
+    bad = [row.get("period", "?") for row in rows if not is_valid_row(game, row)]
+    if bad:
+        return f"格式错误的记录: {', '.join(bad[:5])}"
+    if len({row["period"] for row in rows}) != len(rows):
+        return "期号重复"
+    if not is_complete(rows, start, end):
+        return "期号不连续或未从起始期开始"
+    conflicts = find_conflicts(game, rows, reference)
+    if conflicts:
+        return f"与已知数据不一致: {', '.join(conflicts[:5])}"
+    return None
+
+
+# ==================== 竞速 ====================
+
+def race_sources(sources, start, end, reference=None, quorum=1, timeout=60):
+    """
+    并发请求所有数据源，采用最先到达的、完整且经交叉校验的结果
+
+    - 每个结果必须格式正确、期号连续，且与 reference（通常是本地已保存的数据）在重叠期号上一致
+    - quorum > 1 时，还需要另外 quorum-1 个数据源在重叠期号上给出相同号码
+    - 只包含 reference 中已有期号的结果（即「没有新开奖」）不会立即胜出，
+      先等待其他数据源，避免更新较慢的镜像站掩盖新开奖
+
+    Args:
+        sources: DrawSource 列表（同一彩种）
+        start / end: 期号范围
+        reference: 期号 -> 记录 的字典
+        quorum: 需要相互印证的数据源个数
+        timeout: 等待所有数据源的总秒数
+
+    Returns:
+        (记录列表, 数据源名称)；没有合格结果时返回 (None, None)
+    """
+    if not sources:
+        return None, None
+    game = sources[0].game
+    reference = reference or {}
+    accepted = []   # [(source_name, rows)]
+    fallback = None
+
+    pool = ThreadPoolExecutor(max_workers=len(sources))
+    futures = {pool.submit(source.fetch_range, start, end): source for source in sources}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            source = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"⚠️  数据源 {source.name} 出错: {e}")
+                continue
+
+            problem = check_result(game, rows, start, end, reference)
+            if problem:
+                print(f"⚠️  数据源 {source.name} 的结果被拒绝: {problem}")
+                continue
+
+            peers = [name for name, other in accepted
+                     if not find_conflicts(game, rows, {row["period"]: row for row in other})]
+            accepted.append((source.name, rows))
+            if len(peers) + 1 < quorum:
+                continue
+
+            if any(row["period"] not in reference for row in rows):
+                print(f"✓ 采用数据源 {source.name} 的结果（{len(rows)} 期）")
+                return rows, source.name
+            fallback = fallback or (rows, source.name)
+    except FuturesTimeout:
+        print(f"⚠️  等待数据源超时（{timeout}s）")
+    finally:
+        # 不等待仍在进行中的慢数据源
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if fallback:
+        print(f"✓ 采用数据源 {fallback[1]} 的结果（没有新开奖）")
+        return fallback
+    return None, None
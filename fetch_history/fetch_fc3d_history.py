@@ -8,67 +8,107 @@
 2. 自动计算和值、跨度、形态（豹子/组三/组六）
 3. 合并历史数据，去重
 4. 输出到 data/fc3d_history.json
+5. 支持可断点续传的全量回填：逐页（按年份）抓取并落盘检查点，全部完成后一次性合并
+6. 支持增量同步：只请求本地最新期号之后的期号，没有新数据时不解析、不写文件
+7. 支持条件请求与原始响应缓存：页面未变化（304 或内容哈希一致）时跳过下载与解析
+8. 支持多数据源（500 彩票网、福彩官网、镜像站）：增量同步时并发请求，采用最先返回且校验通过的结果
 
 使用方法：
     python3 fetch_fc3d_history.py
+    python3 fetch_fc3d_history.py --backfill                 # 回填 2004 年至今，中断后重新运行即可续传
+    python3 fetch_fc3d_history.py --backfill --restart       # 丢弃检查点重新回填
+    python3 fetch_fc3d_history.py --delta                    # 增量同步
+    python3 fetch_fc3d_history.py --delta --no-cache         # 不使用响应缓存
 """
 
-import requests
 from bs4 import BeautifulSoup
+import argparse
 import json
+import re
+import shutil
 import time
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
+from http_utils import create_session, ensure_pool_size, RateLimiter, ResponseCache, fetch_with_cache
+from draw_sources import BUILTIN_SOURCES, build_sources, race_sources
+from draw_merge import merge_sorted, report_conflicts
+from lottery_db import open_store
+from json_io import EXIT_UNCHANGED, file_lock, write_json_if_changed
+from history_parser import calc_type, fc3d_row_item, parse_fc3d_fast
+
+# 福彩3D 从 2004 年开始发行，每年期数不超过 366
+FIRST_YEAR = 2004
+MAX_PERIODS_PER_YEAR = 366
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_FILE = os.path.abspath(os.path.join(SCRIPT_DIR, '..', 'data', 'fc3d_history.json'))
+BACKFILL_CHECKPOINT_DIR = os.path.join(SCRIPT_DIR, '.fc3d_backfill')
+HTTP_CACHE_DIR = os.path.join(SCRIPT_DIR, '.http_cache')
+
 
 class FC3DDataFetcher:
     """福彩3D 数据获取器"""
 
-    def __init__(self):
+    def __init__(self, base_url=None, range_url=None, cache_dir=None, sources=None, session=None, store=None):
         # 使用浏览器分析得到的真实数据接口
         # limit=200 保证能获取足够多的近期数据
-        self.base_url = "https://datachart.500.com/sd/history/inc/history.php?limit=200"
+        self.base_url = base_url or "https://datachart.500.com/sd/history/inc/history.php?limit=200"
+        # 按期号范围查询（用于回填）
+        self.range_url = range_url or "https://datachart.500.com/sd/history/inc/history.php?start={start}&end={end}"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
             'Referer': 'https://datachart.500.com/sd/history/history.shtml'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # 可传入共享的 Session（如一体化流水线中两个抓取器共用一个连接池），请求头随每次请求发送
+        self.session = session or create_session(self.headers)
+        # 原始响应缓存（None 表示不缓存，每次完整下载）
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        # 增量同步使用的数据源（名称或镜像地址，见 draw_sources.build_sources）；
+        # None 表示只请求 range_url 这一个地址
+        self.sources = build_sources("fc3d", sources, self) if sources else None
+        # 最近一次合并中被新数据覆盖的冲突期号
+        self.merge_conflicts = []
+        # SQLite 存储（lottery_db.LotteryDB），None 表示直接读写 JSON 文件
+        self.store = store
+        # 本次运行中内容有变化、实际写入的文件
+        self.written_files = []
+
+    def fetch_text_if_changed(self, url, retry=3, rate_limiter=None, defer=False):
+        """获取网页文本，返回 (文本或 None, 与上次缓存相比是否变化)"""
+        print(f"正在获取福彩3D数据... ({url})")
+        body, changed = fetch_with_cache(self.session, url, self.cache, retry=retry, timeout=15,
+                                         rate_limiter=rate_limiter, headers=self.headers, defer=defer)
+        if body is None:
+            return None, False
+        # 500彩票网通常使用 gb2312 编码
+        return body.decode('gb2312', errors='replace'), changed
+
+    def commit_cache(self, saved=True):
+        """数据保存成功后写入暂存的响应缓存；保存失败时丢弃，下次运行仍视为页面有变化。返回 saved"""
+        if self.cache is not None:
+            if saved:
+                self.cache.commit()
+            else:
+                self.cache.discard()
+        return saved
+
+    def fetch_text(self, url, retry=3, rate_limiter=None, defer=False):
+        """获取网页文本，失败返回 None；defer 见 fetch_text_if_changed"""
+        return self.fetch_text_if_changed(url, retry, rate_limiter, defer)[0]
 
     def fetch_page(self, url, retry=3):
         """获取网页内容"""
-        for attempt in range(retry):
-            try:
-                print(f"正在获取福彩3D数据... (尝试 {attempt + 1}/{retry})")
-                response = self.session.get(url, timeout=15)
-                # 500彩票网通常使用 gb2312 编码
-                response.encoding = 'gb2312'
-
-                if response.status_code == 200:
-                    return BeautifulSoup(response.text, 'html.parser')
-                else:
-                    print(f"HTTP 状态码: {response.status_code}")
-
-            except requests.exceptions.RequestException as e:
-                print(f"请求失败: {e}")
-                if attempt < retry - 1:
-                    time.sleep(2)
-
-        return None
+        text = self.fetch_text(url, retry)
+        return BeautifulSoup(text, 'html.parser') if text is not None else None
 
     @staticmethod
     def calc_type(digits):
         """计算形态: 豹子/组三/组六"""
-        unique = set(digits)
-        if len(unique) == 1:
-            return "豹子"
-        elif len(unique) == 2:
-            return "组三"
-        else:
-            return "组六"
+        return calc_type(digits)
 
     def parse_fc3d_data(self, soup):
         """解析福彩3D 开奖数据 (针对 inc/history.php 结构)"""
@@ -92,74 +132,11 @@ class FC3DDataFetcher:
             print(f"找到 {len(rows)} 行数据，开始解析...")
 
             for row in rows:
-                cols = row.find_all('td')
-
-                # inc/history.php 的列结构通常是：
-                # 0: 期号 (2026044)
-                # 1: 开奖号码 (5 8 9) - 空格分隔
-                # 2: 和值
-                # 3: 跨度
-                # ...
-                # 10: 开奖日期 (2026-02-13) (索引可能因页面变动而不同，倒数第一列通常是日期)
-
-                if len(cols) < 5:
-                    continue
-
                 try:
-                    # 1. 提取期号
-                    period = cols[0].text.strip()
-                    if not period.isdigit() or len(period) != 7:
-                        continue
-
-                    # 2. 提取开奖号码
-                    # 可能是 "5 8 9" 格式，也可能是分开的列
-                    # 在 inc/history.php 中通常是第2列包含所有号码
-                    nums_text = cols[1].text.strip()
-                    if ' ' in nums_text:
-                        # 格式: "5 8 9"
-                        digits = nums_text.split()
-                    else:
-                        # 尝试后续列
-                        d1 = cols[1].text.strip()
-                        d2 = cols[2].text.strip()
-                        d3 = cols[3].text.strip()
-                        digits = [d1, d2, d3]
-
-                    # 验证数字
-                    if len(digits) != 3 or not all(d.isdigit() for d in digits):
-                        continue
-
-                    number = "".join(digits)
-                    
-                    # 3. 计算/提取衍生数据
-                    s = sum(int(d) for d in digits)
-                    span = max(int(d) for d in digits) - min(int(d) for d in digits)
-                    form_type = self.calc_type(digits)
-
-                    # 4. 提取日期
-                    # 尝试最后一列，或者倒数几列中符合日期格式的
-                    date_str = ""
-                    for i in range(len(cols) - 1, max(len(cols) - 5, 3), -1):
-                        txt = cols[i].text.strip()
-                        if '-' in txt and len(txt) >= 8: # 2026-02-13
-                            date_str = txt
-                            break
-                    
-                    if not date_str:
-                         # 如果没找到日期，暂且留空或用当天
-                         date_str = datetime.now().strftime("%Y-%m-%d")
-
-                    lottery_item = {
-                        "period": period,
-                        "digits": digits,
-                        "number": number,
-                        "sum": s,
-                        "span": span,
-                        "type": form_type,
-                        "date": date_str
-                    }
-
-                    data_list.append(lottery_item)
+                    # 列结构与日期查找规则见 history_parser.fc3d_row_item
+                    lottery_item = fc3d_row_item([col.text.strip() for col in row.find_all('td')])
+                    if lottery_item:
+                        data_list.append(lottery_item)
 
                 except Exception as e:
                     # 仅在调试时取消注释，以免刷屏
@@ -173,8 +150,24 @@ class FC3DDataFetcher:
 
         return data_list
 
+    def parse_html(self, html):
+        """解析网页文本：优先快速路径，页面结构不符合预期时回退到 BeautifulSoup"""
+        data_list = parse_fc3d_fast(html)
+        if data_list is not None:
+            print(f"成功解析 {len(data_list)} 期福彩3D数据（快速解析）")
+            return data_list
+        return self.parse_fc3d_data(BeautifulSoup(html, 'html.parser'))
+
     def merge_with_existing_data(self, new_data, existing_file):
-        """合并新数据和现有数据，去重"""
+        """合并新数据和现有数据，去重（现有数据按期号降序，逐条有序插入）"""
+        if self.store is not None:
+            # 数据库模式：只写入新记录，合并结果按期号降序从数据库读出
+            new_count, self.merge_conflicts = self.store.upsert_draws("fc3d", new_data)
+            report_conflicts(self.merge_conflicts)
+            merged_data = self.store.load_draws("fc3d")
+            print(f"合并完成: 新增 {new_count} 期, 总计 {len(merged_data)} 期")
+            return merged_data
+
         existing_data = []
 
         if os.path.exists(existing_file):
@@ -186,19 +179,8 @@ class FC3DDataFetcher:
             except Exception as e:
                 print(f"加载现有数据时出错: {e}")
 
-        data_dict = {}
-
-        for item in existing_data:
-            data_dict[item['period']] = item
-
-        new_count = 0
-        for item in new_data:
-            if item['period'] not in data_dict:
-                new_count += 1
-            data_dict[item['period']] = item
-
-        merged_data = list(data_dict.values())
-        merged_data.sort(key=lambda x: x['period'], reverse=True)
+        merged_data, new_count, self.merge_conflicts = merge_sorted(existing_data, new_data)
+        report_conflicts(self.merge_conflicts)
 
         print(f"合并完成: 新增 {new_count} 期, 总计 {len(merged_data)} 期")
 
@@ -264,42 +246,289 @@ class FC3DDataFetcher:
         return formatted
 
     def save_to_json(self, data, output_file):
-        """保存数据"""
+        """
+        保存数据
+
+        Returns:
+            是否保存成功（内容没有变化、无需写入也算成功）
+        """
         try:
-            merged_data = self.merge_with_existing_data(data, output_file)
-            formatted_data = self.format_for_web(merged_data)
-            
             # 确保目录存在
             os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(formatted_data, f, ensure_ascii=False, indent=2)
+            # 持有数据文件的锁完成读取、合并与写入，同时运行的抓取不会互相覆盖
+            with file_lock(output_file):
+                merged_data = self.merge_with_existing_data(data, output_file)
+                formatted_data = self.format_for_web(merged_data)
+                if self.store is not None:
+                    self.store.set_history_document("fc3d", formatted_data)
+
+                # 只有 last_updated 不同时不改写，避免无意义的提交与重新部署
+                written = write_json_if_changed(output_file, formatted_data)
+                if self.store is not None:
+                    # 记录与数据库一致的版本，下次打开数据库时不会当作外部修改重新导入
+                    self.store.record_file(output_file)
+                if not written:
+                    print(f"\nℹ️  数据内容没有变化，跳过写入: {output_file}")
+                    return True
+            self.written_files.append(output_file)
 
             print(f"\n数据已成功保存到 {output_file}")
             print(f"共保存 {len(merged_data)} 期数据")
+            return True
 
         except Exception as e:
             print(f"保存文件时出错: {e}")
+            return False
 
-    def fetch_and_save(self):
+    @staticmethod
+    def build_backfill_pages(first_year=FIRST_YEAR, last_year=None):
+        """按年份拆分期号范围，从最新年份往回排列，如 [("2026001", "2026366"), ...]"""
+        last_year = last_year or datetime.now().year
+        return [(f"{year}001", f"{year}{MAX_PERIODS_PER_YEAR:03d}")
+                for year in range(last_year, first_year - 1, -1)]
+
+    def backfill(self, output_file=DEFAULT_OUTPUT_FILE, first_year=FIRST_YEAR, last_year=None,
+                 workers=4, rate=2.0, checkpoint_dir=BACKFILL_CHECKPOINT_DIR, restart=False):
+        """
+        可断点续传的全量回填
+
+        每完成一页即把解析结果写入 checkpoint_dir/<start>-<end>.json；重新运行时跳过
+        已有检查点的页面。所有页面完成后一次性合并写入 output_file 并清除检查点；
+        有页面失败时保留检查点、不写入 output_file，下次运行从失败处继续。
+
+        Returns:
+            是否全部完成并写入
+        """
+        print("=" * 50)
+        print("福彩3D 历史开奖数据全量回填")
+        print("=" * 50)
+
+        if restart and os.path.isdir(checkpoint_dir):
+            shutil.rmtree(checkpoint_dir)
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        def checkpoint_path(page):
+            return os.path.join(checkpoint_dir, f"{page[0]}-{page[1]}.json")
+
+        pages = self.build_backfill_pages(first_year, last_year)
+        pending = [page for page in pages if not os.path.exists(checkpoint_path(page))]
+        print(f"共 {len(pages)} 页，已完成 {len(pages) - len(pending)} 页，待抓取 {len(pending)} 页")
+
+        ensure_pool_size(self.session, max(workers, 1))
+        limiter = RateLimiter(rate)
+        start_time = time.perf_counter()
+
+        def fetch_page_rows(page):
+            text = self.fetch_text(self.range_url.format(start=page[0], end=page[1]), rate_limiter=limiter)
+            if text is None:
+                return None
+            return self.parse_html(text)
+
+        failed = []
+        fetched_rows = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fetch_page_rows, page): page for page in pending}
+            for future in as_completed(futures):
+                page = futures[future]
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    print(f"⚠️  页面 {page[0]}-{page[1]} 处理出错: {e}")
+                    rows = None
+                if rows is None:
+                    failed.append(page)
+                    continue
+                # 先写临时文件再改名，进程中途被杀也不会留下半个检查点
+                tmp_path = checkpoint_path(page) + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(rows, f, ensure_ascii=False)
+                os.replace(tmp_path, checkpoint_path(page))
+                fetched_rows += len(rows)
+
+        elapsed = time.perf_counter() - start_time
+        rate_info = f", {fetched_rows / elapsed:.0f} 期/秒" if elapsed > 0 and fetched_rows else ""
+        print(f"\n本次抓取 {len(pending) - len(failed)}/{len(pending)} 页, {fetched_rows} 期, 耗时 {elapsed:.2f}s{rate_info}")
+
+        if failed:
+            print(f"⚠️  {len(failed)} 页失败: {', '.join(f'{s}-{e}' for s, e in sorted(failed))}")
+            print(f"检查点已保存在 {checkpoint_dir}，重新运行 --backfill 即可继续")
+            return False
+
+        all_rows = []
+        for page in pages:
+            with open(checkpoint_path(page), 'r', encoding='utf-8') as f:
+                all_rows.extend(json.load(f))
+
+        if not all_rows:
+            print("未能解析到任何数据")
+            return False
+
+        if not self.save_to_json(all_rows, output_file):
+            # 写入失败时保留检查点，重新运行 --backfill 直接从检查点合并
+            print(f"检查点已保存在 {checkpoint_dir}，重新运行 --backfill 即可重试写入")
+            return False
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        return True
+
+    @staticmethod
+    def read_latest_period(filename):
+        """
+        读取本地数据的最新期号
+
+        data 数组按期号降序保存，第一条记录即最新一期，只需读取文件开头。
+
+        Returns:
+            最新期号字符串，文件不存在或为空时返回 None
+        """
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'r', encoding='utf-8') as f:
+            head = f.read(4096)
+        match = re.search(r'"period":\s*"(\d{7})"', head)
+        return match.group(1) if match else None
+
+    def local_latest_period(self, filename):
+        """本地最新期号：数据库模式下查询数据库，否则读取文件开头"""
+        if self.store is not None:
+            return self.store.latest_period("fc3d")
+        return self.read_latest_period(filename)
+
+    @staticmethod
+    def delta_range(latest_period):
+        """latest_period 之后的最小期号范围 (start, end)，end 覆盖到下一年以包含跨年"""
+        return str(int(latest_period) + 1), f"{int(latest_period[:4]) + 1}{MAX_PERIODS_PER_YEAR:03d}"
+
+    def build_delta_url(self, latest_period):
+        """构造只覆盖 latest_period 之后期号的最小查询范围（含跨年）"""
+        start, end = self.delta_range(latest_period)
+        return self.range_url.format(start=start, end=end)
+
+    def sync_from_sources(self, output_file, latest_period):
+        """
+        多数据源增量同步
+
+        查询范围从本地最新一期开始（多请求一期），每个数据源的结果都必须与本地这一期
+        完全一致，借此发现页面结构变化或数据错误的数据源。
+
+        Returns:
+            新增期数（0 表示无新数据），全部数据源失败返回 None
+        """
+        if self.store is not None:
+            reference = {latest_period: self.store.find_draw("fc3d", latest_period)}
+        else:
+            with open(output_file, 'r', encoding='utf-8') as f:
+                reference = {item['period']: item for item in json.load(f).get('data', [])
+                             if item['period'] == latest_period}
+
+        _, end = self.delta_range(latest_period)
+        # 500 彩票网类数据源的新页面先暂存，数据保存成功（或确认没有新数据）后才写入响应缓存
+        rows, _ = race_sources(self.sources, latest_period, end, reference)
+        if rows is None:
+            print("所有数据源均未返回可用结果，请稍后重试")
+            self.commit_cache(False)
+            return None
+
+        new_data = sorted((item for item in rows if item['period'] > latest_period),
+                          key=lambda x: x['period'], reverse=True)
+        if not new_data:
+            print("ℹ️  没有新的开奖数据，跳过写入")
+            self.commit_cache()
+            return 0
+
+        for item in new_data:
+            print(f"新开奖 期号: {item['period']} | 号码: {item['number']} | 形态: {item['type']} | 日期: {item['date']}")
+
+        if not self.commit_cache(self.save_to_json(new_data, output_file)):
+            return None
+        return len(new_data)
+
+    @staticmethod
+    def has_newer_period(text, latest_period):
+        """粗略检查页面中是否存在比 latest_period 更新的期号单元格"""
+        return any(cell > latest_period for cell in re.findall(r'>\s*(\d{7})\s*<', text))
+
+    def delta_sync(self, output_file=DEFAULT_OUTPUT_FILE):
+        """
+        增量同步
+
+        读取本地最新期号，只请求其后的期号范围；没有新开奖时直接返回，
+        不做解析、合并和写入。本地没有数据时退回完整抓取。
+        配置了数据源列表时改为并发竞速，见 sync_from_sources。
+
+        Returns:
+            新增期数（0 表示无新数据），失败返回 None
+        """
+        print("=" * 50)
+        print("福彩3D 开奖数据增量同步")
+        print("=" * 50)
+
+        latest_period = self.local_latest_period(output_file)
+        if not latest_period:
+            print("本地没有数据，改为完整抓取")
+            if not self.fetch_and_save(output_file):
+                return None
+            if self.store is not None:
+                return self.store.count_draws("fc3d")
+            with open(output_file, 'r', encoding='utf-8') as f:
+                return len(json.load(f).get('data', []))
+
+        print(f"本地最新期号: {latest_period}")
+        if self.sources:
+            return self.sync_from_sources(output_file, latest_period)
+
+        # 新页面先暂存，数据保存成功（或确认没有新数据）后才写入响应缓存
+        text, changed = self.fetch_text_if_changed(self.build_delta_url(latest_period), defer=True)
+        if text is None:
+            print("获取网页失败，请检查网络连接或稍后重试")
+            return None
+        if not changed:
+            print("ℹ️  页面自上次获取后未变化，跳过解析与写入")
+            return 0
+
+        # 页面中没有任何更新的期号时，跳过解析与合并
+        if not self.has_newer_period(text, latest_period):
+            print("ℹ️  没有新的开奖数据，跳过解析与写入")
+            self.commit_cache()
+            return 0
+
+        new_data = [item for item in self.parse_html(text)
+                    if item['period'] > latest_period]
+        if not new_data:
+            print("ℹ️  没有新的开奖数据，跳过写入")
+            self.commit_cache()
+            return 0
+
+        for item in new_data:
+            print(f"新开奖 期号: {item['period']} | 号码: {item['number']} | 形态: {item['type']} | 日期: {item['date']}")
+
+        if not self.commit_cache(self.save_to_json(new_data, output_file)):
+            return None
+        return len(new_data)
+
+    def fetch_and_save(self, output_file=DEFAULT_OUTPUT_FILE):
         """获取并保存数据的主函数"""
         print("=" * 50)
         print("福彩3D 历史开奖数据获取工具")
         print("=" * 50)
 
         # 获取网页
-        soup = self.fetch_page(self.base_url)
+        text, changed = self.fetch_text_if_changed(self.base_url, defer=True)
 
-        if not soup:
+        if text is None:
             print("获取网页失败，请检查网络连接或稍后重试")
             return False
 
+        if not changed and os.path.exists(output_file):
+            print("ℹ️  页面自上次获取后未变化，跳过解析与写入")
+            return True
+
         # 解析数据
-        fc3d_data = self.parse_fc3d_data(soup)
+        fc3d_data = self.parse_html(text)
 
         if not fc3d_data:
             print("未能解析到任何数据")
-            return False
+            return self.commit_cache(False)
 
         # 显示最新几期数据
         print("\n最新 5 期数据预览：")
@@ -308,23 +537,46 @@ class FC3DDataFetcher:
             print(f"期号: {item['period']} | 号码: {item['number']} | 和值: {item['sum']} | 跨度: {item['span']} | 形态: {item['type']} | 日期: {item['date']}")
 
         # 保存到 data/fc3d_history.json
-        script_dir = os.path.dirname(os.path.abspath(__file__))
         # 注意：脚本在 fetch_history/ 目录下，数据在 ../data/
-        output_file = os.path.join(script_dir, '..', 'data', 'fc3d_history.json')
-        output_file = os.path.abspath(output_file)
-
-        self.save_to_json(fc3d_data, output_file)
-
-        return True
+        # 保存成功后才写入响应缓存
+        return self.commit_cache(self.save_to_json(fc3d_data, output_file))
 
 
 def main():
     """主函数"""
-    fetcher = FC3DDataFetcher()
-    success = fetcher.fetch_and_save()
+    parser = argparse.ArgumentParser(description="福彩3D 历史开奖数据获取工具")
+    parser.add_argument("--backfill", action="store_true", help="回填全部历史开奖数据（支持断点续传）")
+    parser.add_argument("--since", type=int, default=FIRST_YEAR, help="回填起始年份")
+    parser.add_argument("--workers", type=int, default=4, help="回填并发抓取线程数")
+    parser.add_argument("--rate", type=float, default=2.0, help="回填时每秒最多请求数")
+    parser.add_argument("--restart", action="store_true", help="丢弃已有检查点重新回填")
+    parser.add_argument("--delta", action="store_true", help="增量同步：只获取本地最新期号之后的数据")
+    parser.add_argument("--cache-dir", default=HTTP_CACHE_DIR, help="原始响应缓存目录")
+    parser.add_argument("--no-cache", action="store_true", help="不使用响应缓存，每次完整下载")
+    parser.add_argument("--source", action="append", dest="sources",
+                        help=f"增量同步的数据源，可重复指定：{'/'.join(BUILTIN_SOURCES)} 或镜像地址"
+                             "（含 {start} 与 {end}）；指定后改为多数据源并发竞速，默认只请求 500 彩票网的增量页面")
+    parser.add_argument("--db", default=os.environ.get("LOTTERY_DB"),
+                        help="使用 SQLite 存储（默认读取环境变量 LOTTERY_DB，未设置时直接读写 JSON 文件）")
+    parser.add_argument("--exit-code", action="store_true",
+                        help=f"数据文件没有任何变化时以退出码 {EXIT_UNCHANGED} 退出，便于 CI 跳过提交与部署")
+    args = parser.parse_args()
+
+    fetcher = FC3DDataFetcher(cache_dir=None if args.no_cache else args.cache_dir,
+                              sources=args.sources,
+                              store=open_store(args.db))
+    if args.backfill:
+        success = fetcher.backfill(first_year=args.since, workers=args.workers, rate=args.rate, restart=args.restart)
+    elif args.delta:
+        success = fetcher.delta_sync() is not None
+    else:
+        success = fetcher.fetch_and_save()
 
     if success:
         print("\n✓ 福彩3D 数据获取完成！")
+        if args.exit_code and not fetcher.written_files:
+            print("ℹ️  数据文件没有变化")
+            sys.exit(EXIT_UNCHANGED)
     else:
         print("\n✗ 福彩3D 数据获取失败")
         sys.exit(1)
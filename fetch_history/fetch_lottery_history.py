@@ -8,35 +8,123 @@
 2. 支持指定爬取期数范围
 3. 自动保存为 JSON 格式，方便后续使用
 4. 包含错误处理和重试机制
+5. 支持全量回填：按年份拆分期号范围并发抓取、并行解析，最后一次性合并
+6. 支持增量同步：只请求本地最新期号之后的期号，没有新数据时不解析、不写文件
+7. 支持条件请求与原始响应缓存：页面未变化（304 或内容哈希一致）时跳过下载与解析
+8. 支持多数据源（500 彩票网、福彩官网、镜像站）：增量同步时并发请求，采用最先返回且校验通过的结果
 
 使用方法：
     python3 fetch_lottery_history.py
+    python3 fetch_lottery_history.py --backfill              # 回填 2003 年至今的全部开奖数据
+    python3 fetch_lottery_history.py --backfill --since 2020 --workers 4 --rate 2
+    python3 fetch_lottery_history.py --delta                 # 增量同步
+    python3 fetch_lottery_history.py --delta --no-cache      # 不使用响应缓存
     
 输出：
-    lottery_data.json - 包含所有开奖数据的 JSON 文件
+    lottery_data.json - 双色球开奖主数据（唯一数据源），
+                        ../data/lottery_history.json 等派生文件由它生成（见 build_artifacts.py）
 """
 
-import requests
 from bs4 import BeautifulSoup
+import argparse
 import json
+import re
 import time
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta
 
+from http_utils import create_session, ensure_pool_size, RateLimiter, ResponseCache, fetch_with_cache
+from draw_sources import BUILTIN_SOURCES, build_sources, race_sources
+from draw_merge import merge_sorted, report_conflicts
+from lottery_db import open_store
+from json_io import EXIT_UNCHANGED, atomic_write_json, file_lock, json_unchanged, write_json_if_changed
+from snapshot_store import snapshot_file
+from history_parser import ssq_row_item, parse_ssq_fast
+
+# 双色球从 2003 年开始发行，每年期数不超过 200
+FIRST_YEAR = 2003
+MAX_PERIODS_PER_YEAR = 200
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HTTP_CACHE_DIR = os.path.join(SCRIPT_DIR, '.http_cache')
+
 
 class LotteryDataFetcher:
     """双色球数据获取器"""
     
-    def __init__(self):
-        self.base_url = "https://datachart.500.com/ssq/history/history.shtml"
+    def __init__(self, base_url=None, range_url=None, cache_dir=None, sources=None, session=None, store=None):
+        self.base_url = base_url or "https://datachart.500.com/ssq/history/history.shtml"
+        # 按期号范围查询的接口（用于回填）
+        self.range_url = range_url or "https://datachart.500.com/ssq/history/newinc/history.php?start={start}&end={end}"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # 可传入共享的 Session（如一体化流水线中两个抓取器共用一个连接池），请求头随每次请求发送
+        self.session = session or create_session(self.headers)
+        # 原始响应缓存（None 表示不缓存，每次完整下载）
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        # 增量同步使用的数据源（名称或镜像地址，见 draw_sources.build_sources）；
+        # None 表示只请求 range_url 这一个地址
+        self.sources = build_sources("ssq", sources, self) if sources else None
+        # 最近一次合并中被新数据覆盖的冲突期号
+        self.merge_conflicts = []
+        # SQLite 存储（lottery_db.LotteryDB），None 表示直接读写 JSON 文件
+        self.store = store
+        # 本次运行中内容有变化、实际写入的文件
+        self.written_files = []
+    
+    def fetch_text_if_changed(self, url, retry=3, rate_limiter=None, defer=False):
+        """
+        获取网页文本，并报告与上次缓存相比是否变化
+        
+        Args:
+            url: 目标 URL
+            retry: 重试次数（网络异常与 429/5xx 按指数退避重试）
+            rate_limiter: 可选的 RateLimiter，每次请求前等待
+            defer: 新内容只暂存到响应缓存，保存数据后由 commit_cache 写入
+            
+        Returns:
+            (网页文本或 None, 是否变化)
+        """
+        print(f"正在获取数据... ({url})")
+        body, changed = fetch_with_cache(self.session, url, self.cache, retry=retry, timeout=10,
+                                         rate_limiter=rate_limiter, headers=self.headers, defer=defer)
+        if body is None:
+            return None, False
+        # 500彩票网使用 gb2312 编码
+        return body.decode('gb2312', errors='replace'), changed
+    
+    def commit_cache(self, saved=True):
+        """
+        数据保存成功后写入暂存的响应缓存；保存失败时丢弃，下次运行仍视为页面有变化
+
+        Returns:
+            saved
+        """
+        if self.cache is not None:
+            if saved:
+                self.cache.commit()
+            else:
+                self.cache.discard()
+        return saved
+
+    def fetch_text(self, url, retry=3, rate_limiter=None, defer=False):
+        """
+        获取网页文本
+        
+        Args:
+            url: 目标 URL
+            retry: 重试次数
+            rate_limiter: 可选的 RateLimiter，每次请求前等待
+            defer: 新内容只暂存到响应缓存，保存数据后由 commit_cache 写入
+            
+        Returns:
+            网页文本或 None
+        """
+        return self.fetch_text_if_changed(url, retry, rate_limiter, defer)[0]
     
     def fetch_page(self, url, retry=3):
         """
@@ -49,25 +137,11 @@ class LotteryDataFetcher:
         Returns:
             BeautifulSoup 对象或 None
         """
-        for attempt in range(retry):
-            try:
-                print(f"正在获取数据... (尝试 {attempt + 1}/{retry})")
-                response = self.session.get(url, timeout=10)
-                response.encoding = 'gb2312'  # 500彩票网使用 gb2312 编码
-                
-                if response.status_code == 200:
-                    return BeautifulSoup(response.text, 'html.parser')
-                else:
-                    print(f"HTTP 状态码: {response.status_code}")
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"请求失败: {e}")
-                if attempt < retry - 1:
-                    time.sleep(2)
-                    
-        return None
+        text = self.fetch_text(url, retry)
+        return BeautifulSoup(text, 'html.parser') if text is not None else None
     
-    def parse_lottery_data(self, soup):
+    @staticmethod
+    def parse_lottery_data(soup):
         """
         解析开奖数据
         
@@ -96,34 +170,10 @@ class LotteryDataFetcher:
                 return data_list
             
             for row in rows:
-                cols = row.find_all('td')
-                
-                # 确保列数足够
-                if len(cols) < 9:
-                    continue
-                
                 try:
-                    # 提取期号
-                    period = cols[0].text.strip()
-                    
-                    # 提取红球（6个）
-                    red_balls = [cols[i].text.strip() for i in range(1, 7)]
-                    
-                    # 提取蓝球
-                    blue_ball = cols[7].text.strip()
-                    
-                    # 提取开奖日期（如果有）
-                    date = cols[-1].text.strip() if len(cols) > 8 else ""
-                    
-                    # 构建数据对象
-                    lottery_item = {
-                        "period": period,
-                        "red_balls": red_balls,
-                        "blue_ball": blue_ball,
-                        "date": date
-                    }
-                    
-                    data_list.append(lottery_item)
+                    lottery_item = ssq_row_item([col.text.strip() for col in row.find_all('td')])
+                    if lottery_item:
+                        data_list.append(lottery_item)
                     
                 except Exception as e:
                     print(f"解析行数据时出错: {e}")
@@ -136,6 +186,19 @@ class LotteryDataFetcher:
         
         return data_list
     
+    @staticmethod
+    def parse_html(html):
+        """
+        解析开奖数据网页文本
+        
+        优先使用不构建 DOM 树的快速路径，页面结构不符合预期时回退到 BeautifulSoup。
+        """
+        data_list = parse_ssq_fast(html)
+        if data_list is not None:
+            print(f"成功解析 {len(data_list)} 期数据（快速解析）")
+            return data_list
+        return LotteryDataFetcher.parse_lottery_data(BeautifulSoup(html, 'html.parser'))
+    
     def merge_with_existing_data(self, new_data, existing_file):
         """
         合并新数据和现有数据，去重并保留所有历史记录
@@ -145,8 +208,16 @@ class LotteryDataFetcher:
             existing_file: 现有数据文件路径
 
         Returns:
-            合并后的数据列表
+            合并后的数据列表（冲突期号记录在 self.merge_conflicts）
         """
+        if self.store is not None:
+            # 数据库模式：只写入新记录，合并结果按期号降序从数据库读出
+            new_count, self.merge_conflicts = self.store.upsert_draws("ssq", new_data)
+            report_conflicts(self.merge_conflicts)
+            merged_data = self.store.load_draws("ssq")
+            print(f"合并完成: 新增 {new_count} 期, 总计 {len(merged_data)} 期")
+            return merged_data
+
         existing_data = []
 
         # 如果文件存在，加载现有数据
@@ -158,23 +229,9 @@ class LotteryDataFetcher:
             except Exception as e:
                 print(f"加载现有数据时出错: {e}")
 
-        # 使用期号作为键来去重
-        data_dict = {}
-
-        # 先加载现有数据
-        for item in existing_data:
-            data_dict[item['period']] = item
-
-        # 合并新数据（新数据会覆盖同期号的旧数据）
-        new_count = 0
-        for item in new_data:
-            if item['period'] not in data_dict:
-                new_count += 1
-            data_dict[item['period']] = item
-
-        # 转换回列表并按期号降序排序
-        merged_data = list(data_dict.values())
-        merged_data.sort(key=lambda x: x['period'], reverse=True)
+        # 现有数据按期号降序保存，逐条有序插入（新数据覆盖同期号的旧数据）
+        merged_data, new_count, self.merge_conflicts = merge_sorted(existing_data, new_data)
+        report_conflicts(self.merge_conflicts)
 
         print(f"合并完成: 新增 {new_count} 期, 总计 {len(merged_data)} 期")
 
@@ -182,22 +239,19 @@ class LotteryDataFetcher:
 
     def backup_existing_file(self, filename):
         """
-        备份现有文件
+        备份现有文件（保存为同目录 .snapshots/ 中的快照，相同内容只存一份）
 
         Args:
             filename: 要备份的文件名
+
+        Returns:
+            快照 id，文件不存在或备份失败时返回 None
         """
         if os.path.exists(filename):
-            # 生成带时间戳的备份文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = filename.replace('.json', f'_backup_{timestamp}.json')
-
             try:
-                # 复制文件
-                import shutil
-                shutil.copy2(filename, backup_name)
-                print(f"已创建备份文件: {backup_name}")
-                return backup_name
+                entry = snapshot_file(filename)
+                print(f"已创建快照: {entry['id']}")
+                return entry["id"]
             except Exception as e:
                 print(f"创建备份时出错: {e}")
                 return None
@@ -278,6 +332,37 @@ class LotteryDataFetcher:
 
         return formatted
 
+    @staticmethod
+    def web_file_path(filename):
+        """主数据文件对应的网页数据文件（../data/lottery_history.json）"""
+        return os.path.join(os.path.dirname(os.path.abspath(filename)), '..', 'data', 'lottery_history.json')
+
+    def export_web_file(self, merged_data, filename="lottery_data.json"):
+        """
+        由主数据（fetch_history/lottery_data.json 的内容）生成网页数据文件
+
+        抓取后保存与 build_artifacts.py 重新生成都走这里，两者的输出完全一致。
+
+        Returns:
+            是否写入了文件
+        """
+        web_data_path = self.web_file_path(filename)
+        formatted_data = self.format_for_web(merged_data)
+        if self.store is not None:
+            self.store.set_history_document("ssq", formatted_data)
+
+        # 只有 last_updated 不同时不改写，避免无意义的提交与重新部署
+        written = write_json_if_changed(web_data_path, formatted_data)
+        if self.store is not None:
+            # 记录与数据库一致的版本，下次打开数据库时不会当作外部修改重新导入
+            self.store.record_file(web_data_path)
+        if not written:
+            print(f"ℹ️  网页数据没有变化，跳过写入: {web_data_path}")
+            return False
+        self.written_files.append(web_data_path)
+        print(f"✓ 已同步到网页数据文件: {web_data_path}")
+        return True
+
     def save_to_json(self, data, filename="lottery_data.json", preserve_history=True):
         """
         保存数据到 JSON 文件
@@ -286,41 +371,263 @@ class LotteryDataFetcher:
             data: 要保存的数据
             filename: 文件名
             preserve_history: 是否保留历史数据（合并模式）
+
+        Returns:
+            主数据是否保存成功（内容没有变化、无需写入也算成功）
         """
         try:
-            if preserve_history:
-                # 备份现有文件
-                self.backup_existing_file(filename)
+            # 持有主数据文件的锁完成读取、合并与写入，同时运行的抓取不会互相覆盖
+            with file_lock(filename):
+                if preserve_history:
+                    # 合并数据
+                    merged_data = self.merge_with_existing_data(data, filename)
+
+                    if json_unchanged(filename, merged_data):
+                        print(f"\nℹ️  数据内容没有变化，跳过备份与写入: {filename}")
+                    else:
+                        # 备份现有文件
+                        self.backup_existing_file(filename)
+
+                        # 保存合并后的数据
+                        atomic_write_json(filename, merged_data)
+                        self.written_files.append(filename)
+                        print(f"\n数据已成功保存到 {filename}")
+                        print(f"共保存 {len(merged_data)} 期数据")
+
+                    # 同时更新到 ../data/lottery_history.json
+                    try:
+                        self.export_web_file(merged_data, filename)
+                    except Exception as e:
+                        print(f"⚠️  同步到网页数据失败: {e}")
 
-                # 合并数据
-                merged_data = self.merge_with_existing_data(data, filename)
+                else:
+                    # 直接保存新数据
+                    if not write_json_if_changed(filename, data):
+                        print(f"\nℹ️  数据内容没有变化，跳过写入: {filename}")
+                        return True
+                    self.written_files.append(filename)
+                    print(f"\n数据已成功保存到 {filename}")
+                    print(f"共保存 {len(data)} 期数据")
+            return True
+        except Exception as e:
+            print(f"保存文件时出错: {e}")
+            return False
+    
+    @staticmethod
+    def build_backfill_ranges(first_year=FIRST_YEAR, last_year=None):
+        """
+        按年份拆分期号范围
 
-                # 保存合并后的数据
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(merged_data, f, ensure_ascii=False, indent=2)
-                print(f"\n数据已成功保存到 {filename}")
-                print(f"共保存 {len(merged_data)} 期数据")
+        Returns:
+            [(start, end), ...]，如 ("03001", "03200")
+        """
+        last_year = last_year or datetime.now().year
+        return [(f"{year % 100:02d}001", f"{year % 100:02d}{MAX_PERIODS_PER_YEAR:03d}")
+                for year in range(first_year, last_year + 1)]
 
-                # 同时更新到 ../data/lottery_history.json
-                try:
-                    web_data_path = os.path.join(os.path.dirname(filename), '..', 'data', 'lottery_history.json')
-                    formatted_data = self.format_for_web(merged_data)
+    def backfill(self, output_file="lottery_data.json", first_year=FIRST_YEAR, last_year=None,
+                 workers=8, rate=4.0, parse_workers=None):
+        """
+        全量回填历史开奖数据
 
-                    with open(web_data_path, 'w', encoding='utf-8') as f:
-                        json.dump(formatted_data, f, ensure_ascii=False, indent=2)
-                    print(f"✓ 已同步到网页数据文件: {web_data_path}")
-                except Exception as e:
-                    print(f"⚠️  同步到网页数据失败: {e}")
+        各年份范围通过共享连接池并发抓取（受 rate 次/秒的礼貌限速约束），
+        网页在进程池中并行解析，全部完成后一次性合并写入。
+
+        Args:
+            output_file: 输出文件名（同时同步 ../data/lottery_history.json）
+            first_year / last_year: 回填的年份范围
+            workers: 并发抓取线程数
+            rate: 每秒最多发起的请求数
+            parse_workers: 解析进程数（默认与 CPU 核数相同）
+
+        Returns:
+            是否成功
+        """
+        print("=" * 50)
+        print("双色球历史开奖数据全量回填")
+        print("=" * 50)
+
+        ranges = self.build_backfill_ranges(first_year, last_year)
+        ensure_pool_size(self.session, max(workers, 1))
+        limiter = RateLimiter(rate)
+        start_time = time.perf_counter()
+
+        def fetch_range(period_range):
+            start, end = period_range
+            return self.fetch_text(self.range_url.format(start=start, end=end), rate_limiter=limiter)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pages = list(pool.map(fetch_range, ranges))
+
+        failed = [r for r, page in zip(ranges, pages) if page is None]
+        pages = [page for page in pages if page is not None]
+        fetch_elapsed = time.perf_counter() - start_time
+        print(f"\n抓取完成: {len(pages)}/{len(ranges)} 个范围, 耗时 {fetch_elapsed:.2f}s")
+        if failed:
+            print(f"⚠️  以下范围抓取失败: {', '.join(f'{s}-{e}' for s, e in failed)}")
+
+        try:
+            with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+                parsed = list(pool.map(parse_history_html, pages))
+        except (OSError, NotImplementedError) as e:
+            # 受限环境无法创建子进程时退回串行解析
+            print(f"⚠️  无法启用并行解析，改为串行: {e}")
+            parsed = [parse_history_html(page) for page in pages]
+
+        all_rows = {}
+        for rows in parsed:
+            for item in rows:
+                all_rows[item['period']] = item
+        lottery_data = sorted(all_rows.values(), key=lambda x: x['period'], reverse=True)
+        print(f"解析完成: 共 {len(lottery_data)} 期, 总耗时 {time.perf_counter() - start_time:.2f}s")
+
+        if not lottery_data:
+            print("未能解析到任何数据")
+            return False
+
+        if not self.save_to_json(lottery_data, output_file, preserve_history=True):
+            return False
+        return not failed
+
+    @staticmethod
+    def read_latest_period(filename):
+        """
+        读取本地数据的最新期号
+
+        数据按期号降序保存，第一条记录即最新一期，只需读取文件开头。
+
+        Returns:
+            最新期号字符串，文件不存在或为空时返回 None
+        """
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'r', encoding='utf-8') as f:
+            head = f.read(4096)
+        match = re.search(r'"period":\s*"(\d+)"', head)
+        return match.group(1) if match else None
+
+    def local_latest_period(self, filename):
+        """本地最新期号：数据库模式下查询数据库，否则读取文件开头"""
+        if self.store is not None:
+            return self.store.latest_period("ssq")
+        return self.read_latest_period(filename)
+
+    @staticmethod
+    def delta_range(latest_period):
+        """latest_period 之后的最小期号范围 (start, end)，end 覆盖到下一年以包含跨年"""
+        start = str(int(latest_period) + 1).zfill(len(latest_period))
+        next_year = (int(latest_period[:2]) + 1) % 100
+        return start, f"{next_year:02d}{MAX_PERIODS_PER_YEAR:03d}"
+
+    def build_delta_url(self, latest_period):
+        """构造只覆盖 latest_period 之后期号的最小查询范围（含跨年）"""
+        start, end = self.delta_range(latest_period)
+        return self.range_url.format(start=start, end=end)
+
+    def sync_from_sources(self, output_file, latest_period):
+        """
+        多数据源增量同步
+
+        查询范围从本地最新一期开始（多请求一期），每个数据源的结果都必须与本地这一期
+        完全一致，借此发现页面结构变化或数据错误的数据源。
+
+        Returns:
+            新增期数（0 表示无新数据），全部数据源失败返回 None
+        """
+        if self.store is not None:
+            reference = {latest_period: self.store.find_draw("ssq", latest_period)}
+        else:
+            with open(output_file, 'r', encoding='utf-8') as f:
+                reference = {item['period']: item for item in json.load(f) if item['period'] == latest_period}
+
+        _, end = self.delta_range(latest_period)
+        # 500 彩票网类数据源的新页面先暂存，数据保存成功（或确认没有新数据）后才写入响应缓存
+        rows, _ = race_sources(self.sources, latest_period, end, reference)
+        if rows is None:
+            print("所有数据源均未返回可用结果，请稍后重试")
+            self.commit_cache(False)
+            return None
+
+        new_data = sorted((item for item in rows if item['period'] > latest_period),
+                          key=lambda x: x['period'], reverse=True)
+        if not new_data:
+            print("ℹ️  没有新的开奖数据，跳过写入")
+            self.commit_cache()
+            return 0
+
+        for item in new_data:
+            red_str = " ".join(item['red_balls'])
+            print(f"新开奖 期号: {item['period']} | 红球: {red_str} | 蓝球: {item['blue_ball']} | 日期: {item['date']}")
+
+        if not self.commit_cache(self.save_to_json(new_data, output_file, preserve_history=True)):
+            return None
+        return len(new_data)
+
+    def delta_sync(self, output_file="lottery_data.json"):
+        """
+        增量同步
+
+        读取本地最新期号，只请求其后的期号范围；没有新开奖时直接返回，
+        不做合并、备份和写入。本地没有数据时退回完整抓取。
+        配置了数据源列表时改为并发竞速，见 sync_from_sources。
+
+        Returns:
+            新增期数（0 表示无新数据），失败返回 None
+        """
+        print("=" * 50)
+        print("双色球开奖数据增量同步")
+        print("=" * 50)
+
+        latest_period = self.local_latest_period(output_file)
+        if not latest_period:
+            print("本地没有数据，改为完整抓取")
+            if not self.fetch_and_save(output_file):
+                return None
+            if self.store is not None:
+                return self.store.count_draws("ssq")
+            with open(output_file, 'r', encoding='utf-8') as f:
+                return len(json.load(f))
+
+        print(f"本地最新期号: {latest_period}")
+        if self.sources:
+            return self.sync_from_sources(output_file, latest_period)
+
+        # 新页面先暂存，数据保存成功（或确认没有新数据）后才写入响应缓存
+        text, changed = self.fetch_text_if_changed(self.build_delta_url(latest_period), defer=True)
+        if text is None:
+            print("获取网页失败，请检查网络连接或稍后重试")
+            return None
+        if not changed:
+            print("ℹ️  页面自上次获取后未变化，跳过解析与写入")
+            return 0
+
+        # 页面中没有任何更新的期号时，跳过解析与合并
+        if not self.has_newer_period(text, latest_period):
+            print("ℹ️  没有新的开奖数据，跳过解析与写入")
+            self.commit_cache()
+            return 0
+
+        new_data = [item for item in self.parse_html(text)
+                    if item['period'] > latest_period]
+        if not new_data:
+            print("ℹ️  没有新的开奖数据，跳过写入")
+            self.commit_cache()
+            return 0
+
+        for item in new_data:
+            red_str = " ".join(item['red_balls'])
+            print(f"新开奖 期号: {item['period']} | 红球: {red_str} | 蓝球: {item['blue_ball']} | 日期: {item['date']}")
+
+        if not self.commit_cache(self.save_to_json(new_data, output_file, preserve_history=True)):
+            return None
+        return len(new_data)
+
+    @staticmethod
+    def has_newer_period(text, latest_period):
+        """粗略检查页面中是否存在比 latest_period 更新的期号单元格"""
+        cells = re.findall(r'>\s*(\d{%d})\s*<' % len(latest_period), text)
+        return any(cell > latest_period for cell in cells)
 
-            else:
-                # 直接保存新数据
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                print(f"\n数据已成功保存到 {filename}")
-                print(f"共保存 {len(data)} 期数据")
-        except Exception as e:
-            print(f"保存文件时出错: {e}")
-    
     def fetch_and_save(self, output_file="lottery_data.json", preserve_history=True):
         """
         获取并保存数据的主函数
@@ -334,18 +641,22 @@ class LotteryDataFetcher:
         print("=" * 50)
 
         # 获取网页
-        soup = self.fetch_page(self.base_url)
+        text, changed = self.fetch_text_if_changed(self.base_url, defer=True)
 
-        if not soup:
+        if text is None:
             print("获取网页失败，请检查网络连接或稍后重试")
             return False
 
+        if not changed and os.path.exists(output_file):
+            print("ℹ️  页面自上次获取后未变化，跳过解析与写入")
+            return True
+
         # 解析数据
-        lottery_data = self.parse_lottery_data(soup)
+        lottery_data = self.parse_html(text)
 
         if not lottery_data:
             print("未能解析到任何数据")
-            return False
+            return self.commit_cache(False)
 
         # 显示最新几期数据作为预览
         print("\n最新 5 期数据预览：")
@@ -354,27 +665,54 @@ class LotteryDataFetcher:
             red_str = " ".join(item['red_balls'])
             print(f"期号: {item['period']} | 红球: {red_str} | 蓝球: {item['blue_ball']} | 日期: {item['date']}")
 
-        # 保存数据
-        self.save_to_json(lottery_data, output_file, preserve_history)
+        # 保存数据，成功后才写入响应缓存
+        return self.commit_cache(self.save_to_json(lottery_data, output_file, preserve_history))
 
-        return True
+
+def parse_history_html(html):
+    """解析一页开奖数据网页文本（模块级函数，供进程池调用）"""
+    return LotteryDataFetcher.parse_html(html)
 
 
 def main():
     """主函数"""
-    fetcher = LotteryDataFetcher()
-    
+    parser = argparse.ArgumentParser(description="双色球历史开奖数据获取工具")
     # 可以自定义输出文件名
-    output_file = "lottery_data.json"
+    parser.add_argument("output_file", nargs="?", default="lottery_data.json", help="输出文件名")
+    parser.add_argument("--backfill", action="store_true", help="回填全部历史开奖数据")
+    parser.add_argument("--since", type=int, default=FIRST_YEAR, help="回填起始年份")
+    parser.add_argument("--workers", type=int, default=8, help="回填并发抓取线程数")
+    parser.add_argument("--rate", type=float, default=4.0, help="回填时每秒最多请求数")
+    parser.add_argument("--delta", action="store_true", help="增量同步：只获取本地最新期号之后的数据")
+    parser.add_argument("--cache-dir", default=HTTP_CACHE_DIR, help="原始响应缓存目录")
+    parser.add_argument("--no-cache", action="store_true", help="不使用响应缓存，每次完整下载")
+    parser.add_argument("--source", action="append", dest="sources",
+                        help=f"增量同步的数据源，可重复指定：{'/'.join(BUILTIN_SOURCES)} 或镜像地址"
+                             "（含 {start} 与 {end}）；指定后改为多数据源并发竞速，默认只请求 500 彩票网的增量页面")
+    parser.add_argument("--db", default=os.environ.get("LOTTERY_DB"),
+                        help="使用 SQLite 存储（默认读取环境变量 LOTTERY_DB，未设置时直接读写 JSON 文件）")
+    parser.add_argument("--exit-code", action="store_true",
+                        help=f"数据文件没有任何变化时以退出码 {EXIT_UNCHANGED} 退出，便于 CI 跳过提交与部署")
+    args = parser.parse_args()
+
+    fetcher = LotteryDataFetcher(cache_dir=None if args.no_cache else args.cache_dir,
+                                 sources=args.sources,
+                                 store=open_store(args.db))
+    output_file = args.output_file
     
-    if len(sys.argv) > 1:
-        output_file = sys.argv[1]
-    
-    success = fetcher.fetch_and_save(output_file)
+    if args.backfill:
+        success = fetcher.backfill(output_file, first_year=args.since, workers=args.workers, rate=args.rate)
+    elif args.delta:
+        success = fetcher.delta_sync(output_file) is not None
+    else:
+        success = fetcher.fetch_and_save(output_file)
     
     if success:
         print("\n✓ 数据获取完成！")
         print(f"✓ 文件位置: {output_file}")
+        if args.exit_code and not fetcher.written_files:
+            print("ℹ️  数据文件没有变化")
+            sys.exit(EXIT_UNCHANGED)
     else:
         print("\n✗ 数据获取失败")
         sys.exit(1)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史预测归档的分页导出（供静态网页按需加载）
+
+归档文件会随期数不断增长，而网页首屏只需要最近几期。导出目录结构：
+    data/history/<game>/index.json     索引：总期数与各分页的文件名、期数、期号范围、内容摘要
+    data/history/<game>/hot.json       最近 HOT_SIZE 期
+    data/history/<game>/<year>.json    更早的记录，按开奖年份（由期号推出）分片，期号降序
+
+网页首屏只加载 index.json 与 hot.json，大小与归档总期数无关；更早的年份在翻页时再加载。
+各分页只在内容变化时改写，往年的分片不再变化，可按索引中的摘要长期缓存。
+导出时逐条读取归档，内存中最多保留一个分页的记录。
+
+使用方法：
+    python3 history_pages.py ssq
+    python3 history_pages.py fc3d --hot-size 30
+    python3 history_pages.py ssq --source ../data/predictions_history.json --output /tmp/ssq
+"""
+
+import argparse
+import os
+import re
+
+from archive_stream import iter_records
+from json_io import canonical_digest, file_lock, write_json_if_changed
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "data")
+SOURCE_FILES = {
+    "ssq": os.path.join(DATA_DIR, "predictions_history.json"),
+    "fc3d": os.path.join(DATA_DIR, "fc3d_predictions_history.json"),
+}
+HOT_SIZE = 20
+INDEX_FILE = "index.json"
+HOT_FILE = "hot.json"
+
+_YEAR_FILE = re.compile(r'^\d{4}\.json$')
+
+
+def output_dir(game):
+    return os.path.join(DATA_DIR, "history", game)
+
+
+def period_year(game, period):
+    """期号对应的开奖年份（双色球 26031 → 2026，福彩3D 2026071 → 2026）"""
+    period = str(period)
+    return 2000 + int(period[:2]) if game == "ssq" else int(period[:4])
+
+
+def _write_page(out_dir, name, game, records, year=None):
+    """写入一个分页（内容不变时不改写），返回索引中的条目"""
+    document = {"game": game}
+    entry = {"file": name}
+    if year is not None:
+        document["year"] = entry["year"] = year
+    document["predictions_history"] = records
+    write_json_if_changed(os.path.join(out_dir, name), document)
+    entry.update(count=len(records), first_period=records[0].get("target_period"),
+                 last_period=records[-1].get("target_period"), digest=canonical_digest(document)[:12])
+    return entry
+
+
+def export_pages(game, source=None, out_dir=None, hot_size=HOT_SIZE):
+    """
+    把归档导出为热文件 + 按年份分片的冷文件 + 索引
+
+    Args:
+        game: "ssq" / "fc3d"
+        source: 归档文件（默认 data/ 下对应彩种的归档）
+        out_dir: 输出目录（默认 data/history/<game>）
+        hot_size: 热文件中的期数
+
+    Returns:
+        索引内容
+    """
+    source = source or SOURCE_FILES[game]
+    out_dir = out_dir or output_dir(game)
+    os.makedirs(out_dir, exist_ok=True)
+
+    pages = []
+    hot, shard, shard_year = [], [], None
+    previous = None
+
+    def flush_shard():
+        if shard:
+            pages.append(_write_page(out_dir, f"{shard_year}.json", game, shard, shard_year))
+
+    with file_lock(os.path.join(out_dir, INDEX_FILE)):
+        for record in iter_records(source):
+            period = int(record.get("target_period") or 0)
+            if previous is not None and period >= previous:
+                raise ValueError(f"{source}: 归档未按期号降序排列（{previous} 之后出现 {period}）")
+            previous = period
+            if len(hot) < hot_size:
+                hot.append(record)
+                continue
+            year = period_year(game, record["target_period"])
+            if year != shard_year:
+                flush_shard()
+                shard, shard_year = [], year
+            shard.append(record)
+        flush_shard()
+        if hot:
+            pages.insert(0, _write_page(out_dir, HOT_FILE, game, hot))
+
+        # 记录全部进入热文件或旧年份被筛掉后，删除不再使用的分片
+        current = {page["file"] for page in pages}
+        for name in os.listdir(out_dir):
+            if (_YEAR_FILE.match(name) or name == HOT_FILE) and name not in current:
+                os.remove(os.path.join(out_dir, name))
+
+        index = {
+            "game": game,
+            "total": sum(page["count"] for page in pages),
+            "hot_size": hot_size,
+            "pages": pages,
+        }
+        write_json_if_changed(os.path.join(out_dir, INDEX_FILE), index)
+    return index
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="把历史预测归档导出为热文件与按年份分片的分页")
+    parser.add_argument("game", choices=list(SOURCE_FILES), help="彩种")
+    parser.add_argument("--source", help="归档文件（默认 data/ 下对应彩种的归档）")
+    parser.add_argument("--output", help="输出目录（默认 data/history/<game>）")
+    parser.add_argument("--hot-size", type=int, default=HOT_SIZE, help="热文件中的期数")
+    args = parser.parse_args()
+
+    index = export_pages(args.game, args.source, args.output, args.hot_size)
+    print(f"✓ 共 {index['total']} 期，{len(index['pages'])} 个分页 → {args.output or output_dir(args.game)}")
+    for page in index["pages"]:
+        print(f"  {page['file']:<10}{page['count']:>5} 期  {page['first_period']} ~ {page['last_period']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+500 彩票网历史开奖表格解析
+
+- ssq_row_item / fc3d_row_item: 把一行单元格文本转换为开奖记录（BeautifulSoup 与快速路径共用）
+- parse_ssq_fast / parse_fc3d_fast: 不构建 DOM 树，直接用正则切分 <tr>/<td> 的快速路径；
+  遇到无法确定的页面结构返回 None，由调用方回退到 BeautifulSoup 解析
+"""
+
+import html as html_lib
+import re
+from datetime import datetime
+
+COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+TAG_RE = re.compile(r'<[^>]*>')
+TR_START_RE = re.compile(r'<tr\b([^>]*)>', re.I)
+TD_RE = re.compile(r'<td\b[^>]*>(.*?)</td\s*>', re.I | re.S)
+TD_START_RE = re.compile(r'<td\b', re.I)
+TR_END_RE = re.compile(r'</tr\s*>', re.I)
+CLASS_RE = re.compile(r'class\s*=\s*["\']([^"\']*)["\']', re.I)
+
+
+# ==================== 行解析（两条路径共用） ====================
+
+def ssq_row_item(cells):
+    """
+    双色球一行：期号、6 个红球、蓝球，最后一列为开奖日期
+
+    Returns:
+        开奖记录字典，列数不足时返回 None
+    """
+    if len(cells) < 9:
+        return None
+    return {
+        "period": cells[0],
+        "red_balls": cells[1:7],
+        "blue_ball": cells[7],
+        "date": cells[-1] if len(cells) > 8 else "",
+    }
+
+
+def calc_type(digits):
+    """计算形态: 豹子/组三/组六"""
+    unique = set(digits)
+    if len(unique) == 1:
+        return "豹子"
+    elif len(unique) == 2:
+        return "组三"
+    else:
+        return "组六"
+
+
+def fc3d_row_item(cells):
+    """
+    福彩3D 一行
+
+    inc/history.php 的列结构通常是：0 期号、1 开奖号码（"5 8 9"，旧版为三列分开）、
+    之后为和值/跨度等，开奖日期位于最后几列之一。
+
+    Returns:
+        开奖记录字典，不是数据行时返回 None
+    """
+    if len(cells) < 5:
+        return None
+
+    period = cells[0]
+    if not period.isdigit() or len(period) != 7:
+        return None
+
+    # "5 8 9" 也可能以 &nbsp; 分隔，str.split() 同样会按其切分
+    parts = cells[1].split()
+    if len(parts) > 1:
+        digits = parts
+    else:
+        digits = [cells[1], cells[2], cells[3]]
+
+    if len(digits) != 3 or not all(d.isdigit() for d in digits):
+        return None
+
+    # 从最后一列往前找形如 2026-02-13 的日期
+    date_str = ""
+    for i in range(len(cells) - 1, max(len(cells) - 5, 3), -1):
+        txt = cells[i]
+        if '-' in txt and len(txt) >= 8:
+            date_str = txt
+            break
+    if not date_str:
+        date_str = datetime.now().strftime("%Y-%m-%d")
+
+    return fc3d_record(period, digits, date_str)
+
+
+def fc3d_record(period, digits, date_str):
+    """由期号、三位号码与日期生成完整的福彩3D 记录（计算和值、跨度、形态）"""
+    values = [int(d) for d in digits]
+    return {
+        "period": period,
+        "digits": digits,
+        "number": "".join(digits),
+        "sum": sum(values),
+        "span": max(values) - min(values),
+        "type": calc_type(digits),
+        "date": date_str,
+    }
+
+
+# ==================== 快速路径 ====================
+
+def cell_text(raw):
+    """单元格内文本：去掉内层标签、解码实体并去掉首尾空白（含 &nbsp;）"""
+    if '<' in raw:
+        raw = TAG_RE.sub('', raw)
+    if '&' in raw:
+        raw = html_lib.unescape(raw)
+    return raw.strip()
+
+
+def _row_cells(chunk):
+    """切出一行的单元格文本；存在未闭合的 <td> 时返回 None"""
+    end = TR_END_RE.search(chunk)
+    if end:
+        chunk = chunk[:end.start()]
+    cells = TD_RE.findall(chunk)
+    if len(cells) != len(TD_START_RE.findall(chunk)):
+        return None
+    return [cell_text(c) for c in cells]
+
+
+def _section(html, tag):
+    """返回第一个 <tag>...</tag> 之间的内容，找不到时返回 None"""
+    match = re.search(r'<%s\b[^>]*>' % tag, html, re.I)
+    if not match:
+        return None
+    end = re.compile(r'</%s\s*>' % tag, re.I).search(html, match.end())
+    return html[match.end():end.start() if end else len(html)]
+
+
+def iter_row_cells(html, row_class=None):
+    """
+    依次产出表格行的单元格文本列表
+
+    Args:
+        html: 已去掉注释的页面文本
+        row_class: 只取 class 含该值的 <tr>；为 None 时取第一个 <tbody>（没有则第一个 <table>）内的全部行
+
+    Raises:
+        ValueError: 页面结构超出快速路径能处理的范围（嵌套表格、未闭合单元格）
+    """
+    if row_class is None:
+        scope = _section(html, 'tbody')
+        if scope is None:
+            scope = _section(html, 'table')
+        if scope is None:
+            return
+        if re.search(r'<table\b', scope, re.I):
+            raise ValueError("nested table")
+    else:
+        scope = html
+
+    starts = list(TR_START_RE.finditer(scope))
+    for idx, match in enumerate(starts):
+        if row_class is not None:
+            cls = CLASS_RE.search(match.group(1))
+            if not cls or row_class not in cls.group(1).split():
+                continue
+        end = starts[idx + 1].start() if idx + 1 < len(starts) else len(scope)
+        cells = _row_cells(scope[match.end():end])
+        if cells is None:
+            raise ValueError("unclosed <td>")
+        yield cells
+
+
+def parse_ssq_fast(html):
+    """双色球快速解析，无法处理时返回 None"""
+    try:
+        rows = [ssq_row_item(cells) for cells in iter_row_cells(COMMENT_RE.sub('', html))]
+    except ValueError:
+        return None
+    data_list = [item for item in rows if item]
+    return data_list or None
+
+
+def parse_fc3d_fast(html):
+    """福彩3D 快速解析（只取 class="t_tr1" 的数据行），无法处理时返回 None"""
+    try:
+        rows = [fc3d_row_item(cells) for cells in iter_row_cells(COMMENT_RE.sub('', html), row_class='t_tr1')]
+    except ValueError:
+        return None
+    data_list = [item for item in rows if item]
+    return data_list or None
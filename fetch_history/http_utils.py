@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+抓取脚本共用的 HTTP 工具
+
+- create_session: 带连接池的 requests.Session，供多线程并发请求共享
+- ensure_pool_size: 为已有的 Session 换上更大的连接池（保留请求头、Cookie 与重试设置）
+- RateLimiter: 线程安全的礼貌限速器
+- ResponseCache: 按 URL 缓存原始响应（ETag / Last-Modified / 内容哈希）
+- fetch_with_cache: 条件请求 + 指数退避重试，返回原始字节以及内容是否变化；
+  defer=True 时新内容只暂存，调用方保存数据成功后再 commit，保存失败的页面下次仍视为有变化
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from json_io import atomic_open
+
+
+def create_session(headers, pool_size=10):
+    """
+    创建共享连接池的 Session
+
+    Args:
+        headers: 默认请求头
+        pool_size: 每个主机保持的最大连接数（应不小于并发线程数）
+    """
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def ensure_pool_size(session, pool_size):
+    """
+    保证 session 每个主机至少能保持 pool_size 个连接
+
+    只替换连接池较小的 HTTPAdapter（沿用其 max_retries），其他自定义适配器保持不变；
+    session 本身（请求头、Cookie、调用方注入的对象）不会被替换。
+    """
+    for prefix in ('http://', 'https://'):
+        adapter = getattr(session, 'adapters', {}).get(prefix)
+        if isinstance(adapter, HTTPAdapter) and adapter._pool_maxsize < pool_size:
+            session.mount(prefix, HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                                              max_retries=adapter.max_retries))
+
+
+class RateLimiter:
+    """限速器：任意两次请求的发起时间间隔不小于 1/rate 秒（rate <= 0 表示不限速）"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """阻塞到下一个可用的请求时间槽"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# 这些状态码视为临时故障，退避后重试
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """第 attempt 次（从 0 开始）重试前的等待秒数：指数退避 + 随机抖动"""
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class ResponseCache:
+    """
+    原始响应缓存
+
+    每个 URL 对应 <sha256(url)>.body（原始字节）与 <sha256(url)>.json（元数据：
+    url、etag、last_modified、sha256、fetched_at）。两个文件都先写入唯一的临时文件再改名
+    （json_io.atomic_open），并发写入不会互相覆盖临时文件；同一进程内两文件成对写入（加锁），
+    跨进程交错时 load 的哈希校验会把不配对的缓存视为缺失。
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        # 暂存的新响应 {url: (body, etag, last_modified)}，commit 时才写入磁盘
+        self.pending = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def load(self, url):
+        """返回 (meta, body)，没有完整缓存时返回 (None, None)"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if hashlib.sha256(body).hexdigest() != meta.get("sha256"):
+            return None, None
+        return meta, body
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """写入缓存，返回内容哈希"""
+        meta_path, body_path = self._paths(url)
+        digest = hashlib.sha256(body).hexdigest()
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "sha256": digest,
+            "fetched_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with self._lock:
+            with atomic_open(body_path, 'wb') as f:
+                f.write(body)
+            with atomic_open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+        return digest
+
+    def stage(self, url, body, etag=None, last_modified=None):
+        """暂存新响应，等调用方确认数据已保存后再 commit"""
+        self.pending[url] = (body, etag, last_modified)
+
+    def commit(self):
+        """把暂存的响应写入缓存"""
+        while self.pending:
+            url, entry = self.pending.popitem()
+            self.store(url, *entry)
+
+    def discard(self):
+        """丢弃暂存的响应（数据保存失败时），下次请求仍视为有变化"""
+        self.pending.clear()
+
+    @staticmethod
+    def conditional_headers(meta):
+        """根据缓存元数据生成 If-None-Match / If-Modified-Since 请求头"""
+        headers = {}
+        if meta and meta.get("etag"):
+            headers['If-None-Match'] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers['If-Modified-Since'] = meta["last_modified"]
+        return headers
+
+
+def fetch_with_cache(session, url, cache=None, retry=3, timeout=15, rate_limiter=None, backoff=1.0, headers=None,
+                     defer=False):
+    """
+    带条件请求与退避重试的 GET
+
+    有缓存时携带 ETag / Last-Modified 发起条件请求：304 直接复用缓存内容；
+    200 时比较内容哈希，与缓存一致同样视为未变化。网络异常与 429/5xx 按指数退避重试，
+    服务器给出 Retry-After 时以其为准。headers 为本次请求额外的请求头（多个抓取器共享同一个
+    Session 时各自的 Referer 等）。defer=True 时新内容只暂存到 cache.pending，
+    由调用方在数据保存成功后 cache.commit()，失败时 cache.discard()。
+
+    Returns:
+        (body_bytes, changed)；全部重试失败返回 (None, False)
+    """
+    meta, cached_body = cache.load(url) if cache else (None, None)
+    headers = dict(headers or {}, **ResponseCache.conditional_headers(meta))
+
+    for attempt in range(retry):
+        try:
+            if rate_limiter:
+                rate_limiter.wait()
+            response = session.get(url, timeout=timeout, headers=headers)
+
+            if response.status_code == 304 and cached_body is not None:
+                print("ℹ️  服务器返回 304，页面未变化")
+                return cached_body, False
+
+            if response.status_code == 200:
+                body = response.content
+                if cache is None:
+                    return body, True
+                if meta and hashlib.sha256(body).hexdigest() == meta.get("sha256"):
+                    print("ℹ️  页面内容哈希与缓存一致，未变化")
+                    return body, False
+                save = cache.stage if defer else cache.store
+                save(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                return body, True
+
+            print(f"HTTP 状态码: {response.status_code}")
+            if response.status_code not in RETRY_STATUS:
+                return None, False
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else backoff_delay(attempt, backoff)
+
+        except requests.exceptions.RequestException as e:
+            print(f"请求失败: {e}")
+            delay = backoff_delay(attempt, backoff)
+
+        if attempt < retry - 1:
+            time.sleep(delay)
+
+    return None, False
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 数据文件写入工具
+
+写入前比较新旧内容的规范化哈希（键排序、紧凑格式，并忽略 last_updated 等每次都会变化的字段），
+内容没有变化时不写文件：不产生 git 改动，也就不会触发提交和 Vercel 重新部署。
+
+所有写入都先写同目录的临时文件再改名（中途崩溃不会留下半个文件），
+并持有该数据文件的咨询锁（<文件名>.lock），多个流水线进程可以同时运行：
+- Linux / macOS 使用 fcntl.flock，Windows 使用 msvcrt.locking，两者都不可用时只有进程内的线程锁
+- 同一线程可以重复获取同一个文件的锁（读取-合并-写入的外层锁与内部写入共用）
+"""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+# 每次写入都会刷新、但不代表数据变化的顶层字段
+VOLATILE_FIELDS = ("last_updated",)
+
+# 命令行 --exit-code：所有数据文件都没有变化时的退出码（类似 git diff --exit-code）
+EXIT_UNCHANGED = 3
+
+
+# 进程内每个数据文件一把可重入锁，外加持有的锁文件句柄与重入深度
+_FILE_LOCKS = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+
+def _lock_handle(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        while True:
+            try:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK 重试约 10 秒后仍失败时抛出异常，继续等待
+                time.sleep(0.1)
+
+
+def _unlock_handle(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path):
+    """
+    独占 path 的咨询锁（锁文件为 path + ".lock"），阻塞直到获得
+
+    只约束同样使用 file_lock 的写入者；读取方不需要加锁，原子改名保证读到的总是完整文件。
+    """
+    key = os.path.abspath(path)
+    with _FILE_LOCKS_GUARD:
+        state = _FILE_LOCKS.setdefault(key, {"lock": threading.RLock(), "depth": 0, "handle": None})
+
+    with state["lock"]:
+        if state["depth"] == 0:
+            os.makedirs(os.path.dirname(key), exist_ok=True)
+            handle = open(key + ".lock", 'a+b')
+            try:
+                _lock_handle(handle)
+            except BaseException:
+                handle.close()
+                raise
+            state["handle"] = handle
+        state["depth"] += 1
+        try:
+            yield
+        finally:
+            state["depth"] -= 1
+            if state["depth"] == 0:
+                handle, state["handle"] = state["handle"], None
+                try:
+                    _unlock_handle(handle)
+                finally:
+                    handle.close()
+
+
+@contextmanager
+def atomic_open(path, mode='wb', encoding=None):
+    """
+    打开同目录的临时文件供写入；正常退出时 fsync 后改名覆盖 path（保留原文件权限），
+    出现异常时删除临时文件，path 保持原样
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            file_mode = stat.S_IMODE(os.stat(path).st_mode)
+        except OSError:
+            # mkstemp 创建的文件只有属主可读，新文件改为常规的 0644
+            file_mode = 0o644
+        os.chmod(tmp_file, file_mode)
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def atomic_write_bytes(path, raw):
+    """先写同目录的临时文件并 fsync，再改名覆盖 path"""
+    with atomic_open(path) as f:
+        f.write(raw)
+
+
+def atomic_write_json(path, data):
+    """按仓库统一格式（indent=2、保留中文）原子写入，并持有 path 的锁"""
+    raw = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with file_lock(path):
+        atomic_write_bytes(path, raw)
+
+
+def update_json(path, update, default=None):
+    """
+    持锁完成「读取 → 修改 → 原子写入」，期间其他写入者不会插入
+
+    Args:
+        path: JSON 文件
+        update: update(data) -> 是否需要写入，直接修改 data
+        default: 文件不存在时的初始内容
+
+    Returns:
+        是否写入了文件
+    """
+    with file_lock(path):
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        else:
+            data = default
+        if not update(data):
+            return False
+        atomic_write_json(path, data)
+        return True
+
+
+def canonical_digest(data, volatile=VOLATILE_FIELDS):
+    """忽略易变字段后的内容哈希"""
+    if isinstance(data, dict) and volatile:
+        data = {k: v for k, v in data.items() if k not in volatile}
+    text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_digest(path, volatile=VOLATILE_FIELDS):
+    """现有文件的内容哈希，文件不存在或无法解析时返回 None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return canonical_digest(json.load(f), volatile)
+    except (OSError, ValueError):
+        return None
+
+
+def json_unchanged(path, data, volatile=VOLATILE_FIELDS):
+    """path 中已保存的内容是否与 data 相同（忽略易变字段）"""
+    return file_digest(path, volatile) == canonical_digest(data, volatile)
+
+
+def write_json_if_changed(path, data, volatile=VOLATILE_FIELDS):
+    """
+    内容有变化时按仓库统一格式（indent=2、保留中文）原子写入
+
+    Returns:
+        是否写入了文件
+    """
+    with file_lock(path):
+        if json_unchanged(path, data, volatile):
+            return False
+        atomic_write_json(path, data)
+        return True
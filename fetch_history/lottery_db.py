@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可选的 SQLite 存储后端
+
+设置环境变量 LOTTERY_DB（或抓取脚本的 --db）后，开奖数据、当前预测与历史预测都读写这个数据库，
+data/ 下的 JSON 文件改由导出器生成，供静态网站使用。未设置时仍然直接读写 JSON 文件。
+
+表结构（两个彩种共用，以 game 区分）：
+- draws / draw_numbers: 开奖记录，以及逐个号码的索引（按号码查期号）
+- rounds: 一期预测（status 为 current 或 archived），按 seq 排序
+- predictions: 每个模型（或共识）的一组预测，带 best_group / best_hit_count
+- prediction_groups / hit_results: 每组号码与命中结果
+
+每一层都保存原始 JSON（payload，子列表位置留空），导出时按原有键顺序还原，
+因此「导入 → 导出」得到与原文件完全相同的字节。
+
+导入与导出时在 meta 中记录每个 JSON 文件的 SHA-256；打开数据库时若文件在数据库之外被修改
+（如 git pull 带来了新数据），重新导入对应彩种，避免之后的导出用旧数据覆盖它。
+
+使用方法：
+    python3 lottery_db.py import --db lottery.db      # 从 data/*.json 导入
+    python3 lottery_db.py export --db lottery.db      # 重新生成 data/*.json
+    python3 lottery_db.py query --db lottery.db --game ssq --number 07 --slot blue
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from json_io import write_json_if_changed
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..', 'data'))
+
+# 网站使用的 JSON 文件
+GAME_FILES = {
+    "ssq": {"history": "lottery_history.json", "current": "ai_predictions.json",
+            "archive": "predictions_history.json"},
+    "fc3d": {"history": "fc3d_history.json", "current": "fc3d_ai_predictions.json",
+             "archive": "fc3d_predictions_history.json"},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS draws (
+    game TEXT NOT NULL,
+    period TEXT NOT NULL,
+    date TEXT,
+    numbers TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (game, period)
+);
+CREATE TABLE IF NOT EXISTS draw_numbers (
+    game TEXT NOT NULL,
+    period TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    number TEXT NOT NULL,
+    PRIMARY KEY (game, period, slot, position)
+);
+CREATE INDEX IF NOT EXISTS idx_draw_numbers_number ON draw_numbers (game, slot, number);
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    status TEXT NOT NULL,
+    target_period TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    prediction_date TEXT,
+    payload TEXT NOT NULL,
+    UNIQUE (game, status, target_period)
+);
+CREATE INDEX IF NOT EXISTS idx_rounds_order ON rounds (game, status, seq);
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    round_id INTEGER NOT NULL REFERENCES rounds (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    model_id TEXT,
+    model_name TEXT,
+    best_group INTEGER,
+    best_hit_count INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_round ON predictions (round_id, position);
+CREATE INDEX IF NOT EXISTS idx_predictions_model ON predictions (model_id);
+CREATE TABLE IF NOT EXISTS prediction_groups (
+    id INTEGER PRIMARY KEY,
+    prediction_id INTEGER NOT NULL REFERENCES predictions (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    group_id INTEGER,
+    numbers TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_groups_prediction ON prediction_groups (prediction_id, position);
+CREATE TABLE IF NOT EXISTS hit_results (
+    group_ref INTEGER PRIMARY KEY REFERENCES prediction_groups (id) ON DELETE CASCADE,
+    total_hits INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_hit_results_total ON hit_results (total_hits);
+"""
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def file_sha256(path):
+    """文件内容的 SHA-256，文件不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def draw_numbers(game, row):
+    """开奖记录中的号码：[(slot, position, number)]"""
+    if game == "ssq":
+        numbers = [("red", i, n) for i, n in enumerate(row.get("red_balls", []))]
+        if row.get("blue_ball"):
+            numbers.append(("blue", 0, row["blue_ball"]))
+        return numbers
+    return [("digit", i, d) for i, d in enumerate(row.get("digits", []))]
+
+
+def group_numbers(group):
+    """预测组号码的紧凑文本，如 "03 10 13 22 25 30+04" 或 "582" """
+    if "red_balls" in group:
+        return " ".join(group["red_balls"]) + "+" + str(group.get("blue_ball", ""))
+    return group.get("number") or "".join(group.get("digits", []))
+
+
+class LotteryDB:
+    """开奖与预测数据的 SQLite 存储（连接可在线程间共享，写入串行）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.RLock()
+
+    def close(self):
+        self.conn.close()
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, dumps(value)))
+
+    def record_file(self, path):
+        """记录 JSON 文件当前的内容哈希（与数据库同步的版本）"""
+        self.set_meta(f"sha256:{os.path.abspath(path)}", file_sha256(path))
+
+    def stale_games(self, data_dir=DATA_DIR):
+        """JSON 文件在上次导入 / 导出之后被外部修改过的彩种"""
+        return [game for game, files in GAME_FILES.items()
+                if any(file_sha256(path) != self.get_meta(f"sha256:{os.path.abspath(path)}")
+                       for path in (os.path.join(data_dir, name) for name in files.values()))]
+
+    # ==================== 开奖记录 ====================
+
+    def count_draws(self, game):
+        return self.conn.execute("SELECT COUNT(*) FROM draws WHERE game = ?", (game,)).fetchone()[0]
+
+    def latest_period(self, game):
+        row = self.conn.execute("SELECT MAX(period) FROM draws WHERE game = ?", (game,)).fetchone()
+        return row[0]
+
+    def load_draws(self, game, limit=None):
+        """按期号降序返回开奖记录（与 JSON 文件中的 data 列表相同）"""
+        sql = "SELECT payload FROM draws WHERE game = ? ORDER BY period DESC"
+        params = (game,)
+        if limit:
+            sql += " LIMIT ?"
+            params = (game, limit)
+        return [json.loads(p) for (p,) in self.conn.execute(sql, params)]
+
+    def find_draw(self, game, period):
+        row = self.conn.execute("SELECT payload FROM draws WHERE game = ? AND period = ?", (game, period)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def periods_with_number(self, game, number, slot=None):
+        """开出某个号码的期号（降序）；slot 为 red / blue / digit，为空时不限"""
+        sql = "SELECT DISTINCT period FROM draw_numbers WHERE game = ? AND number = ?"
+        params = [game, number]
+        if slot:
+            sql += " AND slot = ?"
+            params.append(slot)
+        return [p for (p,) in self.conn.execute(sql + " ORDER BY period DESC", params)]
+
+    def upsert_draws(self, game, rows):
+        """
+        写入开奖记录，同期号以新数据为准
+
+        Returns:
+            (新增期数, 冲突列表 [{"period", "old", "new"}])
+        """
+        added, conflicts = 0, []
+        with self.lock, self.conn:
+            for row in rows:
+                period = row["period"]
+                payload = dumps(row)
+                old = self.conn.execute("SELECT payload FROM draws WHERE game = ? AND period = ?",
+                                        (game, period)).fetchone()
+                if old and old[0] == payload:
+                    continue
+                if old:
+                    conflicts.append({"period": period, "old": json.loads(old[0]), "new": row})
+                    self.conn.execute("DELETE FROM draw_numbers WHERE game = ? AND period = ?", (game, period))
+                else:
+                    added += 1
+                numbers = draw_numbers(game, row)
+                self.conn.execute("INSERT OR REPLACE INTO draws (game, period, date, numbers, payload) "
+                                  "VALUES (?, ?, ?, ?, ?)",
+                                  (game, period, row.get("date"), " ".join(n for _, _, n in numbers), payload))
+                self.conn.executemany("INSERT INTO draw_numbers (game, period, slot, position, number) "
+                                      "VALUES (?, ?, ?, ?, ?)",
+                                      [(game, period, slot, pos, n) for slot, pos, n in numbers])
+        return added, conflicts
+
+    def set_history_document(self, game, document):
+        """保存历史开奖文件的其余字段（last_updated、next_draw 等）"""
+        self.set_meta(f"{game}.history", dict(document, data=None))
+
+    def history_document(self, game):
+        """与 data/ 下历史开奖文件相同结构的字典"""
+        template = self.get_meta(f"{game}.history") or {"data": None}
+        template["data"] = self.load_draws(game)
+        return template
+
+    # ==================== 预测 ====================
+
+    def _insert_round(self, game, status, seq, record):
+        template = dict(record, models=None)
+        if "consensus" in record:
+            template["consensus"] = None
+        cursor = self.conn.execute(
+            "INSERT INTO rounds (game, status, target_period, seq, prediction_date, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            (game, status, str(record.get("target_period")), seq, record.get("prediction_date"), dumps(template)))
+        round_id = cursor.lastrowid
+
+        entries = [("model", m) for m in record.get("models", [])]
+        if record.get("consensus") is not None:
+            entries.append(("consensus", record["consensus"]))
+        for position, (role, model) in enumerate(entries):
+            cursor = self.conn.execute(
+                "INSERT INTO predictions (round_id, position, role, model_id, model_name, best_group, "
+                "best_hit_count, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (round_id, position, role, model.get("model_id"), model.get("model_name"), model.get("best_group"),
+                 model.get("best_hit_count"), dumps(dict(model, predictions=None))))
+            prediction_id = cursor.lastrowid
+            for group_position, group in enumerate(model.get("predictions", [])):
+                template = dict(group, hit_result=None) if "hit_result" in group else group
+                cursor = self.conn.execute(
+                    "INSERT INTO prediction_groups (prediction_id, position, group_id, numbers, payload) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (prediction_id, group_position, group.get("group_id"), group_numbers(group), dumps(template)))
+                if "hit_result" in group:
+                    hit = group["hit_result"] or {}
+                    self.conn.execute("INSERT INTO hit_results (group_ref, total_hits, payload) VALUES (?, ?, ?)",
+                                      (cursor.lastrowid, hit.get("total_hits"), dumps(group["hit_result"])))
+        return round_id
+
+    def _load_round(self, round_id, payload):
+        record = json.loads(payload)
+        models = []
+        for prediction_id, role, model_payload in self.conn.execute(
+                "SELECT id, role, payload FROM predictions WHERE round_id = ? ORDER BY position", (round_id,)):
+            model = json.loads(model_payload)
+            groups = []
+            for group_payload, hit_payload in self.conn.execute(
+                    "SELECT g.payload, h.payload FROM prediction_groups g "
+                    "LEFT JOIN hit_results h ON h.group_ref = g.id WHERE g.prediction_id = ? ORDER BY g.position",
+                    (prediction_id,)):
+                group = json.loads(group_payload)
+                if hit_payload is not None:
+                    group["hit_result"] = json.loads(hit_payload)
+                groups.append(group)
+            model["predictions"] = groups
+            if role == "consensus":
+                record["consensus"] = model
+            else:
+                models.append(model)
+        record["models"] = models
+        return record
+
+    def load_current(self, game):
+        """当前（未开奖）预测，与 ai_predictions.json 相同结构；没有时返回 None"""
+        row = self.conn.execute("SELECT id, payload FROM rounds WHERE game = ? AND status = 'current'",
+                                (game,)).fetchone()
+        return self._load_round(*row) if row else None
+
+    def save_current(self, game, predictions):
+        """替换当前预测"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM rounds WHERE game = ? AND status = 'current'", (game,))
+            self._insert_round(game, "current", 0, predictions)
+
+    def has_archived(self, game, target_period):
+        return self.conn.execute("SELECT 1 FROM rounds WHERE game = ? AND status = 'archived' AND target_period = ?",
+                                 (game, str(target_period))).fetchone() is not None
+
+    def archive_round(self, game, record):
+        """把一期已开奖预测加到历史记录顶部"""
+        with self.lock, self.conn:
+            seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM rounds WHERE game = ? AND status = 'archived'",
+                                    (game,)).fetchone()[0]
+            self._insert_round(game, "archived", seq, record)
+
+    def load_archive(self, game, limit=None):
+        """历史预测记录（最新在前）"""
+        sql = "SELECT id, payload FROM rounds WHERE game = ? AND status = 'archived' ORDER BY seq DESC"
+        params = (game,)
+        if limit:
+            sql += " LIMIT ?"
+            params = (game, limit)
+        return [self._load_round(round_id, payload) for round_id, payload in self.conn.execute(sql, params).fetchall()]
+
+    def set_archive_document(self, game, document):
+        self.set_meta(f"{game}.archive", dict(document, predictions_history=None))
+
+    def archive_document(self, game):
+        """与历史预测文件相同结构的字典"""
+        template = self.get_meta(f"{game}.archive") or {"predictions_history": None}
+        template["predictions_history"] = self.load_archive(game)
+        return template
+
+    def recent_model_hits(self, game, window):
+        """最近 window 期归档中各模型的最佳命中数 {model_id: [best_hit_count, ...]}"""
+        hits = {}
+        for model_id, best in self.conn.execute(
+                "SELECT p.model_id, p.best_hit_count FROM predictions p JOIN "
+                "(SELECT id, seq FROM rounds WHERE game = ? AND status = 'archived' ORDER BY seq DESC LIMIT ?) r "
+                "ON p.round_id = r.id WHERE p.role = 'model' ORDER BY r.seq DESC, p.position", (game, window)):
+            hits.setdefault(model_id, []).append(best or 0)
+        return hits
+
+    def model_rounds(self, game, model_id):
+        """某个模型在各期归档中的 (期号, 最佳组, 最佳命中数)，最新在前"""
+        return self.conn.execute(
+            "SELECT r.target_period, p.best_group, p.best_hit_count FROM predictions p JOIN rounds r "
+            "ON p.round_id = r.id WHERE r.game = ? AND r.status = 'archived' AND p.model_id = ? "
+            "ORDER BY r.seq DESC", (game, model_id)).fetchall()
+
+    # ==================== 导入 / 导出 ====================
+
+    def import_json(self, data_dir=DATA_DIR, games=GAME_FILES):
+        """从 data/ 下的 JSON 文件导入（覆盖数据库中对应彩种的数据）"""
+        for game in games:
+            files = GAME_FILES[game]
+            with self.lock, self.conn:
+                self.conn.execute("DELETE FROM draw_numbers WHERE game = ?", (game,))
+                self.conn.execute("DELETE FROM draws WHERE game = ?", (game,))
+                self.conn.execute("DELETE FROM rounds WHERE game = ?", (game,))
+
+            document = self._read(data_dir, files["history"])
+            if document is not None:
+                self.upsert_draws(game, document.get("data", []))
+                self.set_history_document(game, document)
+
+            current = self._read(data_dir, files["current"])
+            if current is not None:
+                self.save_current(game, current)
+
+            archive = self._read(data_dir, files["archive"])
+            if archive is not None:
+                records = archive.get("predictions_history", [])
+                with self.lock, self.conn:
+                    for index, record in enumerate(records):
+                        self._insert_round(game, "archived", len(records) - index, record)
+                self.set_archive_document(game, archive)
+
+            for name in files.values():
+                self.record_file(os.path.join(data_dir, name))
+        self.set_meta("imported_from", data_dir)
+
+    @staticmethod
+    def _read(data_dir, name):
+        path = os.path.join(data_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def export_file(self, game, kind, path):
+        """导出单个网站文件（kind: history / current / archive），内容没有变化时不改写，返回是否写入"""
+        if kind == "history":
+            document = self.history_document(game)
+        elif kind == "current":
+            document = self.load_current(game)
+            if document is None:
+                return False
+        else:
+            document = self.archive_document(game)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        written = write_json_if_changed(path, document)
+        self.record_file(path)
+        return written
+
+    def export_json(self, data_dir=DATA_DIR, games=GAME_FILES):
+        """重新生成网站使用的全部 JSON 文件，返回内容有变化、实际写入的文件列表"""
+        written = []
+        for game in games:
+            for kind, name in GAME_FILES[game].items():
+                path = os.path.join(data_dir, name)
+                if self.export_file(game, kind, path):
+                    written.append(path)
+        return written
+
+
+def open_store(path=None, data_dir=DATA_DIR):
+    """
+    打开 SQLite 存储：path 为空时读取环境变量 LOTTERY_DB，都没有时返回 None（使用 JSON 文件）
+
+    新建的数据库会先从 data/*.json 导入现有数据；JSON 文件在数据库之外被修改过的彩种重新导入。
+    """
+    path = path or os.environ.get("LOTTERY_DB")
+    if not path:
+        return None
+    store = LotteryDB(path)
+    if store.get_meta("imported_from") is None:
+        print(f"📥 初始化数据库 {path}：从 {data_dir} 导入现有数据")
+        store.import_json(data_dir)
+    else:
+        stale = store.stale_games(data_dir)
+        if stale:
+            print(f"📥 {', '.join(stale)} 的 JSON 文件在数据库之外被修改，重新导入")
+            store.import_json(data_dir, stale)
+    return store
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="开奖与预测数据的 SQLite 存储")
+    parser.add_argument("command", choices=["import", "export", "query"], help="导入 / 导出 JSON，或查询")
+    parser.add_argument("--db", default=os.environ.get("LOTTERY_DB", "lottery.db"), help="数据库文件路径")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="JSON 文件目录（默认 data/）")
+    parser.add_argument("--game", choices=list(GAME_FILES), default="ssq", help="查询的彩种")
+    parser.add_argument("--period", help="按期号查询开奖记录")
+    parser.add_argument("--number", help="查询开出某个号码的期号")
+    parser.add_argument("--slot", choices=["red", "blue", "digit"], help="号码位置（与 --number 一起使用）")
+    parser.add_argument("--model", help="查询某个模型的历史最佳命中")
+    args = parser.parse_args()
+
+    store = LotteryDB(args.db)
+    if args.command == "import":
+        store.import_json(args.data_dir)
+        for game in GAME_FILES:
+            print(f"✓ {game}: {store.count_draws(game)} 期开奖，{len(store.load_archive(game))} 期历史预测")
+    elif args.command == "export":
+        for path in store.export_json(args.data_dir):
+            print(f"✓ 已导出: {path}")
+    else:
+        if args.period:
+            print(json.dumps(store.find_draw(args.game, args.period), ensure_ascii=False, indent=2))
+        if args.number:
+            periods = store.periods_with_number(args.game, args.number, args.slot)
+            print(f"号码 {args.number} 共开出 {len(periods)} 期: {', '.join(periods[:20])}")
+        if args.model:
+            for period, best_group, best_hit in store.model_rounds(args.game, args.model):
+                print(f"{period}  最佳组 {best_group}  命中 {best_hit}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据文件快照存储（替代 *_backup_YYYYMMDD_HHMMSS.json 备份副本）
+
+每个数据文件所在目录下有一个 .snapshots/：
+- objects/ab/cdef....json.gz: 以原始字节的 sha256 命名的 gzip 压缩内容，相同内容只存一份
+- index.json: 快照记录（文件名、内容哈希、大小、创建时间），按时间从旧到新
+
+内容与该文件最近一次快照相同时不新增记录，数据没有变化时备份几乎没有开销。
+每次快照后按保留策略（每个文件保留的份数、最长保留天数）清理记录，并删除不再被引用的对象。
+
+使用方法：
+    python3 snapshot_store.py list lottery_data.json
+    python3 snapshot_store.py restore lottery_data.json              # 恢复最近一次快照
+    python3 snapshot_store.py restore lottery_data.json --id 20260101_120000-1a2b3c4d
+    python3 snapshot_store.py prune lottery_data.json --keep 10 --max-age-days 90
+    python3 snapshot_store.py migrate lottery_data.json              # 导入并删除旧的 _backup_ 副本
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta
+
+from json_io import atomic_write_bytes, atomic_write_json, file_lock
+
+SNAPSHOT_DIRNAME = ".snapshots"
+
+# 默认保留策略：每个文件保留最近 30 份，不按时间清理
+DEFAULT_KEEP = 30
+DEFAULT_MAX_AGE_DAYS = None
+
+TIME_FORMAT = "%Y%m%d_%H%M%S"
+LEGACY_BACKUP_PATTERN = re.compile(r"_backup_(\d{8}_\d{6})\.json$")
+
+class SnapshotStore:
+    """内容寻址、去重、压缩的快照存储"""
+
+    def __init__(self, root, keep=DEFAULT_KEEP, max_age_days=DEFAULT_MAX_AGE_DAYS, now=datetime.now):
+        self.root = root
+        self.keep = keep
+        self.max_age_days = max_age_days
+        self.now = now
+        self.index_file = os.path.join(root, "index.json")
+
+    @classmethod
+    def for_file(cls, path, **kwargs):
+        """path 所在目录下的快照存储（与原来的备份副本位置一致）"""
+        return cls(os.path.join(os.path.dirname(os.path.abspath(path)), SNAPSHOT_DIRNAME), **kwargs)
+
+    def object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest[2:] + ".json.gz")
+
+    def load_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def save_index(self, entries):
+        atomic_write_json(self.index_file, entries)
+
+    def put_object(self, raw):
+        """保存一份内容，已存在时直接返回哈希"""
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            # mtime=0 让相同内容得到相同的压缩结果
+            atomic_write_bytes(path, gzip.compress(raw, mtime=0))
+        return digest
+
+    def read_object(self, digest):
+        with open(self.object_path(digest), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def snapshot(self, path, created=None):
+        """
+        为 path 的当前内容创建快照
+
+        Returns:
+            快照记录；文件不存在时返回 None。内容与最近一次快照相同时返回那条记录，不新增
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            raw = f.read()
+        name = os.path.basename(path)
+        created = created or self.now()
+
+        with file_lock(self.index_file):
+            entries = self.load_index()
+            previous = [e for e in entries if e["file"] == name]
+            digest = hashlib.sha256(raw).hexdigest()
+            if previous and previous[-1]["digest"] == digest:
+                return previous[-1]
+
+            self.put_object(raw)
+            entry = {
+                "id": f"{created.strftime(TIME_FORMAT)}-{digest[:8]}",
+                "file": name,
+                "digest": digest,
+                "size": len(raw),
+                "created": created.isoformat(timespec="seconds"),
+            }
+            entries.append(entry)
+            entries.sort(key=lambda e: e["created"])
+            kept = self.apply_retention(entries)
+            self.save_index(kept)
+            if len(kept) < len(entries):
+                self.collect_garbage(kept)
+            return entry
+
+    def list(self, name=None):
+        """快照记录（从旧到新），name 为文件名时只列出该文件的快照"""
+        entries = self.load_index()
+        if name is not None:
+            entries = [e for e in entries if e["file"] == os.path.basename(name)]
+        return entries
+
+    def find(self, name, snapshot_id=None):
+        """按 id（或 id / 哈希前缀）查找快照，未指定时返回最近一次"""
+        entries = self.list(name)
+        if snapshot_id:
+            entries = [e for e in entries if e["id"].startswith(snapshot_id) or e["digest"].startswith(snapshot_id)]
+        return entries[-1] if entries else None
+
+    def restore(self, path, snapshot_id=None, target=None):
+        """
+        把快照内容写回 target（默认 path），写回前先为当前内容做一次快照
+
+        Returns:
+            恢复的快照记录，找不到时返回 None
+        """
+        entry = self.find(path, snapshot_id)
+        if entry is None:
+            return None
+        raw = self.read_object(entry["digest"])
+        target = target or path
+        with file_lock(target):
+            self.snapshot(target)
+            atomic_write_bytes(target, raw)
+        return entry
+
+    def apply_retention(self, entries, keep=None, max_age_days=None):
+        """按份数与天数筛选要保留的记录；每个文件至少保留最近一份"""
+        keep = self.keep if keep is None else keep
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        cutoff = None
+        if max_age_days is not None:
+            cutoff = (self.now() - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+
+        kept = []
+        for name in {e["file"] for e in entries}:
+            versions = [e for e in entries if e["file"] == name]
+            newest = versions[-1]
+            if keep:
+                versions = versions[-keep:]
+            if cutoff is not None:
+                versions = [e for e in versions if e["created"] >= cutoff]
+            kept.extend(versions or [newest])
+        kept.sort(key=lambda e: e["created"])
+        return kept
+
+    def prune(self, keep=None, max_age_days=None):
+        """应用保留策略并删除不再被引用的对象，返回删除的记录数"""
+        with file_lock(self.index_file):
+            entries = self.load_index()
+            kept = self.apply_retention(entries, keep, max_age_days)
+            self.save_index(kept)
+            self.collect_garbage(kept)
+        return len(entries) - len(kept)
+
+    def collect_garbage(self, entries):
+        referenced = {e["digest"] for e in entries}
+        for path in glob.glob(os.path.join(self.root, "objects", "*", "*.json.gz")):
+            digest = os.path.basename(os.path.dirname(path)) + os.path.basename(path)[:-len(".json.gz")]
+            if digest not in referenced:
+                os.remove(path)
+
+    def migrate_legacy_backups(self, path):
+        """导入 path 旁边的 *_backup_YYYYMMDD_HHMMSS.json 副本并删除，返回导入的数量"""
+        stem, ext = os.path.splitext(path)
+        legacy = sorted(glob.glob(f"{glob.escape(stem)}_backup_*{ext}"))
+        imported = 0
+        for backup in legacy:
+            match = LEGACY_BACKUP_PATTERN.search(backup)
+            if not match:
+                continue
+            with open(backup, 'rb') as f:
+                raw = f.read()
+            created = datetime.strptime(match.group(1), TIME_FORMAT)
+            with file_lock(self.index_file):
+                entries = self.load_index()
+                digest = self.put_object(raw)
+                entries.append({
+                    "id": f"{match.group(1)}-{digest[:8]}",
+                    "file": os.path.basename(path),
+                    "digest": digest,
+                    "size": len(raw),
+                    "created": created.isoformat(timespec="seconds"),
+                })
+                entries.sort(key=lambda e: e["created"])
+                self.save_index(entries)
+            os.remove(backup)
+            imported += 1
+        return imported
+
+
+def snapshot_file(path, **kwargs):
+    """为 path 做快照（存储在同目录的 .snapshots/），返回快照记录"""
+    return SnapshotStore.for_file(path, **kwargs).snapshot(path)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="数据文件快照：列出、恢复、清理")
+    parser.add_argument("command", choices=["list", "restore", "prune", "migrate", "snapshot"], help="操作")
+    parser.add_argument("files", nargs="+", help="数据文件路径（快照保存在同目录的 .snapshots/）")
+    parser.add_argument("--id", help="restore 使用的快照 id 或内容哈希前缀（默认最近一次）")
+    parser.add_argument("--to", help="restore 写入的目标文件（默认覆盖原文件）")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="每个文件保留的快照数")
+    parser.add_argument("--max-age-days", type=int, default=DEFAULT_MAX_AGE_DAYS, help="快照最长保留天数")
+    args = parser.parse_args()
+
+    for path in args.files:
+        store = SnapshotStore.for_file(path, keep=args.keep, max_age_days=args.max_age_days)
+        name = os.path.basename(path)
+        if args.command == "list":
+            entries = store.list(name)
+            print(f"📦 {name}: {len(entries)} 份快照")
+            for entry in entries:
+                print(f"  {entry['id']}  {entry['created']}  {entry['size']:>9} 字节")
+        elif args.command == "restore":
+            entry = store.restore(path, args.id, args.to)
+            if entry is None:
+                print(f"❌ {name}: 没有找到快照 {args.id or ''}")
+                raise SystemExit(1)
+            print(f"✓ 已将 {entry['id']} 恢复到 {args.to or path}")
+        elif args.command == "prune":
+            removed = store.prune()
+            print(f"✓ {name}: 清理 {removed} 份快照，剩余 {len(store.list(name))} 份")
+        elif args.command == "migrate":
+            imported = store.migrate_legacy_backups(path)
+            removed = store.prune()
+            print(f"✓ {name}: 导入 {imported} 个旧备份文件，按保留策略清理 {removed} 份")
+        else:
+            entry = store.snapshot(path)
+            print(f"✓ {name}: {entry['id'] if entry else '文件不存在'}")
+
+
+if __name__ == "__main__":
+    main()
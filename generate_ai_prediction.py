@@ -8,8 +8,13 @@ import json
 import os
 import sys
 from datetime import datetime, timedelta, timezone
-from openai import OpenAI
-from typing import Dict, Any
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from typing import Dict, Any, List, Optional
+
+from llm_clients import get_client, is_n_unsupported_error, mark_n_unsupported, supports_n
+from ssq_constraints import validate_group
 
 # 北京时间（UTC+8）
 BEIJING_TZ = timezone(timedelta(hours=8))
@@ -28,6 +33,7 @@ MODELS = [
         "model_id": "SSB-Team-001",
         "api_key": os.environ.get("OPENAI_API_KEY"),
         "base_url": os.environ.get("OPENAI_BASE_URL") or "https://api.openai.com/v1",
+        "supports_n": True,
     },
     {
         "id": os.environ.get("ANTHROPIC_MODEL_ID") or "claude-3-5-sonnet-20241022",
@@ -35,6 +41,7 @@ MODELS = [
         "model_id": "team_alpha_arena_v1",
         "api_key": os.environ.get("ANTHROPIC_API_KEY"),
         "base_url": os.environ.get("ANTHROPIC_BASE_URL") or "https://api.anthropic.com/v1",
+        "supports_n": False,
     },
     {
         "id": os.environ.get("GEMINI_MODEL_ID") or "gemini-2.5-flash",
@@ -42,6 +49,7 @@ MODELS = [
         "model_id": "Gemini2.5",
         "api_key": os.environ.get("GEMINI_API_KEY"),
         "base_url": os.environ.get("GEMINI_BASE_URL") or "https://generativelanguage.googleapis.com/v1beta/openai",
+        "supports_n": True,
     },
     {
         "id": os.environ.get("DEEPSEEK_MODEL_ID") or "deepseek-chat",
@@ -49,9 +57,37 @@ MODELS = [
         "model_id": "DeepseekR1",
         "api_key": os.environ.get("DEEPSEEK_API_KEY"),
         "base_url": os.environ.get("DEEPSEEK_BASE_URL") or "https://api.deepseek.com/v1",
+        "supports_n": False,
     },
 ]
 
+def read_samples_per_call() -> int:
+    """读取 AI_SAMPLES_PER_CALL，未设置或不是整数时使用 1"""
+    value = os.environ.get("AI_SAMPLES_PER_CALL") or "1"
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"⚠️  AI_SAMPLES_PER_CALL={value!r} 不是整数，使用默认值 1")
+        return 1
+
+# 每次调用请求的候选预测数（AI_SAMPLES_PER_CALL，默认 1）
+# 大于 1 时：支持 n 参数的接口一次返回多个 choices，其余接口要求在一次响应中返回多套候选，
+# 再由 select_best_candidate 按约束合规率和号码多样性在本地择优
+SAMPLES_PER_CALL = read_samples_per_call()
+
+MULTI_CANDIDATE_INSTRUCTION = """
+
+---
+
+## 多候选输出
+
+请一次给出 {samples} 套互不相同的完整预测，返回一个 JSON 数组，数组中每个元素都是上面「输出格式要求」中的完整 JSON 对象。
+"""
+
+# 多模型共识（加权集成）配置
+CONSENSUS_MODEL_ID = "Consensus"
+CONSENSUS_MODEL_NAME = "多模型共识"
+
 # 文件路径
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 LOTTERY_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "lottery_history.json")
@@ -59,6 +95,17 @@ AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
 PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "predictions_history.json")
 PROMPT_FILE = os.path.join(SCRIPT_DIR, "doc", "prompt2.0.md")
 
+# 可选的 SQLite 存储（设置环境变量 LOTTERY_DB 时启用，见 fetch_history/lottery_db.py），
+# 启用后读写都经过数据库，上面的 JSON 文件由导出器重新生成；None 表示直接读写 JSON 文件
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+from lottery_db import open_store
+from json_io import atomic_write_json, file_lock, json_unchanged
+from archive_stream import find_record, prepend_record
+from leaderboard import load_leaderboard_weights
+from snapshot_store import snapshot_file
+GAME = "ssq"
+STORE = open_store()
+
 # ==================== 工具函数 ====================
 
 def load_prompt_template() -> str:
@@ -72,6 +119,8 @@ def load_prompt_template() -> str:
 
 def load_lottery_history() -> Dict[str, Any]:
     """加载历史开奖数据"""
+    if STORE is not None:
+        return STORE.history_document(GAME)
     try:
         with open(LOTTERY_HISTORY_FILE, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -123,47 +172,84 @@ def extract_json_from_response(response_text: str) -> str:
 
     return text
 
-def call_ai_model(model_config: Dict[str, Any], prompt: str) -> Dict[str, Any]:
-    """调用 AI 模型获取预测（使用该模型自己的 api_key 和 base_url）"""
+def call_ai_model(model_config: Dict[str, Any], prompt: str, samples: int = 1) -> List[Dict[str, Any]]:
+    """
+    调用 AI 模型获取预测（使用该模型自己的 api_key 和 base_url）
+
+    Args:
+        model_config: 模型配置
+        prompt: 完整 prompt
+        samples: 期望的候选预测数
+
+    Returns:
+        解析成功的候选预测列表（至少 1 个）
+    """
     api_key = model_config.get('api_key')
     base_url = model_config.get('base_url')
     if not api_key:
         raise ValueError(f"模型 {model_config['name']} 未配置 API Key")
 
-    client = OpenAI(api_key=api_key, base_url=base_url)
+    def build_messages(user_prompt: str):
+        return [
+            {
+                "role": "system",
+                "content": "你是一个专业的彩票数据分析师，擅长基于历史数据进行模式分析和预测。请严格按照要求返回 JSON 格式数据，不要有任何额外的解释或说明。"
+            },
+            {
+                "role": "user",
+                "content": user_prompt
+            }
+        ]
+
+    client = get_client(api_key, base_url)
+    response_texts = None
     try:
-        print(f"  ⏳ 正在调用 {model_config['name']} 模型...")
-
-        response = client.chat.completions.create(
-            model=model_config['id'],
-            messages=[
-                {
-                    "role": "system",
-                    "content": "你是一个专业的彩票数据分析师，擅长基于历史数据进行模式分析和预测。请严格按照要求返回 JSON 格式数据，不要有任何额外的解释或说明。"
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.8
-        )
-
-        response_text = response.choices[0].message.content.strip()
-
-        # 提取 JSON
-        json_text = extract_json_from_response(response_text)
-
-        # 解析 JSON
-        prediction_data = json.loads(json_text)
-
-        print(f"  ✅ {model_config['name']} 预测成功")
-        return prediction_data
+        print(f"  ⏳ 正在调用 {model_config['name']} 模型..." + (f"（{samples} 个候选）" if samples > 1 else ""))
+
+        if samples > 1 and supports_n(model_config):
+            try:
+                response = client.chat.completions.create(
+                    model=model_config['id'],
+                    messages=build_messages(prompt),
+                    temperature=0.8,
+                    n=samples
+                )
+                response_texts = [choice.message.content.strip() for choice in response.choices]
+            except Exception as e:
+                # 只有参数错误才改用单次响应；超时、限流等交给外层按调用失败处理，不重复付费请求
+                if not is_n_unsupported_error(e):
+                    raise
+                print(f"  ℹ️  {model_config['name']} 不支持 n={samples}，改为单次响应返回多套候选: {str(e)}")
+                mark_n_unsupported(model_config['id'])
+
+        if response_texts is None:
+            if samples > 1:
+                prompt = prompt + MULTI_CANDIDATE_INSTRUCTION.format(samples=samples)
+            response = client.chat.completions.create(
+                model=model_config['id'],
+                messages=build_messages(prompt),
+                temperature=0.8
+            )
+            response_texts = [response.choices[0].message.content.strip()]
+
+        # 提取并解析 JSON（单个对象或候选数组）
+        candidates = []
+        for response_text in response_texts:
+            try:
+                parsed = json.loads(extract_json_from_response(response_text))
+            except json.JSONDecodeError as e:
+                print(f"  ❌ {model_config['name']} JSON 解析失败: {str(e)}")
+                print(f"  原始响应前500字符:\n{response_text[:500]}")
+                continue
+            parsed = parsed if isinstance(parsed, list) else [parsed]
+            candidates.extend(item for item in parsed if isinstance(item, dict))
+
+        if not candidates:
+            raise ValueError(f"{model_config['name']} 没有可解析的预测结果")
+
+        print(f"  ✅ {model_config['name']} 预测成功" + (f"，获得 {len(candidates)} 个候选" if samples > 1 else ""))
+        return candidates
 
-    except json.JSONDecodeError as e:
-        print(f"  ❌ {model_config['name']} JSON 解析失败: {str(e)}")
-        print(f"  原始响应前500字符:\n{response_text[:500]}")
-        raise
     except Exception as e:
         print(f"  ❌ {model_config['name']} 调用失败")
         print(f"  错误类型: {type(e).__name__}")
@@ -172,6 +258,41 @@ def call_ai_model(model_config: Dict[str, Any], prompt: str) -> Dict[str, Any]:
         print(f"  详细堆栈:\n{traceback.format_exc()}")
         raise
 
+def score_candidate(prediction: Dict[str, Any], accepted: List[Dict[str, Any]]) -> float:
+    """
+    候选预测打分（越高越好）
+
+    - 约束合规率（0-10 分）：各组满足所属策略硬约束且 description 声明与号码一致
+    - 组内重叠：5 组红球两两交集的平均大小
+    - 跨模型重叠：与已选定模型各组红球交集的平均大小
+    """
+    groups = prediction["predictions"]
+    compliant = sum(1 for g in groups if not any(validate_group(g).values()))
+
+    red_sets = [set(g["red_balls"]) for g in groups]
+    pairs = list(combinations(red_sets, 2))
+    intra_overlap = sum(len(a & b) for a, b in pairs) / len(pairs) if pairs else 0.0
+
+    others = [set(g["red_balls"]) for model in accepted for g in model.get("predictions", [])]
+    cross_overlap = 0.0
+    if others:
+        cross_overlap = sum(len(a & b) for a in red_sets for b in others) / (len(red_sets) * len(others))
+
+    return compliant / len(groups) * 10 - intra_overlap - cross_overlap
+
+def select_best_candidate(candidates: List[Dict[str, Any]], accepted: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """验证全部候选，返回得分最高的合法候选（没有合法候选时返回 None）"""
+    best, best_score = None, None
+    for index, candidate in enumerate(candidates, 1):
+        if not validate_prediction(candidate):
+            continue
+        score = score_candidate(candidate, accepted)
+        if len(candidates) > 1:
+            print(f"    候选 {index}: 得分 {score:.2f}")
+        if best_score is None or score > best_score:
+            best, best_score = candidate, score
+    return best
+
 def validate_prediction(prediction: Dict[str, Any]) -> bool:
     """验证预测数据格式"""
     try:
@@ -211,8 +332,16 @@ def validate_prediction(prediction: Dict[str, Any]) -> bool:
         print(f"    ⚠️  验证出错: {str(e)}")
         return False
 
-def generate_predictions() -> Dict[str, Any]:
-    """生成所有模型的预测"""
+def generate_predictions(lottery_data: Optional[Dict[str, Any]] = None, archive: bool = True,
+                         workers: int = 1) -> Dict[str, Any]:
+    """
+    生成所有模型的预测
+
+    Args:
+        lottery_data: 已加载的历史开奖数据（为空时从文件读取）
+        archive: 是否先归档已开奖的旧预测（流水线中归档是单独的阶段）
+        workers: 并发调用模型的线程数；候选择优仍按 MODELS 顺序进行，结果与串行一致
+    """
     print("\n" + "="*50)
     print("🤖 双色球 AI 预测自动生成")
     print("="*50 + "\n")
@@ -227,11 +356,13 @@ def generate_predictions() -> Dict[str, Any]:
         return None
 
     # 加载历史数据
-    print("📊 加载历史开奖数据...")
-    lottery_data = load_lottery_history()
+    if lottery_data is None:
+        print("📊 加载历史开奖数据...")
+        lottery_data = load_lottery_history()
 
     # 归档旧预测（如果已开奖）
-    archive_old_prediction(lottery_data)
+    if archive:
+        archive_old_prediction(lottery_data)
 
     # 获取下期信息
     next_draw = lottery_data.get("next_draw", {})
@@ -254,39 +385,48 @@ def generate_predictions() -> Dict[str, Any]:
     prediction_date = get_next_draw_date()
     print(f"📅 预测日期: {prediction_date}\n")
 
-    # 初始化逐步调用
-    print("🔮 开始生成预测...\n")
-    all_predictions = []
+    active_models = []
     for model_config in MODELS:
-        if not model_config.get('api_key'):
+        if model_config.get('api_key'):
+            active_models.append(model_config)
+        else:
             print(f"  ⚠️  {model_config['name']} 未配置 API Key，跳过\n")
-            continue
-        try:
-            # 构建 prompt
-            prompt = prompt_template.format(
-                target_period=target_period,
-                target_date=target_date,
-                lottery_history=history_json,
-                prediction_date=prediction_date,
-                model_id=model_config['model_id'],
-                model_name=model_config['name']
-            )
-
-            # 调用模型（无需共享 client）
-            prediction = call_ai_model(model_config, prompt)
 
-            # 验证数据
-            if validate_prediction(prediction):
-                all_predictions.append(prediction)
-                print(f"  ✓ 验证通过\n")
-            else:
-                print(f"  ✗ 验证失败，跳过该模型\n")
+    def request_candidates(model_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # 构建 prompt
+        prompt = prompt_template.format(
+            target_period=target_period,
+            target_date=target_date,
+            lottery_history=history_json,
+            prediction_date=prediction_date,
+            model_id=model_config['model_id'],
+            model_name=model_config['name']
+        )
+        # 调用模型（客户端由 llm_clients 共享）
+        return call_ai_model(model_config, prompt, SAMPLES_PER_CALL)
 
-        except Exception as e:
-            print(f"  ✗ 处理 {model_config['name']} 时失败")
-            print(f"  错误类型: {type(e).__name__}")
-            print(f"  错误信息: {str(e)}\n")
-            continue
+    # 模型调用可以并发，择优需要按顺序参考已接受的预测
+    print("🔮 开始生成预测...\n")
+    all_predictions = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(request_candidates, model_config) for model_config in active_models]
+        for model_config, future in zip(active_models, futures):
+            try:
+                candidates = future.result()
+
+                # 验证数据并在候选中择优
+                prediction = select_best_candidate(candidates, all_predictions)
+                if prediction:
+                    all_predictions.append(prediction)
+                    print(f"  ✓ 验证通过\n")
+                else:
+                    print(f"  ✗ 验证失败，跳过该模型\n")
+
+            except Exception as e:
+                print(f"  ✗ 处理 {model_config['name']} 时失败")
+                print(f"  错误类型: {type(e).__name__}")
+                print(f"  错误信息: {str(e)}\n")
+                continue
 
     # 构建最终输出
     if not all_predictions:
@@ -299,9 +439,63 @@ def generate_predictions() -> Dict[str, Any]:
         "models": all_predictions
     }
 
+    # 多模型加权共识
+    weights = load_leaderboard_weights([m.get("model_id") for m in all_predictions], GAME, PREDICTIONS_HISTORY_FILE, STORE)
+    result["consensus"] = build_consensus(all_predictions, weights)
+    print(f"🗳️  已生成多模型共识（权重: {', '.join(f'{k}={v}' for k, v in weights.items())}）")
+
     print(f"✅ 成功生成 {len(all_predictions)}/{len(MODELS)} 个模型的预测\n")
     return result
 
+def build_consensus(models: List[Dict[str, Any]], weights: Dict[str, float], groups: int = 5) -> Dict[str, Any]:
+    """
+    汇总所有模型的预测组，生成加权共识预测
+
+    每个号码的得分为投出该号码的模型权重之和；依次生成 groups 组，
+    号码每被前面的组选用一次，得分减半，以保证各组之间有差异。
+    """
+    red_votes, blue_votes = Counter(), Counter()
+    red_weighted, blue_weighted = Counter(), Counter()
+    for model in models:
+        weight = weights.get(model.get("model_id"), 1.0)
+        for group in model.get("predictions", []):
+            for ball in group["red_balls"]:
+                red_votes[ball] += 1
+                red_weighted[ball] += weight
+            blue_votes[group["blue_ball"]] += 1
+            blue_weighted[group["blue_ball"]] += weight
+
+    red_used, blue_used = Counter(), Counter()
+    predictions = []
+    for group_id in range(1, groups + 1):
+        reds = sorted(red_weighted, key=lambda b: (-red_weighted[b] * 0.5 ** red_used[b], -red_votes[b], b))[:6]
+        blue = min(blue_weighted, key=lambda b: (-blue_weighted[b] * 0.5 ** blue_used[b], -blue_votes[b], b))
+        red_used.update(reds)
+        blue_used[blue] += 1
+        predictions.append({
+            "group_id": group_id,
+            "strategy": "加权共识",
+            "red_balls": sorted(reds),
+            "blue_ball": blue,
+            "description": "红球" + "、".join(f"{b}({red_weighted[b]:.1f}票)" for b in sorted(reds))
+                           + f"；蓝球{blue}({blue_weighted[blue]:.1f}票)"
+        })
+
+    def as_dict(counter):
+        return {k: round(v, 4) for k, v in sorted(counter.items())}
+
+    return {
+        "model_id": CONSENSUS_MODEL_ID,
+        "model_name": CONSENSUS_MODEL_NAME,
+        "source_models": [m.get("model_name") for m in models],
+        "weights": weights,
+        "red_votes": as_dict(red_votes),
+        "red_weighted_votes": as_dict(red_weighted),
+        "blue_votes": as_dict(blue_votes),
+        "blue_weighted_votes": as_dict(blue_weighted),
+        "predictions": predictions
+    }
+
 def calculate_hit_result(prediction_group: Dict[str, Any], actual_result: Dict[str, Any]) -> Dict[str, Any]:
     """计算单组预测的命中结果"""
     red_hits = [b for b in prediction_group["red_balls"] if b in actual_result["red_balls"]]
@@ -314,18 +508,41 @@ def calculate_hit_result(prediction_group: Dict[str, Any], actual_result: Dict[s
         "total_hits": len(red_hits) + (1 if blue_hit else 0)
     }
 
+def score_model_predictions(model_data: Dict[str, Any], actual_result: Dict[str, Any]) -> Dict[str, Any]:
+    """为一个模型（或共识）的全部预测组计算命中，并找出最佳预测组"""
+    predictions_with_hits = []
+    for pred_group in model_data.get("predictions", []):
+        pred_with_hit = pred_group.copy()
+        pred_with_hit["hit_result"] = calculate_hit_result(pred_group, actual_result)
+        predictions_with_hits.append(pred_with_hit)
+
+    # 找出最佳预测组
+    best_pred = max(predictions_with_hits, key=lambda p: p["hit_result"]["total_hits"])
+
+    return {
+        "model_id": model_data.get("model_id"),
+        "model_name": model_data.get("model_name"),
+        "predictions": predictions_with_hits,
+        "best_group": best_pred["group_id"],
+        "best_hit_count": best_pred["hit_result"]["total_hits"]
+    }
+
 def archive_old_prediction(lottery_data: Dict[str, Any]):
     """将旧预测归档到历史记录（如果已开奖）"""
     try:
-        # 检查是否存在旧预测文件
-        if not os.path.exists(AI_PREDICTIONS_FILE):
+        # 读取旧预测
+        if STORE is not None:
+            old_predictions = STORE.load_current(GAME)
+        elif os.path.exists(AI_PREDICTIONS_FILE):
+            with open(AI_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
+                old_predictions = json.load(f)
+        else:
+            old_predictions = None
+
+        if old_predictions is None:
             print("  ℹ️  没有旧预测需要归档\n")
             return
 
-        # 读取旧预测
-        with open(AI_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
-            old_predictions = json.load(f)
-
         old_target_period = old_predictions.get("target_period")
         if not old_target_period:
             print("  ⚠️  旧预测文件格式异常，跳过归档\n")
@@ -350,40 +567,18 @@ def archive_old_prediction(lottery_data: Dict[str, Any]):
             print(f"  ⚠️  找不到期号 {old_target_period} 的开奖结果，跳过归档\n")
             return
 
-        # 读取历史记录文件
-        history_data = {"predictions_history": []}
-        if os.path.exists(PREDICTIONS_HISTORY_FILE):
-            with open(PREDICTIONS_HISTORY_FILE, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
-
-        # 检查该期号是否已存在
-        existing_record = next((r for r in history_data["predictions_history"]
-                               if r["target_period"] == old_target_period), None)
+        # 检查该期号是否已归档（数据库模式下按期号索引查询，JSON 模式下流式查找，都不加载整个历史）
+        if STORE is not None:
+            existing_record = STORE.has_archived(GAME, old_target_period)
+        else:
+            existing_record = find_record(PREDICTIONS_HISTORY_FILE, old_target_period)
 
         if existing_record:
             print(f"  ℹ️  期号 {old_target_period} 已存在于历史记录中\n")
             return
 
         # 为每个模型计算命中结果
-        models_with_hits = []
-        for model_data in old_predictions.get("models", []):
-            # 为每组预测计算命中
-            predictions_with_hits = []
-            for pred_group in model_data.get("predictions", []):
-                pred_with_hit = pred_group.copy()
-                pred_with_hit["hit_result"] = calculate_hit_result(pred_group, actual_result)
-                predictions_with_hits.append(pred_with_hit)
-
-            # 找出最佳预测组
-            best_pred = max(predictions_with_hits, key=lambda p: p["hit_result"]["total_hits"])
-
-            models_with_hits.append({
-                "model_id": model_data.get("model_id"),
-                "model_name": model_data.get("model_name"),
-                "predictions": predictions_with_hits,
-                "best_group": best_pred["group_id"],
-                "best_hit_count": best_pred["hit_result"]["total_hits"]
-            })
+        models_with_hits = [score_model_predictions(m, actual_result) for m in old_predictions.get("models", [])]
 
         # 创建新的历史记录
         new_record = {
@@ -393,12 +588,21 @@ def archive_old_prediction(lottery_data: Dict[str, Any]):
             "models": models_with_hits
         }
 
-        # 插入到历史记录顶部
-        history_data["predictions_history"].insert(0, new_record)
+        # 共识预测与各模型一样计算命中
+        if old_predictions.get("consensus"):
+            consensus = score_model_predictions(old_predictions["consensus"], actual_result)
+            consensus["weights"] = old_predictions["consensus"].get("weights", {})
+            new_record["consensus"] = consensus
 
-        # 保存历史记录
-        with open(PREDICTIONS_HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
+        if STORE is not None:
+            # 写入数据库后重新导出网站使用的历史记录文件
+            STORE.archive_round(GAME, new_record)
+            STORE.export_file(GAME, "archive", PREDICTIONS_HISTORY_FILE)
+        else:
+            # 持锁流式重写并插入到历史记录顶部，期间另一个进程已归档同一期时不重复写入
+            if not prepend_record(PREDICTIONS_HISTORY_FILE, new_record):
+                print(f"  ℹ️  期号 {old_target_period} 已由其他进程归档\n")
+                return
 
         print(f"  ✅ 已将期号 {old_target_period} 的预测归档到历史记录")
         print(f"  📊 归档模型数: {len(models_with_hits)}\n")
@@ -412,18 +616,23 @@ def save_predictions(predictions: Dict[str, Any]):
     try:
         print("💾 保存预测数据...")
 
-        # 创建备份
-        if os.path.exists(AI_PREDICTIONS_FILE):
-            backup_file = AI_PREDICTIONS_FILE.replace(".json", f"_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-            with open(AI_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, ensure_ascii=False, indent=2)
-            print(f"  ✓ 已创建备份: {os.path.basename(backup_file)}")
-
-        # 保存新预测
-        with open(AI_PREDICTIONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(predictions, f, ensure_ascii=False, indent=2)
+        # 比较、快照与写入在同一把文件锁内完成
+        with file_lock(AI_PREDICTIONS_FILE):
+            if json_unchanged(AI_PREDICTIONS_FILE, predictions):
+                print(f"  ℹ️  预测内容没有变化，跳过备份与写入: {AI_PREDICTIONS_FILE}\n")
+                return
+
+            # 创建快照（data/.snapshots/，相同内容只存一份）
+            entry = snapshot_file(AI_PREDICTIONS_FILE)
+            if entry is not None:
+                print(f"  ✓ 已创建快照: {entry['id']}")
+
+            # 保存新预测
+            if STORE is not None:
+                STORE.save_current(GAME, predictions)
+                STORE.export_file(GAME, "current", AI_PREDICTIONS_FILE)
+            else:
+                atomic_write_json(AI_PREDICTIONS_FILE, predictions)
 
         print(f"  ✓ 已保存到: {AI_PREDICTIONS_FILE}\n")
 
@@ -4,15 +4,20 @@
 自动调用 AI 模型生成下期预测数据（每天运行）
 """
 
+import copy
 import json
 import os
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 from datetime import datetime, timedelta, timezone
-from openai import OpenAI
 
 # 北京时间（UTC+8）
 BEIJING_TZ = timezone(timedelta(hours=8))
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from llm_clients import get_client, is_n_unsupported_error, mark_n_unsupported, supports_n
 
 # ==================== 配置区 ====================
 # 每个模型独立的 API Key 和 Base URL（通过环境变量设置）
@@ -28,6 +33,7 @@ MODELS = [
         "model_id": "SSB-Team-001",
         "api_key": os.environ.get("OPENAI_API_KEY"),
         "base_url": os.environ.get("OPENAI_BASE_URL") or "https://api.openai.com/v1",
+        "supports_n": True,
     },
     {
         "id": os.environ.get("ANTHROPIC_MODEL_ID") or "claude-3-5-sonnet-20241022",
@@ -35,6 +41,7 @@ MODELS = [
         "model_id": "team_alpha_arena_v1",
         "api_key": os.environ.get("ANTHROPIC_API_KEY"),
         "base_url": os.environ.get("ANTHROPIC_BASE_URL") or "https://api.anthropic.com/v1",
+        "supports_n": False,
     },
     {
         "id": os.environ.get("GEMINI_MODEL_ID") or "gemini-2.5-flash",
@@ -42,6 +49,7 @@ MODELS = [
         "model_id": "Gemini2.5",
         "api_key": os.environ.get("GEMINI_API_KEY"),
         "base_url": os.environ.get("GEMINI_BASE_URL") or "https://generativelanguage.googleapis.com/v1beta/openai",
+        "supports_n": True,
     },
     {
         "id": os.environ.get("DEEPSEEK_MODEL_ID") or "deepseek-chat",
@@ -49,9 +57,35 @@ MODELS = [
         "model_id": "DeepseekR1",
         "api_key": os.environ.get("DEEPSEEK_API_KEY"),
         "base_url": os.environ.get("DEEPSEEK_BASE_URL") or "https://api.deepseek.com/v1",
+        "supports_n": False,
     },
 ]
 
+def read_samples_per_call() -> int:
+    """读取 AI_SAMPLES_PER_CALL，未设置或不是整数时使用 1"""
+    value = os.environ.get("AI_SAMPLES_PER_CALL") or "1"
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"⚠️  AI_SAMPLES_PER_CALL={value!r} 不是整数，使用默认值 1")
+        return 1
+
+# 每次调用请求的候选预测数（AI_SAMPLES_PER_CALL，默认 1），多于 1 个时在本地择优
+SAMPLES_PER_CALL = read_samples_per_call()
+
+MULTI_CANDIDATE_INSTRUCTION = """
+
+---
+
+## 多候选输出
+
+请一次给出 {samples} 套互不相同的完整预测，返回一个 JSON 数组，数组中每个元素都是上面输出格式中的完整 JSON 对象。
+"""
+
+# 多模型共识（加权集成）配置
+CONSENSUS_MODEL_ID = "Consensus"
+CONSENSUS_MODEL_NAME = "多模型共识"
+
 # 文件路径
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 FC3D_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "fc3d_history.json")
@@ -59,6 +93,16 @@ FC3D_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "fc3d_ai_predictions.js
 FC3D_PREDICTIONS_HISTORY_FILE = os.path.join(SCRIPT_DIR, "data", "fc3d_predictions_history.json")
 PROMPT_FILE = os.path.join(SCRIPT_DIR, "doc", "fc3d_prompt.md")
 
+# 可选的 SQLite 存储（设置环境变量 LOTTERY_DB 时启用，见 fetch_history/lottery_db.py），
+# 启用后读写都经过数据库，上面的 JSON 文件由导出器重新生成；None 表示直接读写 JSON 文件
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+from lottery_db import open_store
+from json_io import write_json_if_changed
+from archive_stream import find_record, prepend_record
+from leaderboard import load_leaderboard_weights
+GAME = "fc3d"
+STORE = open_store()
+
 # ==================== 工具函数 ====================
 
 def load_prompt_template() -> str:
@@ -72,6 +116,8 @@ def load_prompt_template() -> str:
 
 def load_lottery_history() -> Dict[str, Any]:
     """加载历史开奖数据"""
+    if STORE is not None:
+        return STORE.history_document(GAME)
     try:
         with open(FC3D_HISTORY_FILE, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -107,43 +153,73 @@ def extract_json_from_response(response_text: str) -> str:
         text = text[start:end].strip()
     return text
 
-def call_ai_model(model_config: Dict[str, Any], prompt: str) -> Dict[str, Any]:
-    """调用 AI 模型获取预测（使用该模型自己的 api_key 和 base_url）"""
+def call_ai_model(model_config: Dict[str, Any], prompt: str, samples: int = 1) -> List[Dict[str, Any]]:
+    """调用 AI 模型获取预测，返回解析成功的候选预测列表"""
     api_key = model_config.get('api_key')
     base_url = model_config.get('base_url')
     if not api_key:
         raise ValueError(f"模型 {model_config['name']} 未配置 API Key")
 
-    client = OpenAI(api_key=api_key, base_url=base_url)
+    def build_messages(user_prompt: str):
+        return [
+            {
+                "role": "system",
+                "content": "你是一个专业的福彩3D彩票数据分析师。请严格按照要求返回 JSON 格式数据，不要有任何额外的解释或说明。"
+            },
+            {
+                "role": "user",
+                "content": user_prompt
+            }
+        ]
+
+    client = get_client(api_key, base_url)
+    response_texts = None
     try:
-        print(f"  ⏳ 正在调用 {model_config['name']} 模型...")
-
-        response = client.chat.completions.create(
-            model=model_config['id'],
-            messages=[
-                {
-                    "role": "system",
-                    "content": "你是一个专业的福彩3D彩票数据分析师。请严格按照要求返回 JSON 格式数据，不要有任何额外的解释或说明。"
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.7
-        )
+        print(f"  ⏳ 正在调用 {model_config['name']} 模型..." + (f"（{samples} 个候选）" if samples > 1 else ""))
+
+        if samples > 1 and supports_n(model_config):
+            try:
+                response = client.chat.completions.create(
+                    model=model_config['id'],
+                    messages=build_messages(prompt),
+                    temperature=0.7,
+                    n=samples
+                )
+                response_texts = [choice.message.content.strip() for choice in response.choices]
+            except Exception as e:
+                # 只有参数错误才改用单次响应；超时、限流等交给外层按调用失败处理，不重复付费请求
+                if not is_n_unsupported_error(e):
+                    raise
+                print(f"  ℹ️  {model_config['name']} 不支持 n={samples}，改为单次响应返回多套候选: {str(e)}")
+                mark_n_unsupported(model_config['id'])
+
+        if response_texts is None:
+            if samples > 1:
+                prompt = prompt + MULTI_CANDIDATE_INSTRUCTION.format(samples=samples)
+            response = client.chat.completions.create(
+                model=model_config['id'],
+                messages=build_messages(prompt),
+                temperature=0.7
+            )
+            response_texts = [response.choices[0].message.content.strip()]
 
-        response_text = response.choices[0].message.content.strip()
-        json_text = extract_json_from_response(response_text)
-        prediction_data = json.loads(json_text)
+        candidates = []
+        for response_text in response_texts:
+            try:
+                parsed = json.loads(extract_json_from_response(response_text))
+            except json.JSONDecodeError as e:
+                print(f"  ❌ {model_config['name']} JSON 解析失败: {str(e)}")
+                print(f"  原始响应:\n{response_text[:200]}...")
+                continue
+            parsed = parsed if isinstance(parsed, list) else [parsed]
+            candidates.extend(item for item in parsed if isinstance(item, dict))
 
-        print(f"  ✅ {model_config['name']} 预测成功")
-        return prediction_data
+        if not candidates:
+            raise ValueError(f"{model_config['name']} 没有可解析的预测结果")
+
+        print(f"  ✅ {model_config['name']} 预测成功" + (f"，获得 {len(candidates)} 个候选" if samples > 1 else ""))
+        return candidates
 
-    except json.JSONDecodeError as e:
-        print(f"  ❌ {model_config['name']} JSON 解析失败: {str(e)}")
-        print(f"  原始响应:\n{response_text[:200]}...")
-        raise
     except Exception as e:
         print(f"  ❌ {model_config['name']} 调用失败: {str(e)}")
         raise
@@ -209,8 +285,62 @@ def validate_prediction(prediction: Dict[str, Any]) -> bool:
         print(f"    ⚠️  验证出错: {str(e)}")
         return False
 
-def generate_predictions() -> Dict[str, Any]:
-    """生成所有模型的预测"""
+# 各玩法要求的不同数字个数
+PLAY_TYPE_UNIQUE = {"组三": 2, "组六": 3}
+
+def score_candidate(prediction: Dict[str, Any], accepted: List[Dict[str, Any]]) -> float:
+    """
+    候选预测打分（越高越好），需在 validate_prediction 自动修正 play_type 之前调用
+
+    - 玩法合规率（0-10 分）：play_type 合法且与号码形态一致
+    - 组内重叠：5 组两两之间相同位置相同数字的平均个数
+    - 跨模型重叠：与已选定模型各组的平均定位重叠
+    """
+    groups = prediction["predictions"]
+    compliant = 0
+    for g in groups:
+        play_type = g.get("play_type")
+        if play_type in VALID_PLAY_TYPES and PLAY_TYPE_UNIQUE.get(play_type, len(set(g["digits"]))) == len(set(g["digits"])):
+            compliant += 1
+
+    def overlap(a, b):
+        return sum(1 for x, y in zip(a, b) if x == y)
+
+    digits = [g["digits"] for g in groups]
+    pairs = list(combinations(digits, 2))
+    intra_overlap = sum(overlap(a, b) for a, b in pairs) / len(pairs) if pairs else 0.0
+
+    others = [g["digits"] for model in accepted for g in model.get("predictions", [])]
+    cross_overlap = 0.0
+    if others:
+        cross_overlap = sum(overlap(a, b) for a in digits for b in others) / (len(digits) * len(others))
+
+    return compliant / len(groups) * 10 - intra_overlap - cross_overlap
+
+def select_best_candidate(candidates: List[Dict[str, Any]], accepted: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """验证全部候选，返回得分最高的合法候选（已完成 play_type 修正）"""
+    best, best_score = None, None
+    for index, candidate in enumerate(candidates, 1):
+        checked = copy.deepcopy(candidate)
+        if not validate_prediction(checked):
+            continue
+        score = score_candidate(candidate, accepted)
+        if len(candidates) > 1:
+            print(f"    候选 {index}: 得分 {score:.2f}")
+        if best_score is None or score > best_score:
+            best, best_score = checked, score
+    return best
+
+def generate_predictions(lottery_data: Optional[Dict[str, Any]] = None, archive: bool = True,
+                         workers: int = 1) -> Dict[str, Any]:
+    """
+    生成所有模型的预测
+
+    Args:
+        lottery_data: 已加载的历史开奖数据（为空时从文件读取）
+        archive: 是否先归档已开奖的旧预测（流水线中归档是单独的阶段）
+        workers: 并发调用模型的线程数；候选择优仍按 MODELS 顺序进行
+    """
     print("\n" + "="*50)
     print("🎲 福彩3D AI 预测自动生成")
     print("="*50 + "\n")
@@ -223,10 +353,12 @@ def generate_predictions() -> Dict[str, Any]:
         return None
 
     # 加载历史数据
-    lottery_data = load_lottery_history()
+    if lottery_data is None:
+        lottery_data = load_lottery_history()
     
     # 归档旧预测
-    archive_old_prediction(lottery_data)
+    if archive:
+        archive_old_prediction(lottery_data)
 
     # 获取下期信息
     next_draw = lottery_data.get("next_draw", {})
@@ -250,33 +382,42 @@ def generate_predictions() -> Dict[str, Any]:
     prediction_date = get_next_draw_date_fc3d()
     print(f"📅 预测日期: {prediction_date}\n")
 
-    print("🔮 开始生成预测...\n")
-    all_predictions = []
+    active_models = []
     for model_config in MODELS:
-        if not model_config.get('api_key'):
+        if model_config.get('api_key'):
+            active_models.append(model_config)
+        else:
             print(f"  ⚠️  {model_config['name']} 未配置 API Key，跳过\n")
-            continue
-        try:
-            prompt = prompt_template.format(
-                target_period=target_period,
-                target_date=target_date,
-                lottery_history=history_json,
-                prediction_date=prediction_date,
-                model_id=model_config['model_id'],
-                model_name=model_config['name']
-            )
 
-            prediction = call_ai_model(model_config, prompt)
+    def request_candidates(model_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        prompt = prompt_template.format(
+            target_period=target_period,
+            target_date=target_date,
+            lottery_history=history_json,
+            prediction_date=prediction_date,
+            model_id=model_config['model_id'],
+            model_name=model_config['name']
+        )
+        return call_ai_model(model_config, prompt, SAMPLES_PER_CALL)
 
-            if validate_prediction(prediction):
-                all_predictions.append(prediction)
-                print(f"  ✓ 验证通过\n")
-            else:
-                print(f"  ✗ 验证失败，跳过该模型\n")
+    print("🔮 开始生成预测...\n")
+    all_predictions = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(request_candidates, model_config) for model_config in active_models]
+        for model_config, future in zip(active_models, futures):
+            try:
+                candidates = future.result()
+
+                prediction = select_best_candidate(candidates, all_predictions)
+                if prediction:
+                    all_predictions.append(prediction)
+                    print(f"  ✓ 验证通过\n")
+                else:
+                    print(f"  ✗ 验证失败，跳过该模型\n")
 
-        except Exception as e:
-            print(f"  ✗ 处理 {model_config['name']} 失败\n")
-            continue
+            except Exception as e:
+                print(f"  ✗ 处理 {model_config['name']} 失败\n")
+                continue
 
     if not all_predictions:
         print("❌ 没有成功生成任何预测")
@@ -287,9 +428,64 @@ def generate_predictions() -> Dict[str, Any]:
         "target_period": target_period,
         "models": all_predictions
     }
+
+    # 多模型加权共识
+    weights = load_leaderboard_weights([m.get("model_id") for m in all_predictions], GAME, FC3D_PREDICTIONS_HISTORY_FILE, STORE)
+    result["consensus"] = build_consensus(all_predictions, weights)
+    print(f"🗳️  已生成多模型共识（权重: {', '.join(f'{k}={v}' for k, v in weights.items())}）")
     
     return result
 
+def build_consensus(models: List[Dict[str, Any]], weights: Dict[str, float], groups: int = 5) -> Dict[str, Any]:
+    """
+    汇总所有模型的预测组，按位（百/十/个）加权投票生成共识直选号码
+
+    每位数字每被前面的组选用一次，得分减半，以保证各组之间有差异。
+    """
+    position_votes = [Counter() for _ in range(3)]
+    position_weighted = [Counter() for _ in range(3)]
+    digit_votes = Counter()
+    for model in models:
+        weight = weights.get(model.get("model_id"), 1.0)
+        for group in model.get("predictions", []):
+            for pos, digit in enumerate(group["digits"]):
+                position_votes[pos][digit] += 1
+                position_weighted[pos][digit] += weight
+            digit_votes.update(set(group["digits"]))
+
+    used = [Counter() for _ in range(3)]
+    predictions = []
+    for group_id in range(1, groups + 1):
+        digits = []
+        for pos in range(3):
+            votes, weighted = position_votes[pos], position_weighted[pos]
+            digit = min(weighted, key=lambda d: (-weighted[d] * 0.5 ** used[pos][d], -votes[d], d))
+            used[pos][digit] += 1
+            digits.append(digit)
+        predictions.append({
+            "group_id": group_id,
+            "strategy": "加权共识",
+            "play_type": "直选",
+            "digits": digits,
+            "number": "".join(digits),
+            "description": "百十个位加权票: " + " / ".join(
+                f"{d}({position_weighted[pos][d]:.1f}票)" for pos, d in enumerate(digits))
+        })
+
+    def as_dict(counter):
+        return {k: round(v, 4) for k, v in sorted(counter.items())}
+
+    return {
+        "model_id": CONSENSUS_MODEL_ID,
+        "model_name": CONSENSUS_MODEL_NAME,
+        "source_models": [m.get("model_name") for m in models],
+        "weights": weights,
+        "position_votes": [as_dict(c) for c in position_votes],
+        "position_weighted_votes": [as_dict(c) for c in position_weighted],
+        "digit_votes": as_dict(digit_votes),
+        "predictions": predictions
+    }
+
 def calculate_hit_result(prediction_group: Dict[str, Any], actual_result: Dict[str, Any]) -> Dict[str, Any]:
     """计算 FC3D 命中结果（根据 play_type 只显示对应的中奖类型）"""
     pred_digits = prediction_group["digits"]
@@ -350,14 +546,52 @@ def calculate_hit_result(prediction_group: Dict[str, Any], actual_result: Dict[s
         "core_win_types": win_types
     }
 
+def best_group_key(p: Dict[str, Any]) -> int:
+    """最佳组排序键：优先直选，其次核心奖项最多，最后看定位数"""
+    hit = p["hit_result"]
+    score = 0
+    if "直选" in hit["core_win_types"]: score += 1000
+    if "豹子" in hit["core_win_types"]: score += 500
+    if "组选3" in hit["core_win_types"]: score += 100
+    if "组选6" in hit["core_win_types"]: score += 50
+    score += hit["position_hit_count"] * 10
+    score += hit["group_hit_count"]
+    return score
+
+def score_model_predictions(model_data: Dict[str, Any], actual_result: Dict[str, Any]) -> Dict[str, Any]:
+    """为一个模型（或共识）的全部预测组计算命中，并找出最佳预测组"""
+    predictions_with_hits = []
+    for pred_group in model_data.get("predictions", []):
+        pred_with_hit = pred_group.copy()
+        pred_with_hit["hit_result"] = calculate_hit_result(pred_group, actual_result)
+        predictions_with_hits.append(pred_with_hit)
+
+    best_pred = max(predictions_with_hits, key=best_group_key)
+
+    # 简化的最佳命中计数逻辑 for FC3D (定位数)
+    best_hit_cnt = best_pred["hit_result"]["position_hit_count"]
+
+    return {
+        "model_id": model_data.get("model_id"),
+        "model_name": model_data.get("model_name"),
+        "predictions": predictions_with_hits,
+        "best_group": best_pred["group_id"],
+        "best_hit_count": best_hit_cnt
+    }
+
 def archive_old_prediction(lottery_data: Dict[str, Any]):
     """归档旧预测"""
     try:
-        if not os.path.exists(FC3D_PREDICTIONS_FILE):
-            return
+        if STORE is not None:
+            old_predictions = STORE.load_current(GAME)
+            if old_predictions is None:
+                return
+        else:
+            if not os.path.exists(FC3D_PREDICTIONS_FILE):
+                return
 
-        with open(FC3D_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
-            old_predictions = json.load(f)
+            with open(FC3D_PREDICTIONS_FILE, 'r', encoding='utf-8') as f:
+                old_predictions = json.load(f)
 
         old_target_period = old_predictions.get("target_period")
         
@@ -374,50 +608,14 @@ def archive_old_prediction(lottery_data: Dict[str, Any]):
 
         print(f"  📦 旧预测期号 {old_target_period} 已开奖，开始归档...")
 
-        # 读取历史文件
-        history_data = {"predictions_history": []}
-        if os.path.exists(FC3D_PREDICTIONS_HISTORY_FILE):
-            with open(FC3D_PREDICTIONS_HISTORY_FILE, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
-
-        # 检查重复
-        if any(r["target_period"] == old_target_period for r in history_data["predictions_history"]):
+        # 检查重复（数据库模式下按期号索引查询，JSON 模式下流式查找）
+        if (STORE.has_archived(GAME, old_target_period) if STORE is not None else
+                find_record(FC3D_PREDICTIONS_HISTORY_FILE, old_target_period)):
             print(f"  ℹ️  期号 {old_target_period} 已存档\n")
             return
 
         # 计算命中
-        models_with_hits = []
-        for model_data in old_predictions.get("models", []):
-            predictions_with_hits = []
-            for pred_group in model_data.get("predictions", []):
-                pred_with_hit = pred_group.copy()
-                pred_with_hit["hit_result"] = calculate_hit_result(pred_group, actual_result)
-                predictions_with_hits.append(pred_with_hit)
-
-            # 最佳组：优先直选，其次核心奖项最多，最后看定位数
-            def sort_key(p):
-                hit = p["hit_result"]
-                score = 0
-                if "直选" in hit["core_win_types"]: score += 1000
-                if "豹子" in hit["core_win_types"]: score += 500
-                if "组选3" in hit["core_win_types"]: score += 100
-                if "组选6" in hit["core_win_types"]: score += 50
-                score += hit["position_hit_count"] * 10
-                score += hit["group_hit_count"]
-                return score
-
-            best_pred = max(predictions_with_hits, key=sort_key)
-            
-            # 简化的最佳命中计数逻辑 for FC3D (定位数)
-            best_hit_cnt = best_pred["hit_result"]["position_hit_count"]
-
-            models_with_hits.append({
-                "model_id": model_data.get("model_id"),
-                "model_name": model_data.get("model_name"),
-                "predictions": predictions_with_hits,
-                "best_group": best_pred["group_id"],
-                "best_hit_count": best_hit_cnt
-            })
+        models_with_hits = [score_model_predictions(m, actual_result) for m in old_predictions.get("models", [])]
 
         new_record = {
             "prediction_date": old_predictions.get("prediction_date"),
@@ -426,10 +624,20 @@ def archive_old_prediction(lottery_data: Dict[str, Any]):
             "models": models_with_hits
         }
 
-        history_data["predictions_history"].insert(0, new_record)
-
-        with open(FC3D_PREDICTIONS_HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
+        # 共识预测与各模型一样计算命中
+        if old_predictions.get("consensus"):
+            consensus = score_model_predictions(old_predictions["consensus"], actual_result)
+            consensus["weights"] = old_predictions["consensus"].get("weights", {})
+            new_record["consensus"] = consensus
+
+        if STORE is not None:
+            STORE.archive_round(GAME, new_record)
+            STORE.export_file(GAME, "archive", FC3D_PREDICTIONS_HISTORY_FILE)
+        else:
+            # 持锁流式重写并插入到顶部，期间另一个进程已归档同一期时不重复写入
+            if not prepend_record(FC3D_PREDICTIONS_HISTORY_FILE, new_record):
+                print(f"  ℹ️  期号 {old_target_period} 已由其他进程存档\n")
+                return
             
         print(f"  ✅ 归档完成\n")
 
@@ -444,9 +652,15 @@ def save_predictions(predictions: Dict[str, Any]):
              # 简单的覆盖逻辑，不做复杂备份以免文件过多，GitHub 有历史记录
              pass
 
-        with open(FC3D_PREDICTIONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(predictions, f, ensure_ascii=False, indent=2)
+        if STORE is not None:
+            STORE.save_current(GAME, predictions)
+            written = STORE.export_file(GAME, "current", FC3D_PREDICTIONS_FILE)
+        else:
+            written = write_json_if_changed(FC3D_PREDICTIONS_FILE, predictions)
 
+        if not written:
+            print(f"  ℹ️  预测内容没有变化，跳过写入: {FC3D_PREDICTIONS_FILE}\n")
+            return
         print(f"  ✓ 已保存到: {FC3D_PREDICTIONS_FILE}\n")
 
     except Exception as e:
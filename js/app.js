@@ -82,16 +82,23 @@ const MODEL_COLORS = {
     'GPT-5': '#10b981',
     'Claude 4.5': '#8b5cf6',
     'Gemini 2.5': '#3b82f6',
-    'DeepSeek R1': '#f59e0b'
+    'DeepSeek R1': '#f59e0b',
+    [Components.CONSENSUS_MODEL_NAME]: '#4f46e5'
 };
 
+// 历史开奖表格每次渲染的行数
+const HISTORY_TABLE_PAGE_SIZE = 30;
+
 let appState = {
     currentGame: 'ssq',
     dataByGame: {
         ssq: null,
         fc3d: null
     },
-    chartInstances: {}
+    chartInstances: {},
+    historyTableShown: 0,
+    // 图表分析页的统计窗口（dashboard_<game>.json 中 windows 的键）
+    analysisWindow: 'all'
 };
 
 function getCurrentConfig() {
@@ -112,16 +119,6 @@ function setHTML(id, html) {
     if (el) el.innerHTML = html;
 }
 
-function pad2(num) {
-    return String(num).padStart(2, '0');
-}
-
-function getFc3dDigits(drawOrPrediction) {
-    if (Array.isArray(drawOrPrediction?.digits)) return drawOrPrediction.digits;
-    if (typeof drawOrPrediction?.number === 'string') return drawOrPrediction.number.split('');
-    return [];
-}
-
 function calcFc3dType(digits) {
     if (!digits || digits.length !== 3) return '-';
     const uniqueCount = new Set(digits).size;
@@ -299,7 +296,7 @@ function renderModelsGrid() {
         }
     }
 
-    currentData.aiPredictions.models.forEach(model => {
+    Components.getRecordModels(currentData.aiPredictions).forEach(model => {
         const card = Components.createModelCard(model, actualResult, appState.currentGame);
         modelsGridEl.appendChild(card);
     });
@@ -320,7 +317,7 @@ function prepareChartData() {
 
     [...history].reverse().forEach(record => {
         labels.push(record.target_period);
-        record.models.forEach(model => {
+        Components.getRecordModels(record).forEach(model => {
             if (!modelsData[model.model_name]) {
                 modelsData[model.model_name] = [];
             }
@@ -392,6 +389,50 @@ function renderAccuracyCards() {
     currentData.predictionsHistory.predictions_history.forEach(record => {
         containerEl.appendChild(Components.createAccuracyCard(record, appState.currentGame));
     });
+    updateLoadMoreHistoryButton();
+}
+
+function updateLoadMoreHistoryButton() {
+    const buttonEl = document.getElementById('loadMoreHistoryBtn');
+    if (!buttonEl) return;
+
+    const history = getCurrentData()?.predictionsHistory;
+    if (!DataLoader.hasMoreHistory(history)) {
+        buttonEl.style.display = 'none';
+        return;
+    }
+    const nextPage = history.pageIndex.pages[history.loadedPages];
+    const remaining = history.pageIndex.total - history.predictions_history.length;
+    buttonEl.style.display = 'block';
+    buttonEl.disabled = Boolean(history.loading);
+    buttonEl.textContent = history.loading
+        ? '加载中...'
+        : `加载更早的记录（${nextPage.year || ''} 年 ${nextPage.count} 期，剩余 ${remaining} 期）`;
+}
+
+async function loadMoreHistory() {
+    const gameType = appState.currentGame;
+    const history = getCurrentData()?.predictionsHistory;
+    if (!history || history.loading) return;
+
+    history.loading = true;
+    updateLoadMoreHistoryButton();
+    try {
+        const records = await DataLoader.loadMoreHistory(gameType, history);
+        // 加载期间切换了彩种时，只保留数据，不渲染到当前页面
+        if (appState.currentGame === gameType) {
+            const containerEl = document.getElementById('accuracyCardsContainer');
+            records.forEach(record => {
+                containerEl?.appendChild(Components.createAccuracyCard(record, gameType));
+            });
+            renderAccuracyChart();
+        }
+    } catch (error) {
+        alert('历史记录加载失败，请稍后重试');
+    } finally {
+        history.loading = false;
+        if (appState.currentGame === gameType) updateLoadMoreHistoryButton();
+    }
 }
 
 function renderHistoryTable() {
@@ -402,10 +443,27 @@ function renderHistoryTable() {
     if (!tableBodyEl) return;
 
     tableBodyEl.innerHTML = '';
+    appState.historyTableShown = 0;
+    showMoreDraws();
+}
+
+function showMoreDraws() {
+    const draws = getCurrentData()?.lotteryHistory?.data || [];
+    const tableBodyEl = document.getElementById('historyTableBody');
+    if (!tableBodyEl) return;
 
-    currentData.lotteryHistory.data.forEach(draw => {
+    const end = Math.min(appState.historyTableShown + HISTORY_TABLE_PAGE_SIZE, draws.length);
+    draws.slice(appState.historyTableShown, end).forEach(draw => {
         tableBodyEl.appendChild(Components.createHistoryTableRow(draw, appState.currentGame));
     });
+    appState.historyTableShown = end;
+
+    const buttonEl = document.getElementById('showMoreDrawsBtn');
+    if (buttonEl) {
+        const remaining = draws.length - end;
+        buttonEl.style.display = remaining > 0 ? 'block' : 'none';
+        buttonEl.textContent = `显示更多开奖（剩余 ${remaining} 期）`;
+    }
 }
 
 function renderHistoryTab() {
@@ -414,114 +472,54 @@ function renderHistoryTab() {
     renderHistoryTable();
 }
 
-function renderStatisticsCards() {
-    const currentData = getCurrentData();
-    const draws = currentData?.lotteryHistory?.data || [];
-    if (!draws.length) return;
-
-    setText('statTotalDraws', `${draws.length} 期`);
-
-    if (appState.currentGame === 'fc3d') {
-        const digitFrequency = {};
-        const hundredFrequency = {};
-        let totalSum = 0;
-
-        for (let i = 0; i <= 9; i++) {
-            digitFrequency[String(i)] = 0;
-            hundredFrequency[String(i)] = 0;
-        }
-
-        draws.forEach(draw => {
-            const digits = getFc3dDigits(draw);
-            if (digits.length !== 3) return;
-
-            digits.forEach(d => {
-                digitFrequency[d] = (digitFrequency[d] || 0) + 1;
-            });
-
-            hundredFrequency[digits[0]] = (hundredFrequency[digits[0]] || 0) + 1;
-            totalSum += digits.reduce((sum, d) => sum + parseInt(d, 10), 0);
-        });
+function getDashboardWindow() {
+    const dashboard = getCurrentData()?.dashboard;
+    if (!dashboard?.windows) return null;
+    return dashboard.windows[appState.analysisWindow] || dashboard.windows[dashboard.default_window];
+}
 
-        const hottestDigit = Object.entries(digitFrequency).sort((a, b) => b[1] - a[1])[0];
-        const hottestHundred = Object.entries(hundredFrequency).sort((a, b) => b[1] - a[1])[0];
-        const avgSum = Math.round(totalSum / draws.length);
+function renderWindowSelect() {
+    const selectEl = document.getElementById('analysisWindowSelect');
+    const dashboard = getCurrentData()?.dashboard;
+    if (!selectEl) return;
 
-        setText('statHottestRed', `${hottestDigit[0]} (${hottestDigit[1]}次)`);
-        setText('statHottestBlue', `${hottestHundred[0]} (${hottestHundred[1]}次)`);
-        setText('statAvgSum', String(avgSum));
+    if (!dashboard?.windows) {
+        selectEl.style.display = 'none';
         return;
     }
-
-    const redFrequency = {};
-    const blueFrequency = {};
-    let totalSum = 0;
-
-    for (let i = 1; i <= 33; i++) {
-        redFrequency[pad2(i)] = 0;
-    }
-    for (let i = 1; i <= 16; i++) {
-        blueFrequency[pad2(i)] = 0;
+    if (!dashboard.windows[appState.analysisWindow]) {
+        appState.analysisWindow = dashboard.default_window;
     }
 
-    draws.forEach(draw => {
-        (draw.red_balls || []).forEach(ball => {
-            redFrequency[ball] = (redFrequency[ball] || 0) + 1;
-        });
-        blueFrequency[draw.blue_ball] = (blueFrequency[draw.blue_ball] || 0) + 1;
-        totalSum += (draw.red_balls || []).reduce((acc, ball) => acc + parseInt(ball, 10), 0);
+    selectEl.style.display = '';
+    selectEl.innerHTML = '';
+    Object.entries(dashboard.windows).forEach(([key, windowData]) => {
+        const option = document.createElement('option');
+        option.value = key;
+        option.textContent = key === 'all' ? `全部 ${windowData.draws} 期` : `最近 ${key} 期`;
+        option.selected = key === appState.analysisWindow;
+        selectEl.appendChild(option);
     });
+}
 
-    const hottestRed = Object.entries(redFrequency).sort((a, b) => b[1] - a[1])[0];
-    const hottestBlue = Object.entries(blueFrequency).sort((a, b) => b[1] - a[1])[0];
-    const avgSum = Math.round(totalSum / draws.length);
+function renderStatisticsCards() {
+    const windowData = getDashboardWindow();
+    if (!windowData) return;
 
-    setText('statHottestRed', `${hottestRed[0]} (${hottestRed[1]}次)`);
-    setText('statHottestBlue', `${hottestBlue[0]} (${hottestBlue[1]}次)`);
+    const { hottest, hottest_secondary: hottestSecondary, avg_sum: avgSum } = windowData.stats;
+    setText('statTotalDraws', `${windowData.draws} 期`);
+    setText('statHottestRed', `${hottest.label} (${hottest.count}次)`);
+    setText('statHottestBlue', `${hottestSecondary.label} (${hottestSecondary.count}次)`);
     setText('statAvgSum', String(avgSum));
 }
 
 function renderFrequencyChart() {
-    const currentData = getCurrentData();
-    const draws = currentData?.lotteryHistory?.data || [];
+    const windowData = getDashboardWindow();
     const chartEl = document.getElementById('frequencyChart');
-    if (!draws.length || !chartEl) return;
+    if (!windowData || !chartEl) return;
 
-    let labels = [];
-    let data = [];
-    let color = '#fca5a5';
-
-    if (appState.currentGame === 'fc3d') {
-        const frequency = {};
-        for (let i = 0; i <= 9; i++) {
-            frequency[String(i)] = 0;
-        }
-
-        draws.forEach(draw => {
-            const digits = getFc3dDigits(draw);
-            digits.forEach(d => {
-                frequency[d] = (frequency[d] || 0) + 1;
-            });
-        });
-
-        labels = Object.keys(frequency);
-        data = labels.map(label => frequency[label]);
-        color = '#fb7185';
-    } else {
-        const frequency = {};
-        for (let i = 1; i <= 33; i++) {
-            frequency[pad2(i)] = 0;
-        }
-
-        draws.forEach(draw => {
-            (draw.red_balls || []).forEach(ball => {
-                frequency[ball] = (frequency[ball] || 0) + 1;
-            });
-        });
-
-        labels = Object.keys(frequency).sort();
-        data = labels.map(label => frequency[label]);
-    }
+    const { labels, data } = windowData.frequency;
+    const color = appState.currentGame === 'fc3d' ? '#fb7185' : '#fca5a5';
 
     createOrReplaceChart('frequencyChart', chartEl, {
         type: 'bar',
@@ -541,44 +539,12 @@ function renderFrequencyChart() {
 }
 
 function renderSecondaryFrequencyChart() {
-    const currentData = getCurrentData();
-    const draws = currentData?.lotteryHistory?.data || [];
+    const windowData = getDashboardWindow();
     const chartEl = document.getElementById('blueFrequencyChart');
-    if (!draws.length || !chartEl) return;
-
-    let labels = [];
-    let data = [];
-    let color = '#93c5fd';
+    if (!windowData || !chartEl) return;
 
-    if (appState.currentGame === 'fc3d') {
-        const frequency = {};
-        for (let i = 0; i <= 9; i++) {
-            frequency[String(i)] = 0;
-        }
-
-        draws.forEach(draw => {
-            const digits = getFc3dDigits(draw);
-            if (digits[0] !== undefined) {
-                frequency[digits[0]] = (frequency[digits[0]] || 0) + 1;
-            }
-        });
-
-        labels = Object.keys(frequency);
-        data = labels.map(label => frequency[label]);
-        color = '#60a5fa';
-    } else {
-        const frequency = {};
-        for (let i = 1; i <= 16; i++) {
-            frequency[pad2(i)] = 0;
-        }
-
-        draws.forEach(draw => {
-            frequency[draw.blue_ball] = (frequency[draw.blue_ball] || 0) + 1;
-        });
-
-        labels = Object.keys(frequency).sort();
-        data = labels.map(label => frequency[label]);
-    }
+    const { labels, data } = windowData.secondary_frequency;
+    const color = appState.currentGame === 'fc3d' ? '#60a5fa' : '#93c5fd';
 
     createOrReplaceChart('blueFrequencyChart', chartEl, {
         type: 'bar',
@@ -598,33 +564,11 @@ function renderSecondaryFrequencyChart() {
 }
 
 function renderOddEvenChart() {
-    const currentData = getCurrentData();
-    const draws = currentData?.lotteryHistory?.data || [];
+    const windowData = getDashboardWindow();
     const chartEl = document.getElementById('oddEvenChart');
-    if (!draws.length || !chartEl) return;
-
-    const ratioCount = {};
+    if (!windowData || !chartEl) return;
 
-    draws.forEach(draw => {
-        let numbers = [];
-        if (appState.currentGame === 'fc3d') {
-            numbers = getFc3dDigits(draw);
-        } else {
-            numbers = draw.red_balls || [];
-        }
-
-        const oddCount = numbers.filter(ball => parseInt(ball, 10) % 2 === 1).length;
-        const evenCount = numbers.length - oddCount;
-        const ratio = `${oddCount}:${evenCount}`;
-        ratioCount[ratio] = (ratioCount[ratio] || 0) + 1;
-    });
-
-    const commonRatios = appState.currentGame === 'fc3d'
-        ? ['0:3', '1:2', '2:1', '3:0']
-        : ['0:6', '1:5', '2:4', '3:3', '4:2', '5:1', '6:0'];
-
-    const labels = commonRatios.filter(r => ratioCount[r]);
-    const data = labels.map(label => ratioCount[label] || 0);
+    const { labels, data } = windowData.odd_even;
 
     createOrReplaceChart('oddEvenChart', chartEl, {
         type: 'doughnut',
@@ -651,22 +595,11 @@ function renderOddEvenChart() {
 }
 
 function renderSumTrendChart() {
-    const currentData = getCurrentData();
-    const draws = currentData?.lotteryHistory?.data || [];
+    const windowData = getDashboardWindow();
     const chartEl = document.getElementById('sumTrendChart');
-    if (!draws.length || !chartEl) return;
-
-    const recentDraws = draws.slice(0, 30).reverse();
-    const labels = recentDraws.map(draw => draw.period);
-
-    const sums = recentDraws.map(draw => {
-        if (appState.currentGame === 'fc3d') {
-            return getFc3dDigits(draw).reduce((acc, n) => acc + parseInt(n, 10), 0);
-        }
-        return (draw.red_balls || []).reduce((acc, n) => acc + parseInt(n, 10), 0);
-    });
+    if (!windowData || !chartEl) return;
 
-    const avgSum = sums.reduce((a, b) => a + b, 0) / sums.length;
+    const { labels, data: sums, average } = windowData.sum_trend;
 
     const yRange = appState.currentGame === 'fc3d'
         ? { beginAtZero: true, min: 0, max: 27 }
@@ -690,7 +623,7 @@ function renderSumTrendChart() {
                 },
                 {
                     label: '平均值',
-                    data: Array(sums.length).fill(avgSum),
+                    data: Array(sums.length).fill(average),
                     borderColor: '#94a3b8',
                     borderWidth: 2,
                     borderDash: [5, 5],
@@ -709,45 +642,14 @@ function renderSumTrendChart() {
 }
 
 function renderZoneDistributionChart() {
-    const currentData = getCurrentData();
-    const draws = currentData?.lotteryHistory?.data || [];
+    const windowData = getDashboardWindow();
     const chartEl = document.getElementById('zoneDistributionChart');
-    if (!draws.length || !chartEl) return;
+    if (!windowData || !chartEl) return;
 
-    let labels = [];
-    let data = [];
-    let colors = [];
-    let stepSize = 10;
-
-    if (appState.currentGame === 'fc3d') {
-        const typeCount = { '豹子': 0, '组三': 0, '组六': 0 };
-
-        draws.forEach(draw => {
-            const digits = getFc3dDigits(draw);
-            const type = draw.type || calcFc3dType(digits);
-            typeCount[type] = (typeCount[type] || 0) + 1;
-        });
-
-        labels = Object.keys(typeCount);
-        data = Object.values(typeCount);
-        colors = ['#fda4af', '#c4b5fd', '#93c5fd'];
-        stepSize = 5;
-    } else {
-        const zones = { '01-11': 0, '12-22': 0, '23-33': 0 };
-
-        draws.forEach(draw => {
-            (draw.red_balls || []).forEach(ball => {
-                const num = parseInt(ball, 10);
-                if (num >= 1 && num <= 11) zones['01-11'] += 1;
-                else if (num >= 12 && num <= 22) zones['12-22'] += 1;
-                else if (num >= 23 && num <= 33) zones['23-33'] += 1;
-            });
-        });
-
-        labels = Object.keys(zones);
-        data = Object.values(zones);
-        colors = ['#fca5a5', '#93c5fd', '#d8b4fe'];
-    }
+    const { labels, data } = windowData.zones;
+    const isFc3d = appState.currentGame === 'fc3d';
+    const colors = isFc3d ? ['#fda4af', '#c4b5fd', '#93c5fd'] : ['#fca5a5', '#93c5fd', '#d8b4fe'];
+    const stepSize = isFc3d ? 5 : 10;
 
     createOrReplaceChart('zoneDistributionChart', chartEl, {
         type: 'bar',
@@ -770,6 +672,7 @@ function renderZoneDistributionChart() {
 }
 
 function renderAllAnalysisCharts() {
+    renderWindowSelect();
     renderStatisticsCards();
     renderFrequencyChart();
     renderSecondaryFrequencyChart();
@@ -839,6 +742,13 @@ function setupEventListeners() {
     switchButtons.forEach(btn => {
         btn.addEventListener('click', () => switchGame(btn.dataset.game));
     });
+
+    document.getElementById('loadMoreHistoryBtn')?.addEventListener('click', loadMoreHistory);
+    document.getElementById('analysisWindowSelect')?.addEventListener('change', event => {
+        appState.analysisWindow = event.target.value;
+        renderAllAnalysisCharts();
+    });
+    document.getElementById('showMoreDrawsBtn')?.addEventListener('click', showMoreDraws);
 }
 
 function hideLoadingScreen() {
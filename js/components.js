@@ -4,6 +4,17 @@
  */
 
 const Components = {
+    // 与 generate_*_prediction.py 中的 CONSENSUS_MODEL_NAME 一致
+    CONSENSUS_MODEL_NAME: '多模型共识',
+
+    /**
+     * 预测文件或归档记录中参与展示与计分的全部模型：各模型之后附上多模型共识（如有）
+     */
+    getRecordModels(record) {
+        const models = record?.models || [];
+        return record?.consensus ? [...models, record.consensus] : models;
+    },
+
     createLotteryBall(number, color, size = 'md', isHit = false) {
         const ball = document.createElement('div');
         ball.className = `lottery-ball ${color} size-${size}${isHit ? ' hit' : ''}`;
@@ -18,6 +29,7 @@ const Components = {
     },
 
     getModelHeaderClass(modelName) {
+        if (modelName === this.CONSENSUS_MODEL_NAME) return 'model-header-consensus';
         if (modelName.includes('GPT')) return 'model-header-gpt';
         if (modelName.includes('Claude')) return 'model-header-claude';
         if (modelName.includes('DeepSeek')) return 'model-header-deepseek';
@@ -417,9 +429,10 @@ const Components = {
         const hitsList = document.createElement('div');
         hitsList.className = 'model-hits-list';
 
-        record.models.forEach((model, index) => {
+        const models = this.getRecordModels(record);
+        models.forEach((model, index) => {
             hitsList.appendChild(
-                this.createModelHitItem(model, index + 1, index === record.models.length - 1, gameType, result)
+                this.createModelHitItem(model, index + 1, index === models.length - 1, gameType, result)
             );
         });
 
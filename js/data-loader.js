@@ -1,18 +1,26 @@
 /**
  * 数据加载模块
  * 负责按彩种加载历史开奖、AI预测和历史命中数据
+ *
+ * 历史命中数据按分页加载：首屏只请求 data/history/<game>/index.json 与最近若干期的 hot.json，
+ * 更早的年份分片由 loadMoreHistory 按索引顺序逐页追加（分页由 build_artifacts.py 生成）。
+ * 图表分析页的统计数据由 dashboard.py 预先算好（dashboard_<game>.json），浏览器只负责绑定。
  */
 
 const GAME_FILES = {
     ssq: {
         history: './data/lottery_history.json',
         predictions: './data/ai_predictions.json',
-        historyPredictions: './data/predictions_history.json'
+        historyPredictions: './data/predictions_history.json',
+        historyPages: './data/history/ssq/',
+        dashboard: './data/dashboard_ssq.json'
     },
     fc3d: {
         history: './data/fc3d_history.json',
         predictions: './data/fc3d_ai_predictions.json',
-        historyPredictions: './data/fc3d_predictions_history.json'
+        historyPredictions: './data/fc3d_predictions_history.json',
+        historyPages: './data/history/fc3d/',
+        dashboard: './data/dashboard_fc3d.json'
     }
 };
 
@@ -53,31 +61,93 @@ const DataLoader = {
         }
     },
 
-    async loadPredictionsHistory(gameType = 'ssq') {
+    async loadDashboard(gameType = 'ssq') {
         const game = this.normalizeGameType(gameType);
         try {
-            const data = await this.fetchJson(GAME_FILES[game].historyPredictions);
-            console.log(`[${game}] 历史预测对比数据加载成功`, data);
+            const data = await this.fetchJson(GAME_FILES[game].dashboard);
+            console.log(`[${game}] 图表统计数据加载成功`, data);
             return data;
+        } catch (error) {
+            // 图表统计缺失时只影响图表分析页，不阻塞其他内容
+            console.error(`[${game}] 加载图表统计数据失败:`, error);
+            return null;
+        }
+    },
+
+    async fetchHistoryPage(game, page) {
+        // 摘要随内容变化，旧年份的分片可以一直使用浏览器缓存
+        const data = await this.fetchJson(`${GAME_FILES[game].historyPages}${page.file}?v=${page.digest}`);
+        return data.predictions_history || [];
+    },
+
+    /**
+     * 返回 { predictions_history, pageIndex, loadedPages }：
+     * predictions_history 为已加载的记录（期号降序），loadedPages 为已加载的分页数
+     */
+    async loadPredictionsHistory(gameType = 'ssq') {
+        const game = this.normalizeGameType(gameType);
+        let pageIndex = null;
+        try {
+            pageIndex = await this.fetchJson(`${GAME_FILES[game].historyPages}index.json`);
+        } catch (error) {
+            console.warn(`[${game}] 没有历史分页索引，加载完整归档`, error);
+        }
+
+        try {
+            if (!pageIndex) {
+                const data = await this.fetchJson(GAME_FILES[game].historyPredictions);
+                console.log(`[${game}] 历史预测对比数据加载成功`, data);
+                return { ...data, pageIndex: null, loadedPages: 0 };
+            }
+
+            const firstPage = pageIndex.pages[0];
+            const records = firstPage ? await this.fetchHistoryPage(game, firstPage) : [];
+            console.log(`[${game}] 历史预测对比数据加载成功（${records.length}/${pageIndex.total} 期）`);
+            return { predictions_history: records, pageIndex, loadedPages: firstPage ? 1 : 0 };
         } catch (error) {
             console.error(`[${game}] 加载历史预测对比数据失败:`, error);
             throw error;
         }
     },
 
+    hasMoreHistory(history) {
+        return Boolean(history?.pageIndex && history.loadedPages < history.pageIndex.pages.length);
+    },
+
+    /**
+     * 加载下一个分页并追加到 history.predictions_history，返回新加载的记录
+     */
+    async loadMoreHistory(gameType, history) {
+        if (!this.hasMoreHistory(history)) return [];
+        const game = this.normalizeGameType(gameType);
+        const page = history.pageIndex.pages[history.loadedPages];
+        try {
+            const records = await this.fetchHistoryPage(game, page);
+            history.predictions_history.push(...records);
+            history.loadedPages += 1;
+            console.log(`[${game}] 已加载历史分页 ${page.file}（${records.length} 期）`);
+            return records;
+        } catch (error) {
+            console.error(`[${game}] 加载历史分页 ${page.file} 失败:`, error);
+            throw error;
+        }
+    },
+
     async loadAllData(gameType = 'ssq') {
         const game = this.normalizeGameType(gameType);
         try {
-            const [lotteryHistory, aiPredictions, predictionsHistory] = await Promise.all([
+            const [lotteryHistory, aiPredictions, predictionsHistory, dashboard] = await Promise.all([
                 this.loadLotteryHistory(game),
                 this.loadPredictions(game),
-                this.loadPredictionsHistory(game)
+                this.loadPredictionsHistory(game),
+                this.loadDashboard(game)
             ]);
 
             return {
                 lotteryHistory,
                 aiPredictions,
-                predictionsHistory
+                predictionsHistory,
+                dashboard
             };
         } catch (error) {
             console.error(`[${game}] 加载数据失败:`, error);
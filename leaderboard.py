@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+多模型共识的投票权重（两个预测生成脚本共用）
+
+每个模型的权重取其最近 LEADERBOARD_WINDOW 期归档记录中最佳命中数的平均值，再归一化为均值 1：
+- 没有历史记录的新模型取已有模型平均值的平均
+- 平均命中为 0 的模型取下限 MIN_MEAN_HITS，而不是退回平均值（否则从未命中的模型反而获得平均权重）
+"""
+
+import os
+import sys
+from itertools import islice
+from typing import Dict, List
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 抓取脚本按同目录方式导入
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+from archive_stream import iter_records
+
+LEADERBOARD_WINDOW = 30  # 计算模型权重时参考的最近归档期数
+MIN_MEAN_HITS = 0.05     # 平均命中数的下限，从未命中的模型保留很小的投票权
+
+
+def model_weights(hits: Dict[str, List[int]], model_ids: List[str]) -> Dict[str, float]:
+    """
+    由各模型的历史最佳命中数 {model_id: [best_hit_count, ...]} 计算 model_ids 的投票权重（均值归一为 1）
+    """
+    means = {mid: sum(v) / len(v) for mid, v in hits.items() if v}
+    default = sum(means.values()) / len(means) if means else 1.0
+    raw = {mid: max(means.get(mid, default), MIN_MEAN_HITS) for mid in model_ids}
+    scale = sum(raw.values()) / len(raw) if raw else 1.0
+    return {mid: round(w / scale, 4) for mid, w in raw.items()}
+
+
+def recent_model_hits(history_file: str, window: int = LEADERBOARD_WINDOW) -> Dict[str, List[int]]:
+    """读取归档文件最近 window 期中各模型的最佳命中数 {model_id: [best_hit_count, ...]}"""
+    hits: Dict[str, List[int]] = {}
+    if not os.path.exists(history_file):
+        return hits
+    for record in islice(iter_records(history_file), window):
+        for model in record.get("models", []):
+            hits.setdefault(model.get("model_id"), []).append(model.get("best_hit_count", 0))
+    return hits
+
+
+def load_leaderboard_weights(model_ids: List[str], game: str, history_file: str, store=None,
+                             window: int = LEADERBOARD_WINDOW) -> Dict[str, float]:
+    """
+    按最近 window 期各模型的平均最佳命中数计算投票权重
+
+    数据库模式（store 不为 None）下按模型索引直接查询，否则逐条读取归档文件；
+    读取失败时使用等权投票。
+    """
+    try:
+        hits = store.recent_model_hits(game, window) if store is not None else recent_model_hits(history_file, window)
+    except Exception as e:
+        print(f"  ⚠️  读取历史命中记录失败，使用等权投票: {str(e)}")
+        hits = {}
+    return model_weights(hits, model_ids)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+共享的 LLM 客户端注册表
+
+同一 (api_key, base_url) 只创建一个 OpenAI 客户端，双色球与福彩3D 的预测脚本
+（以及一体化流水线中的并发调用）复用同一个客户端及其 HTTP 连接池。
+
+不支持 n 参数（一次返回多个候选）的模型记录在 data/llm_capabilities.json，
+以后的运行直接改用单次响应返回多套候选，不再先发一次注定失败的付费请求。
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from openai import BadRequestError, OpenAI
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CAPABILITIES_FILE = os.path.join(SCRIPT_DIR, "data", "llm_capabilities.json")
+
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+from json_io import update_json
+
+# 参数校验错误信息中单独出现的 n（如 "Unsupported parameter: 'n'"、"n is not supported"）
+N_PARAM_RE = re.compile(r"(?<![\w-])n(?![\w-])")
+
+_clients: Dict[Tuple[str, Optional[str]], OpenAI] = {}
+_lock = threading.Lock()
+
+
+def get_client(api_key: str, base_url: Optional[str] = None) -> OpenAI:
+    """返回 (api_key, base_url) 对应的共享客户端，不存在时创建"""
+    key = (api_key, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(api_key=api_key, base_url=base_url)
+            _clients[key] = client
+        return client
+
+
+def registry_size() -> int:
+    """已创建的客户端数量"""
+    with _lock:
+        return len(_clients)
+
+
+def load_n_unsupported(path: Optional[str] = None) -> set:
+    """已确认不支持 n 参数的模型 ID"""
+    try:
+        with open(path or CAPABILITIES_FILE, 'r', encoding='utf-8') as f:
+            return set(json.load(f).get("n_unsupported", []))
+    except (OSError, ValueError):
+        return set()
+
+
+def supports_n(model_config: Dict[str, Any], path: Optional[str] = None) -> bool:
+    """模型配置声明支持 n 参数，且没有被记录为不支持"""
+    return bool(model_config.get("supports_n")) and model_config["id"] not in load_n_unsupported(path)
+
+
+def is_n_unsupported_error(error: Exception) -> bool:
+    """API 以参数错误（400）拒绝了 n 参数；超时、限流、鉴权与 5xx 等其他错误不算"""
+    return isinstance(error, BadRequestError) and bool(N_PARAM_RE.search(str(error)))
+
+
+def mark_n_unsupported(model_id: str, path: Optional[str] = None) -> None:
+    """记录模型不支持 n 参数（持锁读改写）"""
+    def add(data):
+        if model_id in data["n_unsupported"]:
+            return False
+        data["n_unsupported"] = sorted(data["n_unsupported"] + [model_id])
+        return True
+
+    update_json(path or CAPABILITIES_FILE, add, default={"n_unsupported": []})
@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+"""
+开奖记录、预测组与命中结果的紧凑类型（__slots__ 记录 + 查表编解码）
+
+JSON 中的号码都是字符串（"red_balls": ["03", ...]、"digits": ["2", "6", "1"]），
+直接以字典形式在内存中流转时每个号码、日期都是独立的字符串对象。这里的记录类型：
+- 号码存为 bytes（每个号码 1 字节），期号存为 int，日期存为 yyyymmdd 整数
+- 可由号码推出的字段（福彩3D 的 number/sum/span/type、命中个数等）不存储，编码时再计算
+- 策略名、玩法、中奖类型等重复出现的字符串用 sys.intern 共享
+- from_dict / to_dict 与现有 JSON 结构互转（to_dict 按各文件中的键顺序输出），
+  号码与字符串之间用预先生成的查找表转换，不做 int() 与补零格式化
+- 开奖记录按值比较、可哈希；预测组与命中结果按值比较，但不可哈希（命中结果在开奖后才填入）
+
+analyze_significance.py 逐条读取历史归档时用这些类型计算命中。
+
+使用方法：
+    python3 lottery_records.py                  # 校验 data/ 下全部文件的往返转换
+    python3 lottery_records.py --bench          # 10 万条合成记录的内存与编解码吞吐对比
+    python3 lottery_records.py --bench --count 300000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, List, Optional, Iterable
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, "data")
+
+# 归档流式读取按同目录方式导入
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+from archive_stream import iter_records
+
+# 号码查找表："01" → 1、1 → "01"；福彩3D "7" → 7、7 → "7"
+_BALL = {f"{n:02d}": n for n in range(1, 34)}
+_BALL_TEXT = [f"{n:02d}" for n in range(34)]
+_DIGIT = {str(d): d for d in range(10)}
+_DIGIT_TEXT = [str(d) for d in range(10)]
+_FC3D_TYPES = {1: "豹子", 2: "组三", 3: "组六"}
+
+_intern = sys.intern
+
+
+def _parse_date(text: str) -> int:
+    """'2026-03-22' → 20260322"""
+    return int(text[:4]) * 10000 + int(text[5:7]) * 100 + int(text[8:10])
+
+
+def _format_date(value: int) -> str:
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+
+# ==================== 开奖记录 ====================
+
+class SSQDraw:
+    """双色球一期开奖：reds 为 6 字节红球（与 JSON 顺序相同），blue 为蓝球"""
+
+    __slots__ = ("period", "reds", "blue", "date")
+
+    def __init__(self, period: int, reds: bytes, blue: int, date: int):
+        self.period = period
+        self.reds = reds
+        self.blue = blue
+        self.date = date
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any]) -> "SSQDraw":
+        return cls(int(row["period"]), bytes(map(_BALL.__getitem__, row["red_balls"])),
+                   _BALL[row["blue_ball"]], _parse_date(row["date"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "period": f"{self.period:05d}",
+            "red_balls": list(map(_BALL_TEXT.__getitem__, self.reds)),
+            "blue_ball": _BALL_TEXT[self.blue],
+            "date": _format_date(self.date),
+        }
+
+    def __eq__(self, other):
+        return (type(other) is SSQDraw and self.period == other.period and self.reds == other.reds
+                and self.blue == other.blue and self.date == other.date)
+
+    def __hash__(self):
+        return hash((self.period, self.reds, self.blue, self.date))
+
+    def __repr__(self):
+        return f"SSQDraw({self.period:05d}, {list(self.reds)}, {self.blue})"
+
+
+class FC3DDraw:
+    """福彩3D 一期开奖：digits 为百、十、个位 3 字节；number/sum/span/type 由号码推出"""
+
+    __slots__ = ("period", "digits", "date")
+
+    def __init__(self, period: int, digits: bytes, date: int):
+        self.period = period
+        self.digits = digits
+        self.date = date
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any]) -> "FC3DDraw":
+        return cls(int(row["period"]), bytes(map(_DIGIT.__getitem__, row["digits"])), _parse_date(row["date"]))
+
+    @property
+    def number(self) -> str:
+        return "".join(map(_DIGIT_TEXT.__getitem__, self.digits))
+
+    @property
+    def sum(self) -> int:
+        return sum(self.digits)
+
+    @property
+    def span(self) -> int:
+        return max(self.digits) - min(self.digits)
+
+    @property
+    def type(self) -> str:
+        return _FC3D_TYPES[len(set(self.digits))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        digits = self.digits
+        return {
+            "period": f"{self.period:07d}",
+            "digits": list(map(_DIGIT_TEXT.__getitem__, digits)),
+            "number": self.number,
+            "sum": sum(digits),
+            "span": max(digits) - min(digits),
+            "type": _FC3D_TYPES[len(set(digits))],
+            "date": _format_date(self.date),
+        }
+
+    def __eq__(self, other):
+        return (type(other) is FC3DDraw and self.period == other.period and self.digits == other.digits
+                and self.date == other.date)
+
+    def __hash__(self):
+        return hash((self.period, self.digits, self.date))
+
+    def __repr__(self):
+        return f"FC3DDraw({self.period:07d}, {self.number})"
+
+
+# ==================== 命中结果 ====================
+
+class SSQHit:
+    """双色球单组命中：red_hits 为命中的红球（按预测顺序），命中个数与总命中数由此推出"""
+
+    __slots__ = ("red_hits", "blue_hit")
+
+    def __init__(self, red_hits: bytes, blue_hit: bool):
+        self.red_hits = red_hits
+        self.blue_hit = blue_hit
+
+    @classmethod
+    def from_dict(cls, hit: Dict[str, Any]) -> "SSQHit":
+        return cls(bytes(map(_BALL.__getitem__, hit["red_hits"])), hit["blue_hit"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        count = len(self.red_hits)
+        return {
+            "red_hits": list(map(_BALL_TEXT.__getitem__, self.red_hits)),
+            "red_hit_count": count,
+            "blue_hit": self.blue_hit,
+            "total_hits": count + (1 if self.blue_hit else 0),
+        }
+
+    def __eq__(self, other):
+        return type(other) is SSQHit and self.red_hits == other.red_hits and self.blue_hit == other.blue_hit
+
+    __hash__ = None
+
+
+class FC3DHit:
+    """
+    福彩3D 单组命中：positions 为定位命中的位置下标；组选命中数、总命中数与中奖类型照原样保存
+    （历史文件中这几项的计算口径不止一种，不能由号码推出）
+    """
+
+    __slots__ = ("positions", "group_hit_count", "total_hits", "win_types", "core_win_types")
+
+    def __init__(self, positions: bytes, group_hit_count: int, total_hits: int,
+                 win_types: tuple = (), core_win_types: tuple = ()):
+        self.positions = positions
+        self.group_hit_count = group_hit_count
+        self.total_hits = total_hits
+        self.win_types = win_types
+        self.core_win_types = core_win_types
+
+    @classmethod
+    def from_dict(cls, hit: Dict[str, Any]) -> "FC3DHit":
+        return cls(bytes(hit["position_hit_indices"]), hit["group_hit_count"], hit["total_hits"],
+                   tuple(map(_intern, hit["win_types"])), tuple(map(_intern, hit["core_win_types"])))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "position_hit_indices": list(self.positions),
+            "position_hit_count": len(self.positions),
+            "group_hit_count": self.group_hit_count,
+            "exact_match": len(self.positions) == 3,
+            "total_hits": self.total_hits,
+            "win_types": list(self.win_types),
+            "core_win_types": list(self.core_win_types),
+        }
+
+    def __eq__(self, other):
+        return (type(other) is FC3DHit and self.positions == other.positions
+                and self.group_hit_count == other.group_hit_count and self.total_hits == other.total_hits
+                and self.win_types == other.win_types and self.core_win_types == other.core_win_types)
+
+    __hash__ = None
+
+
+# ==================== 预测组 ====================
+
+class SSQGroup:
+    """双色球一组预测；hit 为 None 表示尚未开奖（JSON 中没有 hit_result）"""
+
+    __slots__ = ("group_id", "strategy", "reds", "blue", "description", "hit")
+
+    def __init__(self, group_id: int, strategy: str, reds: bytes, blue: int, description: str,
+                 hit: Optional[SSQHit] = None):
+        self.group_id = group_id
+        self.strategy = strategy
+        self.reds = reds
+        self.blue = blue
+        self.description = description
+        self.hit = hit
+
+    @classmethod
+    def from_dict(cls, group: Dict[str, Any]) -> "SSQGroup":
+        hit = group.get("hit_result")
+        return cls(group.get("group_id"), _intern(group.get("strategy", "")),
+                   bytes(map(_BALL.__getitem__, group["red_balls"])), _BALL[group["blue_ball"]],
+                   group.get("description", ""), None if hit is None else SSQHit.from_dict(hit))
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "group_id": self.group_id,
+            "strategy": self.strategy,
+            "red_balls": list(map(_BALL_TEXT.__getitem__, self.reds)),
+            "blue_ball": _BALL_TEXT[self.blue],
+            "description": self.description,
+        }
+        if self.hit is not None:
+            result["hit_result"] = self.hit.to_dict()
+        return result
+
+    def __eq__(self, other):
+        return type(other) is SSQGroup and all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    __hash__ = None
+
+
+class FC3DGroup:
+    """福彩3D 一组预测；number 由 digits 推出"""
+
+    __slots__ = ("group_id", "strategy", "play_type", "digits", "description", "hit")
+
+    def __init__(self, group_id: int, strategy: str, play_type: str, digits: bytes, description: str,
+                 hit: Optional[FC3DHit] = None):
+        self.group_id = group_id
+        self.strategy = strategy
+        self.play_type = play_type
+        self.digits = digits
+        self.description = description
+        self.hit = hit
+
+    @classmethod
+    def from_dict(cls, group: Dict[str, Any]) -> "FC3DGroup":
+        hit = group.get("hit_result")
+        return cls(group.get("group_id"), _intern(group.get("strategy", "")), _intern(group.get("play_type", "")),
+                   bytes(map(_DIGIT.__getitem__, group["digits"])), group.get("description", ""),
+                   None if hit is None else FC3DHit.from_dict(hit))
+
+    @property
+    def number(self) -> str:
+        return "".join(map(_DIGIT_TEXT.__getitem__, self.digits))
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "group_id": self.group_id,
+            "strategy": self.strategy,
+            "play_type": self.play_type,
+            "digits": list(map(_DIGIT_TEXT.__getitem__, self.digits)),
+            "number": self.number,
+            "description": self.description,
+        }
+        if self.hit is not None:
+            result["hit_result"] = self.hit.to_dict()
+        return result
+
+    def __eq__(self, other):
+        return type(other) is FC3DGroup and all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    __hash__ = None
+
+
+DRAW_TYPES = {"ssq": SSQDraw, "fc3d": FC3DDraw}
+GROUP_TYPES = {"ssq": SSQGroup, "fc3d": FC3DGroup}
+
+
+# ==================== 批量编解码 ====================
+
+def decode_draws(game: str, rows: Iterable[Dict[str, Any]]) -> List[Any]:
+    return list(map(DRAW_TYPES[game].from_dict, rows))
+
+
+def decode_groups(game: str, groups: Iterable[Dict[str, Any]]) -> List[Any]:
+    return list(map(GROUP_TYPES[game].from_dict, groups))
+
+
+def encode(records: Iterable[Any]) -> List[Dict[str, Any]]:
+    """记录 → JSON 字典（开奖记录与预测组通用）"""
+    return [record.to_dict() for record in records]
+
+
+def load_draws(game: str, path: Optional[str] = None) -> List[Any]:
+    """读取开奖数据文件（data/lottery_history.json 或 data/fc3d_history.json）中的全部开奖记录"""
+    path = path or os.path.join(DATA_DIR, "lottery_history.json" if game == "ssq" else "fc3d_history.json")
+    with open(path, 'r', encoding='utf-8') as f:
+        return decode_draws(game, json.load(f).get("data", []))
+
+
+def iter_history_groups(path: str):
+    """历史预测归档中的全部预测组字典（按期、模型、组顺序）"""
+    for record in iter_records(path):
+        for model in record.get("models", []):
+            yield from model.get("predictions", [])
+
+
+# ==================== 基准测试 ====================
+
+def synthetic_rows(kind: str, count: int) -> List[Dict[str, Any]]:
+    """count 条合成 JSON 记录（kind: ssq.draw / fc3d.draw / ssq.group / fc3d.group）"""
+    rows = []
+    for i in range(count):
+        reds = sorted(f"{(i + k * 5) % 33 + 1:02d}" for k in range(6))
+        digits = [str((i * 7 + k * 3) % 10) for k in range(3)]
+        if kind == "ssq.draw":
+            rows.append(SSQDraw.from_dict({"period": f"{i % 99999:05d}", "red_balls": reds,
+                                           "blue_ball": f"{i % 16 + 1:02d}", "date": "2026-03-22"}).to_dict())
+        elif kind == "fc3d.draw":
+            rows.append(FC3DDraw(i, bytes(map(int, digits)), 20260322).to_dict())
+        elif kind == "ssq.group":
+            hits = reds[:i % 4]
+            rows.append(SSQGroup(i % 5 + 1, f"策略{i % 5 + 1}", bytes(map(int, reds)), i % 16 + 1,
+                                 f"合成数据 {i}", SSQHit(bytes(map(int, hits)), i % 3 == 0)).to_dict())
+        else:
+            positions = bytes(range(i % 4))
+            rows.append(FC3DGroup(i % 5 + 1, f"策略{i % 5 + 1}", "直选", bytes(map(int, digits)),
+                                  f"合成数据 {i}", FC3DHit(positions, i % 4, i % 4,
+                                                         ("直选",) if len(positions) == 3 else ())).to_dict())
+    return rows
+
+
+def _decoder(kind: str):
+    game, what = kind.split(".")
+    return (DRAW_TYPES if what == "draw" else GROUP_TYPES)[game].from_dict
+
+
+def measure_memory(kind: str, text: str) -> tuple:
+    """json.loads 得到的字典列表，与转换为记录（并释放字典）后各自占用的内存（字节）"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        rows = json.loads(text)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        records = list(map(_decoder(kind), rows))
+        del rows
+        gc.collect()
+        record_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del records
+    return dict_bytes, record_bytes
+
+
+def run_benchmark(count: int = 100_000,
+                  kinds: Iterable[str] = ("ssq.draw", "fc3d.draw", "ssq.group", "fc3d.group")) -> List[Dict[str, Any]]:
+    """
+    每种记录生成 count 条合成 JSON，统计内存占用与编解码吞吐
+
+    Returns:
+        [{"kind", "records", "dict_mb", "record_mb", "decode_per_s", "encode_per_s"}, ...]
+    """
+    results = []
+    for kind in kinds:
+        rows = synthetic_rows(kind, count)
+        text = json.dumps(rows, ensure_ascii=False)
+        dict_bytes, record_bytes = measure_memory(kind, text)
+
+        start = time.perf_counter()
+        records = list(map(_decoder(kind), rows))
+        decode_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encoded = encode(records)
+        encode_s = time.perf_counter() - start
+        if encoded != rows:
+            raise AssertionError(f"{kind}: 往返转换结果不一致")
+
+        results.append({
+            "kind": kind, "records": count,
+            "dict_mb": round(dict_bytes / (1024 * 1024), 1),
+            "record_mb": round(record_bytes / (1024 * 1024), 1),
+            "decode_per_s": round(count / decode_s) if decode_s else None,
+            "encode_per_s": round(count / encode_s) if encode_s else None,
+        })
+    return results
+
+
+def verify_data_files(data_dir: str = DATA_DIR) -> Dict[str, int]:
+    """data/ 下各文件中的开奖记录与预测组逐条往返转换，返回各文件校验的记录数"""
+    checked = {}
+    for game, name in (("ssq", "lottery_history.json"), ("fc3d", "fc3d_history.json")):
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                rows = json.load(f).get("data", [])
+            checked[name] = _verify(rows, encode(decode_draws(game, rows)), name)
+
+    for game, names in (("ssq", ("ai_predictions.json", "predictions_history.json")),
+                        ("fc3d", ("fc3d_ai_predictions.json", "fc3d_predictions_history.json"))):
+        for name in names:
+            path = os.path.join(data_dir, name)
+            if not os.path.exists(path):
+                continue
+            if "history" in name:
+                groups = list(iter_history_groups(path))
+                with open(path, 'r', encoding='utf-8') as f:
+                    draws = [r["actual_result"] for r in json.load(f)["predictions_history"] if r.get("actual_result")]
+                _verify(draws, encode(decode_draws(game, draws)), name)
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    groups = [g for m in json.load(f).get("models", []) for g in m.get("predictions", [])]
+            checked[name] = _verify(groups, encode(decode_groups(game, groups)), name)
+    return checked
+
+
+def _verify(expected: List[Dict[str, Any]], actual: List[Dict[str, Any]], name: str) -> int:
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            raise AssertionError(f"{name} 第 {i + 1} 条往返转换不一致: {a} != {b}")
+    return len(expected)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="开奖记录与预测组的紧凑类型")
+    parser.add_argument("--bench", action="store_true", help="对比字典与紧凑记录的内存占用与编解码吞吐")
+    parser.add_argument("--count", type=int, default=100_000, help="基准测试每种记录的条数")
+    args = parser.parse_args()
+
+    if args.bench:
+        print(f"{'记录':<12}{'条数':>10}{'字典(MB)':>11}{'记录(MB)':>11}{'解码(条/s)':>14}{'编码(条/s)':>14}")
+        for r in run_benchmark(args.count):
+            print(f"{r['kind']:<12}{r['records']:>10,}{r['dict_mb']:>11.1f}{r['record_mb']:>11.1f}"
+                  f"{r['decode_per_s'] or 0:>14,}{r['encode_per_s'] or 0:>14,}")
+        return
+
+    for name, count in verify_data_files().items():
+        print(f"✓ {name}: {count} 条记录往返转换一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+双色球 + 福彩3D 一体化更新流水线
+
+在一个进程内按依赖关系执行两个彩种的全部阶段：
+    fetch（增量同步并合并）→ build（重新生成派生文件）→ load（读取一次历史文件）
+    → archive（归档已开奖预测）→ pages（导出网页历史分页）与 predict → save
+
+- 两个彩种互不依赖的阶段并发执行
+- 两个抓取器共享一个 HTTP 连接池，两个预测脚本共享 llm_clients 中的 LLM 客户端
+- 历史开奖文件在 load 阶段只读取一次，供 archive 与 predict 共用
+- 结束时输出每个阶段的开始时间、耗时与状态
+
+使用方法：
+    python3 run_pipeline.py
+    python3 run_pipeline.py --games fc3d --skip-predict
+    python3 run_pipeline.py --json pipeline_timings.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Callable, Optional
+
+# 文件路径
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FETCH_DIR = os.path.join(SCRIPT_DIR, "fetch_history")
+SSQ_FETCH_FILE = os.path.join(FETCH_DIR, "lottery_data.json")
+
+# 抓取脚本按同目录方式导入
+sys.path.insert(0, FETCH_DIR)
+
+from build_artifacts import build as build_artifacts
+
+GAMES = ("ssq", "fc3d")
+
+
+class Pipeline:
+    """按依赖关系并发执行的阶段图"""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, func: Callable[[Dict[str, Any]], Any], deps: List[str] = ()):
+        """
+        添加阶段
+
+        Args:
+            name: 阶段名，如 "ssq.fetch"
+            func: func(inputs) -> 结果，inputs 为 {依赖阶段名: 结果}
+            deps: 依赖的阶段名（必须先添加）
+        """
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"阶段 {name} 依赖未知阶段 {dep}")
+        self.stages[name] = {"func": func, "deps": list(deps)}
+
+    def run(self, workers: int = 4) -> Dict[str, Dict[str, Any]]:
+        """
+        执行全部阶段；某阶段失败时跳过所有依赖它的阶段
+
+        Returns:
+            {阶段名: {"status", "start", "seconds", "result" | "error"}}，时间相对流水线开始
+        """
+        origin = time.perf_counter()
+        report: Dict[str, Dict[str, Any]] = {}
+        pending = dict(self.stages)
+        running = {}
+
+        def execute(name: str, inputs: Dict[str, Any]):
+            start = time.perf_counter()
+            result = self.stages[name]["func"](inputs)
+            return result, start - origin, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = pending[name]["deps"]
+                    if any(report.get(d, {}).get("status") in ("failed", "skipped") for d in deps):
+                        report[name] = {"status": "skipped", "start": None, "seconds": 0.0}
+                        del pending[name]
+                    elif all(report.get(d, {}).get("status") == "ok" for d in deps):
+                        inputs = {d: report[d]["result"] for d in deps}
+                        running[pool.submit(execute, name, inputs)] = name
+                        del pending[name]
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result, start, seconds = future.result()
+                        report[name] = {"status": "ok", "start": start, "seconds": seconds, "result": result}
+                    except Exception as e:
+                        print(f"❌ 阶段 {name} 失败: {type(e).__name__}: {e}")
+                        report[name] = {"status": "failed", "start": None, "seconds": 0.0, "error": str(e)}
+
+        report["_total"] = {"status": "ok", "start": 0.0, "seconds": time.perf_counter() - origin}
+        return report
+
+
+# ==================== 阶段定义 ====================
+
+def build_pipeline(games: List[str], skip_fetch: bool = False, skip_predict: bool = False,
+                   sources: Optional[List[str]] = None, cache_dir: Optional[str] = None,
+                   session=None) -> Pipeline:
+    """
+    构造两个彩种的阶段图
+
+    Args:
+        games: 要更新的彩种（"ssq" / "fc3d"）
+        skip_fetch: 跳过抓取，直接使用本地历史数据
+        skip_predict: 只抓取与归档，不调用模型
+        sources: 增量同步的数据源（见 draw_sources.build_sources）
+        cache_dir: 原始响应缓存目录
+        session: 共享的 requests.Session（为空时新建）
+    """
+    from http_utils import create_session
+
+    session = session or create_session({}, pool_size=16)
+    pipeline = Pipeline()
+
+    for game in games:
+        if game == "ssq":
+            import generate_ai_prediction as generator
+            from fetch_lottery_history import LotteryDataFetcher as Fetcher
+            fetch_file = SSQ_FETCH_FILE
+        else:
+            import generate_fc3d_prediction as generator
+            from fetch_fc3d_history import FC3DDataFetcher as Fetcher, DEFAULT_OUTPUT_FILE as fetch_file
+
+        load_deps = []
+        if not skip_fetch:
+            def fetch(inputs, Fetcher=Fetcher, fetch_file=fetch_file, generator=generator):
+                # 启用 SQLite 存储时与预测脚本共用同一个数据库连接
+                fetcher = Fetcher(cache_dir=cache_dir, sources=sources, session=session, store=generator.STORE)
+                new_count = fetcher.delta_sync(fetch_file)
+                if new_count is None:
+                    # 抓取失败不阻塞后续阶段，沿用本地已有数据
+                    print("⚠️  增量同步失败，使用本地已有数据继续")
+                return new_count
+
+            pipeline.add(f"{game}.fetch", fetch)
+            # 主数据更新后重新生成网页数据与缓存（只处理输入有变化的派生文件）
+            pipeline.add(f"{game}.build", lambda inputs, game=game: build_artifacts([game]), [f"{game}.fetch"])
+            load_deps = [f"{game}.build"]
+
+        pipeline.add(f"{game}.load", lambda inputs, generator=generator: generator.load_lottery_history(), load_deps)
+        pipeline.add(f"{game}.archive",
+                     lambda inputs, game=game, generator=generator: generator.archive_old_prediction(inputs[f"{game}.load"]),
+                     [f"{game}.load"])
+        # 归档新增一期后重新导出网页使用的历史分页
+        pipeline.add(f"{game}.pages", lambda inputs, game=game: build_artifacts([game], kinds=["history"]),
+                     [f"{game}.archive"])
+
+        if skip_predict:
+            continue
+
+        def predict(inputs, game=game, generator=generator):
+            return generator.generate_predictions(inputs[f"{game}.load"], archive=False,
+                                                  workers=len(generator.MODELS))
+
+        def save(inputs, game=game, generator=generator):
+            predictions = inputs[f"{game}.predict"]
+            if not predictions:
+                print(f"ℹ️  {game} 没有生成预测，跳过保存")
+                return False
+            generator.save_predictions(predictions)
+            return True
+
+        # 归档会更新命中历史，预测的模型权重依赖它，因此 predict 排在 archive 之后
+        pipeline.add(f"{game}.predict", predict, [f"{game}.load", f"{game}.archive"])
+        pipeline.add(f"{game}.save", save, [f"{game}.predict"])
+
+    return pipeline
+
+
+def summarize(value: Any) -> str:
+    """阶段结果的简短描述"""
+    if value is None:
+        return "-"
+    if isinstance(value, dict):
+        if "target_period" in value:
+            return f"期号 {value['target_period']}，{len(value.get('models', []))} 个模型"
+        if "data" in value:
+            return f"{len(value['data'])} 期"
+    if isinstance(value, bool):
+        return "是" if value else "否"
+    if isinstance(value, int):
+        return f"新增 {value} 期"
+    return str(value)[:40]
+
+
+def print_report(report: Dict[str, Dict[str, Any]]):
+    """打印阶段耗时表"""
+    total = report["_total"]["seconds"]
+    stages = [(name, r) for name, r in report.items() if name != "_total"]
+    busy = sum(r["seconds"] for _, r in stages)
+
+    print("\n" + "=" * 50)
+    print("⏱  流水线阶段耗时")
+    print("=" * 50)
+    print(f"{'阶段':<16}{'开始(s)':>9}{'耗时(s)':>9}  {'状态':<8}结果")
+    for name, r in sorted(stages, key=lambda item: (item[1]["start"] is None, item[1]["start"] or 0)):
+        start = f"{r['start']:.2f}" if r["start"] is not None else "-"
+        detail = summarize(r.get("result")) if r["status"] == "ok" else r.get("error", "")
+        print(f"{name:<16}{start:>9}{r['seconds']:>9.2f}  {r['status']:<8}{detail}")
+    print(f"\n总耗时 {total:.2f}s，阶段耗时合计 {busy:.2f}s（并发节省 {max(0.0, busy - total):.2f}s）")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="双色球 + 福彩3D 一体化更新流水线")
+    parser.add_argument("--games", nargs="+", choices=GAMES, default=list(GAMES), help="要更新的彩种")
+    parser.add_argument("--skip-fetch", action="store_true", help="跳过抓取，直接使用本地历史数据")
+    parser.add_argument("--skip-predict", action="store_true", help="只抓取与归档，不生成预测")
+    parser.add_argument("--source", action="append", dest="sources", help="增量同步的数据源，可重复指定（指定后改为多数据源并发竞速）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用原始响应缓存")
+    parser.add_argument("--workers", type=int, default=4, help="同时执行的阶段数")
+    parser.add_argument("--json", dest="json_path", help="将阶段耗时写入指定 JSON 文件")
+    args = parser.parse_args()
+
+    from fetch_lottery_history import HTTP_CACHE_DIR
+
+    pipeline = build_pipeline(args.games, skip_fetch=args.skip_fetch, skip_predict=args.skip_predict,
+                              sources=args.sources,
+                              cache_dir=None if args.no_cache else HTTP_CACHE_DIR)
+    report = pipeline.run(workers=args.workers)
+    print_report(report)
+
+    if args.json_path:
+        timings = {name: {k: v for k, v in r.items() if k != "result"} for name, r in report.items()}
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, ensure_ascii=False, indent=2)
+        print(f"💾 阶段耗时已保存到: {args.json_path}")
+
+    if any(r["status"] == "failed" for r in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
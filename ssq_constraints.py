@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""
+双色球红球约束过滤引擎
+
+对全部 C(33,6) = 1,107,568 个红球组合预先计算特征表（区间分布、奇偶、大小、
+和值、连号、AC 值、尾数、质数），每个特征一列、每个组合一字节，按字典序排列。
+任意约束组合都通过 bytes.translate 逐列生成 0/1 掩码并按位与，因而计数、
+抽样、枚举都只需毫秒级；同一套约束也用于校验 AI 预测是否满足其声明。
+
+特征表首次使用时构建并缓存到 cache/ssq_features.bin。
+
+使用方法：
+    python3 ssq_constraints.py                          # 统计各策略约束下的组合数并校验当前预测
+    python3 ssq_constraints.py --validate data/predictions_history.json
+    python3 ssq_constraints.py --sample 5 --strategy 增强型平衡策略师
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import struct
+import sys
+import time
+from typing import Dict, Any, List, Iterator, Optional, Sequence, Tuple
+
+# 文件路径
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 抓取脚本按同目录方式导入
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "fetch_history"))
+
+from json_io import atomic_open
+
+CACHE_DIR = os.path.join(SCRIPT_DIR, "cache")
+FEATURES_CACHE_FILE = os.path.join(CACHE_DIR, "ssq_features.bin")
+AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
+
+RED_MAX = 33
+PICK = 6
+TOTAL_COMBINATIONS = math.comb(RED_MAX, PICK)
+
+PRIMES = {2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31}
+
+# 特征列顺序即缓存文件中的列顺序
+FEATURES = ("zone", "odd", "big", "sum", "consecutive", "ac", "tails", "primes")
+
+_CACHE_MAGIC = b"SSQF"
+_CACHE_VERSION = 1
+_CACHE_HEADER = struct.Struct("<4sII")
+
+# ==================== 约束定义 ====================
+# 约束为 {特征: 取值范围} 字典：
+#   (lo, hi)        闭区间
+#   [v1, v2, ...]   允许值集合
+#   zones           三个区间 01-11 / 12-22 / 23-33 各自的 (lo, hi) 个数范围
+
+DEFAULT_CONSTRAINTS = {
+    "zones": [(1, 4), (1, 4), (1, 4)],
+    "odd": (2, 4),
+    "sum": (90, 130),
+    "consecutive": (0, 2),
+}
+
+# prompt2.0 中各策略的硬约束
+STRATEGY_CONSTRAINTS = {
+    "增强型热号追随者": {
+        "zones": [(1, 3), (1, 3), (1, 3)],
+    },
+    "增强型冷号逆向者": {
+        "odd": [3],
+        "tails": (5, 6),
+        "primes": (2, 3),
+    },
+    "增强型平衡策略师": {
+        "odd": [3, 4],
+        "big": [2, 3],
+        "sum": (100, 120),
+        "consecutive": (0, 1),
+        "ac": (8, 14),
+        "zones": [(1, 2), (2, 3), (1, 3)],
+    },
+    "增强型综合决策者": {
+        "odd": [3, 4],
+        "big": [2, 3],
+        "sum": (100, 120),
+    },
+}
+
+# ==================== 单组特征 ====================
+
+def combo_features(reds: Sequence[int]) -> Dict[str, Any]:
+    """计算单个红球组合的全部特征（reds 为 6 个升序整数）"""
+    z1 = sum(1 for n in reds if n <= 11)
+    z2 = sum(1 for n in reds if 12 <= n <= 22)
+    diffs = {b - a for i, a in enumerate(reds) for b in reds[i + 1:]}
+    return {
+        "zones": (z1, z2, PICK - z1 - z2),
+        "odd": sum(n & 1 for n in reds),
+        "big": sum(1 for n in reds if n >= 17),
+        "sum": sum(reds),
+        "consecutive": sum(1 for a, b in zip(reds, reds[1:]) if b - a == 1),
+        "ac": len(diffs) - (PICK - 1),
+        "tails": len({n % 10 for n in reds}),
+        "primes": sum(1 for n in reds if n in PRIMES),
+    }
+
+def _allowed(spec, values: range) -> List[int]:
+    """将约束取值转换为允许值列表"""
+    if isinstance(spec, tuple):
+        lo, hi = spec
+        return [v for v in values if lo <= v <= hi]
+    return [v for v in values if v in set(spec)]
+
+def check_constraints(reds: Sequence[int], constraints: Dict[str, Any]) -> List[str]:
+    """检查单个组合，返回不满足的约束描述列表（空列表表示全部满足）"""
+    features = combo_features(reds)
+    violations = []
+    for name, spec in constraints.items():
+        if name == "zones":
+            for idx, ((lo, hi), count) in enumerate(zip(spec, features["zones"])):
+                if not lo <= count <= hi:
+                    violations.append(f"区间{idx + 1}个数 {count} 不在 {lo}-{hi}")
+            continue
+        value = features[name]
+        if value not in _allowed(spec, range(value, value + 1)):
+            violations.append(f"{name}={value} 不满足 {spec}")
+    return violations
+
+# ==================== 组合排序 ====================
+
+def rank_combination(reds: Sequence[int]) -> int:
+    """组合 -> 字典序下标"""
+    index = 0
+    prev = 0
+    for pos, n in enumerate(reds):
+        for skipped in range(prev + 1, n):
+            index += math.comb(RED_MAX - skipped, PICK - pos - 1)
+        prev = n
+    return index
+
+def unrank_combination(index: int) -> Tuple[int, ...]:
+    """字典序下标 -> 组合"""
+    combo = []
+    n = 1
+    for pos in range(PICK):
+        while True:
+            block = math.comb(RED_MAX - n, PICK - pos - 1)
+            if index < block:
+                break
+            index -= block
+            n += 1
+        combo.append(n)
+        n += 1
+    return tuple(combo)
+
+# ==================== 特征表 ====================
+
+class CombinationTable:
+    """全部红球组合的列式特征表"""
+
+    def __init__(self, columns: Dict[str, bytes]):
+        self.columns = columns
+        self.size = len(columns["sum"])
+
+    @classmethod
+    def build(cls) -> "CombinationTable":
+        """按字典序逐层累加构建特征列（约数秒）"""
+        cols = {name: bytearray(TOTAL_COMBINATIONS) for name in FEATURES}
+        zone_of = [0] + [0 if n <= 11 else (1 if n <= 22 else 2) for n in range(1, RED_MAX + 1)]
+        zone_weight = (7, 1, 0)  # 打包 zone = z1 * 7 + z2
+        odd, big, prime = [0] * 34, [0] * 34, [0] * 34
+        for n in range(1, RED_MAX + 1):
+            odd[n] = n & 1
+            big[n] = 1 if n >= 17 else 0
+            prime[n] = 1 if n in PRIMES else 0
+
+        zone_col, odd_col, big_col, sum_col = cols["zone"], cols["odd"], cols["big"], cols["sum"]
+        con_col, ac_col, tail_col, prime_col = cols["consecutive"], cols["ac"], cols["tails"], cols["primes"]
+
+        idx = 0
+        top = RED_MAX
+        for a in range(1, top - 4):
+            fa = (zone_weight[zone_of[a]], odd[a], big[a], a, prime[a])
+            for b in range(a + 1, top - 3):
+                fb = (fa[0] + zone_weight[zone_of[b]], fa[1] + odd[b], fa[2] + big[b], fa[3] + b,
+                      fa[4] + prime[b], (b - a == 1))
+                for c in range(b + 1, top - 2):
+                    fc = (fb[0] + zone_weight[zone_of[c]], fb[1] + odd[c], fb[2] + big[c], fb[3] + c,
+                          fb[4] + prime[c], fb[5] + (c - b == 1))
+                    for d in range(c + 1, top - 1):
+                        fd = (fc[0] + zone_weight[zone_of[d]], fc[1] + odd[d], fc[2] + big[d], fc[3] + d,
+                              fc[4] + prime[d], fc[5] + (d - c == 1))
+                        for e in range(d + 1, top):
+                            fe = (fd[0] + zone_weight[zone_of[e]], fd[1] + odd[e], fd[2] + big[e], fd[3] + e,
+                                  fd[4] + prime[e], fd[5] + (e - d == 1))
+                            base_diffs = {b - a, c - a, d - a, e - a, c - b, d - b, e - b, d - c, e - c, e - d}
+                            base_tails = {a % 10, b % 10, c % 10, d % 10, e % 10}
+                            for f in range(e + 1, top + 1):
+                                zone_col[idx] = fe[0] + zone_weight[zone_of[f]]
+                                odd_col[idx] = fe[1] + odd[f]
+                                big_col[idx] = fe[2] + big[f]
+                                sum_col[idx] = fe[3] + f
+                                prime_col[idx] = fe[4] + prime[f]
+                                con_col[idx] = fe[5] + (f - e == 1)
+                                ac_col[idx] = len(base_diffs | {f - a, f - b, f - c, f - d, f - e}) - (PICK - 1)
+                                tail_col[idx] = len(base_tails | {f % 10})
+                                idx += 1
+
+        return cls({name: bytes(col) for name, col in cols.items()})
+
+    @classmethod
+    def load(cls, cache_file: str = FEATURES_CACHE_FILE) -> "CombinationTable":
+        """
+        从缓存加载特征表；缓存缺失、版本不符或大小不对（如写入中断）时重新构建并写入缓存
+
+        缓存先写入同目录的唯一临时文件再改名，同时构建的进程不会读到或覆盖半成品
+        """
+        expected = _CACHE_HEADER.size + TOTAL_COMBINATIONS * len(FEATURES)
+        try:
+            with open(cache_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == expected:
+                    magic, version, count = _CACHE_HEADER.unpack(f.read(_CACHE_HEADER.size))
+                    if magic == _CACHE_MAGIC and version == _CACHE_VERSION and count == TOTAL_COMBINATIONS:
+                        blob = f.read()
+                        if len(blob) == count * len(FEATURES):
+                            return cls({name: blob[i * count:(i + 1) * count] for i, name in enumerate(FEATURES)})
+        except (OSError, struct.error):
+            pass
+
+        table = cls.build()
+        try:
+            with atomic_open(cache_file, 'wb') as f:
+                f.write(_CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, TOTAL_COMBINATIONS))
+                for name in FEATURES:
+                    f.write(table.columns[name])
+        except OSError as e:
+            print(f"  ⚠️  写入特征缓存失败: {e}")
+        return table
+
+    def mask(self, constraints: Dict[str, Any]) -> bytes:
+        """返回满足约束的 0/1 掩码（每个组合一字节）"""
+        result = None
+        for name, spec in constraints.items():
+            if name == "zones":
+                allowed = [z1 * 7 + z2 for z1 in range(7) for z2 in range(7 - z1)
+                           if spec[0][0] <= z1 <= spec[0][1]
+                           and spec[1][0] <= z2 <= spec[1][1]
+                           and spec[2][0] <= PICK - z1 - z2 <= spec[2][1]]
+                column = self.columns["zone"]
+            else:
+                allowed = _allowed(spec, range(256))
+                column = self.columns[name]
+
+            table = bytearray(256)
+            for v in allowed:
+                table[v] = 1
+            col_mask = int.from_bytes(column.translate(table), 'little')
+            result = col_mask if result is None else result & col_mask
+
+        if result is None:
+            return b"\x01" * self.size
+        return result.to_bytes(self.size, 'little')
+
+    def count(self, constraints: Dict[str, Any]) -> int:
+        """满足约束的组合数"""
+        return self.mask(constraints).count(1)
+
+    def enumerate(self, constraints: Dict[str, Any], limit: Optional[int] = None) -> Iterator[Tuple[int, ...]]:
+        """按字典序枚举满足约束的组合"""
+        for i, match in enumerate(re.finditer(b"\x01", self.mask(constraints))):
+            if limit is not None and i >= limit:
+                return
+            yield unrank_combination(match.start())
+
+    def sample(self, constraints: Dict[str, Any], k: int, rng: Optional[random.Random] = None) -> List[Tuple[int, ...]]:
+        """从满足约束的组合中无放回均匀抽取 k 个"""
+        rng = rng or random.Random()
+        indices = [m.start() for m in re.finditer(b"\x01", self.mask(constraints))]
+        return [unrank_combination(i) for i in rng.sample(indices, min(k, len(indices)))]
+
+# ==================== 校验 AI 预测 ====================
+
+def parse_description_claims(description: str) -> Dict[str, Any]:
+    """
+    从 description 中提取可核对的声明（奇偶比、大小比、总和、区间分布、连号）
+
+    总和声明为闭区间 (lo, hi)：「和值105」「和值：105」记为 (105, 105)，
+    「和值100-120」「和值在100～120」记为 (100, 120)
+    """
+    claims = {}
+    m = re.search(r"奇偶(?:比)?\s*(\d)\s*[:：]\s*(\d)", description)
+    if m:
+        claims["odd"] = int(m.group(1))
+    m = re.search(r"大小(?:比)?\s*(\d)\s*[:：]\s*(\d)", description)
+    if m:
+        claims["big"] = int(m.group(1))
+    m = re.search(r"(?:总和|和值)\s*[:：为在]?\s*(\d{2,3})(?:\s*[-~～至到]\s*(\d{2,3}))?", description)
+    if m:
+        lo, hi = int(m.group(1)), int(m.group(2) or m.group(1))
+        claims["sum"] = (min(lo, hi), max(lo, hi))
+    m = re.search(r"区间(?:分布)?\s*(\d)\s*-\s*(\d)\s*-\s*(\d)", description)
+    if m:
+        claims["zones"] = tuple(int(x) for x in m.groups())
+    if "无连号" in description:
+        claims["consecutive"] = 0
+    else:
+        m = re.search(r"(\d)\s*(?:对|组)连号", description)
+        if m:
+            claims["consecutive"] = int(m.group(1))
+    return claims
+
+def validate_group(group: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    校验单组预测
+
+    Returns:
+        {"claim_mismatches": [...], "constraint_violations": [...]}
+    """
+    reds = sorted(int(b) for b in group.get("red_balls", []))
+    if len(reds) != PICK or len(set(reds)) != PICK:
+        return {"claim_mismatches": [], "constraint_violations": [f"红球不是 6 个不同号码: {group.get('red_balls')}"]}
+
+    features = combo_features(reds)
+    mismatches = []
+    for name, claimed in parse_description_claims(group.get("description", "")).items():
+        if name == "sum":
+            lo, hi = claimed
+            if not lo <= features[name] <= hi:
+                mismatches.append(f"sum 声明 {lo if lo == hi else f'{lo}-{hi}'}，实际 {features[name]}")
+        elif features[name] != claimed:
+            mismatches.append(f"{name} 声明 {claimed}，实际 {features[name]}")
+
+    constraints = STRATEGY_CONSTRAINTS.get(group.get("strategy", ""), {})
+    return {
+        "claim_mismatches": mismatches,
+        "constraint_violations": check_constraints(reds, constraints),
+    }
+
+def validate_prediction_file(path: str) -> List[Dict[str, Any]]:
+    """校验当前预测文件或历史预测文件中的所有组，返回存在问题的组"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if "predictions_history" in data:
+        records = data["predictions_history"]
+    else:
+        records = [data]
+
+    issues = []
+    for record in records:
+        for model in record.get("models", []):
+            for group in model.get("predictions", []):
+                result = validate_group(group)
+                if result["claim_mismatches"] or result["constraint_violations"]:
+                    issues.append({
+                        "target_period": record.get("target_period"),
+                        "model_name": model.get("model_name"),
+                        "group_id": group.get("group_id"),
+                        "strategy": group.get("strategy"),
+                        "red_balls": group.get("red_balls"),
+                        **result,
+                    })
+    return issues
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="双色球红球约束过滤引擎")
+    parser.add_argument("--validate", default=AI_PREDICTIONS_FILE, help="要校验的预测文件")
+    parser.add_argument("--strategy", help="抽样/枚举时使用的策略约束（默认使用通用约束）")
+    parser.add_argument("--sample", type=int, default=0, help="随机抽取满足约束的组合数")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 50)
+    print("🧮 双色球红球约束过滤引擎")
+    print("=" * 50 + "\n")
+
+    start = time.perf_counter()
+    table = CombinationTable.load()
+    print(f"📦 特征表就绪: {table.size:,} 个组合 ({(time.perf_counter() - start) * 1000:.0f} ms)\n")
+
+    print("📊 各约束集合的合规组合数:")
+    for name, constraints in [("通用约束", DEFAULT_CONSTRAINTS)] + list(STRATEGY_CONSTRAINTS.items()):
+        start = time.perf_counter()
+        count = table.count(constraints)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  - {name}: {count:,} ({count / table.size:.2%}, {elapsed:.1f} ms)")
+
+    if args.sample:
+        constraints = STRATEGY_CONSTRAINTS.get(args.strategy, DEFAULT_CONSTRAINTS) if args.strategy else DEFAULT_CONSTRAINTS
+        print(f"\n🎲 随机抽取 {args.sample} 组 ({args.strategy or '通用约束'}):")
+        for combo in table.sample(constraints, args.sample):
+            print("  " + " ".join(f"{n:02d}" for n in combo))
+
+    if args.validate and os.path.exists(args.validate):
+        issues = validate_prediction_file(args.validate)
+        print(f"\n🔍 校验 {os.path.basename(args.validate)}: {len(issues)} 组存在问题")
+        for issue in issues:
+            print(f"  - {issue['target_period']} {issue['model_name']} G{issue['group_id']} ({issue['strategy']}) "
+                  f"{' '.join(issue['red_balls'])}")
+            for msg in issue["claim_mismatches"]:
+                print(f"      声明不符: {msg}")
+            for msg in issue["constraint_violations"]:
+                print(f"      违反约束: {msg}")
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+双色球红球旋转矩阵（覆盖设计）生成脚本
+
+给定候选红球池，生成尽量少的 6 码投注，使得：
+只要开奖红球中有 m 个落在候选池内，就至少有一注命中其中 t 个（t-if-m 保证）。
+
+实现要点：
+- 候选池的每个 m 子集编号后用 Python 大整数作为位集
+- 每个 t 子集预先计算「包含它的 m 子集」位集，投注的覆盖位集为其 t 子集位集之并
+- 惰性贪心（覆盖增益单调递减）挑选投注，再做冗余投注删除
+- 在时间预算内随机打破平局多轮重启，保留最小解
+
+使用方法：
+    python3 ssq_wheel.py                                  # 使用 ai_predictions.json 中所有模型红球的并集
+    python3 ssq_wheel.py --pool "01 05 09 12 16 18 22 26 28 31" --guarantee 4 --condition 5
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import time
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+# 文件路径
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_PREDICTIONS_FILE = os.path.join(SCRIPT_DIR, "data", "ai_predictions.json")
+
+TICKET_SIZE = 6
+RED_RANGE = range(1, 34)
+# C(n, 6) 投注全部枚举，候选池再大就难以在合理时间内求解
+MAX_POOL_SIZE = 20
+
+# ==================== 覆盖模型 ====================
+
+def validate_pool(pool: Sequence[int]) -> List[int]:
+    """检查候选池（1-33 内、不重复、个数在 6 到 MAX_POOL_SIZE 之间），返回排序后的号码"""
+    duplicates = sorted(n for n, c in Counter(pool).items() if c > 1)
+    if duplicates:
+        raise ValueError(f"候选池号码重复: {' '.join(f'{n:02d}' for n in duplicates)}")
+    invalid = [n for n in pool if n not in RED_RANGE]
+    if invalid:
+        raise ValueError(f"红球号码应在 1-33 之间: {' '.join(str(n) for n in invalid)}")
+    if not TICKET_SIZE <= len(pool) <= MAX_POOL_SIZE:
+        raise ValueError(f"候选池需要 {TICKET_SIZE}-{MAX_POOL_SIZE} 个号码，当前 {len(pool)} 个")
+    return sorted(pool)
+
+class CoverageModel:
+    """候选池上 t-if-m 覆盖问题的位集表示"""
+
+    def __init__(self, pool: Sequence[int], guarantee: int, condition: int):
+        pool = validate_pool(pool)
+        if not 1 <= guarantee <= condition <= TICKET_SIZE:
+            raise ValueError(f"需要满足 1 <= guarantee <= condition <= {TICKET_SIZE}")
+
+        self.pool = pool
+        self.guarantee = guarantee
+        self.condition = min(condition, len(pool))
+        self.targets = list(combinations(range(len(pool)), self.condition))
+        self.full_mask = (1 << len(self.targets)) - 1
+
+        # t 子集 -> 包含它的 m 子集位集
+        members: Dict[Tuple[int, ...], List[int]] = {}
+        for idx, target in enumerate(self.targets):
+            for sub in combinations(target, guarantee):
+                members.setdefault(sub, []).append(idx)
+        nbytes = (len(self.targets) + 7) // 8
+        self.subset_bits: Dict[Tuple[int, ...], int] = {}
+        for sub, indices in members.items():
+            buf = bytearray(nbytes)
+            for i in indices:
+                buf[i >> 3] |= 1 << (i & 7)
+            self.subset_bits[sub] = int.from_bytes(buf, 'little')
+
+        self.tickets = list(combinations(range(len(pool)), TICKET_SIZE))
+        self._cover_cache: Dict[int, int] = {}
+
+    def cover(self, ticket_idx: int) -> int:
+        """某注投注覆盖的 m 子集位集（按需计算并缓存）"""
+        bits = self._cover_cache.get(ticket_idx)
+        if bits is None:
+            bits = 0
+            for sub in combinations(self.tickets[ticket_idx], self.guarantee):
+                bits |= self.subset_bits[sub]
+            self._cover_cache[ticket_idx] = bits
+        return bits
+
+    def to_numbers(self, ticket_idx: int) -> Tuple[int, ...]:
+        """投注下标 -> 红球号码"""
+        return tuple(self.pool[i] for i in self.tickets[ticket_idx])
+
+    def uncovered(self, chosen: Sequence[int]) -> int:
+        """返回未被覆盖的 m 子集位集"""
+        covered = 0
+        for idx in chosen:
+            covered |= self.cover(idx)
+        return self.full_mask & ~covered
+
+# ==================== 求解 ====================
+
+def greedy_cover(model: CoverageModel, rng: random.Random, deadline: float) -> List[int]:
+    """
+    惰性贪心：堆中保存覆盖增益上界，弹出后重算，仍为最大时选入
+
+    超过 deadline 时返回已选的投注（可能未完全覆盖）
+    """
+    order = list(range(len(model.tickets)))
+    rng.shuffle(order)
+    # 初始上界取全集覆盖数，各投注对称，用随机序号打破平局
+    initial = model.cover(order[0]).bit_count()
+    heap = [(-initial, rank, idx) for rank, idx in enumerate(order)]
+    heapq.heapify(heap)
+
+    uncovered = model.full_mask
+    chosen = []
+    while uncovered:
+        if time.perf_counter() > deadline:
+            break
+        neg_bound, rank, idx = heapq.heappop(heap)
+        gain = (model.cover(idx) & uncovered).bit_count()
+        if gain == 0:
+            continue
+        if not heap or gain >= -heap[0][0]:
+            chosen.append(idx)
+            uncovered &= ~model.cover(idx)
+        else:
+            heapq.heappush(heap, (-gain, rank, idx))
+    return chosen
+
+def prune_redundant(model: CoverageModel, chosen: List[int], rng: random.Random,
+                    deadline: float = float("inf")) -> List[int]:
+    """局部搜索：逐个尝试删除投注，剩余投注仍完全覆盖则删除（超过 deadline 时停止）"""
+    chosen = list(chosen)
+    rng.shuffle(chosen)
+    i = 0
+    while i < len(chosen) and time.perf_counter() < deadline:
+        rest = chosen[:i] + chosen[i + 1:]
+        if not model.uncovered(rest):
+            chosen = rest
+        else:
+            i += 1
+    return chosen
+
+def solve_wheel(pool: Sequence[int], guarantee: int = 4, condition: int = 5,
+                time_budget: float = 5.0, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    生成 t-if-m 覆盖投注
+
+    Args:
+        pool: 候选红球（整数）
+        guarantee: 保证命中数 t
+        condition: 条件命中数 m（开奖红球落入候选池的个数）
+        time_budget: 求解时间预算（秒，含建模）；第一轮贪心也受其限制，
+            预算内未完成覆盖时返回部分投注，verified 为 False
+        seed: 随机种子
+
+    Returns:
+        {"tickets": [...], "rounds": n, "elapsed": s, "verified": 是否完全覆盖, ...}
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    rng = random.Random(seed)
+    model = CoverageModel(pool, guarantee, condition)
+
+    best: Optional[List[int]] = None
+    verified = False
+    rounds = 0
+    while best is None or time.perf_counter() < deadline:
+        solution = greedy_cover(model, rng, deadline)
+        if model.uncovered(solution):
+            # 时间用完时仍未完全覆盖：没有完整解才保留这份部分结果
+            best = best if best is not None else solution
+            break
+        solution = prune_redundant(model, solution, rng, deadline)
+        rounds += 1
+        if not verified or len(solution) < len(best):
+            best, verified = solution, True
+
+    tickets = sorted(model.to_numbers(idx) for idx in best)
+    return {
+        "pool": model.pool,
+        "guarantee": guarantee,
+        "condition": model.condition,
+        "tickets": tickets,
+        "rounds": rounds,
+        "elapsed": time.perf_counter() - start,
+        "verified": verified,
+    }
+
+# ==================== 候选池 ====================
+
+def load_pool_from_predictions(path: str = AI_PREDICTIONS_FILE, max_size: int = MAX_POOL_SIZE) -> List[int]:
+    """取所有模型预测红球的并集；超过 max_size 时按出现次数保留前 max_size 个"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    votes = Counter()
+    for model in data.get("models", []):
+        for group in model.get("predictions", []):
+            votes.update(int(b) for b in group.get("red_balls", []))
+    ranked = sorted(votes, key=lambda n: (-votes[n], n))
+    return sorted(ranked[:max_size])
+
+def assign_blues(tickets: List[Tuple[int, ...]], blues: Sequence[int]) -> List[Dict[str, Any]]:
+    """为每注按顺序循环分配蓝球，输出与预测文件一致的字符串格式"""
+    result = []
+    for i, reds in enumerate(tickets):
+        item = {"red_balls": [f"{n:02d}" for n in reds]}
+        if blues:
+            item["blue_ball"] = f"{blues[i % len(blues)]:02d}"
+        result.append(item)
+    return result
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="双色球红球旋转矩阵生成")
+    parser.add_argument("--pool", help="候选红球，空格或逗号分隔（默认取 ai_predictions.json 中的并集）")
+    parser.add_argument("--blues", default="", help="蓝球，空格或逗号分隔，按注循环分配")
+    parser.add_argument("--guarantee", type=int, default=4, help="保证命中红球数 t（默认 4）")
+    parser.add_argument("--condition", type=int, default=5, help="开奖红球落入候选池的个数 m（默认 5）")
+    parser.add_argument("--time", type=float, default=5.0, help="求解时间预算（秒）")
+    parser.add_argument("--seed", type=int, help="随机种子")
+    parser.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    try:
+        if args.pool:
+            pool = validate_pool([int(x) for x in args.pool.replace(",", " ").split()])
+        else:
+            pool = load_pool_from_predictions()
+    except ValueError as e:
+        parser.error(f"无效的候选池: {e}")
+    blues = [int(x) for x in args.blues.replace(",", " ").split()]
+
+    print("\n" + "=" * 50)
+    print("🎡 双色球旋转矩阵生成")
+    print("=" * 50 + "\n")
+    print(f"🎯 候选池 ({len(pool)} 个): {' '.join(f'{n:02d}' for n in pool)}")
+    print(f"📐 保证条件: 中 {args.condition} 保 {args.guarantee}\n")
+
+    result = solve_wheel(pool, args.guarantee, args.condition, args.time, args.seed)
+    tickets = assign_blues(result["tickets"], blues)
+
+    for i, ticket in enumerate(tickets, 1):
+        blue = f" + {ticket['blue_ball']}" if "blue_ball" in ticket else ""
+        print(f"  {i:>3}. {' '.join(ticket['red_balls'])}{blue}")
+
+    print(f"\n✅ 共 {len(tickets)} 注，{result['rounds']} 轮搜索，耗时 {result['elapsed']:.2f}s，"
+          f"覆盖校验{'通过' if result['verified'] else '失败'}\n")
+    if not result['verified']:
+        print(f"⚠️  {args.time:g}s 内未完成完整覆盖，以上为部分结果，可加大 --time\n")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({**result, "tickets": tickets}, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存到: {args.json_path}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""测试历史预测归档的流式读写：与 json 模块结果一致、顶部插入、筛选与内存占用"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from archive_stream import (ArchiveWriter, filter_records, find_record, iter_records, prepend_record,
+                            read_header)
+from bench_archive import run_benchmark
+from conftest import SCRIPT_DIR
+
+ARCHIVES = ("predictions_history.json", "fc3d_predictions_history.json")
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("name", ARCHIVES)
+def test_reader_and_writer_match_json_module(tmp_path, name):
+    source = os.path.join(SCRIPT_DIR, "data", name)
+    document = load_json(source)
+
+    # 块很小时记录会跨越多次读取
+    for chunk_size in (7, 4096):
+        header = {}
+        assert list(iter_records(source, header=header, chunk_size=chunk_size)) == document["predictions_history"]
+        assert header == {k: v for k, v in document.items() if k != "predictions_history"}
+
+    output = str(tmp_path / name)
+    with ArchiveWriter(output, read_header(source)) as writer:
+        for record in iter_records(source):
+            writer.write(record)
+    with open(output, 'rb') as a, open(source, 'rb') as b:
+        assert a.read() == b.read()
+
+
+def test_prepend_find_and_filter(tmp_path):
+    path = str(tmp_path / "predictions_history.json")
+    shutil.copy(os.path.join(SCRIPT_DIR, "data", "predictions_history.json"), path)
+    document = load_json(path)
+    oldest = document["predictions_history"][-1]
+
+    assert find_record(path, oldest["target_period"]) == oldest
+    assert find_record(path, "00000") is None
+
+    record = dict(document["predictions_history"][0], target_period="99001")
+    assert prepend_record(path, record) is True
+    assert prepend_record(path, record) is False
+    document["predictions_history"].insert(0, record)
+    with open(path, 'r', encoding='utf-8') as f:
+        assert f.read() == json.dumps(document, ensure_ascii=False, indent=2)
+
+    # 紧凑格式的文件逐条重写
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False)
+    newer = dict(record, target_period="99002")
+    assert prepend_record(path, newer) is True
+    assert load_json(path)["predictions_history"] == [newer] + document["predictions_history"]
+
+    kept = filter_records(path, lambda r: int(r["target_period"]) >= 99000)
+    assert kept == 2
+    assert [r["target_period"] for r in iter_records(path)] == ["99002", "99001"]
+
+    new_file = str(tmp_path / "new.json")
+    assert prepend_record(new_file, record) is True
+    assert load_json(new_file) == {"predictions_history": [record]}
+
+
+def test_streaming_uses_less_memory_than_json_load(tmp_path):
+    results = {r["mode"]: r for r in run_benchmark(size_mb=16, work_dir=str(tmp_path))}
+    if results["load-find"]["peak_rss_mb"] is None:
+        pytest.skip("当前平台不支持统计峰值内存")
+    assert results["stream-find"]["peak_rss_mb"] * 2 < results["load-find"]["peak_rss_mb"]
+    assert results["stream-prepend"]["peak_rss_mb"] * 2 < results["load-prepend"]["peak_rss_mb"]
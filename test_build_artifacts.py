@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""测试派生文件构建：由主数据生成、按依赖清单只重建输入变化的文件、干净检出不重建"""
+
+import json
+import os
+import shutil
+import sys
+
+from build_artifacts import build
+from conftest import SCRIPT_DIR
+from draw_matrix import DrawMatrix
+
+
+def make_root(tmp_path):
+    for path in (os.path.join("fetch_history", "lottery_data.json"), os.path.join("data", "fc3d_history.json")):
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        shutil.copy(os.path.join(SCRIPT_DIR, path), tmp_path / path)
+    return str(tmp_path)
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_builds_all_then_nothing(tmp_path):
+    root = make_root(tmp_path)
+    assert build(root=root) == ["ssq.web", "ssq.matrix", "fc3d.matrix", "ssq.dashboard", "fc3d.dashboard"]
+
+    canonical = load_json(os.path.join(root, "fetch_history", "lottery_data.json"))
+    web = load_json(os.path.join(root, "data", "lottery_history.json"))
+    assert web["data"] == canonical
+    assert web["next_draw"]["next_period"] == str(int(canonical[0]["period"]) + 1)
+    matrix = DrawMatrix.load("fc3d", os.path.join(root, "data", "fc3d_history.json"),
+                             os.path.join(root, "cache", "draw_matrix_fc3d.bin"))
+    assert matrix._mapped is not None
+    matrix.close()
+    dashboard = load_json(os.path.join(root, "data", "dashboard_ssq.json"))
+    assert dashboard["draw_count"] == len(canonical)
+
+    assert build(root=root) == []
+
+
+def test_only_changed_inputs_are_rebuilt(tmp_path):
+    root = make_root(tmp_path)
+    build(root=root)
+
+    canonical_file = os.path.join(root, "fetch_history", "lottery_data.json")
+    canonical = load_json(canonical_file)[1:]
+    with open(canonical_file, 'w', encoding='utf-8') as f:
+        json.dump(canonical, f, ensure_ascii=False, indent=2)
+
+    assert build(root=root, dry_run=True) == ["ssq.web"]
+    assert build(root=root) == ["ssq.web", "ssq.matrix", "ssq.dashboard"]
+    assert load_json(os.path.join(root, "data", "lottery_history.json"))["data"] == canonical
+
+
+def test_edited_output_is_regenerated(tmp_path):
+    root = make_root(tmp_path)
+    build(root=root)
+    web_file = os.path.join(root, "data", "lottery_history.json")
+    expected = load_json(web_file)
+
+    with open(web_file, 'w', encoding='utf-8') as f:
+        json.dump({"data": []}, f)
+    assert build(["ssq"], root=root)[0] == "ssq.web"
+    assert load_json(web_file)["data"] == expected["data"]
+    assert build(["ssq"], root=root) == []
+
+
+def test_only_selected_kinds_are_built(tmp_path, monkeypatch):
+    root = make_root(tmp_path)
+    for name in ("predictions_history.json", "fc3d_predictions_history.json"):
+        shutil.copy(os.path.join(SCRIPT_DIR, "data", name), os.path.join(root, "data", name))
+
+    # 只导出历史分页时不依赖抓取脚本（预测工作流没有安装 bs4 / requests）
+    monkeypatch.setitem(sys.modules, "bs4", None)
+    monkeypatch.delitem(sys.modules, "fetch_lottery_history", raising=False)
+    assert build(root=root, kinds=["history"]) == ["ssq.history", "fc3d.history"]
+    assert os.path.exists(os.path.join(root, "data", "history", "ssq", "hot.json"))
+    assert not os.path.exists(os.path.join(root, "data", "lottery_history.json"))
+
+
+def test_clean_checkout_with_unchanged_inputs_rebuilds_nothing(tmp_path):
+    root = make_root(tmp_path / "first")
+    for name in ("predictions_history.json", "fc3d_predictions_history.json"):
+        shutil.copy(os.path.join(SCRIPT_DIR, "data", name), os.path.join(root, "data", name))
+    assert len(build(root=root)) == 7
+
+    # 模拟 CI 的干净检出：只有提交过的文件（不含 cache/ 与锁文件）
+    checkout = str(tmp_path / "checkout")
+    shutil.copytree(root, checkout, ignore=shutil.ignore_patterns("cache", "*.lock"))
+    assert os.path.exists(os.path.join(checkout, "data", "build_manifest.json"))
+    assert build(root=checkout, kinds=["web", "dashboard", "history"]) == []
+    # 只有不提交的号码矩阵缓存需要在本地重新生成
+    assert build(root=checkout) == ["ssq.matrix", "fc3d.matrix"]
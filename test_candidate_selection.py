@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""测试多候选择优：候选打分（合规率与组内 / 跨模型重叠）、择优、单次响应 JSON 数组回退与候选数配置"""
+
+import json
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+import generate_ai_prediction as ssq
+import generate_fc3d_prediction as fc3d
+import llm_clients
+
+
+def ssq_candidate(red_groups, descriptions=None, model_id="m1"):
+    descriptions = descriptions or [""] * len(red_groups)
+    return {"prediction_date": "2026-03-23", "target_period": "26032", "model_id": model_id, "model_name": model_id,
+            "predictions": [{"group_id": i + 1, "strategy": "", "red_balls": [f"{n:02d}" for n in reds],
+                             "blue_ball": "08", "description": desc}
+                            for i, (reds, desc) in enumerate(zip(red_groups, descriptions))]}
+
+
+def fc3d_candidate(numbers, play_type="组六"):
+    return {"prediction_date": "2026-03-23", "target_period": "2026072", "model_id": "m1", "model_name": "m1",
+            "predictions": [{"group_id": i + 1, "strategy": "", "play_type": play_type, "digits": list(number),
+                             "number": number, "description": ""} for i, number in enumerate(numbers)]}
+
+
+DISJOINT = [list(range(6 * i + 1, 6 * i + 7)) for i in range(5)]
+FC3D_DISJOINT = ["012", "345", "678", "901", "234"]
+
+
+def test_ssq_score_candidate():
+    assert ssq.score_candidate(ssq_candidate(DISJOINT), []) == pytest.approx(10)
+    # 5 组完全相同：组内平均重叠 6
+    assert ssq.score_candidate(ssq_candidate([DISJOINT[0]] * 5), []) == pytest.approx(4)
+    # 1 组 description 声明与号码不符：合规率 4/5
+    claims = ["奇偶比 5:1"] + [""] * 4
+    assert ssq.score_candidate(ssq_candidate(DISJOINT, claims), []) == pytest.approx(8)
+    # 已选定模型有一组与第 1 组相同：跨模型平均重叠 6/5
+    accepted = [ssq_candidate([DISJOINT[0]], model_id="m0")]
+    assert ssq.score_candidate(ssq_candidate(DISJOINT), accepted) == pytest.approx(8.8)
+
+
+def test_ssq_select_best_candidate():
+    invalid = ssq_candidate(DISJOINT[:4])
+    overlapping = ssq_candidate([DISJOINT[0]] * 5)
+    best = ssq_candidate(DISJOINT)
+    assert ssq.select_best_candidate([invalid, overlapping, best], []) is best
+    assert ssq.select_best_candidate([invalid], []) is None
+
+
+def test_fc3d_score_and_select_fix_play_type():
+    assert fc3d.score_candidate(fc3d_candidate(FC3D_DISJOINT), []) == pytest.approx(10)
+    # play_type 缺失时按修正前打分，合规率为 0
+    missing = fc3d_candidate(FC3D_DISJOINT, play_type="")
+    assert fc3d.score_candidate(missing, []) == pytest.approx(0)
+    assert fc3d.score_candidate(fc3d_candidate(["012"] * 5), []) == pytest.approx(7)
+
+    compliant = fc3d_candidate(FC3D_DISJOINT)
+    assert fc3d.select_best_candidate([missing, compliant], []) == compliant
+    # 只有需要修正的候选时返回修正后的副本，原候选不变
+    chosen = fc3d.select_best_candidate([missing], [])
+    assert [g["play_type"] for g in chosen["predictions"]] == ["组六"] * 5
+    assert [g["play_type"] for g in missing["predictions"]] == [""] * 5
+
+
+def api_error(cls, message, status):
+    return cls(message, response=SimpleNamespace(request=None, status_code=status, headers={}), body=None)
+
+
+def fake_client(monkeypatch, module, candidates, n_error):
+    """n 参数请求抛出 n_error，否则以单次响应返回候选数组；返回请求记录"""
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if "n" in kwargs:
+            raise n_error
+        content = "```json\n" + json.dumps(candidates, ensure_ascii=False) + "\n```"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(module, "get_client", lambda api_key, base_url: client)
+    return calls
+
+
+@pytest.fixture
+def capabilities(tmp_path, monkeypatch):
+    path = str(tmp_path / "llm_capabilities.json")
+    monkeypatch.setattr(llm_clients, "CAPABILITIES_FILE", path)
+    return path
+
+
+MODEL = {"name": "测试模型", "id": "test-model", "api_key": "key", "base_url": "http://localhost", "supports_n": True}
+
+
+def test_json_array_fallback_when_n_is_unsupported(monkeypatch, capabilities):
+    candidates = [ssq_candidate(DISJOINT), ssq_candidate([DISJOINT[0]] * 5)]
+    calls = fake_client(monkeypatch, ssq, candidates,
+                        api_error(openai.BadRequestError, "Unsupported parameter: 'n'", 400))
+
+    assert ssq.call_ai_model(MODEL, "预测", samples=2) == candidates
+    assert [("n" in c) for c in calls] == [True, False]
+    assert calls[1]["messages"][-1]["content"].endswith(ssq.MULTI_CANDIDATE_INSTRUCTION.format(samples=2))
+
+    # 不支持 n 的结果被记录下来，以后的运行（包括福彩3D）不再尝试 n
+    assert llm_clients.load_n_unsupported() == {"test-model"}
+    calls.clear()
+    assert ssq.call_ai_model(MODEL, "预测", samples=2) == candidates
+    assert [("n" in c) for c in calls] == [False]
+    assert not llm_clients.supports_n(dict(MODEL))
+
+
+@pytest.mark.parametrize("module", [ssq, fc3d])
+@pytest.mark.parametrize("error", [
+    api_error(openai.RateLimitError, "rate limited", 429),
+    api_error(openai.InternalServerError, "upstream error", 500),
+    api_error(openai.BadRequestError, "maximum context length exceeded", 400),
+    TimeoutError("timed out"),
+])
+def test_other_errors_are_not_retried_without_n(monkeypatch, capabilities, module, error):
+    calls = fake_client(monkeypatch, module, [], error)
+    with pytest.raises(type(error)):
+        module.call_ai_model(MODEL, "预测", samples=2)
+    assert len(calls) == 1
+    assert llm_clients.load_n_unsupported() == set()
+
+
+@pytest.mark.parametrize("module", [ssq, fc3d])
+def test_samples_per_call_falls_back_on_invalid_value(monkeypatch, module):
+    for value, expected in (("3", 3), ("0", 1), ("", 1), ("three", 1), ("2.5", 1)):
+        monkeypatch.setenv("AI_SAMPLES_PER_CALL", value)
+        assert module.read_samples_per_call() == expected
+    monkeypatch.delenv("AI_SAMPLES_PER_CALL")
+    assert module.read_samples_per_call() == 1
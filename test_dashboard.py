@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""测试图表分析页的预计算数据：与逐期遍历开奖数据的统计结果一致、窗口划分"""
+
+import json
+import os
+import shutil
+
+from conftest import SCRIPT_DIR
+from dashboard import build_dashboard, write_dashboard
+from draw_matrix import DrawMatrix
+
+
+def load_rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["data"]
+
+
+def expected_window(game, rows, full_trend=False):
+    """对照组：按网页原先的方式逐期统计（和值走势默认最近 30 期，full_trend 时为窗口内全部期数）"""
+    if game == "ssq":
+        numbers = [[int(b) for b in r["red_balls"]] for r in rows]
+        primary = {f"{n:02d}": 0 for n in range(1, 34)}
+        secondary = {f"{n:02d}": 0 for n in range(1, 17)}
+        for r in rows:
+            for b in r["red_balls"]:
+                primary[b] += 1
+            secondary[r["blue_ball"]] += 1
+        zones = [sum(1 for reds in numbers for n in reds if low <= n <= high)
+                 for low, high in ((1, 11), (12, 22), (23, 33))]
+    else:
+        numbers = [[int(d) for d in r["digits"]] for r in rows]
+        primary = {str(d): 0 for d in range(10)}
+        secondary = {str(d): 0 for d in range(10)}
+        for r in rows:
+            for d in r["digits"]:
+                primary[d] += 1
+            secondary[r["digits"][0]] += 1
+        zones = [sum(1 for r in rows if r["type"] == t) for t in ("豹子", "组三", "组六")]
+    sums = [sum(n) for n in numbers]
+    hottest = max(primary, key=lambda k: (primary[k], -int(k)))
+    return {
+        "hottest": {"label": hottest, "count": primary[hottest]},
+        "avg_sum": int(sum(sums) / len(sums) + 0.5),
+        "frequency": list(primary.values()),
+        "secondary_frequency": list(secondary.values()),
+        "sum_trend": sums[:len(rows) if full_trend else 30][::-1],
+        "zones": zones,
+        "odd_even_total": len(rows),
+    }
+
+
+def test_dashboard_matches_per_draw_statistics(tmp_path):
+    for game, name in (("ssq", "lottery_history.json"), ("fc3d", "fc3d_history.json")):
+        source = str(tmp_path / name)
+        shutil.copy(os.path.join(SCRIPT_DIR, "data", name), source)
+        rows = load_rows(source)
+        matrix = DrawMatrix.load(game, source, str(tmp_path / f"{game}.bin"))
+        dashboard = build_dashboard(matrix)
+        matrix.close()
+
+        assert dashboard["draw_count"] == len(rows)
+        assert dashboard["latest_period"] == rows[0]["period"]
+        assert list(dashboard["windows"])[-1] == "all"
+        assert all(w == "all" or int(w) < len(rows) for w in dashboard["windows"])
+
+        for key, data in dashboard["windows"].items():
+            window_rows = rows if key == "all" else rows[:int(key)]
+            expected = expected_window(game, window_rows, full_trend=key != "all")
+            assert data["draws"] == len(window_rows)
+            assert data["stats"]["hottest"] == expected["hottest"]
+            assert data["stats"]["avg_sum"] == expected["avg_sum"]
+            assert data["frequency"]["data"] == expected["frequency"]
+            assert data["secondary_frequency"]["data"] == expected["secondary_frequency"]
+            assert data["sum_trend"]["data"] == expected["sum_trend"]
+            assert data["sum_trend"]["labels"][-1] == rows[0]["period"]
+            if key == "all":
+                assert len(data["sum_trend"]["data"]) == min(30, len(rows))
+            assert data["zones"]["data"] == expected["zones"]
+            assert sum(data["odd_even"]["data"]) == expected["odd_even_total"]
+
+
+def test_write_dashboard_skips_unchanged(tmp_path):
+    source = str(tmp_path / "fc3d_history.json")
+    shutil.copy(os.path.join(SCRIPT_DIR, "data", "fc3d_history.json"), source)
+    output = str(tmp_path / "dashboard_fc3d.json")
+    cache_file = str(tmp_path / "fc3d.bin")
+
+    assert write_dashboard("fc3d", source, output, cache_file) is True
+    assert write_dashboard("fc3d", source, output, cache_file) is False
+    with open(output, 'r', encoding='utf-8') as f:
+        assert json.load(f)["game"] == "fc3d"
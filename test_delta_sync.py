@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""测试增量同步：只请求本地最新期号之后的范围，无新数据时不写文件"""
+
+import json
+import os
+
+from conftest import read_fixture
+from fetch_fc3d_history import FC3DDataFetcher
+from fetch_lottery_history import LotteryDataFetcher, parse_history_html
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fixture_route(name):
+    def route(path, query):
+        return 200, read_fixture(name)
+    return route
+
+
+def make_ssq_output(tmp_path, keep_from):
+    """构造只保存 keep_from 及更早期号的本地数据"""
+    (tmp_path / "fetch_history").mkdir()
+    (tmp_path / "data").mkdir()
+    output_file = str(tmp_path / "fetch_history" / "lottery_data.json")
+
+    rows = parse_history_html(read_fixture("ssq_history_26.html").decode("gb2312"))
+    write_json(output_file, [r for r in rows if r["period"] <= keep_from])
+    assert LotteryDataFetcher.read_latest_period(output_file) == keep_from
+    return output_file
+
+
+def test_ssq_delta_url_covers_year_rollover():
+    fetcher = LotteryDataFetcher(range_url="x?start={start}&end={end}")
+    assert fetcher.build_delta_url("26031") == "x?start=26032&end=27200"
+    assert fetcher.build_delta_url("99150") == "x?start=99151&end=00200"
+
+
+def test_fc3d_delta_url_covers_year_rollover():
+    fetcher = FC3DDataFetcher(range_url="x?start={start}&end={end}")
+    assert fetcher.build_delta_url("2025358") == "x?start=2025359&end=2026366"
+
+
+def test_ssq_delta_merges_only_new_periods(tmp_path, stand_in_server):
+    output_file = make_ssq_output(tmp_path, "26028")
+    with stand_in_server(fixture_route("ssq_history_26.html")) as (url, stats):
+        fetcher = LotteryDataFetcher(range_url=url + "/history.php?start={start}&end={end}")
+        assert fetcher.delta_sync(output_file) == 3
+
+    assert stats["requests"] == 1
+    assert "start=26029&end=27200" in stats["paths"][0]
+    data = load_json(output_file)
+    assert data[0]["period"] == "26031"
+    assert len(data) == 31
+
+
+def test_ssq_delta_without_new_periods_writes_nothing(tmp_path, stand_in_server):
+    output_file = make_ssq_output(tmp_path, "26031")
+    before = os.stat(output_file).st_mtime_ns
+    with stand_in_server(fixture_route("ssq_history_empty.html")) as (url, stats):
+        fetcher = LotteryDataFetcher(range_url=url + "/history.php?start={start}&end={end}")
+        assert fetcher.delta_sync(output_file) == 0
+
+    assert stats["requests"] == 1
+    assert os.stat(output_file).st_mtime_ns == before
+    assert os.listdir(tmp_path / "fetch_history") == ["lottery_data.json"]
+    assert os.listdir(tmp_path / "data") == []
+
+
+def test_fc3d_delta_without_new_periods_writes_nothing(tmp_path, stand_in_server):
+    output_file = str(tmp_path / "fc3d_history.json")
+    write_json(output_file, {"lottery_type": "fc3d", "data": [{"period": "2026071"}],
+                             "next_draw": {"next_period": "2026072"}})
+    before = os.stat(output_file).st_mtime_ns
+    with stand_in_server(fixture_route("fc3d_history_empty.html")) as (url, stats):
+        fetcher = FC3DDataFetcher(range_url=url + "/inc/history.php?start={start}&end={end}")
+        assert fetcher.delta_sync(output_file) == 0
+
+    assert "start=2026072&end=2027366" in stats["paths"][0]
+    assert os.stat(output_file).st_mtime_ns == before
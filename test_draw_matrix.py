@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""测试开奖号码矩阵缓存：与 JSON 统计一致、JSON 变化后重建、损坏缓存回退、并发写入与加载耗时"""
+
+import json
+import os
+import shutil
+import threading
+
+from conftest import SCRIPT_DIR
+from draw_matrix import DrawMatrix, json_frequency, run_benchmark, source_stamp
+
+
+def copy_sources(tmp_path):
+    files = {}
+    for game, name in (("ssq", "lottery_history.json"), ("fc3d", "fc3d_history.json")):
+        files[game] = str(tmp_path / name)
+        shutil.copy(os.path.join(SCRIPT_DIR, "data", name), files[game])
+    return files
+
+
+def load_rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["data"]
+
+
+def test_matrix_matches_json_statistics(tmp_path):
+    files = copy_sources(tmp_path)
+    for game, source in files.items():
+        cache_file = str(tmp_path / f"{game}.bin")
+        DrawMatrix.load(game, source, cache_file).close()
+        # 第二次直接 mmap 已有缓存
+        matrix = DrawMatrix.load(game, source, cache_file)
+        assert matrix._mapped is not None
+        rows = load_rows(source)
+
+        assert matrix.count == len(rows)
+        assert [matrix.period(i) for i in range(3)] == [r["period"] for r in rows[:3]]
+        for window in (None, 10, 30):
+            assert matrix.frequency(window) == json_frequency(game, source, window)
+
+        if game == "ssq":
+            assert matrix.row(0) == [int(b) for b in rows[0]["red_balls"]] + [int(rows[0]["blue_ball"])]
+            assert matrix.sums(5) == [sum(int(b) for b in r["red_balls"]) for r in rows[:5]]
+            blue = int(rows[0]["blue_ball"])
+            assert matrix.omission()["blue"][blue] == 0
+            gap = next(i for i, r in enumerate(rows) if "04" in r["red_balls"])
+            assert matrix.omission()["red"][4] == gap
+        else:
+            assert matrix.row(0) == [int(d) for d in rows[0]["digits"]]
+            assert matrix.sums(5) == [r["sum"] for r in rows[:5]]
+        matrix.close()
+
+
+def test_rebuilds_when_json_changes(tmp_path):
+    source = copy_sources(tmp_path)["fc3d"]
+    cache_file = str(tmp_path / "fc3d.bin")
+    matrix = DrawMatrix.load("fc3d", source, cache_file)
+    count = matrix.count
+    matrix.close()
+
+    with open(source, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    document["data"] = document["data"][1:]
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+
+    matrix = DrawMatrix.load("fc3d", source, cache_file)
+    assert matrix.count == count - 1
+    assert matrix.period(0) == document["data"][0]["period"]
+    matrix.close()
+
+
+def test_corrupt_cache_is_rebuilt(tmp_path):
+    source = copy_sources(tmp_path)["ssq"]
+    cache_file = str(tmp_path / "ssq.bin")
+    DrawMatrix.load("ssq", source, cache_file).close()
+    with open(cache_file, 'r+b') as f:
+        f.truncate(100)
+    assert DrawMatrix.open("ssq", cache_file) is None
+
+    matrix = DrawMatrix.load("ssq", source, cache_file)
+    assert matrix.frequency() == json_frequency("ssq", source)
+    matrix.close()
+
+
+def test_concurrent_saves_leave_a_valid_cache(tmp_path):
+    source = copy_sources(tmp_path)["ssq"]
+    cache_file = str(tmp_path / "cache" / "ssq.bin")
+    matrix = DrawMatrix.build("ssq", load_rows(source))
+    stamp = source_stamp(source)
+    errors = []
+
+    def save():
+        try:
+            for _ in range(5):
+                matrix.save(cache_file, stamp)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert sorted(os.listdir(tmp_path / "cache")) == ["ssq.bin", "ssq.bin.lock"]
+    loaded = DrawMatrix.open("ssq", cache_file, stamp)
+    assert loaded.frequency() == json_frequency("ssq", source)
+    loaded.close()
+
+
+def test_mapped_load_beats_json_parsing(tmp_path):
+    files = copy_sources(tmp_path)
+    for result in run_benchmark(repeat=10, source_files=files, cache_dir=str(tmp_path)):
+        assert result["matrix_load_us"] * 3 < result["json_us"]
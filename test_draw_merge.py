@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""测试有序插入合并：头部追加、中间补缺、冲突覆盖与规模无关的合并耗时"""
+
+import json
+import random
+
+from bench_merge import legacy_merge, run_benchmark, synthetic_history
+from draw_merge import find_position, merge_sorted
+from fetch_fc3d_history import FC3DDataFetcher
+
+
+def ssq(period, blue="01"):
+    return {"period": period, "red_balls": ["01", "02", "03", "04", "05", "06"], "blue_ball": blue,
+            "date": "2026-01-01"}
+
+
+def periods(rows):
+    return [r["period"] for r in rows]
+
+
+def test_find_position_in_descending_rows():
+    rows = [ssq(p) for p in ("26005", "26003", "26001")]
+    assert [find_position(rows, p) for p in ("26006", "26005", "26004", "26001", "25150")] == [0, 0, 1, 2, 3]
+
+
+def test_new_draws_go_to_head_and_gaps_are_filled_in_place():
+    existing = [ssq(p) for p in ("26005", "26003", "26001")]
+    merged, added, conflicts = merge_sorted(existing, [ssq("26002"), ssq("26007"), ssq("26006"), ssq("26004")])
+    assert merged is existing
+    assert periods(merged) == ["26007", "26006", "26005", "26004", "26003", "26002", "26001"]
+    assert added == 4 and conflicts == []
+
+
+def test_conflicting_overwrite_is_reported():
+    existing = [ssq("26002"), ssq("26001")]
+    merged, added, conflicts = merge_sorted(existing, [ssq("26002"), ssq("26001", blue="09"), ssq("26001", blue="10")])
+    assert added == 0
+    # 新数据内部的重复期号以最后出现的为准
+    assert merged[1]["blue_ball"] == "10"
+    assert [c["period"] for c in conflicts] == ["26001"] and conflicts[0]["old"]["blue_ball"] == "01"
+
+
+def test_only_number_changes_count_as_conflicts():
+    existing = [ssq("26002"), ssq("26001")]
+    redated = dict(ssq("26002"), date="2026-01-03")
+    merged, added, conflicts = merge_sorted(existing, [redated])
+    # 号码相同只有日期不同：以新数据为准，但不报告冲突
+    assert merged[0] is redated and conflicts == []
+
+    fc3d = {"period": "2026001", "digits": ["1", "2", "3"], "number": "123", "date": "2026-01-01"}
+    _, _, conflicts = merge_sorted([fc3d], [dict(fc3d, date="2026-01-02")])
+    assert conflicts == []
+    _, _, conflicts = merge_sorted([fc3d], [dict(fc3d, digits=["1", "2", "4"], number="124")])
+    assert [c["period"] for c in conflicts] == ["2026001"]
+
+
+def test_matches_full_rebuild_on_random_input():
+    rng = random.Random(7)
+    base = synthetic_history(500)
+    for _ in range(20):
+        picked = rng.sample(base, 40)
+        existing = sorted(picked[:30], key=lambda r: r["period"], reverse=True)
+        new_rows = picked[25:] + [dict(rng.choice(picked), number="000")]
+        assert merge_sorted(list(existing), new_rows)[0] == legacy_merge(existing, new_rows)
+
+
+def test_fetcher_merge_reports_conflicts(tmp_path):
+    output_file = str(tmp_path / "fc3d_history.json")
+    fetcher = FC3DDataFetcher()
+    rows = synthetic_history(3)
+    for row in rows:
+        row.update(sum=0, span=0, type="组六")
+    fetcher.save_to_json(rows[1:], output_file)
+
+    changed = dict(rows[2], digits=["9", "9", "9"], number="999")
+    fetcher.save_to_json([rows[0], changed], output_file)
+
+    with open(output_file, 'r', encoding='utf-8') as f:
+        saved = json.load(f)["data"]
+    assert periods(saved) == periods(rows)
+    assert saved[2]["number"] == "999"
+    assert [c["period"] for c in fetcher.merge_conflicts] == [rows[2]["period"]]
+
+
+def test_merge_cost_stays_flat_as_history_grows():
+    small, large = run_benchmark(sizes=(1000, 50000), repeat=20)
+    assert large["sorted_us"] * 20 < large["legacy_us"]
+    assert large["sorted_us"] < small["sorted_us"] * 20
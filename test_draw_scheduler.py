@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""测试开奖时间感知的调度器：开奖时刻推算、轮询退避与触发发布（模拟时钟）"""
+
+from datetime import datetime, timedelta
+
+from draw_scheduler import DrawScheduler
+from generate_ai_prediction import BEIJING_TZ
+
+
+class FakeClock:
+    """模拟时钟：sleep 只推进时间"""
+
+    def __init__(self, start):
+        self.current = start
+        self.sleeps = []
+
+    def now(self):
+        return self.current
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.current += timedelta(seconds=seconds)
+
+
+def bj(*args):
+    return datetime(*args, tzinfo=BEIJING_TZ)
+
+
+def make_scheduler(clock, latest, results, **kwargs):
+    """
+    latest: {game: 最新一期}；results: 每次同步的返回值，返回正数时本地最新期号加一
+    """
+    state = {game: dict(row) for game, row in latest.items()}
+    events = []
+
+    def sync(game):
+        events.append(("sync", game, clock.now()))
+        count = results.pop(0)
+        if count:
+            state[game]["period"] = str(int(state[game]["period"]) + count)
+        return count
+
+    def publish(game):
+        events.append(("publish", game, clock.now()))
+        return True
+
+    scheduler = DrawScheduler(list(latest), now=clock.now, sleep=clock.sleep, sync=sync, publish=publish,
+                              poll_delay=600, first_interval=60, max_interval=600, give_up_after=3600, **kwargs)
+    scheduler.latest_draw = lambda game: state[game]
+    return scheduler, events
+
+
+def test_next_draw_follows_each_game_calendar():
+    clock = FakeClock(bj(2026, 3, 23, 9, 0))
+    scheduler, _ = make_scheduler(clock, {
+        "ssq": {"period": "26031", "date": "2026-03-22"},      # 周日
+        "fc3d": {"period": "2026071", "date": "2026-03-22"},
+    }, [])
+    assert scheduler.next_draw("ssq") == ("26032", bj(2026, 3, 24, 21, 15))   # 周二
+    assert scheduler.next_draw("fc3d") == ("2026072", bj(2026, 3, 23, 21, 15))
+
+
+def test_polls_after_draw_with_backoff_then_publishes():
+    clock = FakeClock(bj(2026, 3, 23, 9, 0))
+    scheduler, events = make_scheduler(clock, {"fc3d": {"period": "2026071", "date": "2026-03-22"}},
+                                       [0, None, 0, 1])
+    assert scheduler.run_cycle("fc3d") == ("2026072", True)
+
+    syncs = [when for kind, _, when in events if kind == "sync"]
+    assert syncs[0] == bj(2026, 3, 23, 21, 25)          # 开奖后 10 分钟开始
+    gaps = [(b - a).total_seconds() for a, b in zip(syncs, syncs[1:])]
+    assert 30 <= gaps[0] <= 60 and 60 <= gaps[1] <= 120 and 120 <= gaps[2] <= 240
+    assert events[-1][0] == "publish" and events[-1][2] == syncs[-1]
+    assert (events[-1][2] - bj(2026, 3, 23, 21, 15)) < timedelta(minutes=20)
+
+
+def test_gives_up_without_publishing():
+    clock = FakeClock(bj(2026, 3, 23, 22, 0))
+    scheduler, events = make_scheduler(clock, {"fc3d": {"period": "2026071", "date": "2026-03-22"}}, [0] * 50)
+    assert scheduler.run_cycle("fc3d") == ("2026072", False)
+
+    syncs = [when for kind, _, when in events if kind == "sync"]
+    # 已经过了开奖后 10 分钟，立即开始；一小时内放弃
+    assert syncs[0] == bj(2026, 3, 23, 22, 0)
+    assert syncs[-1] - syncs[0] <= timedelta(hours=1)
+    assert max(clock.sleeps) <= 600
+    assert not any(kind == "publish" for kind, _, _ in events)
+
+
+def test_period_already_present_locally_counts_as_fetched():
+    clock = FakeClock(bj(2026, 3, 23, 22, 0))
+    # 这一期已由其他进程写入本地，同步返回 0 期新增
+    scheduler, events = make_scheduler(clock, {"fc3d": {"period": "2026072", "date": "2026-03-23"}}, [0, 0])
+    assert scheduler.poll("fc3d", "2026072", bj(2026, 3, 23, 21, 15))
+    assert [kind for kind, _, _ in events] == ["sync"]
+    assert clock.sleeps == []
+
+
+def test_run_schedules_games_independently():
+    clock = FakeClock(bj(2026, 3, 24, 21, 30))
+    scheduler, events = make_scheduler(clock, {
+        "ssq": {"period": "26031", "date": "2026-03-22"},
+        "fc3d": {"period": "2026072", "date": "2026-03-23"},
+    }, [1, 1])
+    scheduler.run_game("ssq", cycles=1)
+    scheduler.run_game("fc3d", cycles=1)
+    assert [(kind, game) for kind, game, _ in events] == [
+        ("sync", "ssq"), ("publish", "ssq"), ("sync", "fc3d"), ("publish", "fc3d")]
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""测试多数据源竞速：不同延迟、失败与错误数据的本地替身服务器"""
+
+import json
+import os
+import time
+
+from conftest import read_fixture
+from draw_sources import CwlSource, race_sources
+from fetch_fc3d_history import FC3DDataFetcher
+from fetch_lottery_history import LotteryDataFetcher, parse_history_html
+from http_utils import create_session
+
+SSQ_PAGE = read_fixture("ssq_history_26.html").decode("gb2312")
+LATEST = "26028"
+
+
+def drop_rows(html, periods):
+    """去掉指定期号的数据行（模拟更新较慢的镜像站）"""
+    return "\n".join(line for line in html.split("\n")
+                     if not any(f"<td>{p}</td>" in line for p in periods))
+
+
+def page_route(html, status=200):
+    body = html.encode("gb2312")
+    return lambda path, query: (status, body, {"Retry-After": "0"})
+
+
+def mirror_url(base_url):
+    return base_url + "/history.php?start={start}&end={end}"
+
+
+def make_ssq_output(tmp_path):
+    """本地数据截止到 26028 期"""
+    (tmp_path / "fetch_history").mkdir()
+    (tmp_path / "data").mkdir()
+    output_file = str(tmp_path / "fetch_history" / "lottery_data.json")
+    rows = [r for r in parse_history_html(SSQ_PAGE) if r["period"] <= LATEST]
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+    return output_file
+
+
+def load_periods(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [r["period"] for r in json.load(f)]
+
+
+def test_fastest_valid_mirror_wins(tmp_path, stand_in_server):
+    output_file = make_ssq_output(tmp_path)
+    with stand_in_server(page_route(SSQ_PAGE), latency=1.0) as (slow, slow_stats), \
+            stand_in_server(page_route(SSQ_PAGE), latency=0.05) as (fast, fast_stats):
+        fetcher = LotteryDataFetcher(sources=[mirror_url(slow), mirror_url(fast)])
+        start = time.perf_counter()
+        assert fetcher.delta_sync(output_file) == 3
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.9
+    # 查询从本地最新一期开始，以便与本地数据交叉校验
+    assert "start=26028&end=27200" in fast_stats["paths"][0]
+    assert load_periods(output_file)[:4] == ["26031", "26030", "26029", "26028"]
+
+
+def test_failing_and_inconsistent_sources_are_skipped(tmp_path, stand_in_server):
+    output_file = make_ssq_output(tmp_path)
+    # 快速镜像把本地已有的 26028 期蓝球写错，另一个直接返回 503
+    wrong = SSQ_PAGE.replace('<td class="t_cfont4">15</td>', '<td class="t_cfont4">16</td>', 1)
+    assert wrong != SSQ_PAGE
+    with stand_in_server(page_route(wrong), latency=0.01) as (bad, _), \
+            stand_in_server(page_route("", status=503)) as (down, _), \
+            stand_in_server(page_route(SSQ_PAGE), latency=0.3) as (good, good_stats):
+        fetcher = LotteryDataFetcher(sources=[mirror_url(bad), mirror_url(down), mirror_url(good)])
+        assert fetcher.delta_sync(output_file) == 3
+    assert good_stats["requests"] == 1
+
+
+def test_lagging_mirror_does_not_hide_new_draws(stand_in_server):
+    lagging = drop_rows(SSQ_PAGE, ["26029", "26030", "26031"])
+    reference = {r["period"]: r for r in parse_history_html(SSQ_PAGE) if r["period"] == LATEST}
+    with stand_in_server(page_route(lagging), latency=0.01) as (stale, _), \
+            stand_in_server(page_route(SSQ_PAGE), latency=0.3) as (fresh, _):
+        fetcher = LotteryDataFetcher(sources=[mirror_url(stale), mirror_url(fresh)])
+        rows, name = race_sources(fetcher.sources, LATEST, "27200", reference)
+    assert name == mirror_url(fresh)
+    assert max(r["period"] for r in rows) == "26031"
+
+
+def test_gap_in_periods_is_rejected(stand_in_server):
+    gapped = drop_rows(SSQ_PAGE, ["26030"])
+    with stand_in_server(page_route(gapped)) as (url, _):
+        fetcher = LotteryDataFetcher(sources=[mirror_url(url)])
+        assert race_sources(fetcher.sources, LATEST, "27200") == (None, None)
+
+
+def test_quorum_requires_agreeing_sources(stand_in_server):
+    with stand_in_server(page_route(SSQ_PAGE)) as (a, _), stand_in_server(page_route(SSQ_PAGE)) as (b, _):
+        fetcher = LotteryDataFetcher(sources=[mirror_url(a), mirror_url(b)])
+        rows, _ = race_sources(fetcher.sources, LATEST, "27200", quorum=2)
+        assert len(rows) == 4
+        fetcher = LotteryDataFetcher(sources=[mirror_url(a)])
+        assert race_sources(fetcher.sources, LATEST, "27200", quorum=2) == (None, None)
+
+
+def test_all_sources_failing_leaves_data_untouched(tmp_path, stand_in_server):
+    output_file = make_ssq_output(tmp_path)
+    before = os.stat(output_file).st_mtime_ns
+    with stand_in_server(page_route("", status=503)) as (url, _):
+        fetcher = LotteryDataFetcher(sources=[mirror_url(url)])
+        assert fetcher.delta_sync(output_file) is None
+    assert os.stat(output_file).st_mtime_ns == before
+
+
+def test_failed_save_does_not_update_cache_on_race_path(tmp_path, monkeypatch, stand_in_server):
+    output_file = make_ssq_output(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    with stand_in_server(page_route(SSQ_PAGE)) as (url, _):
+        source = mirror_url(url)
+        page_url = source.format(start=LATEST, end="27200")
+        fetcher = LotteryDataFetcher(cache_dir=cache_dir, sources=[source])
+        monkeypatch.setattr(fetcher, "save_to_json", lambda *args, **kwargs: False)
+        assert fetcher.delta_sync(output_file) is None
+        assert fetcher.cache.load(page_url) == (None, None)
+
+        # 下次运行该页面仍视为有变化，新开奖照常写入，成功后才写入缓存
+        fetcher = LotteryDataFetcher(cache_dir=cache_dir, sources=[source])
+        assert fetcher.fetch_text_if_changed(page_url, defer=True)[1]
+        fetcher.commit_cache(False)
+        assert fetcher.delta_sync(output_file) == 3
+        assert fetcher.cache.load(page_url)[0] is not None
+    assert load_periods(output_file)[0] == "26031"
+
+
+def test_cwl_source_converts_official_json(stand_in_server):
+    ssq_body = json.dumps({"state": 0, "result": [
+        {"code": "2026031", "date": "2026-03-22(日)", "red": "03,10,12,13,18,33", "blue": "08"},
+    ]}).encode("utf-8")
+    fc3d_body = json.dumps({"state": 0, "result": [
+        {"code": "2026071", "date": "2026-03-22(日)", "red": "2,6,1", "blue": ""},
+    ]}).encode("utf-8")
+
+    def route(path, query):
+        assert query["issueStart"][0].startswith("2026")
+        return 200, ssq_body if query["name"] == ["ssq"] else fc3d_body
+
+    with stand_in_server(route) as (url, stats):
+        api_url = url + "/findDrawNotice?name={name}&issueStart={start}&issueEnd={end}"
+        ssq = CwlSource("ssq", create_session({}), api_url=api_url).fetch_range("26031", "27200")
+        fc3d = CwlSource("fc3d", create_session({}), api_url=api_url).fetch_range("2026071", "2027366")
+
+    assert "issueStart=2026031&issueEnd=2027200" in stats["paths"][0]
+    assert ssq == [{"period": "26031", "red_balls": ["03", "10", "12", "13", "18", "33"],
+                    "blue_ball": "08", "date": "2026-03-22"}]
+    assert fc3d[0]["number"] == "261" and fc3d[0]["type"] == "组六"
+
+
+def test_fc3d_fetcher_syncs_from_mirror_source(tmp_path, stand_in_server):
+    output_file = str(tmp_path / "fc3d_history.json")
+    fc3d_page = read_fixture("fc3d_history_2026.html")
+    fetcher = FC3DDataFetcher()
+    rows = [r for r in fetcher.parse_html(fc3d_page.decode("gb2312")) if r["period"] <= "2026069"]
+    fetcher.save_to_json(rows, output_file)
+
+    with stand_in_server(lambda path, query: (200, fc3d_page)) as (url, stats):
+        fetcher = FC3DDataFetcher(sources=[url + "/inc/history.php?start={start}&end={end}"])
+        assert fetcher.delta_sync(output_file) == 2
+    assert "start=2026069&end=2027366" in stats["paths"][0]
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""测试福彩3D 可断点续传的全量回填（本地 HTTP 替身服务器）"""
+
+import json
+import os
+import time
+
+from conftest import read_fixture
+from fetch_fc3d_history import FC3DDataFetcher
+
+RECORDED_YEARS = ("2025", "2026")
+
+
+def fc3d_route(fail_years=()):
+    """按 start 参数的年份返回 fixtures/fc3d_history_<yyyy>.html，没有录制页面的年份返回空表"""
+    def route(path, query):
+        year = query["start"][0][:4]
+        if year in fail_years:
+            return 503, b"", {"Retry-After": "0"}
+        if year in RECORDED_YEARS:
+            return 200, read_fixture(f"fc3d_history_{year}.html")
+        return 200, read_fixture("fc3d_history_empty.html")
+    return route
+
+
+def range_url(base_url):
+    return base_url + "/inc/history.php?start={start}&end={end}"
+
+
+def load_output(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_backfill_pages_go_back_to_2004():
+    pages = FC3DDataFetcher.build_backfill_pages(2004, 2026)
+    assert len(pages) == 23
+    assert pages[0] == ("2026001", "2026366")
+    assert pages[-1] == ("2004001", "2004366")
+
+
+def test_backfill_merges_all_pages_and_clears_checkpoints(tmp_path, stand_in_server):
+    output_file = str(tmp_path / "fc3d_history.json")
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    with stand_in_server(fc3d_route(), latency=0.05) as (url, stats):
+        fetcher = FC3DDataFetcher(range_url=range_url(url))
+        start = time.perf_counter()
+        assert fetcher.backfill(output_file, 2004, 2026, workers=4, rate=0, checkpoint_dir=checkpoint_dir)
+        elapsed = time.perf_counter() - start
+
+    # 23 页每页 50ms 延迟，并发抓取应明显快于串行的 1.15s
+    assert stats["max_in_flight"] > 1
+    assert elapsed < 23 * 0.05
+
+    data = load_output(output_file)
+    assert data["lottery_type"] == "fc3d"
+    assert len(data["data"]) == 227
+    assert data["data"][0]["period"] == "2026071"
+    assert data["data"][0]["digits"] == ["2", "6", "1"]
+    assert data["next_draw"]["next_period"] == "2026072"
+    assert not os.path.exists(checkpoint_dir)
+
+
+def test_interrupted_backfill_resumes_from_checkpoints(tmp_path, stand_in_server):
+    output_file = str(tmp_path / "fc3d_history.json")
+    checkpoint_dir = str(tmp_path / "checkpoints")
+
+    # 第一次运行：2025 年页面失败，其余页面写入检查点，不写输出文件
+    with stand_in_server(fc3d_route(fail_years=("2025",))) as (url, stats):
+        fetcher = FC3DDataFetcher(range_url=range_url(url))
+        assert not fetcher.backfill(output_file, 2020, 2026, workers=3, rate=0, checkpoint_dir=checkpoint_dir)
+    assert not os.path.exists(output_file)
+    assert len(os.listdir(checkpoint_dir)) == 6
+    assert not any(name.endswith(".tmp") for name in os.listdir(checkpoint_dir))
+
+    # 第二次运行：只请求缺失的页面，完成后一次性写入
+    with stand_in_server(fc3d_route()) as (url, stats):
+        fetcher = FC3DDataFetcher(range_url=range_url(url))
+        assert fetcher.backfill(output_file, 2020, 2026, workers=3, rate=0, checkpoint_dir=checkpoint_dir)
+    assert stats["requests"] == 1
+    assert "start=2025001" in stats["paths"][0]
+
+    data = load_output(output_file)
+    assert len(data["data"]) == 227
+    assert not os.path.exists(checkpoint_dir)
+
+
+def test_restart_discards_checkpoints(tmp_path, stand_in_server):
+    output_file = str(tmp_path / "fc3d_history.json")
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    with stand_in_server(fc3d_route(fail_years=("2026",))) as (url, stats):
+        fetcher = FC3DDataFetcher(range_url=range_url(url))
+        assert not fetcher.backfill(output_file, 2024, 2026, workers=2, rate=0, checkpoint_dir=checkpoint_dir)
+
+    with stand_in_server(fc3d_route()) as (url, stats):
+        fetcher = FC3DDataFetcher(range_url=range_url(url))
+        assert fetcher.backfill(output_file, 2024, 2026, workers=2, rate=0, checkpoint_dir=checkpoint_dir,
+                                restart=True)
+    assert stats["requests"] == 3
+
+
+def test_failed_save_keeps_checkpoints(tmp_path, stand_in_server, monkeypatch):
+    output_file = str(tmp_path / "fc3d_history.json")
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    with stand_in_server(fc3d_route()) as (url, stats):
+        fetcher = FC3DDataFetcher(range_url=range_url(url))
+        monkeypatch.setattr("fetch_fc3d_history.write_json_if_changed",
+                            lambda *args, **kwargs: (_ for _ in ()).throw(OSError("disk full")))
+        assert not fetcher.backfill(output_file, 2024, 2026, workers=2, rate=0, checkpoint_dir=checkpoint_dir)
+    assert not os.path.exists(output_file)
+    assert len(os.listdir(checkpoint_dir)) == 3
+
+    # 写入恢复后不再请求网络，直接由检查点合并
+    monkeypatch.undo()
+    with stand_in_server(fc3d_route()) as (url, stats):
+        fetcher = FC3DDataFetcher(range_url=range_url(url))
+        assert fetcher.backfill(output_file, 2024, 2026, workers=2, rate=0, checkpoint_dir=checkpoint_dir)
+    assert stats["requests"] == 0
+    assert len(load_output(output_file)["data"]) == 227
+    assert not os.path.exists(checkpoint_dir)
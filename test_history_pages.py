@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""测试历史预测归档的分页导出：分页拼接后与归档一致、无变化不改写、首屏大小与归档长度无关"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from archive_stream import ArchiveWriter
+from bench_archive import synthetic_record
+from conftest import SCRIPT_DIR
+from history_pages import export_pages, period_year
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_pages(out_dir, index):
+    records = []
+    for page in index["pages"]:
+        records.extend(load_json(os.path.join(out_dir, page["file"]))["predictions_history"])
+    return records
+
+
+@pytest.mark.parametrize("game,name", [("ssq", "predictions_history.json"),
+                                       ("fc3d", "fc3d_predictions_history.json")])
+def test_pages_concatenate_to_archive(tmp_path, game, name):
+    source = str(tmp_path / name)
+    shutil.copy(os.path.join(SCRIPT_DIR, "data", name), source)
+    out_dir = str(tmp_path / game)
+    records = load_json(source)["predictions_history"]
+
+    index = export_pages(game, source, out_dir, hot_size=10)
+    assert index == load_json(os.path.join(out_dir, "index.json"))
+    assert index["total"] == len(records)
+    assert index["pages"][0]["file"] == "hot.json" and index["pages"][0]["count"] == 10
+    assert read_pages(out_dir, index) == records
+    for page in index["pages"][1:]:
+        assert page["file"] == f"{page['year']}.json"
+        assert period_year(game, page["first_period"]) == period_year(game, page["last_period"]) == page["year"]
+
+    # 内容没有变化时不改写任何分页
+    mtimes = {f: os.stat(os.path.join(out_dir, f)).st_mtime_ns for f in os.listdir(out_dir)}
+    assert export_pages(game, source, out_dir, hot_size=10) == index
+    assert {f: os.stat(os.path.join(out_dir, f)).st_mtime_ns for f in os.listdir(out_dir)} == mtimes
+
+    # 全部记录都放得进热文件时，删除已不再使用的年份分片
+    index = export_pages(game, source, out_dir, hot_size=len(records))
+    assert [page["file"] for page in index["pages"]] == ["hot.json"]
+    assert sorted(f for f in os.listdir(out_dir) if not f.endswith(".lock")) == ["hot.json", "index.json"]
+
+
+def test_first_page_size_does_not_grow_with_archive(tmp_path):
+    sizes = []
+    for count in (200, 800):
+        source = str(tmp_path / f"archive_{count}.json")
+        with ArchiveWriter(source, {"历史预测记录": "合成归档"}) as writer:
+            for i in range(count):
+                writer.write(synthetic_record(i))
+        out_dir = str(tmp_path / f"pages_{count}")
+        index = export_pages("ssq", source, out_dir)
+        assert index["total"] == count
+        assert len(index["pages"]) >= 2
+        sizes.append(os.path.getsize(os.path.join(out_dir, "hot.json")))
+    assert sizes[0] == sizes[1]
+
+
+def test_unsorted_archive_is_rejected(tmp_path):
+    source = str(tmp_path / "archive.json")
+    with ArchiveWriter(source) as writer:
+        for period in ("26002", "25150", "26001"):
+            writer.write(dict(synthetic_record(0), target_period=period))
+    with pytest.raises(ValueError):
+        export_pages("ssq", source, str(tmp_path / "pages"), hot_size=1)
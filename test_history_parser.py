@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""测试历史开奖表格解析：录制网页语料上的 BeautifulSoup 路径、快速路径与吞吐量"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+from bs4 import BeautifulSoup
+
+from bench_parsers import run_benchmark
+from conftest import FIXTURES_DIR, SCRIPT_DIR, read_fixture
+from fetch_fc3d_history import FC3DDataFetcher
+from fetch_lottery_history import LotteryDataFetcher
+from history_parser import parse_fc3d_fast, parse_ssq_fast
+
+FIXTURES = sorted(name for name in os.listdir(FIXTURES_DIR) if name.endswith(".html"))
+
+
+def page(name):
+    """录制网页均为 gb2312 编码"""
+    return read_fixture(name).decode("gb2312")
+
+
+def soup_parse(name):
+    html = page(name)
+    if name.startswith("ssq"):
+        return LotteryDataFetcher.parse_lottery_data(BeautifulSoup(html, 'html.parser'))
+    return FC3DDataFetcher().parse_fc3d_data(BeautifulSoup(html, 'html.parser'))
+
+
+def fast_parse(name):
+    return (parse_ssq_fast if name.startswith("ssq") else parse_fc3d_fast)(page(name))
+
+
+def html_parse(name):
+    if name.startswith("ssq"):
+        return LotteryDataFetcher.parse_html(page(name))
+    return FC3DDataFetcher().parse_html(page(name))
+
+
+def committed_records(filename, count):
+    with open(os.path.join(SCRIPT_DIR, "data", filename), 'r', encoding='utf-8') as f:
+        return json.load(f)["data"][-count:]
+
+
+@pytest.mark.parametrize("name", FIXTURES)
+def test_fast_path_matches_beautifulsoup(name):
+    expected = soup_parse(name)
+    fast = fast_parse(name)
+    if fast is not None:
+        assert fast == expected
+    assert html_parse(name) == expected
+
+
+def test_current_layouts():
+    ssq = html_parse("ssq_history_26.html")
+    assert len(ssq) == 31
+    assert ssq[0] == {"period": "26031", "red_balls": ["03", "10", "12", "13", "18", "33"],
+                      "blue_ball": "08", "date": "2026-03-22"}
+
+    fc3d = html_parse("fc3d_history_2026.html")
+    assert len(fc3d) == 71
+    assert fc3d[0] == {"period": "2026071", "digits": ["2", "6", "1"], "number": "261", "sum": 9,
+                       "span": 5, "type": "组六", "date": "2026-03-22"}
+
+
+def test_old_layouts_parse_on_the_fast_path():
+    # 福彩3D 旧版：号码分三列，日期在倒数第二列（最后一列是 &nbsp; 备注）
+    assert parse_fc3d_fast(page("fc3d_history_old_layout.html")) == committed_records("fc3d_history.json", 30)
+    # 双色球旧版：没有 tbody 和注释列
+    assert parse_ssq_fast(page("ssq_history_old_layout.html")) == committed_records("lottery_history.json", 30)
+
+
+def test_rows_without_class_fall_back_to_beautifulsoup():
+    assert parse_fc3d_fast(page("fc3d_history_no_row_class.html")) is None
+    rows = html_parse("fc3d_history_no_row_class.html")
+    assert [r["period"] for r in rows] == [r["period"] for r in committed_records("fc3d_history.json", 60)[:30]]
+
+
+def test_fc3d_edge_rows():
+    rows = {r["period"]: r for r in html_parse("fc3d_history_edge_rows.html")}
+    # 合计行、6 位期号、只有两个号码、尚未开奖的行都被跳过
+    assert sorted(rows) == ["2025296", "2025297", "2025298", "2025299", "2025300"]
+    assert rows["2025300"]["type"] == "豹子"
+    assert rows["2025299"]["digits"] == ["0", "0", "9"] and rows["2025299"]["type"] == "组三"
+    assert rows["2025298"]["digits"] == ["1", "2", "3"]  # &nbsp; 分隔
+    assert rows["2025297"]["date"] == "2025-11-02"  # 单元格内换行
+    assert rows["2025296"]["date"] == datetime.now().strftime("%Y-%m-%d")  # 缺少日期时取当天
+
+
+def test_ssq_edge_rows():
+    rows = html_parse("ssq_history_edge_rows.html")
+    # 跨列说明行与列数不足的行被跳过
+    assert [r["period"] for r in rows] == ["25150", "25149", "25148", "25147"]
+    assert rows[1]["red_balls"][0] == "07" and rows[1]["blue_ball"] == "01"  # 单元格内嵌标签
+    assert rows[2]["red_balls"][0] == "08" and rows[2]["date"] == "2025-12-25"  # 首尾空白
+    assert rows[3]["date"] == "2025-12-23"  # 大写标签
+
+
+def test_unsupported_structures_fall_back():
+    nested = ('<table><tbody><tr><td>26001</td><td><table><tr><td>x</td></tr></table></td>'
+              + '<td>01</td>' * 14 + '</tr></tbody></table>')
+    unclosed = '<table><tbody><tr><td>26001<td>01<td>02</tr></tbody></table>'
+    assert parse_ssq_fast(nested) is None
+    assert parse_ssq_fast(unclosed) is None
+    assert parse_ssq_fast(page("ssq_history_empty.html")) is None
+    assert LotteryDataFetcher.parse_html(page("ssq_history_empty.html")) == []
+
+
+def test_gb2312_pages_decode_through_fetcher(stand_in_server):
+    raw = read_fixture("fc3d_history_old_layout.html")
+    with pytest.raises(UnicodeDecodeError):
+        raw.decode("utf-8")
+    with stand_in_server(lambda path, query: (200, raw)) as (url, stats):
+        text = FC3DDataFetcher().fetch_text(url + "/inc/history.php")
+    assert "开奖日期" in text
+    assert len(FC3DDataFetcher().parse_html(text)) == 30
+
+
+def test_fast_path_throughput():
+    results = {(r["game"], r["parser"]): r for r in run_benchmark(repeat=2)}
+    for game in ("ssq", "fc3d"):
+        fast, soup = results[(game, "fast")], results[(game, "beautifulsoup")]
+        assert fast["rows"] == soup["rows"] > 0
+        assert fast["rows_per_sec"] > 3 * soup["rows_per_sec"]
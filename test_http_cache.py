@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""测试条件请求、原始响应缓存（含并发写入）与退避重试"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch_fc3d_history
+
+from conftest import read_fixture
+from fetch_fc3d_history import FC3DDataFetcher
+from http_utils import ResponseCache, create_session, fetch_with_cache
+
+PAGE = read_fixture("fc3d_history_2026.html")
+
+
+def etag_route(etag='"v1"'):
+    """第一次返回完整页面与 ETag，之后视为页面未变化返回 304"""
+    served = []
+
+    def route(path, query):
+        served.append(path)
+        if len(served) == 1:
+            return 200, PAGE, {"ETag": etag, "Last-Modified": "Sun, 18 Oct 2026 13:30:00 GMT"}
+        return 304, b""
+    return route
+
+
+def test_second_request_is_conditional_and_reuses_cache(tmp_path, stand_in_server):
+    cache = ResponseCache(str(tmp_path))
+    session = create_session({})
+    with stand_in_server(etag_route()) as (url, stats):
+        body, changed = fetch_with_cache(session, url + "/page", cache)
+        assert changed and body == PAGE
+        body, changed = fetch_with_cache(session, url + "/page", cache)
+
+    assert not changed and body == PAGE
+    assert "If-None-Match" not in stats["headers"][0]
+    assert stats["headers"][1]["If-None-Match"] == '"v1"'
+    assert stats["headers"][1]["If-Modified-Since"] == "Sun, 18 Oct 2026 13:30:00 GMT"
+
+
+def test_unchanged_content_hash_counts_as_unchanged(tmp_path, stand_in_server):
+    cache = ResponseCache(str(tmp_path))
+    session = create_session({})
+    with stand_in_server(lambda path, query: (200, PAGE)) as (url, stats):
+        assert fetch_with_cache(session, url + "/page", cache)[1]
+        assert not fetch_with_cache(session, url + "/page", cache)[1]
+
+
+def test_retries_with_backoff_then_succeeds(stand_in_server):
+    attempts = []
+
+    def flaky(path, query):
+        attempts.append(path)
+        if len(attempts) < 3:
+            return 503, b""
+        return 200, PAGE
+
+    with stand_in_server(flaky) as (url, stats):
+        body, changed = fetch_with_cache(create_session({}), url + "/page", retry=3, backoff=0.01)
+    assert body == PAGE and changed
+    assert stats["requests"] == 3
+
+
+def test_client_errors_are_not_retried(stand_in_server):
+    with stand_in_server(lambda path, query: (404, b"")) as (url, stats):
+        assert fetch_with_cache(create_session({}), url + "/page", retry=3, backoff=0.01) == (None, False)
+    assert stats["requests"] == 1
+
+
+def test_fetcher_skips_parse_and_write_when_page_unchanged(tmp_path, stand_in_server):
+    output_file = str(tmp_path / "fc3d_history.json")
+    with stand_in_server(etag_route()) as (url, stats):
+        fetcher = FC3DDataFetcher(base_url=url + "/inc/history.php?limit=200", cache_dir=str(tmp_path / "cache"))
+        assert fetcher.fetch_and_save(output_file)
+        first_mtime = (tmp_path / "fc3d_history.json").stat().st_mtime_ns
+        fetcher.parse_html = None  # 未变化时不应再解析
+        assert fetcher.fetch_and_save(output_file)
+
+    assert (tmp_path / "fc3d_history.json").stat().st_mtime_ns == first_mtime
+    assert stats["headers"][1]["If-None-Match"] == '"v1"'
+
+
+def test_failed_save_does_not_update_cache(tmp_path, stand_in_server, monkeypatch):
+    output_file = str(tmp_path / "fc3d_history.json")
+    with stand_in_server(lambda path, query: (200, PAGE)) as (url, stats):
+        fetcher = FC3DDataFetcher(base_url=url + "/inc/history.php?limit=200", cache_dir=str(tmp_path / "cache"))
+        with monkeypatch.context() as m:
+            m.setattr(fetch_fc3d_history, "write_json_if_changed",
+                      lambda *args, **kwargs: (_ for _ in ()).throw(OSError("磁盘已满")))
+            assert not fetcher.fetch_and_save(output_file)
+        assert not fetcher.cache.pending
+
+        # 上次保存失败，同样的页面仍视为有变化，重新解析并写入
+        parsed = []
+        parse_html = fetcher.parse_html
+        fetcher.parse_html = lambda html: parsed.append(html) or parse_html(html)
+        assert fetcher.fetch_and_save(output_file)
+
+    assert parsed and (tmp_path / "fc3d_history.json").exists()
+    assert fetcher.cache.load(url + "/inc/history.php?limit=200")[0] is not None
+
+
+def test_concurrent_stores_of_one_url_do_not_collide(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    bodies = [bytes([i]) * 4096 for i in range(16)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda body: cache.store("https://example.com/page", body, etag=str(body[0])), bodies))
+
+    meta, body = cache.load("https://example.com/page")
+    assert body in bodies and meta["etag"] is not None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
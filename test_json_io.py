@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""测试 JSON 写入：内容不变时不改写文件、--exit-code、原子写入与多进程文件锁"""
+
+import json
+import multiprocessing
+import os
+import stat
+import sys
+import threading
+
+import pytest
+
+import fetch_fc3d_history
+from conftest import read_fixture
+from fetch_lottery_history import LotteryDataFetcher, parse_history_html
+from json_io import (EXIT_UNCHANGED, atomic_write_json, canonical_digest, file_lock, update_json,
+                     write_json_if_changed)
+
+
+def test_volatile_fields_do_not_trigger_write(tmp_path):
+    path = str(tmp_path / "doc.json")
+    document = {"last_updated": "2026-01-01T00:00:00", "data": [{"period": "26001"}]}
+    assert write_json_if_changed(path, document) is True
+    mtime = os.stat(path).st_mtime_ns
+
+    refreshed = dict(document, last_updated="2026-01-02T00:00:00")
+    assert canonical_digest(refreshed) == canonical_digest(document)
+    assert write_json_if_changed(path, refreshed) is False
+    assert os.stat(path).st_mtime_ns == mtime
+
+    changed = dict(document, data=[{"period": "26002"}])
+    assert write_json_if_changed(path, changed) is True
+    with open(path, 'r', encoding='utf-8') as f:
+        assert json.load(f)["data"][0]["period"] == "26002"
+
+
+def test_ssq_resave_keeps_files_untouched(tmp_path):
+    (tmp_path / "fetch_history").mkdir()
+    (tmp_path / "data").mkdir()
+    output_file = str(tmp_path / "fetch_history" / "lottery_data.json")
+    web_file = str(tmp_path / "data" / "lottery_history.json")
+    rows = parse_history_html(read_fixture("ssq_history_26.html").decode("gb2312"))
+
+    first = LotteryDataFetcher()
+    first.save_to_json(rows, output_file)
+    assert first.written_files == [output_file, LotteryDataFetcher.web_file_path(output_file)]
+    mtimes = {p: os.stat(p).st_mtime_ns for p in (output_file, web_file)}
+
+    again = LotteryDataFetcher()
+    again.save_to_json(rows, output_file)
+    assert again.written_files == []
+    assert {p: os.stat(p).st_mtime_ns for p in (output_file, web_file)} == mtimes
+    assert not [name for name in os.listdir(tmp_path / "fetch_history") if "_backup_" in name]
+
+
+@pytest.mark.parametrize("writes, expected", [(False, EXIT_UNCHANGED), (True, None)])
+def test_exit_code_reports_unchanged(monkeypatch, writes, expected):
+    def fake_fetch_and_save(self, *args, **kwargs):
+        if writes:
+            self.written_files.append("fc3d_history.json")
+        return True
+
+    monkeypatch.setattr(fetch_fc3d_history.FC3DDataFetcher, "fetch_and_save", fake_fetch_and_save)
+    monkeypatch.setattr(sys, "argv", ["fetch_fc3d_history.py", "--no-cache", "--exit-code"])
+    if expected is None:
+        fetch_fc3d_history.main()
+    else:
+        with pytest.raises(SystemExit) as exc:
+            fetch_fc3d_history.main()
+        assert exc.value.code == expected
+
+
+def append_entries(path, worker, count):
+    def append(data, item):
+        data["items"].append(item)
+        return True
+
+    for i in range(count):
+        update_json(path, lambda data: append(data, f"{worker}-{i}"), {"items": []})
+
+
+def test_concurrent_processes_do_not_lose_updates(tmp_path):
+    path = str(tmp_path / "predictions_history.json")
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    workers = [context.Process(target=append_entries, args=(path, w, 25)) for w in range(4)]
+    for p in workers:
+        p.start()
+    # 同一进程内的线程同时写入
+    threads = [threading.Thread(target=append_entries, args=(path, f"t{w}", 25)) for w in range(2)]
+    for t in threads:
+        t.start()
+    for p in workers:
+        p.join()
+    for t in threads:
+        t.join()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        items = json.load(f)["items"]
+    assert len(items) == len(set(items)) == 6 * 25
+
+
+def test_failed_write_keeps_original_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "ai_predictions.json")
+    atomic_write_json(path, {"target_period": "26031"})
+    os.chmod(path, 0o640)
+    original = open(path, 'rb').read()
+
+    def crash(src, dst):
+        raise OSError("进程在改名前被终止")
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "replace", crash)
+        with pytest.raises(OSError):
+            atomic_write_json(path, {"target_period": "26032"})
+    assert open(path, 'rb').read() == original
+    assert sorted(os.listdir(tmp_path)) == ["ai_predictions.json", "ai_predictions.json.lock"]
+
+    atomic_write_json(path, {"target_period": "26032"})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_lock_is_reentrant_within_a_thread(tmp_path):
+    path = str(tmp_path / "lottery_data.json")
+    with file_lock(path):
+        with file_lock(path):
+            assert write_json_if_changed(path, [{"period": "26001"}]) is True
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""测试多模型共识的投票权重：正常模型按平均命中加权、从未命中的模型取下限、新模型取平均"""
+
+import pytest
+
+from archive_stream import ArchiveWriter
+from leaderboard import MIN_MEAN_HITS, load_leaderboard_weights, model_weights
+
+
+def test_weights_for_normal_zero_hit_and_missing_models():
+    hits = {"strong": [3, 3], "weak": [1, 1], "never": [0, 0, 0]}
+    weights = model_weights(hits, ["strong", "weak", "never", "new"])
+
+    means = {"strong": 3, "weak": 1, "never": MIN_MEAN_HITS, "new": (3 + 1 + 0) / 3}
+    scale = sum(means.values()) / len(means)
+    assert weights == {mid: round(mean / scale, 4) for mid, mean in means.items()}
+    # 从未命中的模型权重最低，而不是退回平均值
+    assert 0 < weights["never"] < weights["weak"] < weights["new"] < weights["strong"]
+    assert sum(weights.values()) / len(weights) == pytest.approx(1, abs=1e-3)
+
+
+def test_all_zero_or_no_history_gives_equal_weights():
+    assert model_weights({"a": [0], "b": [0]}, ["a", "b", "c"]) == {"a": 1.0, "b": 1.0, "c": 1.0}
+    assert model_weights({}, ["a", "b"]) == {"a": 1.0, "b": 1.0}
+    assert model_weights({"a": [2]}, []) == {}
+
+
+def test_weights_from_archive_file(tmp_path):
+    history = str(tmp_path / "predictions_history.json")
+    with ArchiveWriter(history) as writer:
+        for period, best in (("26003", 2), ("26002", 0), ("26001", 4)):
+            writer.write({"target_period": period,
+                          "models": [{"model_id": "a", "best_hit_count": best},
+                                     {"model_id": "b", "best_hit_count": 0}]})
+
+    # 只看最近两期：a 平均 1，b 从未命中
+    weights = load_leaderboard_weights(["a", "b"], "ssq", history, window=2)
+    scale = (1 + MIN_MEAN_HITS) / 2
+    assert weights == {"a": round(1 / scale, 4), "b": round(MIN_MEAN_HITS / scale, 4)}
+    assert load_leaderboard_weights(["a"], "ssq", str(tmp_path / "missing.json")) == {"a": 1.0}
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""测试 SQLite 存储后端：导入导出逐字节一致、索引查询、外部修改后重新导入、抓取器与预测脚本的数据库模式"""
+
+import copy
+import json
+import os
+
+import pytest
+
+import generate_fc3d_prediction
+from conftest import SCRIPT_DIR, read_fixture
+from fetch_lottery_history import LotteryDataFetcher
+from lottery_db import GAME_FILES, LotteryDB, open_store
+
+DATA_DIR = os.path.join(SCRIPT_DIR, "data")
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def store(tmp_path):
+    db = LotteryDB(str(tmp_path / "lottery.db"))
+    db.import_json(DATA_DIR)
+    yield db
+    db.close()
+
+
+def test_import_then_export_is_byte_identical(store, tmp_path):
+    out_dir = tmp_path / "export"
+    written = store.export_json(str(out_dir))
+    assert len(written) == 6
+    for game in GAME_FILES:
+        for name in GAME_FILES[game].values():
+            with open(os.path.join(DATA_DIR, name), 'rb') as a, open(out_dir / name, 'rb') as b:
+                assert a.read() == b.read(), name
+
+
+def test_indexed_lookups_match_json_scans(store):
+    history = load_json(os.path.join(DATA_DIR, "lottery_history.json"))["data"]
+    assert store.latest_period("ssq") == history[0]["period"]
+    assert store.find_draw("ssq", history[5]["period"]) == history[5]
+
+    blue_07 = [r["period"] for r in history if r["blue_ball"] == "07"]
+    assert store.periods_with_number("ssq", "07", slot="blue") == blue_07
+    red_07 = [r["period"] for r in history if "07" in r["red_balls"]]
+    assert store.periods_with_number("ssq", "07", slot="red") == red_07
+
+    archive = load_json(os.path.join(DATA_DIR, "fc3d_predictions_history.json"))["predictions_history"]
+    expected = {}
+    for record in archive[:10]:
+        for model in record["models"]:
+            expected.setdefault(model["model_id"], []).append(model.get("best_hit_count", 0))
+    assert store.recent_model_hits("fc3d", 10) == expected
+
+    model_id = archive[0]["models"][0]["model_id"]
+    rounds = store.model_rounds("fc3d", model_id)
+    assert rounds[0] == (archive[0]["target_period"], archive[0]["models"][0]["best_group"],
+                         archive[0]["models"][0]["best_hit_count"])
+
+
+def test_upsert_reports_conflicts(store):
+    latest = store.find_draw("ssq", store.latest_period("ssq"))
+    newer = dict(latest, period=str(int(latest["period"]) + 1))
+    changed = dict(latest, blue_ball="16" if latest["blue_ball"] != "16" else "15")
+
+    added, conflicts = store.upsert_draws("ssq", [newer, latest, changed])
+    assert added == 1
+    assert [c["period"] for c in conflicts] == [latest["period"]]
+    # 号码索引随覆盖一起更新
+    assert store.periods_with_number("ssq", changed["blue_ball"], slot="blue")[0] == latest["period"]
+    assert latest["period"] not in store.periods_with_number("ssq", latest["blue_ball"], slot="blue")
+    assert store.load_draws("ssq", limit=1)[0]["period"] == newer["period"]
+
+
+def test_open_store_reimports_json_changed_outside_db(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for game in GAME_FILES:
+        for name in GAME_FILES[game].values():
+            (data_dir / name).write_bytes(open(os.path.join(DATA_DIR, name), 'rb').read())
+    db_path = str(tmp_path / "lottery.db")
+    store = open_store(db_path, str(data_dir))
+    store.export_json(str(data_dir))
+    assert store.stale_games(str(data_dir)) == []
+    store.close()
+
+    # 数据库之外（如 git pull）新增了一期开奖
+    history_file = str(data_dir / "lottery_history.json")
+    document = load_json(history_file)
+    newer = dict(document["data"][0], period=str(int(document["data"][0]["period"]) + 1))
+    document["data"].insert(0, newer)
+    with open(history_file, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False)
+
+    store = open_store(db_path, str(data_dir))
+    try:
+        assert store.stale_games(str(data_dir)) == []
+        assert store.latest_period("ssq") == newer["period"]
+        # 之后的导出不会用旧数据覆盖外部修改
+        store.export_file("ssq", "history", history_file)
+        assert load_json(history_file)["data"][0] == newer
+    finally:
+        store.close()
+
+
+def test_fetcher_delta_sync_writes_through_store(tmp_path, stand_in_server, store):
+    (tmp_path / "fetch_history").mkdir()
+    (tmp_path / "data").mkdir()
+    output_file = str(tmp_path / "fetch_history" / "lottery_data.json")
+    # 数据库中的最新期号早于录制网页
+    with store.conn:
+        store.conn.execute("DELETE FROM draws WHERE game = 'ssq' AND period > '26028'")
+        store.conn.execute("DELETE FROM draw_numbers WHERE game = 'ssq' AND period > '26028'")
+
+    with stand_in_server(lambda path, query: (200, read_fixture("ssq_history_26.html"))) as (url, stats):
+        fetcher = LotteryDataFetcher(range_url=url + "/history.php?start={start}&end={end}", store=store)
+        assert fetcher.delta_sync(output_file) == 3
+
+    assert "start=26029" in stats["paths"][0]
+    assert store.latest_period("ssq") == "26031"
+    web = load_json(str(tmp_path / "data" / "lottery_history.json"))
+    assert web == store.history_document("ssq")
+
+
+def test_generator_archives_through_store(tmp_path, monkeypatch, store):
+    monkeypatch.setattr(generate_fc3d_prediction, "STORE", store)
+    history_file = str(tmp_path / "fc3d_predictions_history.json")
+    current_file = str(tmp_path / "fc3d_ai_predictions.json")
+    monkeypatch.setattr(generate_fc3d_prediction, "FC3D_PREDICTIONS_HISTORY_FILE", history_file)
+    monkeypatch.setattr(generate_fc3d_prediction, "FC3D_PREDICTIONS_FILE", current_file)
+
+    # 当前预测的目标期号设为已开奖的最新一期
+    latest = store.latest_period("fc3d")
+    with store.conn:
+        store.conn.execute("DELETE FROM rounds WHERE game = 'fc3d' AND status = 'archived' AND target_period = ?",
+                           (latest,))
+    current = copy.deepcopy(store.load_current("fc3d"))
+    current["target_period"] = latest
+    generate_fc3d_prediction.save_predictions(current)
+    assert load_json(current_file) == current
+
+    lottery_data = generate_fc3d_prediction.load_lottery_history()
+    assert lottery_data["data"][0]["period"] == latest
+    generate_fc3d_prediction.archive_old_prediction(lottery_data)
+
+    assert store.has_archived("fc3d", latest)
+    exported = load_json(history_file)["predictions_history"]
+    assert exported[0]["target_period"] == latest
+    assert "hit_result" in exported[0]["models"][0]["predictions"][0]
+    assert exported[0] == store.load_archive("fc3d", limit=1)[0]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""测试开奖记录与预测组的紧凑类型：与现有 JSON 往返一致、派生字段、比较与哈希、内存占用"""
+
+import os
+
+import pytest
+
+from conftest import SCRIPT_DIR
+from lottery_records import (FC3DDraw, FC3DGroup, SSQDraw, SSQGroup, decode_draws, encode, load_draws,
+                             run_benchmark, verify_data_files)
+
+
+def test_data_files_round_trip():
+    checked = verify_data_files(os.path.join(SCRIPT_DIR, "data"))
+    assert set(checked) == {"lottery_history.json", "fc3d_history.json", "ai_predictions.json",
+                            "predictions_history.json", "fc3d_ai_predictions.json", "fc3d_predictions_history.json"}
+    assert all(count > 0 for count in checked.values())
+
+
+def test_records_and_derived_fields():
+    draw = SSQDraw.from_dict({"period": "26031", "red_balls": ["03", "10", "12", "13", "18", "33"],
+                              "blue_ball": "08", "date": "2026-03-22"})
+    assert (draw.period, list(draw.reds), draw.blue, draw.date) == (26031, [3, 10, 12, 13, 18, 33], 8, 20260322)
+    assert not hasattr(draw, "__dict__")
+
+    fc3d = FC3DDraw.from_dict({"period": "2026071", "digits": ["0", "0", "0"], "number": "000", "sum": 0,
+                               "span": 0, "type": "豹子", "date": "2026-01-02"})
+    assert (fc3d.number, fc3d.sum, fc3d.span, fc3d.type) == ("000", 0, 0, "豹子")
+    assert encode(decode_draws("fc3d", [fc3d.to_dict()])) == [fc3d.to_dict()]
+
+    pending = {"group_id": 2, "strategy": "冷号回补", "play_type": "组六", "digits": ["9", "1", "4"],
+               "number": "914", "description": ""}
+    assert FC3DGroup.from_dict(pending).to_dict() == pending
+    group = SSQGroup.from_dict({"group_id": 1, "strategy": "冷号回补", "red_balls": ["01", "02", "03", "04", "05", "06"],
+                                "blue_ball": "16", "description": "",
+                                "hit_result": {"red_hits": ["02"], "red_hit_count": 1, "blue_hit": True, "total_hits": 2}})
+    assert group.strategy is FC3DGroup.from_dict(pending).strategy
+    assert group.to_dict()["hit_result"]["total_hits"] == 2
+
+    draws = load_draws("ssq")
+    assert draws[0] == SSQDraw.from_dict(draws[0].to_dict())
+
+
+def test_draws_are_hashable_groups_are_not():
+    row = {"period": "26031", "red_balls": ["03", "10", "12", "13", "18", "33"], "blue_ball": "08", "date": "2026-03-22"}
+    a, b = SSQDraw.from_dict(row), SSQDraw.from_dict(dict(row))
+    assert a == b and hash(a) == hash(b) and len({a, b}) == 1
+    assert len({a, SSQDraw.from_dict(dict(row, blue_ball="09"))}) == 2
+    fc3d = {"period": "2026071", "digits": ["1", "2", "3"], "date": "2026-03-22"}
+    assert len({FC3DDraw.from_dict(fc3d), FC3DDraw.from_dict(dict(fc3d))}) == 1
+
+    group = SSQGroup.from_dict({"group_id": 1, "strategy": "", "red_balls": row["red_balls"], "blue_ball": "08",
+                                "description": ""})
+    for record in (group, FC3DGroup.from_dict({"group_id": 1, "strategy": "", "play_type": "组六",
+                                               "digits": ["1", "2", "3"], "number": "123", "description": ""})):
+        with pytest.raises(TypeError):
+            hash(record)
+
+
+def test_records_use_less_memory_than_dicts():
+    for r in run_benchmark(count=20_000):
+        assert r["record_mb"] * 2 < r["dict_mb"], r
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""测试一体化流水线：阶段依赖、并发执行、失败跳过与阶段耗时"""
+
+import os
+import shutil
+import time
+
+import pytest
+
+import generate_ai_prediction
+import generate_fc3d_prediction
+import run_pipeline
+from conftest import SCRIPT_DIR
+from run_pipeline import Pipeline, build_pipeline
+
+
+def sleeper(seconds, result=None):
+    def stage(inputs):
+        time.sleep(seconds)
+        return result
+    return stage
+
+
+def test_independent_stages_run_concurrently():
+    pipeline = Pipeline()
+    for game in ("ssq", "fc3d"):
+        pipeline.add(f"{game}.fetch", sleeper(0.3, 1))
+        pipeline.add(f"{game}.load", lambda inputs, game=game: inputs[f"{game}.fetch"] + 1, [f"{game}.fetch"])
+    report = pipeline.run(workers=4)
+
+    assert report["_total"]["seconds"] < 0.55
+    assert report["ssq.load"]["result"] == 2 and report["fc3d.load"]["result"] == 2
+    # 依赖阶段在上游结束后才开始
+    assert report["ssq.load"]["start"] >= report["ssq.fetch"]["start"] + report["ssq.fetch"]["seconds"]
+    assert report["ssq.fetch"]["seconds"] >= 0.3
+
+
+def test_failed_stage_skips_dependents_only():
+    def boom(inputs):
+        raise RuntimeError("网络错误")
+
+    pipeline = Pipeline()
+    pipeline.add("ssq.fetch", boom)
+    pipeline.add("ssq.load", sleeper(0), ["ssq.fetch"])
+    pipeline.add("ssq.save", sleeper(0), ["ssq.load"])
+    pipeline.add("fc3d.fetch", sleeper(0, 0))
+    report = pipeline.run()
+
+    assert report["ssq.fetch"]["status"] == "failed" and "网络错误" in report["ssq.fetch"]["error"]
+    assert report["ssq.load"]["status"] == report["ssq.save"]["status"] == "skipped"
+    assert report["fc3d.fetch"]["status"] == "ok"
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        Pipeline().add("ssq.load", sleeper(0), ["ssq.fetch"])
+
+
+def test_local_pipeline_loads_history_once(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    shutil.copytree(os.path.join(SCRIPT_DIR, "data"), data_dir)
+    for module, names in ((generate_ai_prediction, ("LOTTERY_HISTORY_FILE", "AI_PREDICTIONS_FILE",
+                                                    "PREDICTIONS_HISTORY_FILE")),
+                          (generate_fc3d_prediction, ("FC3D_HISTORY_FILE", "FC3D_PREDICTIONS_FILE",
+                                                      "FC3D_PREDICTIONS_HISTORY_FILE"))):
+        for name in names:
+            monkeypatch.setattr(module, name, str(data_dir / os.path.basename(getattr(module, name))))
+
+    calls = []
+    original = generate_ai_prediction.load_lottery_history
+    monkeypatch.setattr(generate_ai_prediction, "load_lottery_history",
+                        lambda: calls.append(1) or original())
+
+    exported = []
+    monkeypatch.setattr(run_pipeline, "build_artifacts", lambda games, kinds: exported.extend(games) or kinds)
+
+    report = build_pipeline(["ssq", "fc3d"], skip_fetch=True, skip_predict=True).run()
+
+    assert set(report) == {"ssq.load", "ssq.archive", "ssq.pages", "fc3d.load", "fc3d.archive", "fc3d.pages",
+                           "_total"}
+    assert sorted(exported) == ["fc3d", "ssq"]
+    assert all(r["status"] == "ok" for r in report.values())
+    assert calls == [1]
+    assert len(report["ssq.load"]["result"]["data"]) > 0
+    assert len(report["fc3d.load"]["result"]["data"]) > 0
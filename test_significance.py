@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""测试显著性分析：零假设分布与穷举一致、5 组取最佳的尾概率、精确和检验、Holm 校正、归档命中统计与按号码矩阵计算命中"""
+
+import math
+from itertools import product
+
+import pytest
+
+from analyze_significance import (analyze_history, convolve, fc3d_group_hits, fc3d_group_pmf, holm_adjust,
+                                  load_history, max_pmf, ssq_group_hits, ssq_group_pmf, sum_test)
+from archive_stream import ArchiveWriter
+from draw_matrix import DrawMatrix
+
+
+def test_group_pmfs_match_enumeration():
+    # 福彩3D：穷举 1000 个开奖号码，对固定预测 123 统计定位命中数
+    counts = [0] * 4
+    for draw in product(range(10), repeat=3):
+        counts[sum(a == b for a, b in zip(draw, (1, 2, 3)))] += 1
+    assert fc3d_group_pmf() == pytest.approx([c / 1000 for c in counts])
+
+    pmf = ssq_group_pmf()
+    assert len(pmf) == 8 and sum(pmf) == pytest.approx(1)
+    assert pmf[7] == pytest.approx(1 / math.comb(33, 6) / 16)
+    assert pmf[0] == pytest.approx(math.comb(27, 6) / math.comb(33, 6) * 15 / 16)
+
+
+def test_max_of_five_tail_matches_enumeration():
+    pmf = fc3d_group_pmf()
+    brute = [0.0] * len(pmf)
+    for hits in product(range(len(pmf)), repeat=5):
+        brute[max(hits)] += math.prod(pmf[h] for h in hits)
+    assert max_pmf(pmf, 5) == pytest.approx(brute)
+
+    # 尾概率 P(max >= k) = 1 - P(单组 < k)^5
+    best = max_pmf(ssq_group_pmf(), 5)
+    for k in range(1, 8):
+        assert sum(best[k:]) == pytest.approx(1 - sum(ssq_group_pmf()[:k]) ** 5)
+    assert max_pmf(pmf, 1) == pmf
+
+
+def test_sum_test_p_value_matches_enumeration():
+    a, b = fc3d_group_pmf(), max_pmf(fc3d_group_pmf(), 5)
+    observed = [1, 0, 2, 1]
+    pmfs = [a, b, a, b]
+    exact = sum(math.prod(p[h] for p, h in zip(pmfs, hits))
+                for hits in product(range(4), repeat=4) if sum(hits) >= sum(observed))
+    result = sum_test(observed, pmfs)
+    assert result["p_value"] == pytest.approx(exact)
+    assert result["n"] == 4 and result["observed_total"] == 4
+    assert sum_test([0, 0], [a, a])["p_value"] == pytest.approx(1)
+    assert convolve([0.5, 0.5], [0.5, 0.5]) == [0.25, 0.5, 0.25]
+
+
+def test_holm_adjustment():
+    rows = [{"p_value": p} for p in (0.01, 0.04, 0.03, 0.005)]
+    holm_adjust(rows)
+    # 升序 0.005×4、0.01×3、0.03×2、0.04×1，并保持单调不减
+    assert [r["p_holm"] for r in rows] == pytest.approx([0.03, 0.06, 0.06, 0.02])
+
+    rows = [{"p_value": 0.6}, {"p_value": 0.5}]
+    holm_adjust(rows)
+    assert [r["p_holm"] for r in rows] == [1.0, 1.0]
+
+
+def test_analyze_history_streams_archive(tmp_path):
+    path = str(tmp_path / "fc3d_predictions_history.json")
+    groups = [{"group_id": i + 1, "strategy": "直选" if i < 3 else "", "play_type": "直选",
+               "digits": list(number), "number": number, "description": ""}
+              for i, number in enumerate(["123", "120", "456", "183", "999"])]
+    with ArchiveWriter(path) as writer:
+        writer.write({"target_period": "2026072", "models": [{"model_name": "m1", "predictions": []}]})
+        writer.write({"target_period": "2026071", "actual_result": {"period": "2026071", "digits": ["1", "2", "3"],
+                                                                     "date": "2026-03-22"},
+                      "models": [{"model_name": "m1", "predictions": groups}]})
+
+    report = analyze_history(load_history(path), fc3d_group_pmf(), fc3d_group_hits, "fc3d")
+    assert report["periods"] == 2
+    assert [(r["name"], r["observed_total"]) for r in report["models"]] == [("m1", 3)]
+    assert {r["name"]: r["observed_total"] for r in report["strategies"]} == {"直选": 5, "未知": 2}
+
+    ssq = analyze_history(load_history(str(tmp_path / "missing.json")), ssq_group_pmf(), ssq_group_hits, "ssq")
+    assert ssq == {"periods": 0, "draw_mismatches": 0, "models": [], "strategies": []}
+
+
+def test_hits_are_scored_against_the_draw_matrix(tmp_path):
+    path = str(tmp_path / "fc3d_predictions_history.json")
+    group = {"group_id": 1, "strategy": "直选", "play_type": "直选", "digits": ["1", "2", "3"], "number": "123"}
+    with ArchiveWriter(path) as writer:
+        for period, digits in (("2026071", ["1", "2", "3"]), ("2026070", ["4", "5", "6"])):
+            writer.write({"target_period": period, "actual_result": {"period": period, "digits": digits},
+                          "models": [{"model_name": "m1", "predictions": [group]}]})
+
+    # 2026071 在主数据中开出 129（归档记录有误），2026070 不在矩阵中时沿用归档的开奖结果
+    matrix = DrawMatrix.build("fc3d", [{"period": "2026071", "digits": ["1", "2", "9"]}])
+    report = analyze_history(load_history(path), fc3d_group_pmf(), fc3d_group_hits, "fc3d", matrix)
+    assert report["draw_mismatches"] == 1
+    assert [(r["name"], r["observed_total"]) for r in report["models"]] == [("m1", 2)]
+
+    report = analyze_history(load_history(path), fc3d_group_pmf(), fc3d_group_hits, "fc3d")
+    assert report["draw_mismatches"] == 0
+    assert report["models"][0]["observed_total"] == 3
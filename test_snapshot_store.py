@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""测试快照存储：相同内容去重、按份数/天数清理、恢复与旧备份迁移"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from fetch_lottery_history import LotteryDataFetcher
+from snapshot_store import SnapshotStore
+
+
+class Clock:
+    def __init__(self):
+        self.current = datetime(2026, 1, 1, 12, 0, 0)
+
+    def __call__(self):
+        return self.current
+
+    def advance(self, **kwargs):
+        self.current += timedelta(**kwargs)
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def object_files(store):
+    return [name for _, _, names in os.walk(os.path.join(store.root, "objects")) for name in names]
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    path = str(tmp_path / "lottery_data.json")
+    write_json(path, [{"period": "26001", "red_balls": ["01"] * 6}])
+    clock = Clock()
+    store = SnapshotStore.for_file(path, now=clock)
+
+    first = store.snapshot(path)
+    clock.advance(hours=1)
+    assert store.snapshot(path) == first
+    assert len(store.list(path)) == 1
+
+    write_json(path, [{"period": "26002"}])
+    clock.advance(hours=1)
+    second = store.snapshot(path)
+    assert second["id"] != first["id"]
+    assert len(object_files(store)) == 2
+
+    # 内容回到第一版时新增记录，但复用已有对象
+    write_json(path, [{"period": "26001", "red_balls": ["01"] * 6}])
+    clock.advance(hours=1)
+    third = store.snapshot(path)
+    assert third["digest"] == first["digest"]
+    assert len(store.list(path)) == 3
+    assert len(object_files(store)) == 2
+
+    with open(path, 'rb') as f:
+        assert gzip.decompress(open(store.object_path(first["digest"]), 'rb').read()) == f.read()
+
+
+def test_retention_by_count_and_age(tmp_path):
+    path = str(tmp_path / "ai_predictions.json")
+    clock = Clock()
+    store = SnapshotStore.for_file(path, keep=3, now=clock)
+    for i in range(6):
+        write_json(path, {"target_period": f"2600{i}"})
+        store.snapshot(path)
+        clock.advance(days=1)
+
+    entries = store.list(path)
+    assert len(entries) == 3
+    assert len(object_files(store)) == 3
+
+    # 按天数清理时仍保留最近一份
+    clock.advance(days=30)
+    assert store.prune(max_age_days=7) == 2
+    assert [e["id"] for e in store.list(path)] == [entries[-1]["id"]]
+    assert len(object_files(store)) == 1
+
+
+def test_restore_writes_back_snapshot(tmp_path):
+    path = str(tmp_path / "lottery_data.json")
+    clock = Clock()
+    store = SnapshotStore.for_file(path, now=clock)
+    write_json(path, [{"period": "26001"}])
+    original = open(path, 'rb').read()
+    first = store.snapshot(path)
+
+    clock.advance(hours=1)
+    write_json(path, [{"period": "broken"}])
+    assert store.restore(path, first["id"][:12]) == first
+    assert open(path, 'rb').read() == original
+    # 覆盖前的内容也留有快照
+    assert len(store.list(path)) == 2
+
+
+def test_fetcher_backup_and_legacy_migration(tmp_path):
+    path = str(tmp_path / "lottery_data.json")
+    write_json(path, [{"period": "26001"}])
+    legacy = str(tmp_path / "lottery_data_backup_20251027_152701.json")
+    write_json(legacy, [{"period": "25122"}])
+
+    fetcher = LotteryDataFetcher()
+    snapshot_id = fetcher.backup_existing_file(path)
+    assert fetcher.backup_existing_file(path) == snapshot_id
+    assert not [n for n in os.listdir(tmp_path) if "_backup_" in n and n != os.path.basename(legacy)]
+
+    store = SnapshotStore.for_file(path)
+    assert store.migrate_legacy_backups(path) == 1
+    assert not os.path.exists(legacy)
+    entries = store.list(path)
+    assert entries[0]["id"].startswith("20251027_152701-")
+    assert entries[-1]["id"] == snapshot_id
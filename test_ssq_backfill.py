@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""测试双色球全量回填（使用本地 HTTP 替身服务器提供录制的网页）"""
+
+import json
+
+from conftest import read_fixture
+from fetch_lottery_history import LotteryDataFetcher
+from http_utils import create_session
+
+RECORDED_YEARS = ("25", "26")
+
+
+def ssq_route(fail_years=()):
+    """按 start 参数的年份返回 fixtures/ssq_history_<yy>.html，没有录制页面的年份返回空表"""
+    def route(path, query):
+        year = query["start"][0][:2]
+        if year in fail_years:
+            return 500, b"", {"Retry-After": "0"}
+        if year in RECORDED_YEARS:
+            return 200, read_fixture(f"ssq_history_{year}.html")
+        return 200, read_fixture("ssq_history_empty.html")
+    return route
+
+
+def make_output(tmp_path):
+    """仿照仓库布局创建 fetch_history/ 与 data/ 目录，返回输出文件路径"""
+    (tmp_path / "fetch_history").mkdir()
+    (tmp_path / "data").mkdir()
+    return str(tmp_path / "fetch_history" / "lottery_data.json")
+
+
+def range_url(base_url):
+    return base_url + "/history.php?start={start}&end={end}"
+
+
+def test_backfill_ranges_cover_every_year():
+    ranges = LotteryDataFetcher.build_backfill_ranges(2003, 2026)
+    assert len(ranges) == 24
+    assert ranges[0] == ("03001", "03200")
+    assert ranges[-1] == ("26001", "26200")
+
+
+def test_backfill_fetches_concurrently_and_merges_once(tmp_path, stand_in_server):
+    output_file = make_output(tmp_path)
+    session = create_session({}, pool_size=2)
+    with stand_in_server(ssq_route(), latency=0.05) as (url, stats):
+        fetcher = LotteryDataFetcher(range_url=range_url(url), session=session)
+        assert fetcher.backfill(output_file, first_year=2003, last_year=2026, workers=8, rate=0)
+
+    assert stats["requests"] == 24
+    assert stats["max_in_flight"] > 1
+    # 注入的共享 Session 保持不变，只是连接池扩大到并发线程数
+    assert fetcher.session is session
+    assert session.adapters["http://"]._pool_maxsize == 8
+
+    with open(output_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert len(data) == 92
+    assert data[0] == {"period": "26031", "red_balls": ["03", "10", "12", "13", "18", "33"],
+                       "blue_ball": "08", "date": "2026-03-22"}
+    assert [d["period"] for d in data] == sorted((d["period"] for d in data), reverse=True)
+
+    with open(tmp_path / "data" / "lottery_history.json", 'r', encoding='utf-8') as f:
+        web = json.load(f)
+    assert len(web["data"]) == 92
+    assert web["next_draw"]["next_period"] == "26032"
+
+
+def test_backfill_respects_rate_limit(tmp_path, stand_in_server):
+    output_file = make_output(tmp_path)
+    with stand_in_server(ssq_route()) as (url, stats):
+        fetcher = LotteryDataFetcher(range_url=range_url(url))
+        fetcher.backfill(output_file, first_year=2017, last_year=2026, workers=8, rate=20)
+
+    arrivals = sorted(stats["arrivals"])
+    assert len(arrivals) == 10
+    # 10 次请求在 20 次/秒限速下至少跨越 9 个间隔
+    assert arrivals[-1] - arrivals[0] >= 9 / 20 * 0.9
+
+
+def test_backfill_keeps_successful_ranges_when_one_fails(tmp_path, stand_in_server):
+    output_file = make_output(tmp_path)
+    with stand_in_server(ssq_route(fail_years=("25",))) as (url, stats):
+        fetcher = LotteryDataFetcher(range_url=range_url(url))
+        assert not fetcher.backfill(output_file, first_year=2025, last_year=2026, workers=2, rate=0)
+
+    with open(output_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert {d["period"][:2] for d in data} == {"26"}
+
+
+def test_backfill_reports_failed_save(tmp_path, stand_in_server, monkeypatch):
+    output_file = make_output(tmp_path)
+    monkeypatch.setattr("fetch_lottery_history.atomic_write_json",
+                        lambda *args, **kwargs: (_ for _ in ()).throw(OSError("disk full")))
+    with stand_in_server(ssq_route()) as (url, stats):
+        fetcher = LotteryDataFetcher(range_url=range_url(url))
+        assert not fetcher.backfill(output_file, first_year=2025, last_year=2026, workers=2, rate=0)
+    assert fetcher.written_files == []
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""测试双色球约束过滤引擎：掩码计数与穷举一致、组合排序往返、特征缓存、预测声明校验"""
+
+import math
+import os
+import random
+from itertools import combinations
+
+import pytest
+
+from ssq_constraints import (TOTAL_COMBINATIONS, CombinationTable, check_constraints, combo_features,
+                             parse_description_claims, rank_combination, unrank_combination, validate_group)
+
+SMALL_CONSTRAINTS = {
+    "sum": (21, 45),
+    "odd": [2, 3, 4],
+    "consecutive": (0, 2),
+    "zones": [(3, 6), (0, 3), (0, 0)],
+}
+
+
+@pytest.fixture(scope="module")
+def table():
+    return CombinationTable.build()
+
+
+def brute_force(constraints, max_sum):
+    """穷举全部组合（先按和值剪枝）并逐个检查约束"""
+    return [combo for combo in combinations(range(1, 34), 6)
+            if sum(combo) <= max_sum and not check_constraints(combo, constraints)]
+
+
+def test_mask_count_matches_brute_force(table):
+    expected = brute_force(SMALL_CONSTRAINTS, SMALL_CONSTRAINTS["sum"][1])
+    assert 0 < len(expected) < 5000
+    assert table.count(SMALL_CONSTRAINTS) == len(expected)
+    assert list(table.enumerate(SMALL_CONSTRAINTS)) == expected
+
+    sampled = table.sample(SMALL_CONSTRAINTS, 5, random.Random(1))
+    assert len(set(sampled)) == 5 and set(sampled) <= set(expected)
+    assert table.count({}) == TOTAL_COMBINATIONS
+
+
+def test_feature_columns_match_combo_features(table):
+    rng = random.Random(7)
+    for index in [0, TOTAL_COMBINATIONS - 1] + rng.sample(range(TOTAL_COMBINATIONS), 500):
+        combo = unrank_combination(index)
+        assert rank_combination(combo) == index
+        features = combo_features(combo)
+        z1, z2, _ = features["zones"]
+        assert table.columns["zone"][index] == z1 * 7 + z2
+        for name in ("odd", "big", "sum", "consecutive", "ac", "tails", "primes"):
+            assert table.columns[name][index] == features[name], (combo, name)
+
+
+def test_rank_is_lexicographic():
+    assert unrank_combination(0) == (1, 2, 3, 4, 5, 6)
+    assert unrank_combination(TOTAL_COMBINATIONS - 1) == (28, 29, 30, 31, 32, 33)
+    assert rank_combination((1, 2, 3, 4, 5, 7)) == 1
+    assert rank_combination((2, 3, 4, 5, 6, 7)) == math.comb(32, 5)
+
+
+def test_truncated_feature_cache_is_rebuilt(table, tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "ssq_features.bin")
+    monkeypatch.setattr(CombinationTable, "build", classmethod(lambda cls: table))
+    CombinationTable.load(cache_file)
+    size = os.path.getsize(cache_file)
+
+    # 模拟写入中断留下的半个文件：头部正确但数据不全
+    with open(cache_file, 'r+b') as f:
+        f.truncate(size // 2)
+    builds = []
+    monkeypatch.setattr(CombinationTable, "build", classmethod(lambda cls: builds.append(1) or table))
+    assert CombinationTable.load(cache_file).columns == table.columns
+    assert builds == [1]
+    assert os.path.getsize(cache_file) == size
+    assert os.listdir(tmp_path) == ["ssq_features.bin"]
+
+    assert CombinationTable.load(cache_file).columns == table.columns
+    assert builds == [1]
+
+
+def test_sum_claims_accept_single_values_and_ranges():
+    for text in ("和值105，奇偶比3:3", "和值：105", "和值: 105", "总和为105"):
+        assert parse_description_claims(text)["sum"] == (105, 105), text
+    for text in ("总和 100-120", "和值100~120", "和值100至120", "和值 100 到 120", "和值120-100",
+                 "和值在100-120", "和值：100～120", "和值在 100 到 120 之间"):
+        assert parse_description_claims(text)["sum"] == (100, 120), text
+
+    group = {"strategy": "", "red_balls": ["03", "10", "12", "13", "18", "33"], "blue_ball": "08"}  # 和值 89
+    assert validate_group(dict(group, description="和值80-90"))["claim_mismatches"] == []
+    assert validate_group(dict(group, description="和值89"))["claim_mismatches"] == []
+    assert validate_group(dict(group, description="和值90-130"))["claim_mismatches"] == ["sum 声明 90-130，实际 89"]
+    assert validate_group(dict(group, description="和值100"))["claim_mismatches"] == ["sum 声明 100，实际 89"]
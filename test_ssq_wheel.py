@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""测试双色球旋转矩阵：t-if-m 覆盖保证（独立穷举核对）、参数校验与蓝球分配"""
+
+from itertools import combinations
+
+import pytest
+
+from ssq_wheel import MAX_POOL_SIZE, assign_blues, solve_wheel
+
+
+def assert_guarantee(pool, tickets, guarantee, condition):
+    """候选池中任意 condition 个号码，至少有一注命中其中 guarantee 个"""
+    for drawn in combinations(pool, condition):
+        drawn = set(drawn)
+        assert any(len(drawn & set(ticket)) >= guarantee for ticket in tickets), drawn
+
+
+@pytest.mark.parametrize("pool,guarantee,condition", [
+    ([1, 5, 9, 12, 16, 18, 22, 26, 28, 31], 4, 5),
+    ([2, 3, 7, 11, 13, 17, 19, 23, 29, 31, 33], 3, 4),
+    (list(range(1, 13)), 3, 6),
+])
+def test_tickets_satisfy_coverage_guarantee(pool, guarantee, condition):
+    result = solve_wheel(pool, guarantee, condition, time_budget=0.2, seed=1)
+    assert result["verified"]
+    assert result["pool"] == sorted(pool)
+    tickets = result["tickets"]
+    assert tickets == sorted(tickets)
+    assert all(len(set(t)) == 6 and set(t) <= set(pool) for t in tickets)
+    # 全部组合投注才是上限，覆盖设计应明显更少
+    assert len(tickets) < len(list(combinations(pool, 6)))
+    assert_guarantee(pool, tickets, guarantee, condition)
+
+
+def test_small_pool_and_invalid_arguments():
+    assert solve_wheel([1, 2, 3, 4, 5, 6], 6, 6, time_budget=0.01, seed=1)["tickets"] == [(1, 2, 3, 4, 5, 6)]
+    with pytest.raises(ValueError):
+        solve_wheel([1, 2, 3, 4, 5], 3, 5)
+    with pytest.raises(ValueError):
+        solve_wheel(list(range(1, 11)), 5, 4)
+
+
+def test_pool_is_validated():
+    for pool in (list(range(1, MAX_POOL_SIZE + 2)), [1, 2, 3, 4, 5, 6, 6], [0, 1, 2, 3, 4, 5], [1, 2, 3, 4, 5, 34]):
+        with pytest.raises(ValueError):
+            solve_wheel(pool, 3, 4, time_budget=0.01)
+
+
+def test_time_budget_bounds_the_first_round():
+    # 20 个号码的 5-if-6 一轮贪心需要数秒；超出预算时返回部分投注
+    result = solve_wheel(list(range(1, MAX_POOL_SIZE + 1)), 5, 6, time_budget=1.0, seed=1)
+    assert result["elapsed"] < 1.5
+    assert not result["verified"] and result["rounds"] == 0
+    assert result["tickets"] and len(set(result["tickets"])) == len(result["tickets"])
+
+
+def test_assign_blues_cycles_in_order():
+    tickets = [(1, 2, 3, 4, 5, 6), (7, 8, 9, 10, 11, 12), (13, 14, 15, 16, 17, 18)]
+    assert [t["blue_ball"] for t in assign_blues(tickets, [3, 16])] == ["03", "16", "03"]
+    assert assign_blues(tickets[:1], []) == [{"red_balls": ["01", "02", "03", "04", "05", "06"]}]